@@ -0,0 +1,106 @@
+"""
+Agent Name: python-bench-startup
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Startup benchmark and import-regression guard for the ``scjson`` CLI.
+
+Each scenario runs in a fresh interpreter ``--runs`` times; the median wall
+time is reported along with the heavy modules the scenario imported. With
+``--check`` the script exits non-zero when a scenario imports a module it
+should not (for example the engine for ``--help``) or when ``--max-ms`` is
+exceeded. Run from ``py/``::
+
+    python benchmarks/bench_startup.py --runs 10 --check --max-ms 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PY_DIR = Path(__file__).resolve().parents[1]
+HEAVY = ("scjson.context", "scjson.pydantic", "jinja2", "xmlschema", "xsdata", "pydantic")
+
+# Scenario name -> (CLI arguments, heavy modules it must not import)
+SCENARIOS: Dict[str, Tuple[List[str], Tuple[str, ...]]] = {
+    "import": ([], HEAVY),
+    "help": (["--help"], HEAVY),
+    "json": (["json", "{chart}", "-o", "{out}"], ("scjson.context", "scjson.pydantic", "jinja2", "xmlschema")),
+}
+
+_PROBE = """
+import json, sys
+from click.testing import CliRunner
+from scjson.cli import main
+args = json.loads(sys.argv[1])
+if args:
+    result = CliRunner().invoke(main, args)
+    if result.exit_code != 0:
+        raise SystemExit(result.output)
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def run_scenario(args: List[str], runs: int) -> Tuple[float, List[str]]:
+    """Return the median milliseconds and imported modules for ``args``."""
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PY_DIR), env.get("PYTHONPATH")]))
+    samples: List[float] = []
+    modules: List[str] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE, json.dumps(args)],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+        samples.append((time.perf_counter() - started) * 1e3)
+        modules = json.loads(proc.stdout.strip().splitlines()[-1])
+    return statistics.median(samples), modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per scenario")
+    parser.add_argument("--check", action="store_true", help="Fail on forbidden imports")
+    parser.add_argument("--max-ms", type=float, help="Fail when a scenario median exceeds this")
+    args = parser.parse_args()
+
+    failures: List[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        chart = Path(tmp) / "chart.scxml"
+        chart.write_text(
+            '<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="a"><state id="a"/></scxml>',
+            encoding="utf-8",
+        )
+        fill = {"chart": str(chart), "out": str(Path(tmp) / "chart.scjson")}
+        for name, (template, forbidden) in SCENARIOS.items():
+            cli_args = [part.format(**fill) for part in template]
+            median, modules = run_scenario(cli_args, args.runs)
+            loaded = [m for m in forbidden if any(x == m or x.startswith(m + ".") for x in modules)]
+            print(f"{name:8s} {median:8.1f} ms  heavy imports: {', '.join(loaded) or 'none'}")
+            if args.check and loaded:
+                failures.append(f"{name}: imported {', '.join(loaded)}")
+            if args.max_ms is not None and median > args.max_ms:
+                failures.append(f"{name}: {median:.1f} ms > {args.max_ms} ms")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
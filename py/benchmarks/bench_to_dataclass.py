@@ -0,0 +1,90 @@
+"""
+Agent Name: python-bench-to-dataclass
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Benchmark SCJSON → dataclass conversion on a large synthetic chart.
+
+Builds a chart with ``--states`` compound states (each carrying entry/exit
+actions, a guarded transition and an if/elseif/else block), converts it to
+SCJSON once, then times ``SCXMLDocumentHandler._to_dataclass`` and the full
+``json_to_xml`` path. Run from ``py/``::
+
+    python benchmarks/bench_to_dataclass.py --states 3000 --repeat 5
+
+``--no-gc`` pauses the cyclic garbage collector during the timed calls to
+show how much of the cost is collections triggered by the allocation burst.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scjson.SCXMLDocumentHandler import SCXMLDocumentHandler  # noqa: E402
+from scjson.dataclasses import Scxml  # noqa: E402
+
+
+def build_chart(states: int) -> str:
+    """Return an SCXML document with ``states`` compound states."""
+
+    parts = ['<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="s0">']
+    for i in range(states):
+        parts.append(
+            f'<state id="s{i}">'
+            f'<onentry><log expr="{i}"/><assign location="x" expr="{i}"/></onentry>'
+            f'<transition event="e{i}" target="s{(i + 1) % states}" cond="x &gt; {i}">'
+            '<raise event="r"/></transition>'
+            f'<state id="c{i}"><onexit><if cond="x"><send event="a"/>'
+            '<elseif cond="y"/><else/></if></onexit></state>'
+            "</state>"
+        )
+    parts.append("</scxml>")
+    return "".join(parts)
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    """Return the fastest wall time of ``repeat`` calls, in seconds."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--states", type=int, default=3000, help="Compound states in the chart")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions (best is reported)")
+    parser.add_argument("--no-gc", action="store_true", help="Disable the garbage collector while timing")
+    args = parser.parse_args()
+    if args.no_gc:
+        gc.disable()
+
+    handler = SCXMLDocumentHandler()
+    json_str = handler.xml_to_json(build_chart(args.states))
+    data = json.loads(json_str)
+    print(f"chart: {args.states} states, {len(json_str) / 1e6:.1f} MB SCJSON")
+
+    first = time.perf_counter()
+    handler._to_dataclass(Scxml, data)
+    print(f"first _to_dataclass (includes builder compile): {(time.perf_counter() - first) * 1e3:.1f} ms")
+    convert = best_of(args.repeat, lambda: handler._to_dataclass(Scxml, data))
+    print(f"_to_dataclass: {convert * 1e3:.1f} ms ({convert / args.states * 1e6:.1f} us/state)")
+    full = best_of(args.repeat, lambda: handler.json_to_xml(json_str))
+    print(f"json_to_xml: {full * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,19 +8,25 @@ Licensed under the BSD 1-Clause License.
 Execute a chart in both the Python runtime and a reference engine, then
 diff their JSONL traces. Supports leaf-only/state filtering, step-0
 normalization, and optional field omission for focused comparisons.
+Traces are normalized and compared while streaming, so long soak traces are
+never held in memory; ``--bisect`` finds the first divergence via rolling-hash
+checkpoints.
 """
 
 from __future__ import annotations
 
 import argparse
+import atexit
+import hashlib
 import json
 import os
 import shlex
 import subprocess
 import sys
+from functools import partial
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Iterable, List, Tuple, Set, Dict, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
 
 try:
     from scjson.cli import engine_trace  # noqa: F401  # ensure CLI registered when installed locally
@@ -183,80 +189,6 @@ def _leaf_ids_from_chart(chart: Path, treat_as_xml: bool) -> Set[str]:
     return leaves
 
 
-def _normalize_steps_leaf_only(steps: List[dict], leaf_ids: Set[str]) -> List[dict]:
-    if not leaf_ids:
-        return steps
-    norm: List[dict] = []
-    for step in steps:
-        s = dict(step)
-        for key in ("configuration", "enteredStates", "exitedStates"):
-            vals = s.get(key)
-            if isinstance(vals, list):
-                s[key] = [v for v in vals if v in leaf_ids]
-        norm.append(s)
-    return norm
-
-
-def _strip_step0_noise(steps: List[dict]) -> List[dict]:
-    """Normalize step 0 differences across engines.
-
-    - Remove datamodelDelta at step 0 (engines include different init deltas)
-    - Remove firedTransitions at step 0 (some engines record initial transitions)
-    """
-    if not steps:
-        return steps
-    out: List[dict] = []
-    for s in steps:
-        t = dict(s)
-        if int(t.get("step", -1)) == 0:
-            t["datamodelDelta"] = {}
-            t["firedTransitions"] = []
-        out.append(t)
-    return out
-
-
-def _strip_step0_states(steps: List[dict]) -> List[dict]:
-    """Optionally clear step 0 entered/exited to reduce reference noise.
-
-    Some engines surface initial transitions by reporting non-empty
-    ``enteredStates``/``exitedStates`` at step 0. Others do not. When comparing
-    traces, clearing these fields for step 0 helps focus diffs on
-    post-initialization behavior. The final configuration remains available
-    via ``configuration`` regardless.
-    """
-    if not steps:
-        return steps
-    out: List[dict] = []
-    for s in steps:
-        t = dict(s)
-        if int(t.get("step", -1)) == 0:
-            t["enteredStates"] = []
-            t["exitedStates"] = []
-        out.append(t)
-    return out
-
-
-def _normalize_transition_conditions(steps: List[dict]) -> List[dict]:
-    """Clear transition conditions for comparison parity with SCION output."""
-
-    normalized: List[dict] = []
-    for step in steps:
-        t = dict(step)
-        transitions = t.get("firedTransitions")
-        if isinstance(transitions, list):
-            cleaned: List[dict] = []
-            for item in transitions:
-                if isinstance(item, dict):
-                    entry = dict(item)
-                    entry["cond"] = None
-                    cleaned.append(entry)
-                else:
-                    cleaned.append(item)
-            t["firedTransitions"] = cleaned
-        normalized.append(t)
-    return normalized
-
-
 def _diff_steps(py_steps: List[dict], ref_steps: List[dict]) -> Tuple[bool, List[str], Tuple[int, int, int, int]]:
     mismatch = False
     notes: List[str] = []
@@ -288,6 +220,193 @@ def _diff_steps(py_steps: List[dict], ref_steps: List[dict]) -> Tuple[bool, List
     return mismatch, notes, (py_len, ref_len, compared, mismatching_keys)
 
 
+_END = object()
+_DEFAULT_LABELS = ("python", "reference")
+
+
+def _nonblank_lines(handle: Iterable[bytes]) -> Iterator[bytes]:
+    for raw in handle:
+        if raw.strip():
+            yield raw
+
+
+def _step_notes(
+    idx: int, left: dict, right: dict, notes: List[str], labels: Tuple[str, str]
+) -> int:
+    """Append per-key notes for a differing step; return the key count."""
+    notes.append(f"Step {idx}:")
+    count = 0
+    for key in sorted(set(left.keys()) | set(right.keys())):
+        l_val = left.get(key)
+        r_val = right.get(key)
+        if l_val != r_val:
+            count += 1
+            notes.append(f"  {key}: {labels[0]}={l_val!r} {labels[1]}={r_val!r}")
+    return count
+
+
+def _diff_trace_files(
+    left_path: Path,
+    right_path: Path,
+    normalize: Callable[[dict], dict],
+    *,
+    max_mismatches: int = 1,
+    labels: Tuple[str, str] = _DEFAULT_LABELS,
+) -> Tuple[bool, List[str], Tuple[int, int, int, int]]:
+    """Compare two JSONL traces step by step without loading them.
+
+    Each step is parsed and normalized only when reached. Comparison stops
+    after ``max_mismatches`` differing steps (``0`` compares everything);
+    the remaining lines are then only counted so totals stay accurate.
+
+    Returns
+    -------
+    Tuple[bool, List[str], Tuple[int, int, int, int]]
+        ``(mismatch, notes, (left_len, right_len, compared, mismatching_keys))``
+        as produced by :func:`_diff_steps`.
+    """
+    notes: List[str] = []
+    left_len = right_len = compared = mismatching_keys = bad_steps = 0
+    stopped = False
+    with left_path.open("rb") as lf, right_path.open("rb") as rf:
+        left_lines = _nonblank_lines(lf)
+        right_lines = _nonblank_lines(rf)
+        while True:
+            l_raw = next(left_lines, _END)
+            r_raw = next(right_lines, _END)
+            if l_raw is not _END:
+                left_len += 1
+            if r_raw is not _END:
+                right_len += 1
+            if l_raw is _END or r_raw is _END:
+                break
+            idx = compared
+            compared += 1
+            l_step = normalize(json.loads(l_raw))
+            r_step = normalize(json.loads(r_raw))
+            if l_step == r_step:
+                continue
+            bad_steps += 1
+            mismatching_keys += _step_notes(idx, l_step, r_step, notes, labels)
+            if max_mismatches > 0 and bad_steps >= max_mismatches:
+                stopped = True
+                break
+        left_len += sum(1 for _ in left_lines)
+        right_len += sum(1 for _ in right_lines)
+    if stopped and compared < min(left_len, right_len):
+        notes.append(
+            f"Stopped after {bad_steps} mismatching step(s); "
+            f"{min(left_len, right_len) - compared} later step(s) not compared."
+        )
+    if left_len != right_len:
+        notes.insert(
+            0,
+            f"Length mismatch: {labels[0]} trace has {left_len} steps, {labels[1]} has {right_len}.",
+        )
+    mismatch = bool(bad_steps) or left_len != right_len
+    return mismatch, notes, (left_len, right_len, compared, mismatching_keys)
+
+
+def _rolling_hash(prev: bytes, step: dict) -> bytes:
+    """Chain ``step`` onto the prefix digest ``prev``."""
+    canonical = json.dumps(step, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(prev + canonical.encode("utf-8")).digest()
+
+
+def _trace_checkpoints(
+    path: Path, normalize: Callable[[dict], dict], stride: int
+) -> List[Tuple[int, bytes, int]]:
+    """Return ``(steps, prefix_digest, byte_offset)`` every ``stride`` steps.
+
+    The first entry is the empty prefix and the last covers the whole
+    trace. Only one step is held in memory at a time.
+    """
+    checkpoints: List[Tuple[int, bytes, int]] = [(0, b"", 0)]
+    digest = b""
+    count = 0
+    offset = 0
+    with path.open("rb") as handle:
+        for raw in handle:
+            offset += len(raw)
+            if not raw.strip():
+                continue
+            digest = _rolling_hash(digest, normalize(json.loads(raw)))
+            count += 1
+            if count % stride == 0:
+                checkpoints.append((count, digest, offset))
+    if checkpoints[-1][0] != count:
+        checkpoints.append((count, digest, offset))
+    return checkpoints
+
+
+def _bisect_trace_files(
+    left_path: Path,
+    right_path: Path,
+    normalize: Callable[[dict], dict],
+    *,
+    stride: int = 4096,
+    labels: Tuple[str, str] = _DEFAULT_LABELS,
+) -> Tuple[bool, List[str], Tuple[int, int, int, int]]:
+    """Locate the first divergent step using rolling-hash checkpoints.
+
+    Both traces are hashed in one streaming pass each. Because checkpoint
+    digests cover the whole prefix, "checkpoint ``i`` differs" is monotone
+    in ``i``, so the first differing checkpoint is found by binary search.
+    Only the ``stride`` steps after the last matching checkpoint are then
+    re-read (by byte offset) and compared step by step.
+
+    Returns
+    -------
+    Tuple[bool, List[str], Tuple[int, int, int, int]]
+        Same shape as :func:`_diff_trace_files`; ``compared`` is the index of
+        the first divergent step.
+    """
+    stride = max(1, stride)
+    left_cp = _trace_checkpoints(left_path, normalize, stride)
+    right_cp = _trace_checkpoints(right_path, normalize, stride)
+    left_len = left_cp[-1][0]
+    right_len = right_cp[-1][0]
+    if left_cp[-1][:2] == right_cp[-1][:2]:
+        return False, [], (left_len, right_len, left_len, 0)
+
+    lo, hi = 0, min(len(left_cp), len(right_cp))
+    # Invariant: checkpoint ``lo`` matches; the first mismatch lies in (lo, hi]
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if left_cp[mid][:2] == right_cp[mid][:2]:
+            lo = mid
+        else:
+            hi = mid
+    base, _, left_off = left_cp[lo]
+    right_off = right_cp[lo][2]
+
+    notes: List[str] = []
+    mismatching_keys = 0
+    idx = base
+    with left_path.open("rb") as lf, right_path.open("rb") as rf:
+        lf.seek(left_off)
+        rf.seek(right_off)
+        left_lines = _nonblank_lines(lf)
+        right_lines = _nonblank_lines(rf)
+        while True:
+            l_raw = next(left_lines, _END)
+            r_raw = next(right_lines, _END)
+            if l_raw is _END or r_raw is _END:
+                break
+            l_step = normalize(json.loads(l_raw))
+            r_step = normalize(json.loads(r_raw))
+            if l_step != r_step:
+                mismatching_keys = _step_notes(idx, l_step, r_step, notes, labels)
+                break
+            idx += 1
+    if left_len != right_len:
+        notes.insert(
+            0,
+            f"Length mismatch: {labels[0]} trace has {left_len} steps, {labels[1]} has {right_len}.",
+        )
+    return True, notes, (left_len, right_len, idx, mismatching_keys)
+
+
 def _default_reference_cmd() -> List[str]:
     if _SCION_SCRIPT.exists():
         return ["node", str(_SCION_SCRIPT)]
@@ -327,22 +446,125 @@ def _build_trace_cmd(
     return cmd
 
 
-def _omit_fields(
-    steps: List[dict], *, omit_actions: bool, omit_delta: bool, omit_transitions: bool
-) -> List[dict]:
-    if not (omit_actions or omit_delta or omit_transitions):
-        return steps
-    out: List[dict] = []
-    for s in steps:
-        t = dict(s)
-        if omit_actions and "actionLog" in t:
-            t["actionLog"] = []
-        if omit_delta and "datamodelDelta" in t:
-            t["datamodelDelta"] = {}
-        if omit_transitions and "firedTransitions" in t:
-            t["firedTransitions"] = []
-        out.append(t)
-    return out
+def _normalize_step(
+    step: dict,
+    leaf_ids: Set[str] | None,
+    *,
+    keep_step0_states: bool,
+    omit_actions: bool,
+    omit_delta: bool,
+    omit_transitions: bool,
+) -> dict:
+    """Normalize one trace step for comparison.
+
+    Per-step equivalent of the leaf-only, step-0, omission, and
+    transition-condition passes, so traces can be compared while streaming.
+    ``leaf_ids`` of ``None`` (or empty) keeps full state sets.
+    """
+    t = dict(step)
+    if leaf_ids:
+        for key in ("configuration", "enteredStates", "exitedStates"):
+            vals = t.get(key)
+            if isinstance(vals, list):
+                t[key] = [v for v in vals if v in leaf_ids]
+    if int(t.get("step", -1)) == 0:
+        # Engines report different init deltas, and some record initial
+        # transitions; step-0 entered/exited lists are likewise optional
+        # noise (``configuration`` still carries the initial state).
+        t["datamodelDelta"] = {}
+        t["firedTransitions"] = []
+        if not keep_step0_states:
+            t["enteredStates"] = []
+            t["exitedStates"] = []
+    if omit_actions and "actionLog" in t:
+        t["actionLog"] = []
+    if omit_delta and "datamodelDelta" in t:
+        t["datamodelDelta"] = {}
+    if omit_transitions and "firedTransitions" in t:
+        t["firedTransitions"] = []
+    # Clear transition conditions for comparison parity with SCION output
+    transitions = t.get("firedTransitions")
+    if isinstance(transitions, list):
+        t["firedTransitions"] = [
+            dict(item, cond=None) if isinstance(item, dict) else item
+            for item in transitions
+        ]
+    return t
+
+
+def _mismatch_report(
+    notes: List[str],
+    stats: Tuple[int, int, int, int],
+    labels: Tuple[str, str] = ("python", "reference"),
+) -> List[str]:
+    """Render diff notes and totals as printable lines."""
+    left, right = labels
+    left_len, right_len, compared, mismatching_keys = stats
+    lines = [f"Mismatch detected ({left} vs {right}):"]
+    lines.extend(notes)
+    lines.append(
+        f"Totals: {left}_steps={left_len} {right}_steps={right_len} compared={compared} mismatching_keys={mismatching_keys}"
+    )
+    return lines
+
+
+_REFERENCE_POOLS: Dict[Tuple[str, ...], Any] = {}
+
+
+def _reference_worker_pool(
+    ref_cmd: List[str],
+    *,
+    env: Dict[str, str] | None = None,
+    timeout: float = 120.0,
+) -> Any:
+    """Return the process-wide persistent worker pool for ``ref_cmd``.
+
+    The reference command is started once with ``--worker`` and reused for
+    every later chart in this process (see ``scjson.trace_worker``).
+    """
+    key = tuple(ref_cmd)
+    pool = _REFERENCE_POOLS.get(key)
+    if pool is None:
+        from scjson.trace_worker import TraceWorkerPool
+
+        pool = TraceWorkerPool(list(ref_cmd) + ["--worker"], 1, env=env, timeout=timeout)
+        _REFERENCE_POOLS[key] = pool
+        if len(_REFERENCE_POOLS) == 1:
+            atexit.register(_close_reference_pools)
+    return pool
+
+
+def _close_reference_pools() -> None:
+    while _REFERENCE_POOLS:
+        _, pool = _REFERENCE_POOLS.popitem()
+        try:
+            pool.close()
+        except Exception:
+            pass
+
+
+def _write_reference_trace_worker(
+    ref_cmd: List[str],
+    chart: Path,
+    events: Path | None,
+    out: Path,
+    treat_as_xml: bool,
+    *,
+    env: Dict[str, str] | None = None,
+    timeout: float = 120.0,
+) -> None:
+    """Write a reference trace through a persistent worker.
+
+    Failures are raised as ``SystemExit`` with the same ``Command failed:``
+    prefix as :func:`_run` so callers keep their fallback handling.
+    """
+    pool = _reference_worker_pool(ref_cmd, env=env, timeout=timeout)
+    try:
+        pool.write_trace(chart, events, out, is_xml=treat_as_xml)
+    except Exception as exc:
+        raise SystemExit(
+            "Command failed: {} --worker\n{}".format(" ".join(ref_cmd), exc)
+        )
 
 
 def _run(cmd: List[str], cwd: Path | None = None) -> None:
@@ -445,6 +667,11 @@ def main() -> None:
         type=Path,
         help="Directory for trace artifacts (defaults to temporary directory)",
     )
+    parser.add_argument(
+        "--reference-worker",
+        action="store_true",
+        help="Drive the reference through its persistent --worker mode (framed stdin/stdout)",
+    )
     # Step-0 state normalization: allow explicit keep/strip and auto mode
     parser.add_argument(
         "--keep-step0-states",
@@ -496,6 +723,26 @@ def main() -> None:
         default=0.0,
         help="Advance mock time (python engine) before event processing",
     )
+    parser.add_argument(
+        "--max-mismatches",
+        type=int,
+        default=1,
+        help="Stop comparing after N mismatching steps (0 = report all)",
+    )
+    parser.add_argument(
+        "--bisect",
+        action="store_true",
+        help=(
+            "Locate the first divergence by binary search over rolling-hash "
+            "checkpoints (for very long traces)"
+        ),
+    )
+    parser.add_argument(
+        "--checkpoint-stride",
+        type=int,
+        default=4096,
+        help="Steps between rolling-hash checkpoints used by --bisect",
+    )
     parser.add_argument(
         "--gen-depth",
         type=int,
@@ -653,48 +900,38 @@ def main() -> None:
         workdir = Path(os.environ["WORKDIR_OVERRIDE"])  # type: ignore
         workdir.mkdir(parents=True, exist_ok=True)
         ref_trace = workdir / "reference.trace.jsonl"
-    _run(_build_trace_cmd(ref_cmd, chart, events, ref_trace, treat_as_xml))
+    if args.reference_worker:
+        _write_reference_trace_worker(ref_cmd, chart, events, ref_trace, treat_as_xml)
+    else:
+        _run(_build_trace_cmd(ref_cmd, chart, events, ref_trace, treat_as_xml))
 
-    py_steps = _load_trace(py_trace)
-    ref_steps = _load_trace(ref_trace)
     # Normalize states to leaf-only (optional)
-    if args.leaf_only:
-        leaf_ids = _leaf_ids_from_chart(chart, treat_as_xml)
-        py_steps = _normalize_steps_leaf_only(py_steps, leaf_ids)
-        ref_steps = _normalize_steps_leaf_only(ref_steps, leaf_ids)
-    # Also normalize step 0 noisy fields (datamodelDelta and firedTransitions)
-    py_steps = _strip_step0_noise(py_steps)
-    ref_steps = _strip_step0_noise(ref_steps)
-    # Optionally clear step-0 entered/exited state lists to reduce reference variance
-    if not args.keep_step0_states:
-        py_steps = _strip_step0_states(py_steps)
-        ref_steps = _strip_step0_states(ref_steps)
-
-    # Optionally omit fields from comparison for focus/size
-    py_steps = _omit_fields(
-        py_steps,
-        omit_actions=args.omit_actions,
-        omit_delta=args.omit_delta,
-        omit_transitions=args.omit_transitions,
-    )
-    ref_steps = _omit_fields(
-        ref_steps,
+    leaf_ids = _leaf_ids_from_chart(chart, treat_as_xml) if args.leaf_only else None
+    normalize = partial(
+        _normalize_step,
+        leaf_ids=leaf_ids,
+        keep_step0_states=args.keep_step0_states,
         omit_actions=args.omit_actions,
         omit_delta=args.omit_delta,
         omit_transitions=args.omit_transitions,
     )
-    py_steps = _normalize_transition_conditions(py_steps)
-    ref_steps = _normalize_transition_conditions(ref_steps)
-    mismatch, notes, stats = _diff_steps(py_steps, ref_steps)
 
-    if mismatch:
-        print("Mismatch detected (python vs reference):")
-        for note in notes:
-            print(note)
-        py_len, ref_len, compared, mismatching_keys = stats
-        print(
-            f"Totals: python_steps={py_len} reference_steps={ref_len} compared={compared} mismatching_keys={mismatching_keys}"
+    def compare(
+        left: Path, right: Path, labels: Tuple[str, str]
+    ) -> Tuple[bool, List[str], Tuple[int, int, int, int]]:
+        if args.bisect:
+            return _bisect_trace_files(
+                left, right, normalize, stride=args.checkpoint_stride, labels=labels
+            )
+        return _diff_trace_files(
+            left, right, normalize, max_mismatches=args.max_mismatches, labels=labels
         )
+
+    mismatch, notes, stats = compare(py_trace, ref_trace, ("python", "reference"))
+
+    if mismatch:
+        for line in _mismatch_report(notes, stats):
+            print(line)
         if temp_dir:
             print(f"Artifacts retained in {workdir}")
         sys.exit(1)
@@ -715,30 +952,13 @@ def main() -> None:
             workdir.mkdir(parents=True, exist_ok=True)
             secondary_trace = workdir / "secondary.trace.jsonl"
         _run(_build_trace_cmd(secondary_cmd, chart, events, secondary_trace, treat_as_xml))
-        secondary_steps = _load_trace(secondary_trace)
-        # Apply normalization to secondary to align with ref_steps
-        if args.leaf_only:
-            leaf_ids = _leaf_ids_from_chart(chart, treat_as_xml)
-            secondary_steps = _normalize_steps_leaf_only(secondary_steps, leaf_ids)
-        secondary_steps = _strip_step0_noise(secondary_steps)
-        if not args.keep_step0_states:
-            secondary_steps = _strip_step0_states(secondary_steps)
-        secondary_steps = _omit_fields(
-            secondary_steps,
-            omit_actions=args.omit_actions,
-            omit_delta=args.omit_delta,
-            omit_transitions=args.omit_transitions,
+        # Secondary is normalized the same way as the reference it is compared to
+        mismatch_sec, notes_sec, stats_sec = compare(
+            ref_trace, secondary_trace, ("reference", "secondary")
         )
-        secondary_steps = _normalize_transition_conditions(secondary_steps)
-        mismatch_sec, notes_sec, stats_sec = _diff_steps(ref_steps, secondary_steps)
         if mismatch_sec:
-            print("Mismatch detected (reference vs secondary):")
-            for note in notes_sec:
-                print(note)
-            py_len, ref_len, compared, mismatching_keys = stats_sec
-            print(
-                f"Totals: reference_steps={py_len} secondary_steps={ref_len} compared={compared} mismatching_keys={mismatching_keys}"
-            )
+            for line in _mismatch_report(notes_sec, stats_sec, ("reference", "secondary")):
+                print(line)
             if temp_dir:
                 print(f"Artifacts retained in {workdir}")
             sys.exit(2)
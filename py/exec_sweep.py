@@ -8,29 +8,52 @@ Licensed under the BSD 1-Clause License.
 Sweep a corpus of charts and compare Python engine traces to a reference.
 
 This utility discovers SCXML/SCJSON files under a root directory, locates
-matching JSONL event streams, and invokes ``py/exec_compare.py`` for each
-chart. It summarizes mismatches and optionally retains artifacts. When
-``--generate-vectors`` is provided, it generates event vectors and a coverage
-summary for charts without events using ``py/vector_gen.py`` before compare.
+matching JSONL event streams, and compares each chart using the helpers from
+``py/exec_compare.py``. The Python engine runs in process (no per-chart
+``engine-trace`` subprocess); ``--jobs`` spreads charts over a process pool.
+Results are cached by content (chart, events, engine sources, reference and
+normalization flags) so unchanged charts are skipped on re-runs and an
+interrupted sweep resumes where it stopped. When ``--generate-vectors`` is
+provided, it generates event vectors and a coverage summary for charts without
+events using ``py/vector_gen.py`` before compare.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
 import re
 import shlex
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from importlib.metadata import PackageNotFoundError, version as pkg_version
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Iterable, List, Tuple
-
+from typing import Any, Iterable, Iterator, List, Tuple
+
+import scjson
+from scjson.trace import trace_chart
+
+from exec_compare import (
+    _build_trace_cmd,
+    _diff_trace_files,
+    _leaf_ids_from_chart,
+    _mismatch_report,
+    _normalize_step,
+    _write_reference_trace_worker,
+)
 from scion_support import augment_node_path, ensure_scion_runner
+from vector_gen import generate_vectors
 
 ROOT = Path(__file__).resolve().parent.parent
 
+_CACHE_FORMAT = 1
+_COVERAGE_KEYS = ("enteredStates", "firedTransitions", "doneEvents", "errorEvents")
+
 
 _SCION_KNOWN_BUGS = {
     (ROOT / "tests" / "sweep_corpus" / "parallel_history_deep.scxml").resolve(): (
@@ -75,6 +98,374 @@ def _run(
     return subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, env=env)
 
 
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _engine_fingerprint() -> str:
+    """Hash the engine, trace, and vector sources that determine outcomes.
+
+    The installed package version alone does not change while iterating on
+    the engine, so the result cache is keyed on source content instead.
+    """
+
+    digest = hashlib.sha256()
+    try:
+        digest.update(pkg_version("scjson").encode("utf-8"))
+    except PackageNotFoundError:
+        digest.update(b"unknown")
+    py_root = ROOT / "py"
+    sources = sorted(Path(scjson.__file__).resolve().parent.rglob("*.py"))
+    sources += sorted((py_root / "vector_lib").glob("*.py"))
+    sources += [py_root / "vector_gen.py", py_root / "exec_compare.py"]
+    for src in sources:
+        try:
+            data = src.read_bytes()
+        except OSError:
+            continue
+        digest.update(src.name.encode("utf-8"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class _ResultCache:
+    """Content-addressed store of per-chart sweep results.
+
+    Entries are written atomically as each chart completes, so an interrupted
+    sweep resumes from the first chart without a recorded result.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return None
+        result = entry.get("result")
+        return result if isinstance(result, dict) else None
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"key": key, "result": result}), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+
+def _result_cache_key(job: dict[str, Any], chart: Path, events: Path | None) -> str:
+    """Return the cache key for a chart job.
+
+    The key covers the chart bytes, the events file (or the generation
+    parameters when vectors will be generated), the engine fingerprint, the
+    reference command, and every normalization flag.
+    """
+
+    if events is not None:
+        events_part = "file:" + _sha256_file(events)
+    elif job["generate_vectors"]:
+        events_part = "generated:{}:{}:{}".format(
+            job["gen_depth"], job["gen_limit"], job["gen_variants_per_event"]
+        )
+    else:
+        events_part = "empty"
+    material = {
+        "version": _CACHE_FORMAT,
+        "chart": _sha256_file(chart),
+        "events": events_part,
+        "engine": job["engine"],
+        "reference": job["reference"],
+        "flags": {
+            key: job[key]
+            for key in (
+                "leaf_only",
+                "keep_step0_states",
+                "omit_actions",
+                "omit_delta",
+                "omit_transitions",
+                "advance_time",
+                "ordering",
+            )
+        },
+    }
+    blob = json.dumps(material, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+def _write_reference_trace(
+    reference: str,
+    job: dict[str, Any],
+    chart: Path,
+    events: Path,
+    out: Path,
+    treat_as_xml: bool,
+) -> None:
+    """Produce the reference trace.
+
+    The Python reference runs in process; other references are spawned per
+    chart, or served by a persistent ``--worker`` process when requested.
+    """
+
+    if reference == job["python_reference"]:
+        trace_chart(chart, events, out, is_xml=treat_as_xml)
+        return
+    if job["reference_worker"]:
+        try:
+            _write_reference_trace_worker(
+                shlex.split(reference),
+                chart,
+                events,
+                out,
+                treat_as_xml,
+                env=job["env"],
+                timeout=job["reference_timeout"],
+            )
+        except SystemExit as exc:
+            raise RuntimeError(str(exc)) from None
+        return
+    cmd = _build_trace_cmd(shlex.split(reference), chart, events, out, treat_as_xml)
+    result = _run(cmd, env=job["env"])
+    if result.returncode != 0:
+        raise RuntimeError(
+            "Command failed: {}\nstdout:\n{}\nstderr:\n{}".format(
+                " ".join(cmd), result.stdout, result.stderr
+            )
+        )
+
+
+def _compare_chart(
+    job: dict[str, Any],
+    chart: Path,
+    events: Path,
+    workdir: Path,
+    reference: str,
+    advance_time: float,
+) -> Tuple[bool, str]:
+    """Trace ``chart`` with the Python engine in process and diff against ``reference``.
+
+    Returns
+    -------
+    Tuple[bool, str]
+        ``(matched, report)`` where ``report`` holds the mismatch notes.
+
+    Raises
+    ------
+    RuntimeError
+        When the Python engine or the reference fails; the sweep records
+        the chart as an ``error``.
+    """
+
+    treat_as_xml = chart.suffix.lower() == ".scxml"
+    workdir.mkdir(parents=True, exist_ok=True)
+    py_trace = workdir / "python.trace.jsonl"
+    ref_trace = workdir / "reference.trace.jsonl"
+    try:
+        trace_chart(
+            chart,
+            events,
+            py_trace,
+            is_xml=treat_as_xml,
+            advance_time=advance_time,
+            ordering=job["ordering"],
+            leaf_only=job["leaf_only"],
+            omit_actions=job["omit_actions"],
+            omit_delta=job["omit_delta"],
+            omit_transitions=job["omit_transitions"],
+        )
+    except Exception as exc:
+        raise RuntimeError(f"Python engine failed on {chart}: {type(exc).__name__}: {exc}") from exc
+    _write_reference_trace(reference, job, chart, events, ref_trace, treat_as_xml)
+
+    leaf_ids = _leaf_ids_from_chart(chart, treat_as_xml) if job["leaf_only"] else None
+    normalize = partial(
+        _normalize_step,
+        leaf_ids=leaf_ids,
+        keep_step0_states=job["keep_step0_states"],
+        omit_actions=job["omit_actions"],
+        omit_delta=job["omit_delta"],
+        omit_transitions=job["omit_transitions"],
+    )
+    mismatch, notes, stats = _diff_trace_files(py_trace, ref_trace, normalize)
+    if mismatch:
+        return False, "\n".join(_mismatch_report(notes, stats))
+    return True, ""
+
+
+def _sweep_chart(job: dict[str, Any]) -> dict[str, Any]:
+    """Generate vectors (when requested) and compare a single chart.
+
+    Runs in a worker process when ``--jobs`` exceeds one, so everything it
+    needs travels in the picklable ``job`` mapping.
+
+    Returns
+    -------
+    dict
+        Result record with ``status`` (``match``/``mismatch``/``error``),
+        ``output``, printable ``messages``, optional ``coverage`` and
+        ``chartSummary`` entries, a ``referenceNote`` when the reference was
+        overridden, and ``cached`` when served from the result cache.
+    """
+
+    chart = Path(job["chart"])
+    try:
+        chart_text = chart.read_text(encoding="utf-8")
+    except Exception:
+        chart_text = ""
+    treat_as_xml = chart.suffix.lower() == ".scxml"
+    events = _default_events_path(chart)
+    cache = _ResultCache(Path(job["cache_dir"])) if job["cache_dir"] else None
+    key = _result_cache_key(job, chart, events) if cache is not None else None
+    if cache is not None and key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            cached["cached"] = True
+            return cached
+
+    result: dict[str, Any] = {
+        "chart": str(chart),
+        "status": "match",
+        "output": "",
+        "messages": [],
+        "coverage": None,
+        "chartSummary": None,
+        "referenceNote": None,
+        "cached": False,
+    }
+    scratch = Path(job["scratch"])
+    advance_time = job["advance_time"]
+    # Generate vector + coverage when requested and no events exist
+    if events is None and job["generate_vectors"]:
+        vec_dir = scratch / "vectors"
+        vec_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            generate_vectors(
+                chart,
+                treat_as_xml=treat_as_xml,
+                out_dir=vec_dir,
+                max_depth=job["gen_depth"],
+                advance_time=advance_time,
+                limit=job["gen_limit"],
+                variants_per_event=job["gen_variants_per_event"],
+            )
+        except Exception:
+            pass
+        gen_events = vec_dir / f"{chart.stem}.events.jsonl"
+        events = gen_events if gen_events.exists() else None
+        summary: dict[str, Any] = {}
+        # Adopt recommended advance time from vector metadata when user did not pass one
+        try:
+            if (not advance_time) or advance_time <= 0:
+                meta_path = vec_dir / f"{chart.stem}.vector.json"
+                if meta_path.exists():
+                    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                    adv = float(meta.get("advanceTime", 0.0) or 0.0)
+                    if adv > 0:
+                        summary["_advanceTime"] = adv
+        except Exception:
+            pass
+        cov_path = vec_dir / f"{chart.stem}.coverage.json"
+        if cov_path.exists():
+            try:
+                cov = json.loads(cov_path.read_text(encoding="utf-8"))
+                result["coverage"] = {k: int(cov.get(k, 0)) for k in _COVERAGE_KEYS}
+                summary = cov
+            except Exception:
+                pass
+        result["chartSummary"] = summary or None
+        # If vector meta suggested an advance time and no global was provided, apply per chart
+        adv = summary.get("_advanceTime")
+        if (not advance_time or advance_time <= 0) and isinstance(adv, (int, float)) and adv > 0:
+            advance_time = float(adv)
+    # Otherwise, create an empty stream to enable at least step-0 compare
+    if events is None:
+        events = scratch / (chart.stem + ".events.jsonl")
+        events.parent.mkdir(parents=True, exist_ok=True)
+        events.write_text("")
+
+    reference = job["reference"]
+    override_reason: str | None = None
+    if not job["explicit_reference"] and reference == job["scion_reference"]:
+        if chart_text:
+            for pattern, message in _SCION_EXPR_PATTERNS:
+                if pattern.search(chart_text):
+                    override_reason = message
+                    break
+        if override_reason is None:
+            bug_reason = _SCION_KNOWN_BUGS.get(chart.resolve())
+            if bug_reason:
+                override_reason = bug_reason
+    if override_reason:
+        reference = job["python_reference"]
+        result["messages"].append(
+            f"{override_reason} Falling back to Python reference for {chart}."
+        )
+        result["referenceNote"] = f"{override_reason} Using Python reference."
+
+    workdir = scratch
+    try:
+        matched, report = _compare_chart(job, chart, events, workdir, reference, advance_time)
+    except Exception as exc:
+        failure = str(exc)
+        if (
+            reference == job["scion_reference"]
+            and not job["explicit_reference"]
+            and job["scion_ready"]
+            and "Command failed:" in failure
+        ):
+            try:
+                matched, report = _compare_chart(
+                    job, chart, events, workdir, job["python_reference"], advance_time
+                )
+            except Exception as fallback_exc:
+                result["status"] = "error"
+                result["output"] = (
+                    "SCION reference failed:\n"
+                    + failure
+                    + "\nFallback to Python reference also failed:\n"
+                    + str(fallback_exc)
+                )
+                return result
+            result["messages"].append(
+                f"SCION reference failed for {chart}; fell back to Python reference."
+            )
+        else:
+            result["status"] = "error"
+            result["output"] = failure
+            return result
+    if not matched:
+        result["status"] = "mismatch"
+        result["output"] = report
+    # Only deterministic outcomes are cached; errors are retried next run
+    if cache is not None and key is not None:
+        cache.put(key, result)
+    return result
+
+
+def _iter_results(jobs: List[dict[str, Any]], workers: int) -> Iterator[dict[str, Any]]:
+    """Yield per-chart results in chart order, serially or from a process pool."""
+
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _sweep_chart(job)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        yield from pool.map(_sweep_chart, jobs)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
@@ -163,6 +554,37 @@ def main() -> None:
         default="tolerant",
         help="Ordering policy for child→parent emissions (finalize, etc.)",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes for chart comparisons (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Result cache directory (default: <workdir>/.sweep-cache when --workdir is set)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the result cache; every chart is compared again",
+    )
+    parser.add_argument(
+        "--reference-worker",
+        action="store_true",
+        help=(
+            "Keep one persistent reference engine per sweep process (--worker mode) "
+            "instead of launching it for every chart"
+        ),
+    )
+    parser.add_argument(
+        "--reference-timeout",
+        type=float,
+        default=120.0,
+        help="Seconds before a persistent reference worker is considered hung and restarted",
+    )
     opts = parser.parse_args()
 
     # Load skip patterns from file, if provided
@@ -203,191 +625,88 @@ def main() -> None:
 
     mismatches: List[Tuple[Path, str]] = []
     total = 0
-    cov_total = {"enteredStates": 0, "firedTransitions": 0, "doneEvents": 0, "errorEvents": 0}
+    cached = 0
+    cov_total = {k: 0 for k in _COVERAGE_KEYS}
     cov_count = 0
     cov_by_chart: dict[str, dict] = {}
     reference_notes: List[Tuple[Path, str]] = []
 
-    base_cmd = [sys.executable, str((ROOT / "py" / "exec_compare.py").resolve()), "--reference", default_reference]
     if opts.workdir:
         artifacts_root = Path(opts.workdir)
         artifacts_root.mkdir(parents=True, exist_ok=True)
     else:
         artifacts_root = None
-
-    # Common normalization flags
-    common_flags: List[str] = []
-    if opts.leaf_only:
-        common_flags.append("--leaf-only")
-    else:
-        common_flags.append("--full-states")
-    if opts.keep_step0_states:
-        common_flags.append("--keep-step0-states")
-    if opts.omit_actions:
-        common_flags.append("--omit-actions")
-    if opts.omit_delta:
-        common_flags.append("--omit-delta")
-    if opts.omit_transitions:
-        common_flags.append("--omit-transitions")
-    if opts.advance_time and opts.advance_time > 0:
-        common_flags.extend(["--advance-time", str(opts.advance_time)])
-    if opts.ordering:
-        common_flags.extend(["--ordering", opts.ordering])
-
-    # Temporary directory for auto-generated empty event streams
+    cache_dir: Path | None = None
+    if not opts.no_cache:
+        if opts.cache_dir:
+            cache_dir = Path(opts.cache_dir)
+        elif artifacts_root:
+            cache_dir = artifacts_root / ".sweep-cache"
+
+    # Temporary directory for per-chart vectors, traces and empty event streams
     temp_dir: TemporaryDirectory[str] | None = None
+    if artifacts_root is None:
+        temp_dir = TemporaryDirectory(prefix="scjson-sweep-")
+    shared = {
+        "reference": default_reference,
+        "explicit_reference": bool(opts.reference),
+        "python_reference": python_reference,
+        "scion_reference": scion_reference,
+        "scion_ready": scion_ready,
+        "env": common_env,
+        "reference_worker": opts.reference_worker,
+        "reference_timeout": opts.reference_timeout,
+        "engine": _engine_fingerprint(),
+        "cache_dir": str(cache_dir) if cache_dir else None,
+        "generate_vectors": opts.generate_vectors,
+        "gen_depth": opts.gen_depth,
+        "gen_limit": opts.gen_limit,
+        "gen_variants_per_event": opts.gen_variants_per_event,
+        "leaf_only": opts.leaf_only,
+        "keep_step0_states": opts.keep_step0_states,
+        "omit_actions": opts.omit_actions,
+        "omit_delta": opts.omit_delta,
+        "omit_transitions": opts.omit_transitions,
+        "advance_time": opts.advance_time,
+        "ordering": opts.ordering,
+    }
+    jobs: List[dict[str, Any]] = []
+    for idx, chart in enumerate(charts):
+        if artifacts_root:
+            rel = chart.relative_to(opts.root)
+            scratch = artifacts_root / rel.parent / rel.stem
+        else:
+            scratch = Path(temp_dir.name) / f"{idx:05d}-{chart.stem}"  # type: ignore[union-attr]
+        jobs.append(dict(shared, chart=str(chart), scratch=str(scratch)))
+
+    workers = opts.jobs if opts.jobs > 0 else (os.cpu_count() or 1)
     try:
-        for chart in charts:
-            try:
-                chart_text = chart.read_text(encoding="utf-8")
-            except Exception:
-                chart_text = ""
-            events = _default_events_path(chart)
-            # Generate vector + coverage when requested and no events exist
-            if events is None and opts.generate_vectors:
-                # Decide vector output directory
-                if artifacts_root:
-                    rel = chart.relative_to(opts.root)
-                    vec_dir = artifacts_root / rel.parent / rel.stem / "vectors"
-                else:
-                    if temp_dir is None:
-                        temp_dir = TemporaryDirectory(prefix="scjson-sweep-")
-                    vec_dir = Path(temp_dir.name) / "vectors"
-                vec_dir.mkdir(parents=True, exist_ok=True)
-                vg_cmd = [
-                    sys.executable,
-                    str((ROOT / "py" / "vector_gen.py").resolve()),
-                    str(chart),
-                    "--out",
-                    str(vec_dir),
-                ]
-                if chart.suffix.lower() == ".scxml":
-                    vg_cmd.append("--xml")
-                if opts.advance_time and opts.advance_time > 0:
-                    vg_cmd.extend(["--advance-time", str(opts.advance_time)])
-                if opts.gen_depth:
-                    vg_cmd.extend(["--max-depth", str(opts.gen_depth)])
-                if opts.gen_limit:
-                    vg_cmd.extend(["--limit", str(opts.gen_limit)])
-                if opts.gen_variants_per_event:
-                    vg_cmd.extend(["--variants-per-event", str(opts.gen_variants_per_event)])
-                _run(vg_cmd, env=common_env)
-                gen_events = vec_dir / f"{chart.stem}.events.jsonl"
-                events = gen_events if gen_events.exists() else None
-                # Adopt recommended advance time from vector metadata when user did not pass one
-                try:
-                    if (not opts.advance_time) or opts.advance_time <= 0:
-                        meta_path = vec_dir / f"{chart.stem}.vector.json"
-                        if meta_path.exists():
-                            meta = json.loads(meta_path.read_text(encoding="utf-8"))
-                            adv = float(meta.get("advanceTime", 0.0) or 0.0)
-                            if adv > 0:
-                                # Stash as a per-chart override via a tuple entry in cov_by_chart
-                                cov_by_chart.setdefault(str(chart), {})["_advanceTime"] = adv
-                except Exception:
-                    pass
-                cov_path = vec_dir / f"{chart.stem}.coverage.json"
-                if cov_path.exists():
-                    try:
-                        cov = json.loads(cov_path.read_text(encoding="utf-8"))
-                        for k in cov_total:
-                            cov_total[k] += int(cov.get(k, 0))
-                        cov_by_chart[str(chart)] = cov
-                        cov_count += 1
-                    except Exception:
-                        pass
-            # Otherwise, create an empty stream to enable at least step-0 compare
-            if events is None and not opts.generate_vectors:
-                if temp_dir is None:
-                    temp_dir = TemporaryDirectory(prefix="scjson-sweep-")
-                tmp = Path(temp_dir.name) / (chart.stem + ".events.jsonl")
-                tmp.parent.mkdir(parents=True, exist_ok=True)
-                tmp.write_text("")
-                events = tmp
+        for result in _iter_results(jobs, workers):
+            chart = Path(result["chart"])
             total += 1
-            cmd = list(base_cmd)
-            if artifacts_root:
-                rel = chart.relative_to(opts.root)
-                workdir = artifacts_root / rel.parent / rel.stem
-                cmd.extend(["--workdir", str(workdir)])
-            cmd.extend(common_flags)
-            # If vector meta suggested an advance time and no global was provided, apply per chart
-            try:
-                if (not opts.advance_time) or opts.advance_time <= 0:
-                    adv = cov_by_chart.get(str(chart), {}).get("_advanceTime")
-                    if isinstance(adv, (int, float)) and adv > 0:
-                        cmd.extend(["--advance-time", str(adv)])
-            except Exception:
-                pass
-            cmd.append(str(chart))
-            if events:
-                cmd.extend(["--events", str(events)])
-            override_reason: str | None = None
-            if not opts.reference and default_reference == scion_reference:
-                if chart_text:
-                    for pattern, message in _SCION_EXPR_PATTERNS:
-                        if pattern.search(chart_text):
-                            override_reason = message
-                            break
-                if override_reason is None:
-                    bug_reason = _SCION_KNOWN_BUGS.get(chart.resolve())
-                    if bug_reason:
-                        override_reason = bug_reason
-            if override_reason:
-                try:
-                    ref_idx = cmd.index("--reference") + 1
-                except ValueError:
-                    ref_idx = None
-                if ref_idx is not None and cmd[ref_idx] == default_reference:
-                    cmd[ref_idx] = python_reference
-                    note = (
-                        f"{override_reason} Falling back to Python reference for {chart}."
-                    )
-                    print(note)
-                    reference_notes.append((chart, f"{override_reason} Using Python reference."))
-            result = _run(cmd, env=common_env)
-            if (
-                result.returncode != 0
-                and not opts.reference
-                and scion_ready
-                and default_reference == scion_reference
-                and (
-                    "Command failed:" in result.stdout
-                    or "Command failed:" in result.stderr
-                )
-            ):
-                try:
-                    ref_idx = cmd.index("--reference") + 1
-                except ValueError:
-                    ref_idx = None
-                if ref_idx is not None and cmd[ref_idx] == scion_reference:
-                    fallback_cmd = list(cmd)
-                    fallback_cmd[ref_idx] = python_reference
-                    fallback = _run(fallback_cmd, env=common_env)
-                    if fallback.returncode == 0:
-                        print(f"SCION reference failed for {chart}; fell back to Python reference.")
-                        result = fallback
-                        cmd = fallback_cmd
-                    else:
-                        combined = (
-                            "SCION reference failed:\n"
-                            + result.stdout
-                            + "\n"
-                            + result.stderr
-                            + "\nFallback to Python reference also failed:\n"
-                            + fallback.stdout
-                            + "\n"
-                            + fallback.stderr
-                        )
-                        mismatches.append((chart, combined))
-                        continue
-            if result.returncode != 0:
-                mismatches.append((chart, result.stdout + "\n" + result.stderr))
+            if result.get("cached"):
+                cached += 1
+            for message in result.get("messages") or []:
+                print(message)
+            if result.get("referenceNote"):
+                reference_notes.append((chart, result["referenceNote"]))
+            if result.get("chartSummary") is not None:
+                cov_by_chart[str(chart)] = result["chartSummary"]
+            cov = result.get("coverage")
+            if cov:
+                for k in cov_total:
+                    cov_total[k] += int(cov.get(k, 0))
+                cov_count += 1
+            if result.get("status") != "match":
+                mismatches.append((chart, result.get("output") or ""))
                 # Keep going; summarize later
     finally:
         if temp_dir is not None:
             temp_dir.cleanup()
 
+    if cached:
+        print(f"Reused cached results for {cached} of {total} charts ({cache_dir})")
+
     if reference_notes:
         print("Reference overrides applied for Python-specific conditions:")
         for path, reason in reference_notes:
@@ -13,12 +13,14 @@ exception; set ``fail_on_unknown_properties=False`` when instantiating
 parsing.
 """
 
-from typing import Optional, Type, Union, Any, get_args, get_origin, ForwardRef
+from typing import Optional, Type, Union, Any, Callable, Dict, Tuple, get_args, get_origin, ForwardRef
 from enum import Enum
 from decimal import Decimal
-import xmlschema
 import json
+import os
+import threading
 from dataclasses import asdict, fields, is_dataclass
+from xsdata.formats.dataclass.context import XmlContext
 from xsdata.formats.dataclass.serializers.config import SerializerConfig
 from xsdata.formats.dataclass.parsers import XmlParser
 from xsdata.formats.dataclass.parsers.config import ParserConfig
@@ -59,15 +61,15 @@ class SCXMLDocumentHandler:
         """
         self.model_class = model_class
         self.schema_path = schema_path
+        # Parsers carry a per-instance namespace map, so each handler gets
+        # its own; the binding context, configs, serializers and compiled
+        # schemas are shared process-wide (see ``_shared_*`` below).
         self.parser = XmlParser(
-            config=ParserConfig(fail_on_unknown_properties=fail_on_unknown_properties)
+            config=_parser_config(fail_on_unknown_properties),
+            context=_XML_CONTEXT,
         )
-        self.serializer = XmlSerializer(
-            config=SerializerConfig(
-                pretty_print=pretty, encoding="utf-8", xml_declaration=True
-            )
-        )
-        self.schema = xmlschema.XMLSchema(schema_path) if schema_path else None
+        self.serializer = _shared_serializer(pretty)
+        self.schema = compiled_schema(schema_path) if schema_path else None
         self.omit_empty = omit_empty
 
     @staticmethod
@@ -152,84 +154,12 @@ class SCXMLDocumentHandler:
         return json.dumps(data, indent=2)
 
     def _to_dataclass(self, cls: type, data: Any):
-        """Recursively build dataclass instance from dict."""
-        cls = self._resolve(cls)
-        origin = get_origin(cls)
-        if origin is list:
-            item_type = self._resolve(get_args(cls)[0])
-            return [self._to_dataclass(item_type, x) for x in data]
-        if origin is Union:
-            for arg in get_args(cls):
-                if arg is type(None):
-                    continue
-                try:
-                    return self._to_dataclass(self._resolve(arg), data)
-                except Exception:
-                    pass
-            return data
-        if cls is object:
-            if isinstance(data, dict) and "qname" in data:
-                return AnyElement(
-                    qname=data.get("qname"),
-                    text=data.get("text"),
-                    tail=data.get("tail"),
-                    attributes=data.get("attributes", {}),
-                    children=[
-                        self._to_dataclass(object, c) if isinstance(c, dict) else c
-                        for c in data.get("children", [])
-                    ],
-                )
-            if isinstance(data, dict):
-                try:
-                    return self._to_dataclass(Scxml, data)
-                except Exception:
-                    pass
-            if isinstance(data, list):
-                return [self._to_dataclass(object, x) for x in data]
-            return data
-        if cls is object:
-            if isinstance(data, dict) and "qname" in data:
-                return AnyElement(
-                    qname=data.get("qname"),
-                    text=data.get("text"),
-                    tail=data.get("tail"),
-                    attributes=data.get("attributes", {}),
-                    children=[
-                        self._to_dataclass(object, c) if isinstance(c, dict) else c
-                        for c in data.get("children", [])
-                    ],
-                )
-            if isinstance(data, list):
-                return [self._to_dataclass(object, x) for x in data]
-            return data
-        if is_dataclass(cls):
-            kwargs = {}
-            post = {}
-            for f in fields(cls):
-                if f.name not in data:
-                    continue
-                value = self._to_dataclass(f.type, data[f.name])
-                if f.type is Decimal or f.name == "version":
-                    try:
-                        value = Decimal(str(value))
-                    except Exception:
-                        pass
-                if f.init:
-                    # xsdata dataclasses mark some attributes with init=False.
-                    # Handle them after instantiation to avoid TypeError.
-                    kwargs[f.name] = value
-                else:
-                    post[f.name] = value
-            obj = cls(**kwargs)
-            for name, value in post.items():
-                setattr(obj, name, value)
-            return obj
-        if isinstance(cls, type) and issubclass(cls, Enum):
-            try:
-                return cls(data)
-            except Exception:
-                return data
-        return data
+        """Recursively build dataclass instance from dict.
+
+        Conversion is delegated to a builder compiled once per type (see
+        :func:`_builder`), so repeated calls avoid per-node reflection.
+        """
+        return _builder(cls)(data)
 
     def json_to_xml(self, json_str: str) -> str:
         """Convert stored JSON string to SCXML."""
@@ -240,3 +170,257 @@ class SCXMLDocumentHandler:
             model = self._to_dataclass(self.model_class, data)
         return self.to_string(model)
 
+
+_XML_CONTEXT = XmlContext()
+_CACHE_LOCK = threading.Lock()
+_PARSER_CONFIGS: Dict[bool, ParserConfig] = {}
+_SERIALIZERS: Dict[bool, XmlSerializer] = {}
+_SCHEMAS: Dict[Tuple[str, int], Any] = {}
+
+
+def _parser_config(fail_on_unknown_properties: bool) -> ParserConfig:
+    """Return the shared parser configuration for the given strictness."""
+    config = _PARSER_CONFIGS.get(fail_on_unknown_properties)
+    if config is None:
+        config = _PARSER_CONFIGS.setdefault(
+            fail_on_unknown_properties,
+            ParserConfig(fail_on_unknown_properties=fail_on_unknown_properties),
+        )
+    return config
+
+
+def _shared_serializer(pretty: bool) -> XmlSerializer:
+    """Return the process-wide serializer for ``pretty``.
+
+    ``XmlSerializer.render`` keeps no per-call state on the instance, so one
+    serializer per configuration is safe to share.
+    """
+    serializer = _SERIALIZERS.get(pretty)
+    if serializer is None:
+        serializer = _SERIALIZERS.setdefault(
+            pretty,
+            XmlSerializer(
+                config=SerializerConfig(
+                    pretty_print=pretty, encoding="utf-8", xml_declaration=True
+                ),
+                context=_XML_CONTEXT,
+            ),
+        )
+    return serializer
+
+
+def compiled_schema(schema_path: Union[str, os.PathLike]) -> Any:
+    """Return a compiled ``xmlschema.XMLSchema`` for ``schema_path``.
+
+    Schemas are compiled once per process and keyed by resolved path and
+    modification time, so editing the XSD recompiles it.
+
+    Parameters
+    ----------
+    schema_path: str | os.PathLike
+        XML Schema document.
+
+    Returns
+    -------
+    xmlschema.XMLSchema
+        Compiled schema, shared by every caller in the process.
+    """
+    path = os.path.realpath(os.fspath(schema_path))
+    key = (path, os.stat(path).st_mtime_ns)
+    schema = _SCHEMAS.get(key)
+    if schema is None:
+        with _CACHE_LOCK:
+            schema = _SCHEMAS.get(key)
+            if schema is None:
+                import xmlschema
+
+                schema = xmlschema.XMLSchema(path)
+                for stale in [k for k in _SCHEMAS if k[0] == path]:
+                    del _SCHEMAS[stale]
+                _SCHEMAS[key] = schema
+    return schema
+
+
+# Complete builders only, so lookups need no lock
+_BUILDERS: Dict[Any, Callable[[Any], Any]] = {}
+# Builders compiled under _BUILD_LOCK whose field converters may be unresolved
+_PENDING_BUILDERS: Dict[Any, Callable[[Any], Any]] = {}
+_BUILD_LOCK = threading.RLock()
+
+
+def _identity(data: Any) -> Any:
+    return data
+
+
+def _builder(tp: Any) -> Callable[[Any], Any]:
+    """Return the compiled ``data -> value`` converter for ``tp``.
+
+    Builders are cached by resolved type. Dispatch on list, ``Union``,
+    ``object``, dataclass and ``Enum`` happens here once instead of per node,
+    and dataclass builders are generated as straight-line functions.
+    Compilation holds a lock, and builders reach the shared cache only
+    once every converter they call is resolved.
+    """
+    cls = SCXMLDocumentHandler._resolve(tp)
+    try:
+        return _BUILDERS[cls]
+    except KeyError:
+        pass
+    except TypeError:
+        return _compile_builder(cls)
+    with _BUILD_LOCK:
+        builder = _BUILDERS.get(cls) or _PENDING_BUILDERS.get(cls)
+        if builder is not None:
+            return builder
+        outermost = not _PENDING_BUILDERS
+        try:
+            if is_dataclass(cls) and get_origin(cls) is None:
+                # Register before resolving field converters so recursive
+                # types (``State`` inside ``State``) find this builder.
+                builder, namespace, field_types = _dataclass_builder(cls)
+                _PENDING_BUILDERS[cls] = builder
+                for name, field_type in field_types.items():
+                    namespace[name] = _builder(field_type)
+            else:
+                builder = _compile_builder(cls)
+                _PENDING_BUILDERS[cls] = builder
+            if outermost:
+                _BUILDERS.update(_PENDING_BUILDERS)
+        finally:
+            if outermost:
+                _PENDING_BUILDERS.clear()
+        return builder
+
+
+def _compile_builder(cls: Any) -> Callable[[Any], Any]:
+    """Compile a converter for an already resolved type."""
+    origin = get_origin(cls)
+    if origin is list:
+        item = _builder(get_args(cls)[0])
+        if item is _identity:
+            return lambda data: [x for x in data]
+        return lambda data: [item(x) for x in data]
+    if origin is Union:
+        return _union_builder([arg for arg in get_args(cls) if arg is not type(None)])
+    if cls is object:
+        return _object_value
+    if isinstance(cls, type) and issubclass(cls, Enum):
+
+        def enum_value(data: Any) -> Any:
+            try:
+                return cls(data)
+            except Exception:
+                return data
+
+        return enum_value
+    return _identity
+
+
+def _union_builder(arms: list) -> Callable[[Any], Any]:
+    """Try each ``Union`` arm in order, falling back to the raw value.
+
+    Every arm maps ``None`` to ``None`` (or fails), so ``None`` short-circuits,
+    and arms after one that always succeeds are dropped.
+    """
+    compiled: list = []
+    for arm in arms:
+        conv = _builder(arm)
+        compiled.append(conv)
+        if conv is _identity:
+            break
+    if not compiled or compiled[0] is _identity:
+        return _identity
+    if len(compiled) == 1:
+        only = compiled[0]
+
+        def optional_value(data: Any) -> Any:
+            if data is None:
+                return None
+            try:
+                return only(data)
+            except Exception:
+                return data
+
+        return optional_value
+
+    def union_value(data: Any) -> Any:
+        if data is None:
+            return None
+        for conv in compiled:
+            try:
+                return conv(data)
+            except Exception:
+                pass
+        return data
+
+    return union_value
+
+
+def _object_value(data: Any) -> Any:
+    """Convert wildcard (``object``) content to ``AnyElement``/dataclasses."""
+    if isinstance(data, dict) and "qname" in data:
+        return AnyElement(
+            qname=data.get("qname"),
+            text=data.get("text"),
+            tail=data.get("tail"),
+            attributes=data.get("attributes", {}),
+            children=[
+                _object_value(c) if isinstance(c, dict) else c
+                for c in data.get("children", [])
+            ],
+        )
+    if isinstance(data, dict):
+        try:
+            return _builder(Scxml)(data)
+        except Exception:
+            pass
+    if isinstance(data, list):
+        return [_object_value(x) for x in data]
+    return data
+
+
+def _dataclass_builder(cls: type) -> Tuple[Callable[[Any], Any], Dict[str, Any], Dict[str, Any]]:
+    """Generate a straight-line builder for dataclass ``cls``.
+
+    The generated function mirrors the reflective algorithm: fields present
+    in ``data`` are converted in declaration order, ``Decimal`` and
+    ``version`` fields are coerced through ``str``, and ``init=False``
+    fields are assigned after construction.
+
+    Returns
+    -------
+    tuple
+        The builder, its globals namespace, and the field converter names
+        mapped to field types. The caller binds each name in the namespace
+        once the builder is cached.
+    """
+    namespace: Dict[str, Any] = {"cls": cls, "Decimal": Decimal, "_MISSING": _MISSING}
+    field_types: Dict[str, Any] = {}
+    lines = ["def build(data):", "    kwargs = {}"]
+    post: list = []
+    for idx, f in enumerate(fields(cls)):
+        conv = f"c{idx}"
+        key = repr(f.name)
+        field_types[conv] = f.type
+        target = f"kwargs[{key}]" if f.init else f"v{idx}"
+        lines.append(f"    if {key} in data:")
+        lines.append(f"        {target} = {conv}(data[{key}])")
+        if f.type is Decimal or f.name == "version":
+            lines.append("        try:")
+            lines.append(f"            {target} = Decimal(str({target}))")
+            lines.append("        except Exception:")
+            lines.append("            pass")
+        if not f.init:
+            lines.append("    else:")
+            lines.append(f"        v{idx} = _MISSING")
+            post.append((idx, f.name))
+    lines.append("    obj = cls(**kwargs)")
+    for idx, name in post:
+        lines.append(f"    if v{idx} is not _MISSING:")
+        lines.append(f"        obj.{name} = v{idx}")
+    lines.append("    return obj")
+    exec("\n".join(lines), namespace)  # nosec - generated from dataclass fields
+    return namespace["build"], namespace, field_types
+
+
+_MISSING = object()
@@ -8,13 +8,48 @@ Licensed under the BSD 1-Clause License.
 scjson conversion tools.
 """
 
-from .context import DocumentContext
-from .events import Event, EventQueue
-from .activation import ActivationRecord, TransitionSpec
-from .json_stream import JsonStreamDecoder
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .context import DocumentContext
+    from .async_context import AsyncDocumentContext
+    from .session_host import SessionHost
+    from .events import Event, EventQueue
+    from .activation import ActivationRecord, TransitionSpec
+    from .json_stream import JsonStreamDecoder
+
+# Public names resolve on first access (PEP 562) so that importing a light
+# submodule such as ``scjson.cli`` does not load the engine and models.
+_LAZY = {
+    "DocumentContext": ".context",
+    "AsyncDocumentContext": ".async_context",
+    "SessionHost": ".session_host",
+    "JsonStreamDecoder": ".json_stream",
+    "Event": ".events",
+    "EventQueue": ".events",
+    "ActivationRecord": ".activation",
+    "TransitionSpec": ".activation",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __all__ = [
     "DocumentContext",
+    "AsyncDocumentContext",
+    "SessionHost",
     "JsonStreamDecoder",
     "Event",
     "EventQueue",
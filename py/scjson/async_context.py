@@ -0,0 +1,343 @@
+"""
+Agent Name: python-async-context
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Asyncio front end for the Python engine.
+
+:class:`AsyncDocumentContext` runs the regular interpreter on an event loop.
+Producers ``await ctx.send(...)``, consumers iterate macrostep results with
+``async for``, delayed ``<send>`` events are armed with ``loop.call_at`` and
+invocations wake the loop when they finish. An idle session owns no thread
+and costs no CPU, so one loop can keep thousands of them alive.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from pydantic import PrivateAttr
+
+from .context import INVOKE_POLL_INTERVAL, DocumentContext
+from .events import Event
+from .invoke import InvokeHandler, OnDone
+
+#: Poll interval for invocations that cannot signal completion themselves.
+POLL_INTERVAL = INVOKE_POLL_INTERVAL
+#: Deadlines closer than this (seconds) keep the armed loop timer.
+TIMER_SLACK = 1e-3
+
+
+class AsyncDocumentContext(DocumentContext):
+    """Document context driven by an asyncio event loop.
+
+    Build it with the usual constructors (``from_xml_file`` and friends);
+    the initial configuration is entered synchronously. The loop is bound
+    when iteration starts, so timers and invocations created before that
+    are armed then.
+
+    Attributes
+    ----------
+    max_pending : int
+        Maximum number of external events waiting in the ingress queue
+        before :meth:`send` suspends the producer; ``0`` means unbounded.
+    """
+
+    max_pending: int = 0
+    _loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default=None)
+    _timer: Optional[asyncio.TimerHandle] = PrivateAttr(default=None)
+    _timer_due: Optional[float] = PrivateAttr(default=None)
+    _wakeup: Optional[asyncio.Event] = PrivateAttr(default=None)
+    _space: Optional[asyncio.Event] = PrivateAttr(default=None)
+    _needs_poll: bool = PrivateAttr(default=False)
+    _closed: bool = PrivateAttr(default=False)
+
+    # ------------------------------------------------------------------ #
+    # Producer API
+    # ------------------------------------------------------------------ #
+
+    async def send(self, name: str, data: Any | None = None) -> bool:
+        """Queue an external event, waiting while the ingress queue is full.
+
+        :param name: Event name.
+        :param data: Optional payload.
+        :returns: ``False`` when an ingress policy dropped the event.
+        """
+
+        while self.max_pending and len(self._ingress) >= self.max_pending:
+            if self._space is None:
+                self._space = asyncio.Event()
+            self._space.clear()
+            await self._space.wait()
+        return self.send_nowait(name, data)
+
+    def send_nowait(self, name: str, data: Any | None = None) -> bool:
+        """Queue an external event without waiting (loop thread only).
+
+        Ingress policies (:meth:`set_ingress_policy`) apply as for
+        :meth:`post`, except that a full ``block`` policy drops the event
+        instead of blocking the loop.
+
+        :param name: Event name.
+        :param data: Optional payload.
+        :returns: ``False`` when an ingress policy dropped the event.
+        """
+
+        if self._closed:
+            raise RuntimeError("context is closed")
+        admitted = self._ingress.put(Event(name=name, data=data), 0)
+        self._wake()
+        return admitted
+
+    def post(self, evt_name: str, data: Any | None = None, *, timeout: float | None = None) -> bool:
+        """Queue an external event from any thread and wake the loop.
+
+        See :meth:`DocumentContext.post`.
+        """
+
+        admitted = super().post(evt_name, data, timeout=timeout)
+        self._wake()
+        return admitted
+
+    def close(self) -> None:
+        """Stop iteration once the queued events have been processed."""
+
+        self._closed = True
+        self._wake()
+
+    # ------------------------------------------------------------------ #
+    # Consumer API
+    # ------------------------------------------------------------------ #
+
+    def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        return self.steps()
+
+    async def steps(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one result per macrostep until closed or finished.
+
+        A macrostep takes one event (from the inbox, a due timer or a
+        finished invocation) and runs the queue until it is empty. Each
+        result has the ``event``, ``enteredStates``, ``exitedStates`` and
+        ``configuration`` keys of :meth:`trace_step` entries. Between
+        macrosteps the generator sleeps until a producer, timer or
+        invocation wakes it.
+        """
+
+        self._bind(asyncio.get_running_loop())
+        try:
+            while True:
+                self._needs_poll = self._watch_invocations(self._wake)
+                self.poll_invocations()
+                self._release_delayed_events()
+                if not self.events:
+                    evt = self._ingress.pop()
+                    if evt is not None:
+                        self.events.push(evt)
+                        if self._space is not None:
+                            self._space.set()
+                if self.events:
+                    yield self._macrostep()
+                    continue
+                if self.done or (self._closed and not self._ingress):
+                    return
+                await self._idle()
+        finally:
+            self._disarm()
+
+    async def run_until_done(self) -> List[Dict[str, Any]]:
+        """Drive the context to completion and return every macrostep."""
+
+        return [step async for step in self.steps()]
+
+    def _drain_ingress(self) -> None:
+        # steps() takes ingress events one per macrostep instead
+        return
+
+    def _macrostep(self) -> Dict[str, Any]:
+        head = self.events._q[0]
+        before = set(self.configuration)
+        self.run()
+        after = set(self.configuration)
+        order = self._activation_order_key
+        return {
+            "event": {"name": head.name, "data": head.data},
+            "enteredStates": sorted(self._filter_states(after - before), key=order),
+            "exitedStates": sorted(self._filter_states(before - after), key=order),
+            "configuration": sorted(self._filter_states(after), key=order),
+        }
+
+    async def _idle(self) -> None:
+        wakeup = self._wakeup
+        assert wakeup is not None
+        wakeup.clear()
+        self._arm_timer()
+        timeout = POLL_INTERVAL if self._needs_poll else None
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    # ------------------------------------------------------------------ #
+    # Loop integration
+    # ------------------------------------------------------------------ #
+
+    def _bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._loop is not None and self._loop is not loop:
+            raise RuntimeError("context is already bound to another event loop")
+        self._loop = loop
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+
+    def _wake(self) -> None:
+        loop = self._loop
+        if loop is None or self._wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # loop already closed
+
+    def _schedule_event(self, event: Event, delay: float) -> None:
+        super()._schedule_event(event, delay)
+        if self._loop is not None:
+            self._arm_timer()
+
+    def _cancel_delayed_event(self, send_id: str) -> bool:
+        removed = super()._cancel_delayed_event(send_id)
+        if removed and self._loop is not None:
+            self._arm_timer()
+        return removed
+
+    def _arm_timer(self) -> None:
+        """Keep one loop timer on the earliest pending timer.
+
+        Child invocation timers count too (see :meth:`next_timer`); the
+        steps loop releases them through :meth:`poll_invocations` once the
+        timer fires.
+        """
+
+        delay = self.next_timer() if self._use_wall_clock and self._loop is not None else None
+        due = None if delay is None else time.monotonic() + delay
+        if due is not None and self._timer_due is not None and abs(due - self._timer_due) < TIMER_SLACK:
+            return
+        self._disarm()
+        if due is None:
+            return
+        # Delays are measured on time.monotonic(); convert to loop time.
+        when = self._loop.time() + delay
+        self._timer = self._loop.call_at(when, self._timer_fired)
+        self._timer_due = due
+
+    def _timer_fired(self) -> None:
+        self._timer = None
+        self._timer_due = None
+        self._wake()
+
+    def _disarm(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_due = None
+
+
+class AsyncInvokeHandler(InvokeHandler):
+    """Invocation implemented by a coroutine on the context's event loop.
+
+    Subclasses implement :meth:`run`. Its return value completes the
+    invocation with ``done.invoke.<id>``; an exception raises
+    ``error.execution``. Leaving the invoking state cancels the task.
+    """
+
+    def __init__(self, type_name: str, src: Any, payload: Any, on_done: Optional[OnDone] = None) -> None:
+        super().__init__(type_name, src, payload, on_done)
+        self.task: Optional[asyncio.Task] = None
+        self.finished = False
+        self._ready: Optional[Callable[[], None]] = None
+
+    async def run(self) -> Any:
+        """Do the work of the invocation (returns ``None`` by default)."""
+        return None
+
+    def start(self) -> None:  # noqa: D401
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # started when the context binds its loop
+        self._spawn(loop)
+
+    def _spawn(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self.task is not None or self.finished:
+            return
+        self.task = loop.create_task(self.run())
+        self.task.add_done_callback(self._task_done)
+
+    def _task_done(self, _task: asyncio.Task) -> None:
+        if self._ready is not None:
+            self._ready()
+
+    def on_ready(self, callback: Callable[[], None]) -> bool:
+        """Wake ``callback`` when the task finishes, starting it if needed."""
+        self._ready = callback
+        if self.task is None and not self.finished:
+            try:
+                self._spawn(asyncio.get_running_loop())
+            except RuntimeError:
+                return False
+        return True
+
+    def cancel(self) -> None:  # noqa: D401
+        super().cancel()
+        self.finished = True
+        if self.task is not None:
+            self.task.cancel()
+
+    def stop(self) -> None:  # noqa: D401
+        self.finished = True
+
+    def poll(self) -> int:
+        """Deliver the task's outcome once it is available."""
+        task = self.task
+        if self.finished or task is None or not task.done():
+            return 0
+        self.finished = True
+        if task.cancelled():
+            return 0
+        error = task.exception()
+        if error is not None:
+            self._emit(
+                Event(
+                    name="error.execution",
+                    data={"error": f"{type(error).__name__}: {error}", "type": self.type_name},
+                    invokeid=getattr(self, 'invoke_id', None),
+                )
+            )
+        else:
+            self._on_done(task.result())
+        return 1
+
+
+class AsyncCallHandler(AsyncInvokeHandler):
+    """Runs an ``async def`` callable registered for ``python:<name>``.
+
+    The invoke payload is passed as keyword arguments.
+    """
+
+    def __init__(
+        self,
+        type_name: str,
+        src: Any,
+        payload: Any,
+        on_done: Optional[OnDone] = None,
+        *,
+        func: Callable[..., Any],
+    ) -> None:
+        super().__init__(type_name, src, payload, on_done)
+        self.func = func
+
+    async def run(self) -> Any:
+        kwargs = dict(self.payload) if isinstance(self.payload, dict) else {}
+        return await self.func(**kwargs)
@@ -0,0 +1,336 @@
+"""
+Agent Name: python-batch
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Per-file conversion and validation jobs for the ``xml``, ``json`` and
+``validate`` commands.
+
+Jobs are plain dictionaries and results are plain dictionaries so they can
+cross a process pool. Each process keeps its own
+:class:`~scjson.SCXMLDocumentHandler.SCXMLDocumentHandler` per option set,
+and :func:`run_jobs` yields results in submission order so parallel output
+matches a serial run. :class:`ConversionManifest` records source and output
+hashes so incremental runs only convert what changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+if TYPE_CHECKING:
+    from .SCXMLDocumentHandler import SCXMLDocumentHandler
+
+__all__ = [
+    "MANIFEST_NAME",
+    "ConversionManifest",
+    "convert_job",
+    "validate_job",
+    "run_jobs",
+    "sha256_file",
+]
+
+MANIFEST_NAME = ".scjson-manifest.json"
+
+_HANDLERS: Dict[Tuple[bool, bool], SCXMLDocumentHandler] = {}
+
+
+def _handler(omit_empty: bool = True, fail_unknown: bool = True) -> SCXMLDocumentHandler:
+    """Return this process's handler for the given options."""
+
+    key = (omit_empty, fail_unknown)
+    handler = _HANDLERS.get(key)
+    if handler is None:
+        # Imported on first use so the CLI does not load xsdata at startup.
+        from .SCXMLDocumentHandler import SCXMLDocumentHandler
+
+        handler = SCXMLDocumentHandler(
+            omit_empty=omit_empty, fail_on_unknown_properties=fail_unknown
+        )
+        _HANDLERS[key] = handler
+    return handler
+
+
+def sha256_file(path: str | Path) -> str:
+    """Return the SHA-256 hex digest of ``path``'s bytes."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionManifest:
+    """Source/output hash record for incremental directory conversion.
+
+    The manifest lives next to the outputs (``<out_dir>/.scjson-manifest.json``
+    by default) and maps each source, relative to the source root, to its
+    SHA-256, its output path relative to the output root, and the output's
+    SHA-256. Entries recorded under different conversion options or a
+    different source scope are discarded on load so such a change rebuilds
+    everything. A failed conversion keeps its entry, marked stale, so the
+    previous output stays tracked.
+
+    Parameters
+    ----------
+    path: Path
+        Manifest file.
+    out_dir: Path
+        Output root that recorded output paths are relative to.
+    options: Mapping[str, Any]
+        Conversion options and scope (direction, handler flags, source root,
+        glob pattern, scjson version).
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path, out_dir: Path, options: Mapping[str, Any]) -> None:
+        self.path = Path(path)
+        self.out_dir = Path(out_dir)
+        self.options = dict(options)
+        self.entries: Dict[str, Dict[str, str]] = {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == self.VERSION and data.get("options") == self.options:
+                self.entries = dict(data.get("entries") or {})
+        except Exception:
+            self.entries = {}
+
+    def is_current(self, rel: str, source_hash: str, dest: Path) -> bool:
+        """Return ``True`` when ``rel`` and its output are unchanged."""
+
+        entry = self.entries.get(rel)
+        if not entry or entry.get("source") != source_hash:
+            return False
+        try:
+            if Path(entry["output"]) != dest.relative_to(self.out_dir):
+                return False
+            return dest.is_file() and sha256_file(dest) == entry.get("outputHash")
+        except Exception:
+            return False
+
+    def record(self, rel: str, source_hash: str, dest: Path) -> None:
+        """Record a freshly written output for ``rel``."""
+
+        self.entries[rel] = {
+            "source": source_hash,
+            "output": dest.relative_to(self.out_dir).as_posix(),
+            "outputHash": sha256_file(dest),
+        }
+
+    def mark_stale(self, rel: str) -> None:
+        """Keep tracking ``rel``'s output but convert it again next run."""
+
+        entry = self.entries.get(rel)
+        if entry is not None:
+            entry["source"] = None
+
+    def remove_orphans(self, live: Iterable[str], src_dir: Path) -> List[Path]:
+        """Delete outputs whose sources no longer exist and return their paths.
+
+        Entries outside ``live`` whose source file is still present under
+        ``src_dir`` are kept untouched.
+        """
+
+        keep = set(live)
+        removed: List[Path] = []
+        for rel in sorted(set(self.entries) - keep):
+            if (Path(src_dir) / rel).exists():
+                continue
+            entry = self.entries.pop(rel)
+            dest = self.out_dir / entry.get("output", "")
+            try:
+                if dest.is_file():
+                    dest.unlink()
+                    removed.append(dest)
+            except OSError:
+                pass
+        return removed
+
+    def save(self) -> None:
+        """Atomically write the manifest."""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": self.VERSION,
+            "options": self.options,
+            "entries": {rel: self.entries[rel] for rel in sorted(self.entries)},
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".manifest-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, indent=2)
+                handle.write("\n")
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
+def convert_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert one file between SCXML and SCJSON.
+
+    Parameters
+    ----------
+    job: dict
+        ``src`` path, ``to`` (``"xml"`` or ``"json"``), optional ``dest``
+        path (``None`` skips writing), ``verify`` flag, the handler
+        options ``omit_empty`` and ``fail_unknown``, and for JSON output
+        ``stream`` (bounded-memory conversion) and ``compact``.
+
+    Returns
+    -------
+    dict
+        ``src``, ``ok``, ``verified``, the written ``dest`` (or ``None``) and
+        ``error`` text on failure.
+    """
+
+    src = Path(job["src"])
+    dest = job.get("dest")
+    result: Dict[str, Any] = {
+        "src": str(src),
+        "ok": False,
+        "verified": False,
+        "dest": None,
+        "error": None,
+    }
+    handler = _handler(job.get("omit_empty", True), job.get("fail_unknown", True))
+    to_xml = job.get("to") == "xml"
+    if not to_xml and job.get("stream") and dest is not None and not job.get("verify"):
+        from .scxml_stream import stream_xml_file
+
+        try:
+            stream_xml_file(
+                src,
+                dest,
+                omit_empty=job.get("omit_empty", True),
+                indent=None if job.get("compact") else 2,
+                fail_on_unknown_properties=job.get("fail_unknown", True),
+            )
+        except Exception as exc:
+            result["error"] = str(exc)
+            return result
+        result["ok"] = True
+        result["dest"] = str(dest)
+        return result
+    try:
+        data = src.read_text(encoding="utf-8")
+        converted = handler.json_to_xml(data) if to_xml else handler.xml_to_json(data)
+        if not to_xml and job.get("compact"):
+            converted = json.dumps(json.loads(converted), separators=(",", ":"))
+        if job.get("verify"):
+            if to_xml:
+                handler.xml_to_json(converted)
+            else:
+                handler.json_to_xml(converted)
+            result["ok"] = result["verified"] = True
+            return result
+    except Exception as exc:
+        result["error"] = str(exc)
+        return result
+    if dest is not None:
+        out = Path(dest)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(converted, encoding="utf-8")
+        result["dest"] = str(out)
+    result["ok"] = True
+    return result
+
+
+def _schema_error(schema_path: str | Path, source: str) -> str | None:
+    """Return the first XML Schema violation in ``source``, if any."""
+
+    from .SCXMLDocumentHandler import compiled_schema
+
+    schema = compiled_schema(schema_path)
+    for error in schema.iter_errors(source):
+        return error.reason or str(error)
+    return None
+
+
+def validate_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Round-trip one SCXML or SCJSON file in memory.
+
+    Parameters
+    ----------
+    job: dict
+        ``src`` path and optional ``schema`` (XSD path). With a schema the
+        SCXML text (the source, or the SCXML produced from an SCJSON
+        source) is also validated against the schema, compiled once per
+        process. Files with other suffixes are accepted unchecked.
+
+    Returns
+    -------
+    dict
+        ``src``, ``ok`` and ``error`` text on failure.
+    """
+
+    src = Path(job["src"])
+    schema = job.get("schema")
+    result: Dict[str, Any] = {"src": str(src), "ok": True, "error": None}
+    handler = _handler()
+    try:
+        data = src.read_text(encoding="utf-8")
+        error = None
+        if src.suffix == ".scxml":
+            handler.json_to_xml(handler.xml_to_json(data))
+            if schema:
+                error = _schema_error(schema, str(src))
+        elif src.suffix == ".scjson":
+            xml_str = handler.json_to_xml(data)
+            handler.xml_to_json(xml_str)
+            if schema:
+                error = _schema_error(schema, xml_str)
+        if error is not None:
+            result["ok"] = False
+            result["error"] = f"schema: {error}"
+    except Exception as exc:
+        result["ok"] = False
+        result["error"] = str(exc)
+    return result
+
+
+def run_jobs(
+    func: Callable[[Dict[str, Any]], Dict[str, Any]],
+    jobs: Iterable[Dict[str, Any]],
+    workers: int = 1,
+) -> Iterator[Dict[str, Any]]:
+    """Run ``func`` over ``jobs`` and yield results in submission order.
+
+    Parameters
+    ----------
+    func: Callable[[dict], dict]
+        Module-level job function such as :func:`convert_job`.
+    jobs: Iterable[dict]
+        Job payloads.
+    workers: int
+        Worker processes; ``1`` runs in the calling process.
+
+    Returns
+    -------
+    Iterator[dict]
+        One result per job.
+    """
+
+    payloads: List[Dict[str, Any]] = list(jobs)
+    if workers <= 1 or len(payloads) <= 1:
+        for payload in payloads:
+            yield func(payload)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(workers, len(payloads))
+    chunksize = max(1, len(payloads) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(func, payloads, chunksize=chunksize)
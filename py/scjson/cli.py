@@ -8,17 +8,26 @@ Licensed under the BSD 1-Clause License.
 
 import os
 import sys
+import time
 import logging
 from typing import TextIO
 import click
 from pathlib import Path
-from .SCXMLDocumentHandler import SCXMLDocumentHandler
-from .context import DocumentContext, ExecutionMode
-from .safe_eval import SafeExpressionEvaluator
-from .events import Event
+from .batch import (
+    MANIFEST_NAME,
+    ConversionManifest,
+    convert_job,
+    run_jobs,
+    sha256_file,
+    validate_job,
+)
 from .json_stream import JsonStreamDecoder
-from .jinja_gen import JinjaGenPydantic
 from importlib.metadata import version, PackageNotFoundError
+
+# Heavy modules (the engine, pydantic models, jinja2 code generation,
+# xsdata bindings) are imported inside the commands that need them so that
+# ``scjson --help`` and plain conversions start quickly. ``scjson.batch``
+# defers the xsdata handler until the first file is converted.
 from json import dumps
 
 def _get_metadata(pkg="scjson"):
@@ -50,58 +59,172 @@ def main(ctx):
         click.echo(ctx.get_help())
 
 
+_JOBS_OPTION = click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes for directory input (0 = one per CPU)",
+)
+
+
+def _workers(jobs: int) -> int:
+    """Translate a ``--jobs`` value into a worker count."""
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def _single_output(path: Path, output: Path | None, suffix: str) -> Path:
+    """Resolve the destination for a single-file conversion."""
+    if output and (output.is_dir() or not output.suffix):
+        base = output
+    else:
+        base = output.parent if output else path.parent
+    if base:
+        base.mkdir(parents=True, exist_ok=True)
+    return (
+        output
+        if output and output.suffix
+        else (base / path.with_suffix(suffix).name)
+    ) if output else path.with_suffix(suffix)
+
+
+_INCREMENTAL_OPTIONS = (
+    click.option(
+        "--incremental",
+        is_flag=True,
+        default=False,
+        help=f"Skip unchanged sources using a manifest in the output directory ({MANIFEST_NAME})",
+    ),
+    click.option(
+        "--manifest",
+        type=click.Path(dir_okay=False, path_type=Path),
+        help="Manifest file for incremental conversion (implies --incremental)",
+    ),
+)
+
+
+def _incremental_options(func):
+    """Attach ``--incremental``/``--manifest`` to a conversion command."""
+    for option in reversed(_INCREMENTAL_OPTIONS):
+        func = option(func)
+    return func
+
+
+def _convert(
+    path: Path,
+    output: Path | None,
+    recursive: bool,
+    verify: bool,
+    jobs: int,
+    *,
+    to: str,
+    incremental: bool = False,
+    manifest_path: Path | None = None,
+    **options,
+) -> None:
+    """Convert ``path`` (file or directory) and report each file in order.
+
+    Exits with status 1 once every file was processed if any of them failed.
+    """
+    src_suffix, dest_suffix = (".scjson", ".scxml") if to == "xml" else (".scxml", ".scjson")
+    incremental = incremental or manifest_path is not None
+    if incremental and (verify or not path.is_dir()):
+        raise click.UsageError("--incremental/--manifest require a directory PATH and no --verify")
+    payloads = []
+    if path.is_dir():
+        out_dir = output if output else path
+        pattern = f"**/*{src_suffix}" if recursive else f"*{src_suffix}"
+        for src in sorted(path.glob(pattern)):
+            if src.is_file():
+                rel = src.relative_to(path)
+                dest = out_dir / rel.with_suffix(dest_suffix) if not verify else None
+                payloads.append({"src": src, "dest": dest, "rel": rel.as_posix()})
+    else:
+        dest = None if verify else _single_output(path, output, dest_suffix)
+        payloads.append({"src": path, "dest": dest})
+
+    manifest = None
+    skipped = 0
+    if incremental:
+        manifest = ConversionManifest(
+            manifest_path or out_dir / MANIFEST_NAME,
+            out_dir,
+            dict(
+                options,
+                to=to,
+                recursive=recursive,
+                pattern=pattern,
+                source=str(path.resolve()),
+                scjson=md["version"],
+            ),
+        )
+        pending = []
+        for payload in payloads:
+            payload["source_hash"] = sha256_file(payload["src"])
+            if manifest.is_current(payload["rel"], payload["source_hash"], payload["dest"]):
+                skipped += 1
+            else:
+                pending.append(payload)
+        live = [payload["rel"] for payload in payloads]
+        payloads = pending
+
+    for payload in payloads:
+        payload.update(options, to=to, verify=verify)
+    success = True
+    for payload, result in zip(payloads, run_jobs(convert_job, payloads, _workers(jobs))):
+        if result["error"] is not None:
+            click.echo(f"Failed to convert {result['src']}: {result['error']}", err=True)
+            success = False
+            if manifest is not None:
+                manifest.mark_stale(payload["rel"])
+        elif result["verified"]:
+            click.echo(f"Verified {result['src']}")
+        elif result["dest"] is not None:
+            click.echo(f"Wrote {result['dest']}")
+            if manifest is not None:
+                manifest.record(payload["rel"], payload["source_hash"], payload["dest"])
+
+    if manifest is not None:
+        for orphan in manifest.remove_orphans(live, path):
+            click.echo(f"Removed {orphan}")
+        manifest.save()
+        click.echo(f"Skipped {skipped} unchanged file(s)")
+
+    if not success:
+        raise SystemExit(1)
+
+
 @main.command(help="Convert scjson file to SCXML.")
 @click.argument("path", type=click.Path(exists=True, path_type=Path))
 @click.option("--output", "-o", type=click.Path(path_type=Path), help="Output file or directory")
 @click.option("--recursive", "-r", is_flag=True, default=False, help="Recurse into subdirectories when PATH is a directory")
 @click.option("--verify", "-v", is_flag=True, default=False, help="Verify conversion without writing output")
 @click.option("--keep-empty", is_flag=True, default=False, help="Keep null or empty items when producing JSON")
-def xml(path: Path, output: Path | None, recursive: bool, verify: bool, keep_empty: bool):
+@_JOBS_OPTION
+@_incremental_options
+def xml(
+    path: Path,
+    output: Path | None,
+    recursive: bool,
+    verify: bool,
+    keep_empty: bool,
+    jobs: int,
+    incremental: bool,
+    manifest: Path | None,
+):
     """Convert a single scjson file or all scjson files in a directory."""
-    handler = SCXMLDocumentHandler(omit_empty=not keep_empty)
-
-    def convert_file(src: Path, dest: Path | None):
-        try:
-            with open(src, "r", encoding="utf-8") as f:
-                json_str = f.read()
-            xml_str = handler.json_to_xml(json_str)
-            if verify:
-                handler.xml_to_json(xml_str)
-                click.echo(f"Verified {src}")
-                return True
-        except Exception as e:
-            click.echo(f"Failed to convert {src}: {e}", err=True)
-            return False
-        if dest is None:
-            return True
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        with open(dest, "w", encoding="utf-8") as f:
-            f.write(xml_str)
-        click.echo(f"Wrote {dest}")
-        return True
-
-    if path.is_dir():
-        out_dir = output if output else path
-        pattern = "**/*.scjson" if recursive else "*.scjson"
-        for src in path.glob(pattern):
-            if src.is_file():
-                rel = src.relative_to(path)
-                dest = out_dir / rel.with_suffix(".scxml") if not verify else None
-                convert_file(src, dest)
-    else:
-        if output and (output.is_dir() or not output.suffix):
-            base = output
-        else:
-            base = output.parent if output else path.parent
-        if base:
-            base.mkdir(parents=True, exist_ok=True)
-        out_file = (
-            output
-            if output and output.suffix
-            else (base / path.with_suffix(".scxml").name)
-        ) if output else path.with_suffix(".scxml")
-        dest = None if verify else out_file
-        convert_file(path, dest)
+    _convert(
+        path,
+        output,
+        recursive,
+        verify,
+        jobs,
+        to="xml",
+        incremental=incremental,
+        manifest_path=manifest,
+        omit_empty=not keep_empty,
+    )
 
 
 @main.command(help="Convert SCXML file to scjson.")
@@ -116,6 +239,15 @@ def xml(path: Path, output: Path | None, recursive: bool, verify: bool, keep_emp
     default=True,
     help="Fail on unknown XML elements when converting",
 )
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help="Convert with bounded memory via lxml iterparse (for very large charts)",
+)
+@click.option("--compact", is_flag=True, default=False, help="Write JSON without indentation")
+@_JOBS_OPTION
+@_incremental_options
 def json(
     path: Path,
     output: Path | None,
@@ -123,89 +255,60 @@ def json(
     verify: bool,
     keep_empty: bool,
     fail_unknown: bool,
+    stream: bool,
+    compact: bool,
+    jobs: int,
+    incremental: bool,
+    manifest: Path | None,
 ):
     """Convert a single SCXML file or all SCXML files in a directory."""
-    handler = SCXMLDocumentHandler(omit_empty=not keep_empty, fail_on_unknown_properties=fail_unknown)
-
-    def convert_file(src: Path, dest: Path | None):
-        try:
-            with open(src, "r", encoding="utf-8") as f:
-                xml_str = f.read()
-            json_str = handler.xml_to_json(xml_str)
-            if verify:
-                handler.json_to_xml(json_str)
-                click.echo(f"Verified {src}")
-                return True
-        except Exception as e:
-            click.echo(f"Failed to convert {src}: {e}", err=True)
-            return False
-        if dest is None:
-            return True
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        with open(dest, "w", encoding="utf-8") as f:
-            f.write(json_str)
-        click.echo(f"Wrote {dest}")
-        return True
-
-    if path.is_dir():
-        out_dir = output if output else path
-        pattern = "**/*.scxml" if recursive else "*.scxml"
-        for src in path.glob(pattern):
-            if src.is_file():
-                rel = src.relative_to(path)
-                dest = out_dir / rel.with_suffix(".scjson") if not verify else None
-                convert_file(src, dest)
-    else:
-        if output and (output.is_dir() or not output.suffix):
-            base = output
-        else:
-            base = output.parent if output else path.parent
-        if base:
-            base.mkdir(parents=True, exist_ok=True)
-        out_file = (
-            output
-            if output and output.suffix
-            else (base / path.with_suffix(".scjson").name)
-        ) if output else path.with_suffix(".scjson")
-        dest = None if verify else out_file
-        convert_file(path, dest)
+    _convert(
+        path,
+        output,
+        recursive,
+        verify,
+        jobs,
+        to="json",
+        incremental=incremental,
+        manifest_path=manifest,
+        omit_empty=not keep_empty,
+        fail_unknown=fail_unknown,
+        stream=stream,
+        compact=compact,
+    )
 
 
 @main.command(help="Validate scjson or SCXML files by round-tripping them in memory.")
 @click.argument("path", type=click.Path(exists=True, path_type=Path))
 @click.option("--recursive", "-r", is_flag=True, default=False, help="Recurse into subdirectories when PATH is a directory")
-def validate(path: Path, recursive: bool):
+@click.option(
+    "--schema",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Also validate SCXML against this XML Schema (compiled once per worker)",
+)
+@_JOBS_OPTION
+def validate(path: Path, recursive: bool, schema: Path | None, jobs: int):
     """Check that files can be converted to the opposite format and back."""
-    handler = SCXMLDocumentHandler()
-
-    def validate_file(src: Path) -> bool:
-        try:
-            data = src.read_text(encoding="utf-8")
-            if src.suffix == ".scxml":
-                json_str = handler.xml_to_json(data)
-                handler.json_to_xml(json_str)
-            elif src.suffix == ".scjson":
-                xml_str = handler.json_to_xml(data)
-                handler.xml_to_json(xml_str)
-            else:
-                return True
-        except Exception as e:
-            click.echo(f"Validation failed for {src}: {e}", err=True)
-            return False
-        return True
-
-    success = True
     if path.is_dir():
         pattern = "**/*" if recursive else "*"
-        for src in path.glob(pattern):
-            if src.is_file() and src.suffix in {".scxml", ".scjson"}:
-                if not validate_file(src):
-                    success = False
+        payloads = [
+            {"src": src}
+            for src in sorted(path.glob(pattern))
+            if src.is_file() and src.suffix in {".scxml", ".scjson"}
+        ]
+    elif path.suffix in {".scxml", ".scjson"}:
+        payloads = [{"src": path}]
     else:
-        if path.suffix in {".scxml", ".scjson"}:
-            success = validate_file(path)
-        else:
-            click.echo("Unsupported file type", err=True)
+        click.echo("Unsupported file type", err=True)
+        raise SystemExit(1)
+
+    if schema is not None:
+        for payload in payloads:
+            payload["schema"] = str(schema)
+    success = True
+    for result in run_jobs(validate_job, payloads, _workers(jobs)):
+        if not result["ok"]:
+            click.echo(f"Validation failed for {result['src']}: {result['error']}", err=True)
             success = False
 
     if not success:
@@ -217,6 +320,8 @@ def validate(path: Path, recursive: bool):
 def typescript(output: Path | None):
     """Create typescrupt Type files for scjson."""
     print(f"Convert Scjson type for typescript - Path: {output}")
+    from .jinja_gen import JinjaGenPydantic
+
     Gen = JinjaGenPydantic(output=output)
     base_dir = os.path.abspath(output)
     os.makedirs(base_dir, exist_ok=True)
@@ -235,6 +340,8 @@ def typescript(output: Path | None):
 def rust(output: Path | None):
     """Create Rust structs and enums for scjson."""
     print(f"Convert Scjson type for rust - Path: {output}")
+    from .jinja_gen import JinjaGenPydantic
+
     Gen = JinjaGenPydantic(output=output, lang="rust")
     base_dir = os.path.abspath(output)
     os.makedirs(base_dir, exist_ok=True)
@@ -248,6 +355,8 @@ def rust(output: Path | None):
 def swift(output: Path | None):
     """Create Swift structures and enums for scjson."""
     print(f"Convert Scjson type for swift - Path: {output}")
+    from .jinja_gen import JinjaGenPydantic
+
     Gen = JinjaGenPydantic(output=output, lang="swift")
     base_dir = os.path.abspath(output)
     os.makedirs(base_dir, exist_ok=True)
@@ -261,6 +370,8 @@ def swift(output: Path | None):
 def ruby(output: Path | None):
     """Create Ruby classes and helpers for scjson."""
     print(f"Convert Scjson type for ruby - Path: {output}")
+    from .jinja_gen import JinjaGenPydantic
+
     Gen = JinjaGenPydantic(output=output, lang="ruby")
     base_dir = os.path.abspath(output)
     os.makedirs(base_dir, exist_ok=True)
@@ -273,6 +384,8 @@ def ruby(output: Path | None):
 @click.option("--output", "-o", type=click.Path(path_type=Path), help="Output file base.")
 def schema(output: Path | None):
     """Export scjson.schema.json."""
+    from .jinja_gen import JinjaGenPydantic
+
     Gen = JinjaGenPydantic(output=output)
     base_dir = os.path.abspath(output)
     outname = os.path.join(base_dir, "scjson.schema.json")
@@ -311,6 +424,8 @@ def run(input_path: Path, workdir: Path | None, is_xml: bool) -> None:
         ``None``
     """
 
+    from .context import DocumentContext
+
     sink: TextIO = sys.stdout
     if workdir:
         workdir.mkdir(parents=True, exist_ok=True)
@@ -340,9 +455,9 @@ def run(input_path: Path, workdir: Path | None, is_xml: bool) -> None:
     "--input",
     "-I",
     "input_path",
-    required=True,
+    required=False,
     type=click.Path(exists=True, path_type=Path),
-    help="SCJSON/SCXML document",
+    help="SCJSON/SCXML document (required unless --worker)",
 )
 @click.option(
     "--events",
@@ -446,8 +561,17 @@ def run(input_path: Path, workdir: Path | None, is_xml: bool) -> None:
         " Disabled by default to keep control tokens from affecting step counts."
     ),
 )
+@click.option(
+    "--worker",
+    is_flag=True,
+    default=False,
+    help=(
+        "Serve trace jobs over stdin/stdout using length-prefixed JSON frames"
+        " instead of tracing a single document (see scjson.trace_worker)."
+    ),
+)
 def engine_trace(
-    input_path: Path,
+    input_path: Path | None,
     events_path: Path | None,
     is_xml: bool,
     out_path: Path | None,
@@ -464,6 +588,7 @@ def engine_trace(
     advance_time: float,
     ordering: str,
     emit_time_steps: bool,
+    worker: bool,
 ) -> None:
     """Produce a JSON lines trace of engine steps for comparison harnesses.
 
@@ -484,6 +609,9 @@ def engine_trace(
         snapshot.
     lax_mode: bool
         Selects lax execution mode when ``True``; strict mode remains default.
+    worker: bool
+        Serve framed trace jobs until stdin closes; the remaining options
+        apply to every job.
 
     Returns
     -------
@@ -491,31 +619,37 @@ def engine_trace(
         Writes one JSON object per line.
     """
 
-    execution_mode = ExecutionMode.LAX if lax_mode else ExecutionMode.STRICT
-    # Configure evaluator unless unsafe is requested
-    evaluator = None
-    if not unsafe_eval:
-        # Minimal preset denies math.* and trims to a smaller surface
-        deny: list[str] = list(expr_deny or ())
-        allow: list[str] = list(expr_allow or ())
-        if (expr_preset or "standard").lower() == "minimal":
-            deny.append("math.*")
-        evaluator = SafeExpressionEvaluator(allow_patterns=allow or None, deny_patterns=deny or None)
-    ctx_kwargs = {
-        "allow_unsafe_eval": unsafe_eval,
-        "execution_mode": execution_mode,
+    context_options = {
+        "unsafe_eval": unsafe_eval,
+        "expr_preset": expr_preset,
+        "expr_allow": expr_allow,
+        "expr_deny": expr_deny,
+        "lax_mode": lax_mode,
+        "ordering": ordering,
     }
-    if evaluator is not None:
-        ctx_kwargs["evaluator"] = evaluator
-    ctx = (
-        DocumentContext.from_xml_file(input_path, **ctx_kwargs)
-        if is_xml
-        else DocumentContext.from_json_file(input_path, **ctx_kwargs)
-    )
-    try:
-        ctx.ordering_mode = (ordering or "tolerant").lower()
-    except Exception:
-        pass
+    trace_options = {
+        "leaf_only": leaf_only,
+        "omit_actions": omit_actions,
+        "omit_delta": omit_delta,
+        "omit_transitions": omit_transitions,
+        "emit_time_steps": emit_time_steps,
+        "max_steps": max_steps,
+    }
+    if worker:
+        from .trace_worker import serve
+
+        serve(
+            context_options=context_options,
+            trace_options=trace_options,
+            advance_time=advance_time,
+        )
+        return
+    if input_path is None:
+        raise click.UsageError("Missing option '--input' / '-I'.")
+
+    from .trace import load_trace_context, write_trace
+
+    ctx = load_trace_context(input_path, is_xml=is_xml, **context_options)
 
     sink: TextIO
     if out_path:
@@ -529,113 +663,39 @@ def engine_trace(
         # Optional time advance to release delayed sends scheduled during init
         if advance_time and advance_time > 0:
             ctx.advance_time(advance_time)
-        # Note: we do not drain queued events at init here; step 0 represents
-        # initial configuration after internal (eventless) transitions only.
-        # Initial snapshot step (step 0)
-        filtered_start = ctx._filter_states(ctx.configuration)
-        if leaf_only:
-            leaf_ids = ctx.leaf_state_ids()
-            filtered_start = [s for s in filtered_start if s in leaf_ids]
-        init = {
-            "step": 0,
-            "event": None,
-            "firedTransitions": [] if not omit_transitions else [],
-            "enteredStates": sorted(filtered_start, key=ctx._activation_order_key),
-            "exitedStates": [],
-            "configuration": sorted(filtered_start, key=ctx._activation_order_key),
-            "actionLog": [] if not omit_actions else [],
-            "datamodelDelta": (
-                {} if omit_delta else {k: ctx.data_model[k] for k in sorted(ctx.data_model)}
-            ),
-        }
-        sink.write(dumps(init) + "\n")
-
-        # Event stream
         if events_path:
             stream_handle = open(events_path, "r", encoding="utf-8")
             stream: TextIO = stream_handle
         else:
             stream = sys.stdin
-
-        step_no = 1
-        for msg in JsonStreamDecoder(stream):
-            # Support control tokens in the event stream to advance time
-            # without emitting a trace step. This enables vectors to flush
-            # delayed <send> events between external stimuli.
-            try:
-                adv = msg.get("advance_time") if isinstance(msg, dict) else None
-                if isinstance(adv, (int, float)) and adv > 0:
-                    ctx.advance_time(float(adv))
-                    if emit_time_steps:
-                        trace = ctx.trace_step(Event(name="__time__", data=None))
-                        if leaf_only:
-                            leaf_ids = ctx.leaf_state_ids()
-                            for key in ("configuration", "enteredStates", "exitedStates"):
-                                vals = trace.get(key)
-                                if isinstance(vals, list):
-                                    trace[key] = [v for v in vals if v in leaf_ids]
-                        if omit_actions and "actionLog" in trace:
-                            trace["actionLog"] = []
-                        if omit_delta and "datamodelDelta" in trace:
-                            trace["datamodelDelta"] = {}
-                        if not omit_delta and isinstance(trace.get("datamodelDelta"), dict):
-                            dm = trace["datamodelDelta"]
-                            trace["datamodelDelta"] = {k: dm[k] for k in sorted(dm)}
-                        if omit_transitions and "firedTransitions" in trace:
-                            trace["firedTransitions"] = []
-                        trace["event"] = None
-                        trace["step"] = step_no
-                        sink.write(dumps(trace) + "\n")
-                        step_no += 1
-                    continue
-            except Exception:
-                # Fall through to normal event handling
-                pass
-            if max_steps is not None and step_no > max_steps:
-                click.echo(
-                    f"Reached max step limit ({max_steps}); remaining events skipped.",
-                    err=True,
-                )
-                break
-            evt_name = msg.get("event") or msg.get("name")
-            if not evt_name:
-                continue
-            evt_data = msg.get("data")
-            trace = ctx.trace_step(Event(name=evt_name, data=evt_data))
-            # Post-process filtering and ordering for determinism/size
-            if leaf_only:
-                leaf_ids = ctx.leaf_state_ids()
-                for key in ("configuration", "enteredStates", "exitedStates"):
-                    vals = trace.get(key)
-                    if isinstance(vals, list):
-                        trace[key] = [v for v in vals if v in leaf_ids]
-            if omit_actions and "actionLog" in trace:
-                trace["actionLog"] = []
-            if omit_delta and "datamodelDelta" in trace:
-                trace["datamodelDelta"] = {}
-            # Ensure reproducible ordering for datamodelDelta keys
-            if not omit_delta and isinstance(trace.get("datamodelDelta"), dict):
-                dm = trace["datamodelDelta"]
-                trace["datamodelDelta"] = {k: dm[k] for k in sorted(dm)}
-            if omit_transitions and "firedTransitions" in trace:
-                trace["firedTransitions"] = []
-            trace["step"] = step_no
-            sink.write(dumps(trace) + "\n")
-            step_no += 1
+        write_trace(
+            ctx,
+            JsonStreamDecoder(stream),
+            sink,
+            **trace_options,
+            on_limit=lambda: click.echo(
+                f"Reached max step limit ({max_steps}); remaining events skipped.",
+                err=True,
+            ),
+        )
     finally:
         if sink is not sys.stdout:
             sink.close()
         if stream_handle is not None:
             stream_handle.close()
 
-@main.command(help="Run a chart to quiescence and report outcome (pass/fail/other).")
+@main.command(
+    help=(
+        "Run a chart (or a directory/glob of charts) to quiescence and report "
+        "outcome (pass/fail/other)."
+    )
+)
 @click.option(
     "--input",
     "-I",
-    "input_path",
+    "target",
     required=True,
-    type=click.Path(exists=True, path_type=Path),
-    help="SCJSON/SCXML document",
+    help="SCJSON/SCXML document, directory, or glob pattern",
 )
 @click.option("--xml", "is_xml", is_flag=True, default=False, help="Input is SCXML")
 @click.option(
@@ -659,37 +719,214 @@ def engine_trace(
     show_default=True,
     help="Use lax execution mode (default true for verification)",
 )
+@click.option(
+    "--glob",
+    "pattern",
+    default="**/*.scxml",
+    show_default=True,
+    help="Pattern for charts beneath a directory input",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes for batch verification (0 = one per CPU)",
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=None,
+    help="Per-chart wall-clock limit in seconds; overruns report 'timeout'",
+)
+@click.option(
+    "--summary",
+    "summary_path",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Write a JSON summary with per-chart timing ('-' for stdout)",
+)
 def engine_verify(
-    input_path: Path,
+    target: str,
     is_xml: bool,
     advance_time: float,
     max_steps: int,
     lax_mode: bool,
+    pattern: str,
+    jobs: int,
+    timeout: float | None,
+    summary_path: Path | None,
 ):
-    """Execute chart to quiescence and print outcome summary.
+    """Execute chart(s) to quiescence and print an outcome summary.
 
     Outcome is based on presence of 'pass' or 'fail' state IDs in the final
-    configuration. Exit codes: 0=pass, 1=fail, 2=other.
+    configuration. For a single file the exit codes are 0=pass, 1=fail,
+    2=other (including timeout/error). For a directory or glob every chart
+    is verified, SCXML is inferred from the file suffix, and the exit code
+    is 0 only when all charts pass.
     """
 
-    execution_mode = ExecutionMode.LAX if lax_mode else ExecutionMode.STRICT
-    ctx = (
-        DocumentContext.from_xml_file(input_path, execution_mode=execution_mode)
-        if is_xml
-        else DocumentContext.from_json_file(input_path, execution_mode=execution_mode)
+    from .verify import collect_charts, iter_verify, verify_chart, verify_summary
+
+    options = {
+        "advance_time": advance_time,
+        "max_steps": max_steps,
+        "lax_mode": lax_mode,
+        "timeout": timeout,
+    }
+    single = Path(target)
+    if single.is_file() and summary_path is None:
+        result = verify_chart(single, is_xml=is_xml, **options)
+        click.echo(f"outcome: {result['outcome']}")
+        if result.get("error"):
+            click.echo(result["error"], err=True)
+        raise SystemExit({"pass": 0, "fail": 1}.get(result["outcome"], 2))
+
+    charts = collect_charts(target, pattern)
+    if not charts:
+        raise click.ClickException(f"No charts found for {target}")
+    workers = jobs or (os.cpu_count() or 1)
+    started = time.perf_counter()
+    results = list(iter_verify(charts, jobs=workers, **options))
+    summary = verify_summary(results, elapsed=time.perf_counter() - started)
+    summary["jobs"] = workers
+    counts = summary["counts"]
+    click.echo(
+        "Verify summary: "
+        + " ".join([f"total={summary['total']}"] + [f"{k}={v}" for k, v in counts.items()])
+        + f" elapsed={summary['elapsed']:.2f}s"
     )
-    if advance_time > 0:
-        ctx.advance_time(advance_time)
-    ctx.run(steps=max_steps)
-    config = set(ctx.configuration)
-    if "pass" in config:
-        click.echo("outcome: pass")
-        raise SystemExit(0)
-    if "fail" in config:
-        click.echo("outcome: fail")
-        raise SystemExit(1)
-    click.echo("outcome: other")
-    raise SystemExit(2)
+    for item in results:
+        if item["outcome"] != "pass":
+            line = f"- {item['outcome']}: {item['chart']}"
+            if item.get("error"):
+                line += f" ({item['error']})"
+            click.echo(line)
+    if summary_path is not None:
+        text = dumps(summary, indent=2)
+        if str(summary_path) == "-":
+            click.echo(text)
+        else:
+            summary_path.parent.mkdir(parents=True, exist_ok=True)
+            summary_path.write_text(text + "\n", encoding="utf-8")
+    raise SystemExit(0 if counts["pass"] == summary["total"] else 1)
+
+
+@main.command(
+    help=(
+        "Estimate state occupancy, time-to-final and error rates by simulating "
+        "many sessions of a chart under a stochastic workload on the mock clock."
+    )
+)
+@click.option(
+    "--input",
+    "-I",
+    "input_path",
+    required=True,
+    type=click.Path(exists=True, path_type=Path),
+    help="SCJSON/SCXML chart (SCXML inferred from the .scxml suffix)",
+)
+@click.option(
+    "--workload",
+    "-w",
+    "workload_path",
+    required=True,
+    type=click.Path(exists=True, path_type=Path),
+    help="JSON workload spec with event generators and payload distributions",
+)
+@click.option(
+    "--sessions",
+    "-n",
+    type=click.IntRange(min=1),
+    default=100,
+    show_default=True,
+    help="Number of independent sessions",
+)
+@click.option(
+    "--horizon",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Simulated seconds per session (overrides the spec's horizon)",
+)
+@click.option("--seed", type=int, default=0, show_default=True, help="Base random seed")
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes (0 = one per CPU)",
+)
+@click.option(
+    "--bins",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Histogram bins for occupancy and time-to-final",
+)
+@click.option(
+    "--out",
+    "-o",
+    "out_path",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Write the summary JSON here; defaults to stdout",
+)
+def simulate(
+    input_path: Path,
+    workload_path: Path,
+    sessions: int,
+    horizon: float | None,
+    seed: int,
+    jobs: int,
+    bins: int,
+    out_path: Path | None,
+) -> None:
+    """Run a Monte-Carlo simulation and write a JSON summary.
+
+    Parameters
+    ----------
+    input_path: Path
+        SCXML or SCJSON chart.
+    workload_path: Path
+        Workload spec; see :class:`scjson.montecarlo.Workload`.
+    sessions: int
+        Sessions to simulate; session ``i`` is seeded from ``seed`` and
+        ``i`` so results do not depend on ``jobs``.
+    horizon: float | None
+        Simulated seconds per session; defaults to the spec's ``horizon``.
+
+    Returns
+    -------
+    None
+        Writes the summary from :func:`scjson.montecarlo.run_montecarlo`.
+    """
+
+    from json import loads
+
+    from .montecarlo import Workload, run_montecarlo
+
+    try:
+        workload = Workload.from_dict(loads(workload_path.read_text(encoding="utf-8")))
+        summary = run_montecarlo(
+            input_path,
+            workload,
+            sessions=sessions,
+            horizon=horizon,
+            seed=seed,
+            jobs=_workers(jobs),
+            bins=bins,
+        )
+    except ValueError as exc:
+        raise click.ClickException(str(exc))
+    text = dumps(summary, indent=2)
+    if out_path is None:
+        click.echo(text)
+    else:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(text + "\n", encoding="utf-8")
+
 
 if __name__ == "__main__":
     main()
@@ -15,10 +15,26 @@ import re
 import time
 from pathlib import Path
 from types import SimpleNamespace
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 import logging
 from enum import Enum
 from collections import defaultdict
+from dataclasses import fields as dataclass_fields, is_dataclass
 from uuid import uuid4
 from xml.etree import ElementTree as ET
 
@@ -32,7 +48,7 @@ from .pydantic import (
     ScxmlFinalType,
     State,
 )
-from .events import Event, EventQueue
+from .events import SCJSON_NS, Event, EventQueue, IngressPolicy, IngressQueue, parse_ingress_policies
 from .safe_eval import SafeExpressionEvaluator, SafeEvaluationError
 from .activation import ActivationRecord, TransitionSpec, ActivationStatus
 from .invoke import InvokeRegistry, InvokeHandler
@@ -41,6 +57,15 @@ from . import dataclasses as dataclasses_module
 
 logger = logging.getLogger(__name__)
 
+#: Seconds between polls of invocations that cannot signal completion.
+INVOKE_POLL_INTERVAL = 0.05
+
+#: Outputs :meth:`DocumentContext.process_batch` can collect.
+BATCH_OUTPUTS = ("configuration", "transitions", "outbound")
+
+#: Entries kept in a context's flat transition table before it is reset.
+FLAT_TABLE_LIMIT = 4096
+
 
 class _EventDataProxy(dict):
     """Mapping wrapper that exposes dictionary entries as attributes."""
@@ -69,6 +94,127 @@ _ACTION_SERIALIZER = SCXMLDocumentHandler(
     fail_on_unknown_properties=False,
 )
 
+# XML tag -> model field for document-order paths
+_ORDER_TAG_FIELDS = {
+    "state": "state",
+    "onentry": "onentry",
+    "onexit": "onexit",
+    "if": "if_value",
+    "foreach": "foreach",
+    "raise": "raise_value",
+    "log": "log",
+    "assign": "assign",
+    "script": "script",
+    "send": "send",
+    "cancel": "cancel",
+    "transition": "transition",
+    "final": "final",
+    "parallel": "parallel",
+    "history": "history",
+    "datamodel": "datamodel",
+    "data": "data",
+}
+
+_ORDER_LIST_FIELDS = {
+    "state",
+    "onentry",
+    "onexit",
+    "if_value",
+    "foreach",
+    "raise_value",
+    "log",
+    "assign",
+    "script",
+    "send",
+    "cancel",
+    "transition",
+    "final",
+    "parallel",
+    "history",
+    "datamodel",
+    "data",
+}
+
+# Per dataclass: (field, xml tag, element dataclass) for child elements.
+# A ``None`` tag marks a wildcard field.
+_ELEMENT_LAYOUTS: Dict[type, Tuple[Tuple[str, str | None, type | None], ...]] = {}
+
+
+def _event_matches(token: str, name: str | None) -> bool:
+    """Return ``True`` when event descriptor ``token`` matches ``name``.
+
+    SCXML allows space-separated event names and wildcard patterns.
+    Supported tokens:
+
+    - exact: ``"foo"``
+    - any: ``"*"`` (matches any external event)
+    - prefix: ``"error.*"`` (matches e.g. ``error.execution``)
+    """
+
+    if name is None:
+        return False
+    if token == "*":
+        return True
+    if token.endswith(".*"):
+        prefix = token[:-2]
+        return name == prefix or name.startswith(prefix + ".")
+    return token == name
+
+
+def _transition_matches(trans: TransitionSpec, name: str | None) -> bool:
+    """Return ``True`` when ``trans`` is a candidate for event ``name``.
+
+    ``None`` stands for the eventless pass, which only considers
+    transitions without an ``event`` attribute.
+    """
+
+    if name is None:
+        return trans.event is None
+    te = trans.event or ""
+    names = te.split()
+    if names:
+        return any(_event_matches(token, name) for token in names)
+    return _event_matches(te, name)
+
+
+class _FlatStep(NamedTuple):
+    """Precomputed effect of an event on a flat region.
+
+    ``source`` is ``None`` when no transition matches at all.
+    """
+
+    source: Optional[ActivationRecord]
+    trans: Optional[TransitionSpec]
+    exited: Tuple[str, ...]
+    entered: Tuple[str, ...]
+
+
+def _element_layout(cls: type) -> Tuple[Tuple[str, str | None, type | None], ...]:
+    """Return the child element fields of dataclass ``cls`` in XML order."""
+
+    layout = _ELEMENT_LAYOUTS.get(cls)
+    if layout is not None:
+        return layout
+    hints = get_type_hints(cls)
+    entries: List[Tuple[str, str | None, type | None]] = []
+    for f in dataclass_fields(cls):
+        kind = f.metadata.get("type")
+        if kind == "Wildcard":
+            entries.append((f.name, None, None))
+            continue
+        if kind not in (None, "Element"):
+            continue
+        tp = hints[f.name]
+        while get_origin(tp) in (list, Union):
+            tp = [arg for arg in get_args(tp) if arg is not type(None)][0]
+        element = tp if is_dataclass(tp) else None
+        if kind is None and element is None:
+            continue
+        entries.append((f.name, f.metadata.get("name", f.name), element))
+    layout = _ELEMENT_LAYOUTS[cls] = tuple(entries)
+    return layout
+
+
 class ExecutionMode(str, Enum):
     """Execution conformance modes supported by the interpreter."""
 
@@ -108,10 +254,24 @@ class DocumentContext(BaseModel):
     invocations_autoforward: Dict[str, bool] = Field(default_factory=dict)
     _invocations_started_for_state: Set[str] = PrivateAttr(default_factory=set)
     _base_dir: Optional[Path] = PrivateAttr(default=None)
+    # Chart was validated before loading; invoked children inherit it
+    _trusted: bool = PrivateAttr(default=False)
     _external_emitter: Optional[Any] = PrivateAttr(default=None)
     # Ordering policy for parent queue emission from child invokes
     ordering_mode: str = "tolerant"  # tolerant | strict | scion
     _leaf_ids: Set[str] = PrivateAttr(default_factory=set)
+    # Thread-safe ingress in front of ``events`` (see ``post``)
+    _ingress: IngressQueue = PrivateAttr(default_factory=IngressQueue)
+    _stopping: bool = PrivateAttr(default=False)
+    _woken: bool = PrivateAttr(default=False)
+    _watched: Dict[str, InvokeHandler] = PrivateAttr(default_factory=dict)
+    # Outbound sends captured by ``process_batch`` (``None`` when not collecting)
+    _outbox: Optional[List[Tuple[str, Event]]] = PrivateAttr(default=None)
+    _transition_ids: Optional[Dict[int, int]] = PrivateAttr(default=None)
+    # Use precomputed steps for guard-free flat regions (see ``_flat_step``)
+    flat_transitions: bool = True
+    _flat_states: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _flat_table: Dict[Tuple[str, Optional[str]], Optional[_FlatStep]] = PrivateAttr(default_factory=dict)
 
     # ------------------------------------------------------------------ #
     # Interpreter API – the real engine would call these
@@ -130,10 +290,16 @@ class DocumentContext(BaseModel):
 
     def microstep(self) -> None:
         """Execute one microstep of the interpreter."""
+        self._microstep(None)
+
+    def _microstep(self, fired: Optional[List[TransitionSpec]]) -> None:
+        """Run one microstep, appending taken transitions to ``fired``."""
         self._release_delayed_events()
+        self.poll_invocations()
         evt = self.events.pop()
         event_consumed = evt is not None
         triggered = False
+        verbose = logger.isEnabledFor(logging.INFO)
 
         # Autoforward external events to active invocations before processing
         if evt is not None:
@@ -156,12 +322,15 @@ class DocumentContext(BaseModel):
                 if result:
                     act, trans, _, _ = result
                     triggered = True
-                    logger.info(
-                        "[microstep] %s -> %s on %s",
-                        act.id,
-                        ",".join(trans.target),
-                        head_evt.name,
-                    )
+                    if fired is not None:
+                        fired.append(trans)
+                    if verbose:
+                        logger.info(
+                            "[microstep] %s -> %s on %s",
+                            act.id,
+                            ",".join(trans.target),
+                            head_evt.name,
+                        )
         except Exception:
             pass
 
@@ -173,12 +342,15 @@ class DocumentContext(BaseModel):
             if result:
                 act, trans, _, _ = result
                 triggered = True
-                logger.info(
-                    "[microstep] %s -> %s on %s",
-                    act.id,
-                    ",".join(trans.target),
-                    evt.name,
-                )
+                if fired is not None:
+                    fired.append(trans)
+                if verbose:
+                    logger.info(
+                        "[microstep] %s -> %s on %s",
+                        act.id,
+                        ",".join(trans.target),
+                        evt.name,
+                    )
 
         while True:
             result = self._execute_transition(None)
@@ -186,14 +358,17 @@ class DocumentContext(BaseModel):
                 break
             triggered = True
             act, trans, _, _ = result
-            logger.info(
-                "[microstep] %s -> %s on %s",
-                act.id,
-                ",".join(trans.target),
-                trans.event or "<epsilon>",
-            )
+            if fired is not None:
+                fired.append(trans)
+            if verbose:
+                logger.info(
+                    "[microstep] %s -> %s on %s",
+                    act.id,
+                    ",".join(trans.target),
+                    trans.event or "<epsilon>",
+                )
 
-        if event_consumed and not triggered and evt is not None:
+        if event_consumed and not triggered and evt is not None and verbose:
             logger.info("[microstep] consumed event: %s", evt.name)
         # At the end of the microstep, start invocations for states that
         # remain active after all transitions in this step.
@@ -223,31 +398,8 @@ class DocumentContext(BaseModel):
             if not act:
                 continue
             for trans in act.transitions:
-                if evt is None:
-                    if trans.event is not None:
-                        continue
-                else:
-                    te = trans.event or ""
-                    # SCXML allows space-separated event names and wildcard patterns
-                    # Supported tokens:
-                    #  - exact: "foo"
-                    #  - any: "*" (matches any external event)
-                    #  - prefix: "error.*" (matches e.g., error.execution)
-                    def _matches(token: str, name: str | None) -> bool:
-                        if name is None:
-                            return False
-                        if token == "*":
-                            return True
-                        if token.endswith(".*"):
-                            prefix = token[:-2]
-                            return name == prefix or name.startswith(prefix + ".")
-                        return token == name
-
-                    names = [n for n in te.split() if n]
-                    if names and not any(_matches(token, event_name) for token in names):
-                        continue
-                    if not names and not _matches(te, event_name):
-                        continue
+                if not _transition_matches(trans, event_name):
+                    continue
                 if trans.cond is None or self._eval_condition(trans.cond, act):
                     return act, trans
         return None
@@ -255,6 +407,15 @@ class DocumentContext(BaseModel):
     def _execute_transition(
         self, evt: Event | None
     ) -> Optional[Tuple[ActivationRecord, TransitionSpec, Set[str], Set[str]]]:
+        step = self._flat_step(evt) if self.flat_transitions else None
+        if step is not None:
+            if step.source is None:
+                return None
+            # Flat region: a cond-free, action-free move between sibling
+            # leaves only swaps configuration entries.
+            self.configuration.difference_update(step.exited)
+            self.configuration.update(step.entered)
+            return step.source, step.trans, set(step.entered), set(step.exited)
         sel = self._select_transition(evt)
         if not sel:
             return None
@@ -262,6 +423,95 @@ class DocumentContext(BaseModel):
         entered, exited = self._fire_transition(act, trans)
         return act, trans, entered, exited
 
+    def _flat_step(self, evt: Event | None) -> Optional[_FlatStep]:
+        """Return the table entry for ``evt`` in the current flat region.
+
+        ``None`` means the configuration or the event needs the general
+        selection and firing path.
+        """
+
+        flat = self._flat_states
+        if not flat:
+            return None
+        for state_id in self.configuration:
+            size = flat.get(state_id)
+            if size is not None:
+                break
+        else:
+            return None
+        if size != len(self.configuration):
+            return None
+        key = (state_id, evt.name if evt is not None else None)
+        table = self._flat_table
+        try:
+            return table[key]
+        except KeyError:
+            pass
+        step = self._compile_flat_step(state_id, key[1])
+        if len(table) >= FLAT_TABLE_LIMIT:
+            table.clear()
+        table[key] = step
+        return step
+
+    def _compile_flat_step(self, state_id: str, event_name: str | None) -> Optional[_FlatStep]:
+        """Resolve ``event_name`` in leaf ``state_id`` to a :class:`_FlatStep`.
+
+        Mirrors :meth:`_select_transition` over the active chain. Any guard on
+        a candidate transition, executable content, a transition declared on
+        an ancestor, or a target outside the flat states gives ``None``.
+        """
+
+        flat = self._flat_states
+        for act in self.activations[state_id].path():
+            for trans in act.transitions:
+                if not _transition_matches(trans, event_name):
+                    continue
+                if (
+                    act.id != state_id
+                    or trans.cond is not None
+                    or len(trans.target) > 1
+                    or any(tid not in flat for tid in trans.target)
+                    or self._iter_actions(trans.container)
+                ):
+                    return None
+                exited = tuple(a.id for a in self._compute_exit_set(act, trans.target))
+                entered = tuple(a.id for a in self._compute_entry_list(act, trans.target))
+                if any(sid not in flat for sid in exited + entered):
+                    return None
+                return _FlatStep(act, trans, exited, entered)
+        return _FlatStep(None, None, (), ())
+
+    def _find_flat_states(self) -> Dict[str, int]:
+        """Return leaf states that can use the flat transition table.
+
+        A flat state is an atomic ``<state>`` without ``onentry``, ``onexit``
+        or ``<invoke>`` whose ancestors are neither ``<parallel>`` nor hold
+        ``<history>``. While one is active the configuration is exactly its
+        ancestor chain; the value is that chain's length.
+        """
+
+        flat: Dict[str, int] = {}
+        for state_id, act in self.activations.items():
+            node = act.node
+            if (
+                not isinstance(node, State)
+                or act.children
+                or act.invokes
+                or node.initial_attribute
+                or node.initial
+                or node.onentry
+                or node.onexit
+            ):
+                continue
+            chain = act.path()
+            if any(
+                isinstance(anc.node, ScxmlParallelType) or getattr(anc.node, "history", None)
+                for anc in chain[:-1]
+            ):
+                continue
+            flat[state_id] = len(chain)
+        return flat
+
     def trace_step(self, evt: Event | None = None) -> dict:
         """Execute one microstep and return a standardized trace entry."""
 
@@ -864,6 +1114,9 @@ class DocumentContext(BaseModel):
                 # mark as parent-bubble event for the invoker pump
                 send_id = f"$to-parent:{uuid4()}"
             event_obj = Event(name=str(event_name), data=payload, send_id=send_id)
+            if self._outbox is not None:
+                self._outbox.append((str(target), event_obj))
+                return
             # Respect delay/delayexpr semantics: schedule on the child's queue,
             # then the invoker will bubble to the parent when due.
             if getattr(send, "delayexpr", None) is not None:
@@ -914,6 +1167,11 @@ class DocumentContext(BaseModel):
             return
 
         if target and str(target) not in {"#_internal", "_internal"}:
+            if self._outbox is not None:
+                payload = self._build_send_payload(send, env, act)
+                event_obj = Event(name=str(event_name), data=payload, send_id=getattr(send, "id", None))
+                self._outbox.append((str(target), event_obj))
+                return
             logger.warning(
                 "External <send> target '%s' is not supported yet; skipping", target
             )
@@ -1180,6 +1438,70 @@ class DocumentContext(BaseModel):
             except Exception:
                 continue
 
+    def next_timer(self) -> Optional[float]:
+        """Return seconds until the earliest pending timer, or ``None``.
+
+        Covers this session's delayed events and the timers of child
+        invocations that report them (see :meth:`InvokeHandler.next_timer`).
+        Overdue timers report ``0.0``.
+        """
+
+        earliest: Optional[float] = None
+        if self.delayed_events:
+            now = time.monotonic() if self._use_wall_clock else self._timer_now
+            earliest = max(0.0, self.delayed_events[0][0] - now)
+        for handler in list(self.invocations.values()):
+            try:
+                delay = handler.next_timer()
+            except Exception:
+                continue
+            if delay is not None and (earliest is None or delay < earliest):
+                earliest = max(0.0, delay)
+        return earliest
+
+    def simulate(self, horizon: float | None = None, *, max_jumps: int | None = None) -> float:
+        """Run as a discrete-event simulation on the mock clock.
+
+        Queued events are processed; whenever the session is idle the
+        clock jumps straight to the next timer deadline across the
+        session and its child invocations. This repeats until nothing is
+        pending, the chart reaches a top-level ``<final>``, or
+        ``horizon`` simulated seconds have passed. Hour-long timeouts
+        cost no real time.
+
+        Invocations that do real work (``python:`` callables, out-of-process
+        children) are not waited for; their results are picked up when they
+        are already available.
+
+        :param horizon: Stop after this many simulated seconds; the clock
+            is left at exactly ``horizon``.
+        :param max_jumps: Optional limit on clock jumps, for charts with
+            timers that re-arm forever.
+        :returns: Simulated seconds elapsed.
+        """
+
+        if self._use_wall_clock:
+            self._use_wall_clock = False
+            self._timer_now = time.monotonic()
+        elapsed = 0.0
+        jumps = 0
+        while True:
+            self.run()
+            if self.done:
+                break
+            delay = self.next_timer()
+            if delay is None or (max_jumps is not None and jumps >= max_jumps):
+                break
+            if horizon is not None and elapsed + delay > horizon:
+                self.advance_time(horizon - elapsed)
+                self.run()
+                elapsed = horizon
+                break
+            self.advance_time(delay)
+            elapsed += delay
+            jumps += 1
+        return elapsed
+
     # -------------------------------
     # Invoke lifecycle
     # -------------------------------
@@ -1254,6 +1576,11 @@ class DocumentContext(BaseModel):
                     setattr(handler, 'invoke_id', inv_id)
                 except Exception:
                     pass
+                # Child machines load the same way as their parent
+                try:
+                    setattr(handler, 'trusted', self._trusted)
+                except Exception:
+                    pass
                 self.invocations[inv_id] = handler
                 self.invocations_by_state.setdefault(act.id, []).append(inv_id)
                 self._invoke_specs[inv_id] = (inv, act)
@@ -1945,6 +2272,7 @@ class DocumentContext(BaseModel):
         allow_unsafe_eval: bool = False,
         evaluator: SafeExpressionEvaluator | None = None,
         execution_mode: ExecutionMode | str = ExecutionMode.STRICT,
+        trusted: bool = False,
     ) -> "DocumentContext":
         text = Path(path).read_text(encoding="utf-8")
         data = cls._prepare_raw_data(json.loads(text))
@@ -1961,6 +2289,7 @@ class DocumentContext(BaseModel):
             evaluator=evaluator,
             execution_mode=mode,
             source_xml=None,
+            trusted=trusted,
         )
 
     @classmethod
@@ -1971,7 +2300,14 @@ class DocumentContext(BaseModel):
         allow_unsafe_eval: bool = False,
         evaluator: SafeExpressionEvaluator | None = None,
         execution_mode: ExecutionMode | str = ExecutionMode.STRICT,
+        trusted: bool = False,
     ) -> "DocumentContext":
+        """Create a DocumentContext from an SCXML file.
+
+        Parameters are as for :meth:`from_xml_string`; ``trusted`` likewise
+        only reaches invoked child machines. Relative ``src`` paths of
+        invocations resolve against the file's directory.
+        """
         mode = (
             execution_mode
             if isinstance(execution_mode, ExecutionMode)
@@ -1990,6 +2326,7 @@ class DocumentContext(BaseModel):
             execution_mode=mode,
             source_xml=xml_str,
             base_dir=Path(path).resolve().parent,
+            trusted=trusted,
         )
         return ctx
 
@@ -2001,6 +2338,7 @@ class DocumentContext(BaseModel):
         allow_unsafe_eval: bool = False,
         evaluator: SafeExpressionEvaluator | None = None,
         execution_mode: ExecutionMode | str = ExecutionMode.STRICT,
+        trusted: bool = False,
     ) -> "DocumentContext":
         """Create a DocumentContext from an XML string.
 
@@ -2014,6 +2352,12 @@ class DocumentContext(BaseModel):
             Optional evaluator instance.
         execution_mode: ExecutionMode | str
             Strict or lax parsing.
+        trusted: bool
+            Treat the chart as already validated (for example with
+            ``scjson validate``). XML sources always take their execution
+            order from the source text, so here the flag only passes on to
+            invoked child machines; JSON loads (:meth:`from_json_file`) use
+            it to skip the JSON -> XML round-trip while indexing.
 
         Returns
         -------
@@ -2037,6 +2381,7 @@ class DocumentContext(BaseModel):
             execution_mode=mode,
             source_xml=xml_str,
             base_dir=None,
+            trusted=trusted,
         )
         return ctx
 
@@ -2052,9 +2397,13 @@ class DocumentContext(BaseModel):
         source_xml: str | None = None,
         base_dir: Path | None = None,
         defer_initial: bool = False,
+        trusted: bool = False,
+        index: Tuple[Dict[int, Any], Dict[int, List[str]]] | None = None,
     ) -> "DocumentContext":
         evaluator = evaluator or SafeExpressionEvaluator()
-        lookup, path_map = cls._build_json_lookup(doc, raw_data)
+        if index is None:
+            index = cls._build_index(doc, raw_data, source_xml, trusted)
+        lookup, order = index
         root_state = cls._build_activation_tree(doc, None, evaluator, allow_unsafe_eval)
         ctx = cls(
             doc=doc,
@@ -2068,10 +2417,15 @@ class DocumentContext(BaseModel):
             ctx._base_dir = base_dir
         except Exception:
             ctx._base_dir = None
+        ctx._trusted = trusted
         ctx._action_cache = {}
-        ctx.json_order = cls._build_order_map(raw_data, path_map, source_xml)
+        spec = (getattr(doc, "other_attributes", None) or {}).get(f"{{{SCJSON_NS}}}ingress")
+        if spec:
+            ctx._ingress.policies.update(parse_ingress_policies(str(spec)))
+        ctx.json_order = order
         ctx.data_model = root_state.local_data
         ctx._index_activations(root_state)
+        ctx._flat_states = ctx._find_flat_states()
         try:
             ctx._leaf_ids = ctx.leaf_state_ids()
         except Exception:
@@ -2087,6 +2441,23 @@ class DocumentContext(BaseModel):
                 pass
         return ctx
 
+    @classmethod
+    def _build_index(
+        cls,
+        doc: Scxml,
+        raw_data: Dict[str, Any],
+        source_xml: str | None,
+        trusted: bool = False,
+    ) -> Tuple[Dict[int, Any], Dict[int, List[str]]]:
+        """Return the raw-data lookup and action order maps for ``doc``.
+
+        Both maps are keyed by model ``id`` and only read afterwards, so
+        contexts built from the same ``doc`` may share them.
+        """
+
+        lookup, path_map = cls._build_json_lookup(doc, raw_data)
+        return lookup, cls._build_order_map(raw_data, path_map, source_xml, trusted)
+
     @staticmethod
     def _build_json_lookup(model: Any, raw: Any) -> tuple[Dict[int, Any], Dict[int, Tuple[tuple[str, int], ...]]]:
         lookup: Dict[int, Any] = {}
@@ -2169,7 +2540,17 @@ class DocumentContext(BaseModel):
         raw_data: Dict[str, Any],
         path_map: Dict[int, Tuple[tuple[str, int], ...]],
         source_xml: str | None,
+        trusted: bool = False,
     ) -> Dict[int, List[str]]:
+        if source_xml is None and trusted:
+            # Trusted data is already in canonical shape, so the order the
+            # serializer would produce can be read off the dataclass layout
+            # without the JSON -> XML round-trip.
+            derived = DocumentContext._order_from_data(raw_data)
+            if derived is not None:
+                return {
+                    obj_id: derived[p] for obj_id, p in path_map.items() if p in derived
+                }
         if source_xml is not None:
             xml_candidates = [source_xml]
         else:
@@ -2178,46 +2559,6 @@ class DocumentContext(BaseModel):
             except Exception:
                 xml_candidates = []
 
-        tag_to_field = {
-            "state": "state",
-            "onentry": "onentry",
-            "onexit": "onexit",
-            "if": "if_value",
-            "foreach": "foreach",
-            "raise": "raise_value",
-            "log": "log",
-            "assign": "assign",
-            "script": "script",
-            "send": "send",
-            "cancel": "cancel",
-            "transition": "transition",
-            "final": "final",
-            "parallel": "parallel",
-            "history": "history",
-            "datamodel": "datamodel",
-            "data": "data",
-        }
-
-        list_fields = {
-            "state",
-            "onentry",
-            "onexit",
-            "if_value",
-            "foreach",
-            "raise_value",
-            "log",
-            "assign",
-            "script",
-            "send",
-            "cancel",
-            "transition",
-            "final",
-            "parallel",
-            "history",
-            "datamodel",
-            "data",
-        }
-
         order_by_path: Dict[Tuple[tuple[str, int], ...], List[str]] = {}
 
         for candidate in xml_candidates:
@@ -2228,15 +2569,15 @@ class DocumentContext(BaseModel):
 
             def traverse(elem: ET.Element, path: List[tuple[str, int]]) -> None:
                 local = DocumentContext._local_name(elem.tag)
-                field = tag_to_field.get(local, local)
+                field = _ORDER_TAG_FIELDS.get(local, local)
                 child_tags = [DocumentContext._local_name(child.tag) for child in list(elem)]
                 order_by_path[tuple(path)] = child_tags
 
                 child_counts: Dict[str, int] = defaultdict(int)
                 for child in list(elem):
                     child_local = DocumentContext._local_name(child.tag)
-                    child_field = tag_to_field.get(child_local, child_local)
-                    if child_field in list_fields:
+                    child_field = _ORDER_TAG_FIELDS.get(child_local, child_local)
+                    if child_field in _ORDER_LIST_FIELDS:
                         idx = child_counts[child_field]
                         child_counts[child_field] += 1
                         traverse(child, path + [(child_field, idx)])
@@ -2252,20 +2593,486 @@ class DocumentContext(BaseModel):
 
         return order_map
 
+    @staticmethod
+    def _order_from_data(
+        raw_data: Dict[str, Any],
+    ) -> Dict[Tuple[tuple[str, int], ...], List[str]] | None:
+        """Return child tag order by path as the XML serializer emits it.
+
+        Returns ``None`` when a wildcard field carries content (inline
+        ``<content>`` documents, foreign elements), whose serialized tags
+        are only known after the round-trip.
+        """
+
+        order_by_path: Dict[Tuple[tuple[str, int], ...], List[str]] = {}
+
+        def walk(node: Dict[str, Any], cls: type, path: Tuple[tuple[str, int], ...]) -> bool:
+            tags: List[str] = []
+            order_by_path[path] = tags
+            counts: Dict[str, int] = defaultdict(int)
+            for name, tag, element in _element_layout(cls):
+                value = node.get(name)
+                if tag is None:
+                    if value:
+                        return False
+                    continue
+                if value is None:
+                    continue
+                for item in value if isinstance(value, list) else [value]:
+                    if element is None or not isinstance(item, dict):
+                        return False
+                    tags.append(tag)
+                    field = _ORDER_TAG_FIELDS.get(tag, tag)
+                    idx = 0
+                    if field in _ORDER_LIST_FIELDS:
+                        idx = counts[field]
+                        counts[field] += 1
+                    if not walk(item, element, path + ((field, idx),)):
+                        return False
+            return True
+
+        if not isinstance(raw_data, dict) or not walk(raw_data, dataclasses_module.Scxml, ()):
+            return None
+        return order_by_path
+
+    def poll_invocations(self, timeout: float = 0.0) -> int:
+        """Deliver results from invocations that run asynchronously.
+
+        Out-of-process children (``scxml-process``) report their events and
+        completion through :meth:`InvokeHandler.poll`; this is called at the
+        start of every microstep, so callers only need it to wait for a
+        child while the parent queue is empty.
+
+        :param timeout: Seconds to wait for at least one result when none is
+            ready yet; ``0`` returns immediately.
+        :returns: Number of results delivered.
+        """
+
+        delivered = self._poll_handlers()
+        deadline = time.monotonic() + timeout
+        while not delivered:
+            remaining = deadline - time.monotonic()
+            waiters = [
+                h for h in self.invocations.values() if type(h).wait is not InvokeHandler.wait
+            ]
+            if remaining <= 0 or not waiters:
+                break
+            # Wait in short slices so handlers on other pools are polled too
+            try:
+                waiters[0].wait(min(remaining, 0.05))
+            except Exception:
+                pass
+            delivered = self._poll_handlers()
+        return delivered
+
+    def _poll_handlers(self) -> int:
+        delivered = 0
+        for handler in list(self.invocations.values()):
+            try:
+                delivered += handler.poll()
+            except Exception:
+                pass
+        return delivered
+
     def run(self, steps: int | None = None) -> None:
         """Execute microsteps until the queue is empty or ``steps`` is reached.
 
+        Events handed in with :meth:`post` are queued first.
+
         :param steps: Maximum number of microsteps to run, or ``None`` for no
             limit.
         :returns: ``None``
         """
 
         count = 0
+        self._drain_ingress()
         self._release_delayed_events()
         while self.events and (steps is None or count < steps):
             self.microstep()
             count += 1
 
+    # -------------------------------
+    # Batch processing
+    # -------------------------------
+    def process_batch(
+        self,
+        events: Iterable[Union[str, Tuple[str, Any], Event]],
+        *,
+        collect: Iterable[str] = (),
+    ) -> Dict[str, Any]:
+        """Run a sequence of external events to completion, one macrostep each.
+
+        This is the throughput path for callers that only need a few
+        outputs: no trace entries are built and nothing is logged unless
+        ``INFO`` logging is enabled. Each event is handled exactly as with
+        :meth:`enqueue` followed by :meth:`run`.
+
+        :param events: Event names, ``(name, data)`` pairs or :class:`Event`
+            objects.
+        :param collect: Outputs to return in addition to the event count:
+            ``"configuration"`` – final :meth:`configuration_mask`;
+            ``"transitions"`` – ids of the transitions taken, in order (see
+            :meth:`transition_table`);
+            ``"outbound"`` – ``(target, Event)`` pairs for ``<send>`` to
+            ``#_parent`` or to an external target, captured instead of
+            being queued or rejected. Their delay is left to the caller.
+        :returns: ``{"events": count}`` plus one entry per collected output.
+        """
+
+        wanted = set(collect)
+        unknown = wanted.difference(BATCH_OUTPUTS)
+        if unknown:
+            raise ValueError(f"unknown batch outputs: {sorted(unknown)}")
+        fired: Optional[List[TransitionSpec]] = [] if "transitions" in wanted else None
+        outbox = self._outbox
+        if "outbound" in wanted:
+            self._outbox = []
+        count = 0
+        push = self.events.push
+        queue = self.events
+        try:
+            self._drain_ingress()
+            for item in events:
+                if isinstance(item, str):
+                    push(Event(name=item))
+                elif isinstance(item, Event):
+                    push(item)
+                else:
+                    name, data = item
+                    push(Event(name=name, data=data))
+                count += 1
+                while queue:
+                    self._microstep(fired)
+        finally:
+            outbound, self._outbox = self._outbox, outbox
+
+        result: Dict[str, Any] = {"events": count}
+        if "configuration" in wanted:
+            result["configuration"] = self.configuration_mask()
+        if fired is not None:
+            ids = self._transition_index()
+            result["transitions"] = [ids[id(trans)] for trans in fired]
+        if "outbound" in wanted:
+            result["outbound"] = outbound
+        return result
+
+    def configuration_mask(self) -> int:
+        """Return the configuration as an integer bitmask.
+
+        Bit ``n`` is set when the state with document order ``n`` (see
+        ``activation_order``) is active. Masks are stable for a chart and
+        can be compared across sessions of it.
+        """
+
+        order = self.activation_order
+        mask = 0
+        for state_id in self.configuration:
+            bit = order.get(state_id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def states_from_mask(self, mask: int) -> List[str]:
+        """Return the state ids set in ``mask``, in document order."""
+
+        return [state_id for state_id, bit in self.activation_order.items() if mask >> bit & 1]
+
+    def transition_table(self) -> List[Tuple[str, TransitionSpec]]:
+        """Return ``(source state id, transition)`` pairs by transition id.
+
+        Ids number the transitions of the chart in document order and are
+        what :meth:`process_batch` reports for ``"transitions"``.
+        """
+
+        table: List[Tuple[str, TransitionSpec]] = []
+        for state_id in sorted(self.activations, key=self._activation_order_key):
+            for trans in self.activations[state_id].transitions:
+                table.append((state_id, trans))
+        return table
+
+    def _transition_index(self) -> Dict[int, int]:
+        ids = self._transition_ids
+        if ids is None:
+            ids = {id(trans): n for n, (_, trans) in enumerate(self.transition_table())}
+            self._transition_ids = ids
+        return ids
+
+    # -------------------------------
+    # Blocking run loops
+    # -------------------------------
+    def post(self, evt_name: str, data: Any | None = None, *, timeout: float | None = None) -> bool:
+        """Queue an external event from any thread.
+
+        Unlike :meth:`enqueue`, this never touches interpreter state: the
+        event waits in a locked ingress queue until the interpreter thread
+        picks it up in :meth:`run`, :meth:`run_until_idle` or
+        :meth:`run_forever`, and wakes those loops if they are sleeping.
+        Ingress policies (:meth:`set_ingress_policy`) apply here.
+
+        :param evt_name: Name of the event.
+        :param data: Optional payload.
+        :param timeout: Seconds to wait for room under a ``block`` policy;
+            ``None`` waits as long as needed. Never post a blocking event
+            from the interpreter thread itself.
+        :returns: ``False`` when a policy dropped the event.
+        """
+
+        return self._ingress.put(Event(name=evt_name, data=data), timeout)
+
+    def set_ingress_policy(self, evt_name: str, kind: str | None, limit: int = 1) -> None:
+        """Set how :meth:`post` and the ``send`` front ends admit events named ``evt_name``.
+
+        :param evt_name: Exact event name.
+        :param kind: ``latest``, ``drop-oldest``, ``drop-newest``, ``block``,
+            or ``None`` to remove the policy.
+        :param limit: Pending events of this name allowed before the policy
+            applies (ignored for ``latest``).
+        :returns: ``None``
+        """
+
+        with self._ingress.cond:
+            if kind is None:
+                self._ingress.policies.pop(evt_name, None)
+            else:
+                self._ingress.policies[evt_name] = IngressPolicy(kind, limit)
+
+    def ingress_stats(self) -> Dict[str, Any]:
+        """Return posted events still ``pending`` and per-name ``coalesced``, ``dropped`` and ``blocked`` counts."""
+
+        return self._ingress.stats()
+
+    def stop(self) -> None:
+        """Make the current (or next) :meth:`run_forever` return.
+
+        Safe to call from any thread.
+        """
+
+        with self._ingress.cond:
+            self._stopping = True
+            self._ingress.cond.notify_all()
+
+    def run_until_idle(self, timeout: float | None = None) -> bool:
+        """Process events until nothing is queued or pending.
+
+        Sleeps on a condition variable while waiting for posted events,
+        the next wall-clock timer or running invocations, so waiting costs
+        no CPU.
+
+        :param timeout: Maximum seconds to wait for pending work, or
+            ``None`` to wait as long as timers or invocations are pending.
+        :returns: ``True`` when the context went idle (or finished),
+            ``False`` when ``timeout`` expired first.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self.poll_invocations()
+            self.run()
+            if self.events or self._ingress:
+                continue
+            if self.done:
+                return True
+            pending, delay = self._pending_work()
+            if not pending:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                delay = remaining if delay is None else min(delay, remaining)
+            self._wait_for_work(delay)
+
+    def run_forever(self) -> None:
+        """Process events as they arrive until :meth:`stop` or a top-level final.
+
+        Between events the thread sleeps on a condition variable that
+        :meth:`post`, :meth:`stop`, due timers and finishing invocations
+        wake.
+
+        :returns: ``None``
+        """
+
+        try:
+            while True:
+                self.poll_invocations()
+                self.run()
+                if self.events or self._ingress:
+                    continue
+                if self.done or self._stopping:
+                    return
+                _, delay = self._pending_work()
+                self._wait_for_work(delay)
+        finally:
+            with self._ingress.cond:
+                self._stopping = False
+
+    def _drain_ingress(self) -> None:
+        if not self._ingress:
+            return
+        self._ingress.drain(self.events.push)
+
+    def _notify_ingress(self) -> None:
+        with self._ingress.cond:
+            # Remembered so a wakeup arriving before the wait is not lost
+            self._woken = True
+            self._ingress.cond.notify_all()
+
+    def _wait_for_work(self, timeout: float | None) -> None:
+        with self._ingress.cond:
+            if not (self._ingress or self._stopping or self._woken):
+                self._ingress.cond.wait(timeout)
+            self._woken = False
+
+    def _pending_work(self) -> tuple[bool, Optional[float]]:
+        """Return whether timers or invocations are pending and when to look again.
+
+        Wall-clock timers include those of child invocations (see
+        :meth:`next_timer`). The delay is ``None`` when only a notification
+        (a posted event or an invocation's ``on_ready`` callback) can
+        produce more work. Invocations that can neither notify nor be
+        polled, such as in-process children without timers, only move when
+        the parent sends to them and do not count as pending.
+        """
+
+        delay: Optional[float] = None
+        pending = False
+        if self._use_wall_clock:
+            delay = self.next_timer()
+            pending = delay is not None
+        live = self._live_invocations()
+        if live:
+            if self._watch_invocations(self._notify_ingress):
+                pending = True
+                delay = INVOKE_POLL_INTERVAL if delay is None else min(delay, INVOKE_POLL_INTERVAL)
+            elif any(inv_id in self._watched for inv_id in live):
+                pending = True
+        return pending, delay
+
+    def _watch_invocations(self, callback: Callable[[], None]) -> bool:
+        """Register ``callback`` with invocations started since the last call.
+
+        :returns: ``True`` when some invocation cannot notify and has to be
+            polled instead.
+        """
+
+        needs_poll = False
+        watched: Dict[str, InvokeHandler] = {}
+        for inv_id in self._live_invocations():
+            handler = self.invocations[inv_id]
+            if self._watched.get(inv_id) is handler:
+                watched[inv_id] = handler
+                continue
+            try:
+                if handler.on_ready(callback):
+                    watched[inv_id] = handler
+                    continue
+            except Exception:
+                pass
+            if type(handler).wait is not InvokeHandler.wait:
+                needs_poll = True
+        self._watched = watched
+        return needs_poll
+
+    @property
+    def done(self) -> bool:
+        """``True`` once the chart has reached a top-level ``<final>``."""
+
+        return any(
+            isinstance(child.node, ScxmlFinalType) and child.id in self.configuration
+            for child in self.root_activation.children
+        )
+
+    def _live_invocations(self) -> List[str]:
+        """Return ids of invocations that are neither done nor cancelled."""
+
+        live = []
+        for ids in self.invocations_by_state.values():
+            for inv_id in ids:
+                handler = self.invocations.get(inv_id)
+                if handler is None or getattr(handler, "finished", False):
+                    continue
+                if getattr(handler, "is_canceled", False):
+                    continue
+                live.append(inv_id)
+        return live
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the runtime state of this context as plain data.
+
+        The snapshot holds the configuration, datamodel values per
+        activation, final markers, history, queued events and pending
+        delayed events (as remaining delays). Together with the chart it is
+        enough to rebuild the session with :meth:`restore`, for example in
+        another process. Datamodel values are not copied.
+
+        :returns: A picklable dictionary (JSON-compatible when the
+            datamodel is).
+        :raises ValueError: When invocations are still running; their
+            handlers cannot be moved.
+        """
+
+        live = self._live_invocations()
+        if live:
+            raise ValueError(f"cannot snapshot running invocations: {', '.join(live)}")
+        now = time.monotonic() if self._use_wall_clock else self._timer_now
+        return {
+            "version": 1,
+            "configuration": sorted(self.configuration, key=self._activation_order_key),
+            "data": {
+                act_id: dict(act.local_data)
+                for act_id, act in self.activations.items()
+                if act.local_data
+            },
+            "final": [
+                act_id
+                for act_id, act in self.activations.items()
+                if act.status is ActivationStatus.FINAL
+            ],
+            "history": {k: list(v) for k, v in self.history.items()},
+            "history_deep": {k: list(v) for k, v in self.history_deep.items()},
+            "events": [evt.model_dump() for evt in self.events._q],
+            "delayed": [[max(0.0, due - now), evt.model_dump()] for due, evt in self.delayed_events],
+            "wall_clock": self._use_wall_clock,
+            "invoked": sorted(self._invocations_started_for_state),
+        }
+
+    def restore(self, state: Mapping[str, Any]) -> None:
+        """Replace the runtime state with a :meth:`snapshot` of the same chart.
+
+        Use it on a context whose initial entry was deferred (or on any
+        fresh context of the chart); nothing is executed while restoring.
+
+        :param state: Snapshot produced by :meth:`snapshot`.
+        :returns: ``None``
+        """
+
+        if state.get("version") != 1:
+            raise ValueError(f"unsupported snapshot version: {state.get('version')!r}")
+        self.configuration.clear()
+        self.configuration.update(state["configuration"])
+        final = set(state.get("final", ()))
+        for act_id, act in self.activations.items():
+            act.status = ActivationStatus.FINAL if act_id in final else ActivationStatus.ACTIVE
+        for act_id, values in state.get("data", {}).items():
+            act = self.activations.get(act_id)
+            if act is not None:
+                # data_model aliases the root's local_data; update in place
+                act.local_data.clear()
+                act.local_data.update(values)
+        self.history = {k: list(v) for k, v in state.get("history", {}).items()}
+        self.history_deep = {k: list(v) for k, v in state.get("history_deep", {}).items()}
+        self.events = EventQueue()
+        for item in state.get("events", ()):
+            self.events.push(Event(**item))
+        self._use_wall_clock = bool(state.get("wall_clock", True))
+        if self._use_wall_clock:
+            self._timer_now = time.monotonic()
+        self.delayed_events = sorted(
+            ((self._timer_now + delay, Event(**item)) for delay, item in state.get("delayed", ())),
+            key=lambda entry: entry[0],
+        )
+        self._invocations_started_for_state = set(state.get("invoked", ()))
+
     # -------------------------------
     # Helpers for deep history
     # -------------------------------
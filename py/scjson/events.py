@@ -10,8 +10,9 @@ Event primitives used by the runtime engine.
 
 from __future__ import annotations
 
+import threading
 from collections import deque
-from typing import Any, Deque, Optional
+from typing import Any, Callable, Deque, Dict, Optional, Set
 
 from pydantic import BaseModel
 
@@ -81,6 +82,200 @@ class EventQueue:
         self._q = new_queue
         return removed
 
+    def __len__(self) -> int:
+        """Return the number of queued events."""
+        return len(self._q)
+
     def __bool__(self) -> bool:
         """Return ``True`` if any events are queued."""
         return bool(self._q)
+
+
+#: Namespace of scjson extension attributes such as ``scjson:ingress``.
+SCJSON_NS = "https://github.com/SoftOboros/scjson"
+
+INGRESS_POLICIES = ("latest", "drop-oldest", "drop-newest", "block")
+
+
+class IngressPolicy:
+    """How :class:`IngressQueue` admits events of one name.
+
+    Parameters
+    ----------
+    kind : str
+        ``latest`` (a pending event takes the new payload instead of
+        queueing another), ``drop-oldest`` / ``drop-newest`` (keep at most
+        ``limit`` pending, discarding the oldest or the incoming one) or
+        ``block`` (producers wait while ``limit`` are pending).
+    limit : int
+        Maximum pending events of this name; ``latest`` always uses ``1``.
+    """
+
+    __slots__ = ("kind", "limit")
+
+    def __init__(self, kind: str, limit: int = 1) -> None:
+        if kind not in INGRESS_POLICIES:
+            raise ValueError(f"unknown ingress policy {kind!r}; expected one of {', '.join(INGRESS_POLICIES)}")
+        self.kind = kind
+        self.limit = 1 if kind == "latest" else max(1, int(limit))
+
+    def __repr__(self) -> str:
+        return f"IngressPolicy({self.kind!r}, {self.limit})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, IngressPolicy) and (self.kind, self.limit) == (other.kind, other.limit)
+
+
+def parse_ingress_policies(spec: str) -> Dict[str, IngressPolicy]:
+    """Parse ``"name=kind[:limit]; ..."`` into policies.
+
+    Example: ``"reading=latest; alarm=drop-oldest:100; cmd=block:16"``.
+
+    :raises ValueError: On malformed entries or unknown kinds.
+    """
+
+    policies: Dict[str, IngressPolicy] = {}
+    for item in spec.replace(",", ";").split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, rule = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"malformed ingress policy: {item!r}")
+        kind, _, limit = rule.strip().partition(":")
+        policies[name.strip()] = IngressPolicy(kind.strip(), int(limit) if limit.strip() else 1)
+    return policies
+
+
+class IngressQueue:
+    """Thread-safe FIFO in front of an :class:`EventQueue`.
+
+    Producers on any thread :meth:`put` events; the interpreter thread
+    :meth:`drain` s them. Events whose name has an :class:`IngressPolicy`
+    are coalesced, dropped or held back so a burst cannot grow the queue
+    without bound. Counters per event name record what the policies did.
+
+    Attributes
+    ----------
+    cond : threading.Condition
+        Guards the queue; notified on every put and drain.
+    policies : dict[str, IngressPolicy]
+        Policies by event name.
+    """
+
+    def __init__(self) -> None:
+        self.cond = threading.Condition()
+        self.policies: Dict[str, IngressPolicy] = {}
+        self._q: Deque[Event] = deque()
+        # Pending events per policy-governed name, oldest first
+        self._pending: Dict[str, Deque[Event]] = {}
+        # ids of queued events discarded by drop-oldest
+        self._skip: Set[int] = set()
+        self.coalesced: Dict[str, int] = {}
+        self.dropped: Dict[str, int] = {}
+        self.blocked: Dict[str, int] = {}
+
+    def put(self, evt: Event, timeout: Optional[float] = None) -> bool:
+        """Admit ``evt`` according to its name's policy.
+
+        :param evt: Event to queue.
+        :param timeout: For ``block`` policies, seconds to wait for room;
+            ``None`` waits indefinitely. The event is dropped on timeout.
+        :returns: ``True`` when queued or coalesced, ``False`` when dropped.
+        """
+
+        with self.cond:
+            policy = self.policies.get(evt.name)
+            if policy is not None:
+                admitted = self._admit(evt, policy, timeout)
+                if admitted is not True:
+                    return admitted is None
+            self._q.append(evt)
+            self.cond.notify_all()
+            return True
+
+    def _admit(self, evt: Event, policy: IngressPolicy, timeout: Optional[float]) -> Optional[bool]:
+        """Return ``True`` to queue ``evt``, ``None`` if merged, ``False`` if dropped."""
+
+        name = evt.name
+        pending = self._pending.setdefault(name, deque())
+        if len(pending) >= policy.limit:
+            kind = policy.kind
+            if kind == "latest":
+                # Latest value wins; the pending event keeps its place.
+                pending[0].data = evt.data
+                self.coalesced[name] = self.coalesced.get(name, 0) + 1
+                return None
+            if kind == "drop-newest":
+                self.dropped[name] = self.dropped.get(name, 0) + 1
+                return False
+            if kind == "drop-oldest":
+                self._skip.add(id(pending.popleft()))
+                self.dropped[name] = self.dropped.get(name, 0) + 1
+            else:  # block
+                self.blocked[name] = self.blocked.get(name, 0) + 1
+                if not self.cond.wait_for(lambda: len(pending) < policy.limit, timeout):
+                    self.dropped[name] = self.dropped.get(name, 0) + 1
+                    return False
+        pending.append(evt)
+        return True
+
+    def drain(self, push: Callable[[Event], None]) -> int:
+        """Hand every queued event to ``push`` in arrival order.
+
+        :returns: Number of events delivered.
+        """
+
+        delivered = 0
+        with self.cond:
+            while True:
+                evt = self._take()
+                if evt is None:
+                    break
+                push(evt)
+                delivered += 1
+            self.cond.notify_all()
+        return delivered
+
+    def pop(self) -> Optional[Event]:
+        """Remove and return the oldest queued event, or ``None``.
+
+        For consumers that take one event per macrostep.
+        """
+
+        with self.cond:
+            evt = self._take()
+            if evt is not None:
+                self.cond.notify_all()
+            return evt
+
+    def _take(self) -> Optional[Event]:
+        while self._q:
+            evt = self._q.popleft()
+            if self._skip and id(evt) in self._skip:
+                self._skip.discard(id(evt))
+                continue
+            pending = self._pending.get(evt.name)
+            if pending and pending[0] is evt:
+                pending.popleft()
+            return evt
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return ``pending`` plus ``coalesced``/``dropped``/``blocked`` counts by name."""
+
+        with self.cond:
+            return {
+                "pending": len(self._q) - len(self._skip),
+                "coalesced": dict(self.coalesced),
+                "dropped": dict(self.dropped),
+                "blocked": dict(self.blocked),
+            }
+
+    def __len__(self) -> int:
+        """Return the number of events waiting."""
+        return len(self._q) - len(self._skip)
+
+    def __bool__(self) -> bool:
+        """Return ``True`` if any events are waiting."""
+        return bool(self._q)
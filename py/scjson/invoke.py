@@ -14,7 +14,13 @@ engine can start/cancel invocations, support `<finalize>`, and emit
 
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, Optional
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
 from pathlib import Path
 
 from typing import TYPE_CHECKING
@@ -64,6 +70,46 @@ class InvokeHandler:
     def send(self, name: str, data: Any | None = None) -> None:  # noqa: D401
         """Send an event to the invocation (no-op by default)."""
 
+    def poll(self) -> int:
+        """Deliver results that completed asynchronously.
+
+        Handlers that run their work elsewhere (see
+        :mod:`scjson.process_invoke`) replay child events and completion from
+        here; the context calls it at the start of every microstep.
+
+        Returns
+        -------
+        int
+            Number of results delivered (``0`` by default).
+        """
+        return 0
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to ``timeout`` seconds for an asynchronous result.
+
+        Returns
+        -------
+        bool
+            ``True`` when something may be ready for :meth:`poll`
+            (``False`` by default).
+        """
+        return False
+
+    def on_ready(self, callback: Callable[[], None]) -> bool:
+        """Ask to be notified when :meth:`poll` may have a result.
+
+        Event-loop front ends (:mod:`scjson.async_context`) use this to sleep
+        until work completes instead of polling. ``callback`` may be called
+        from any thread.
+
+        Returns
+        -------
+        bool
+            ``True`` when the handler will call ``callback``; ``False``
+            (the default) means the caller has to poll.
+        """
+        return False
+
     def set_emitter(self, emitter: Callable[[Event], None]) -> None:
         """Install a parent-emitter callback used to bubble child events.
 
@@ -78,6 +124,14 @@ class InvokeHandler:
         """Advance mock time for the invocation (no-op by default)."""
         return
 
+    def next_timer(self) -> Optional[float]:
+        """Return seconds until the invocation's earliest pending timer.
+
+        Used by :meth:`DocumentContext.simulate` to jump the mock clock.
+        ``None`` (the default) means no timer is known to the caller.
+        """
+        return None
+
 
 class ImmediateDoneHandler(InvokeHandler):
     """A mock handler that completes immediately upon start.
@@ -95,12 +149,154 @@ class NoopHandler(InvokeHandler):
     pass
 
 
+def _process_handler(type_name: str, src: Any, payload: Any, on_done: Optional[OnDone] = None) -> InvokeHandler:
+    from .process_invoke import SCXMLProcessHandler
+
+    return SCXMLProcessHandler(type_name, src, payload, on_done)
+
+
+PYTHON_PREFIX = "python:"
+
+#: Callables available to every registry as ``python:<name>``.
+PYTHON_CALLABLES: Dict[str, Callable[..., Any]] = {}
+
+_EXECUTOR: Any = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def register_callable(name: str, func: Callable[..., Any]) -> None:
+    """Make ``func`` invocable from any chart as ``<invoke type="python:name">``.
+
+    Parameters
+    ----------
+    name : str
+        Name after the ``python:`` prefix.
+    func : Callable[..., Any]
+        Called on a worker thread with the invoke payload (``<param>``,
+        ``namelist`` and ``content``) as keyword arguments; its return
+        value becomes the ``done.invoke`` data.
+    """
+    PYTHON_CALLABLES[name] = func
+
+
+def python_invoke_executor() -> Any:
+    """Return the shared thread pool for ``python:`` invocations.
+
+    Created on first use with :class:`concurrent.futures.ThreadPoolExecutor`'s
+    default bound (``min(32, cpu_count + 4)`` threads).
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _EXECUTOR = ThreadPoolExecutor(thread_name_prefix="scjson-invoke")
+        return _EXECUTOR
+
+
+class PythonCallHandler(InvokeHandler):
+    """Runs a registered blocking callable on a thread pool.
+
+    The interpreter thread only submits the call. The outcome is picked up
+    by :meth:`poll`, which the context runs at the start of each microstep
+    (or while waiting in :meth:`DocumentContext.poll_invocations`). A return
+    value completes the invocation with ``done.invoke.<id>``. An exception
+    or an unknown name raises ``error.execution`` instead. Cancelling on
+    state exit discards the outcome; a call that is already running cannot
+    be interrupted and finishes in the background.
+    """
+
+    def __init__(
+        self,
+        type_name: str,
+        src: Any,
+        payload: Any,
+        on_done: Optional[OnDone] = None,
+        *,
+        func: Callable[..., Any] | None = None,
+        executor: Any = None,
+    ) -> None:
+        super().__init__(type_name, src, payload, on_done)
+        self.func = func
+        self.executor = executor
+        self.future: Any = None
+        self.finished = False
+
+    def start(self) -> None:  # noqa: D401
+        if self.func is None:
+            self.future = _failed(LookupError(f"no callable registered for {self.type_name}"))
+            return
+        kwargs = dict(self.payload) if isinstance(self.payload, dict) else {}
+        executor = self.executor or python_invoke_executor()
+        self.future = executor.submit(self.func, **kwargs)
+
+    def cancel(self) -> None:  # noqa: D401
+        super().cancel()
+        self.finished = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def stop(self) -> None:  # noqa: D401
+        self.finished = True
+
+    def poll(self) -> int:
+        """Deliver the call's outcome once it is available."""
+        future = self.future
+        if self.finished or future is None or not future.done():
+            return 0
+        self.finished = True
+        if future.cancelled():
+            return 0
+        error = future.exception()
+        if error is not None:
+            self._emit(
+                Event(
+                    name="error.execution",
+                    data={"error": f"{type(error).__name__}: {error}", "type": self.type_name},
+                    invokeid=getattr(self, 'invoke_id', None),
+                )
+            )
+        else:
+            self._on_done(future.result())
+        return 1
+
+    def on_ready(self, callback: Callable[[], None]) -> bool:
+        """Call ``callback`` from the worker thread when the call finishes."""
+        if self.future is None:
+            return False
+        self.future.add_done_callback(lambda _f: callback())
+        return True
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to ``timeout`` seconds for the call to finish."""
+        if self.finished or self.future is None:
+            return False
+        from concurrent.futures import wait as wait_futures
+
+        done, _ = wait_futures([self.future], timeout=timeout)
+        return bool(done)
+
+
+def _failed(error: BaseException) -> Any:
+    from concurrent.futures import Future
+
+    future: Any = Future()
+    future.set_exception(error)
+    return future
+
+
 class InvokeRegistry:
     """Simple factory registry for invocation handlers.
 
     The default registry understands two types:
     - ``mock:immediate`` – completes instantly on start and passes payload
       to the done callback.
+    - ``scxml-process`` – runs an SCXML/SCJSON child machine in a worker
+      process (:mod:`scjson.process_invoke`).
+    - ``python:<name>`` – calls the callable registered as ``<name>`` on a
+      thread pool (:class:`PythonCallHandler`). ``async def`` callables
+      run as tasks on the event loop of an
+      :class:`~scjson.async_context.AsyncDocumentContext` instead.
     - Any other type – returns a :class:`NoopHandler` (does nothing).
 
     Methods
@@ -108,25 +304,47 @@ class InvokeRegistry:
     register(type_name, factory)
         Register a factory callable that returns an :class:`InvokeHandler` for
         the given type.
+    register_callable(name, func)
+        Make ``func`` available as ``python:<name>`` for this registry only.
     create(type_name, src, payload, autostart, on_done)
         Create a handler for the given type. If ``autostart`` is true, callers
         should invoke ``start()`` after creation.
+
+    Attributes
+    ----------
+    executor : concurrent.futures.Executor | None
+        Executor for ``python:`` invocations; ``None`` uses the shared
+        bounded pool from :func:`python_invoke_executor`.
     """
 
     def __init__(self) -> None:
         self._factories: Dict[str, Callable[..., InvokeHandler]] = {}
+        self._callables: Dict[str, Callable[..., Any]] = {}
+        self.executor: Any = None
         # Built-in mocks
         self.register("mock:immediate", lambda type_name, src, payload, on_done=None: ImmediateDoneHandler(type_name, src, payload, on_done))
         self.register("mock:record", lambda type_name, src, payload, on_done=None: RecordHandler(type_name, src, payload, on_done))
         # SCXML/SCJSON child-machine handler
         self.register("scxml", lambda type_name, src, payload, on_done=None: SCXMLChildHandler(type_name, src, payload, on_done))
         self.register("scjson", lambda type_name, src, payload, on_done=None: SCXMLChildHandler(type_name, src, payload, on_done))
+        # Child machine hosted in a worker process (imported on first use)
+        self.register("scxml-process", _process_handler)
         # Deferred mock that completes on a specific event
         self.register("mock:deferred", lambda type_name, src, payload, on_done=None: DeferredHandler(type_name, src, payload, on_done))
 
     def register(self, type_name: str, factory: Callable[..., InvokeHandler]) -> None:
         self._factories[type_name] = factory
 
+    def register_callable(self, name: str, func: Callable[..., Any]) -> None:
+        self._callables[name] = func
+
+    def resolve_callable(self, name: str) -> Callable[..., Any] | None:
+        """Return the ``python:`` callable for ``name``, registry first."""
+        func = self._callables.get(name)
+        if func is None:
+            func = PYTHON_CALLABLES.get(name)
+        return func
+
     def create(
         self,
         type_name: str,
@@ -140,6 +358,21 @@ class InvokeRegistry:
         handler: InvokeHandler
         if factory is not None:
             handler = factory(type_name, src, payload, on_done)
+        elif type_name.startswith(PYTHON_PREFIX):
+            name = type_name[len(PYTHON_PREFIX):]
+            func = self.resolve_callable(name)
+            if inspect.iscoroutinefunction(func):
+                from .async_context import AsyncCallHandler
+
+                return AsyncCallHandler(type_name, src, payload, on_done, func=func)
+            handler = PythonCallHandler(
+                type_name,
+                src,
+                payload,
+                on_done,
+                func=func,
+                executor=self.executor,
+            )
         else:
             handler = NoopHandler(type_name, src, payload, on_done)
         return handler
@@ -165,6 +398,164 @@ class RecordHandler(InvokeHandler):
         self.received.append((name, data))
 
 
+class PreparedChart:
+    """A validated child chart that can be instantiated repeatedly.
+
+    Holds the ``Scxml`` model, the prepared raw data and, once the first
+    context has been built, the lookup/order index shared by every context
+    created from it. None of these are mutated at runtime; each context
+    still gets its own activations and freshly evaluated datamodel.
+    """
+
+    def __init__(self, doc: Any, data: Any, source_xml: str | None, base_dir: Path | None) -> None:
+        self.doc = doc
+        self.data = data
+        self.source_xml = source_xml
+        self.base_dir = base_dir
+        self.index: Tuple[Dict[int, Any], Dict[int, Any]] | None = None
+
+    def instantiate(self, *, trusted: bool = False, defer_initial: bool = True) -> 'DocumentContext':
+        """Return a new context, by default with deferred initial entry."""
+        from .context import DocumentContext, ExecutionMode  # local to avoid import cycle
+
+        if self.index is None:
+            self.index = DocumentContext._build_index(self.doc, self.data, self.source_xml, trusted)
+        return DocumentContext._from_model(
+            self.doc,
+            self.data,
+            allow_unsafe_eval=False,
+            evaluator=None,
+            execution_mode=ExecutionMode.LAX,
+            source_xml=self.source_xml,
+            base_dir=self.base_dir,
+            defer_initial=defer_initial,
+            trusted=trusted,
+            index=self.index,
+        )
+
+
+class ChildChartCache:
+    """LRU cache of :class:`PreparedChart` objects for ``<invoke>`` children.
+
+    Files are keyed by resolved path and revalidated against their
+    modification time and size; inline content is keyed by a SHA-256 of
+    its text (SCXML) or canonical JSON (SCJSON node). Loads that raise are
+    not cached.
+
+    Parameters
+    ----------
+    max_entries : int
+        Number of prepared charts kept; ``0`` disables caching.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[Any, PreparedChart]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load_file(self, path: str | Path) -> PreparedChart:
+        """Return the prepared chart for an ``.scxml`` or ``.scjson`` file."""
+        resolved = Path(path).resolve()
+        st = os.stat(resolved)
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        def build() -> PreparedChart:
+            text = resolved.read_text(encoding="utf-8")
+            if resolved.suffix.lower() == ".scxml":
+                return self._prepare(json.loads(self._xml_to_json(text)), text, resolved.parent)
+            return self._prepare(json.loads(text), None, resolved.parent)
+
+        return self._get(("file", str(resolved)), stamp, build)
+
+    def load_xml(self, xml_text: str) -> PreparedChart:
+        """Return the prepared chart for inline SCXML text."""
+        digest = hashlib.sha256(xml_text.encode("utf-8")).hexdigest()
+        return self._get(
+            ("xml", digest),
+            None,
+            lambda: self._prepare(json.loads(self._xml_to_json(xml_text)), xml_text, None),
+        )
+
+    def load_node(self, node: Dict[str, Any]) -> PreparedChart:
+        """Return the prepared chart for an inline SCJSON-like mapping."""
+        text = json.dumps(node, sort_keys=True, default=str)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        def build() -> PreparedChart:
+            from .pydantic import Scxml  # local import to avoid cycles
+
+            doc = Scxml.model_validate(node)
+            return PreparedChart(doc, doc.model_dump(mode="python"), None, None)
+
+        return self._get(("node", digest), None, build)
+
+    def stats(self) -> Dict[str, int]:
+        """Return ``hits``, ``misses``, ``evictions``, ``entries`` and ``max_entries``."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def _get(self, key: Tuple[str, str], stamp: Any, build: Callable[[], PreparedChart]) -> PreparedChart:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Build outside the lock; concurrent misses on one key build twice
+        # and the last one wins, which is harmless.
+        prepared = build()
+        if self.max_entries <= 0:
+            return prepared
+        with self._lock:
+            self._entries[key] = (stamp, prepared)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return prepared
+
+    @staticmethod
+    def _xml_to_json(xml_text: str) -> str:
+        # A handler per miss: its parser keeps per-document state, and the
+        # schema context behind it is shared anyway.
+        from .SCXMLDocumentHandler import SCXMLDocumentHandler
+
+        return SCXMLDocumentHandler(fail_on_unknown_properties=False).xml_to_json(xml_text)
+
+    @staticmethod
+    def _prepare(raw: Any, source_xml: str | None, base_dir: Path | None) -> PreparedChart:
+        from .context import DocumentContext  # local to avoid import cycle
+        from .pydantic import Scxml
+
+        data = DocumentContext._prepare_raw_data(raw)
+        return PreparedChart(Scxml.model_validate(data), data, source_xml, base_dir)
+
+
+#: Process-wide cache used by :class:`SCXMLChildHandler`.
+CHILD_CHART_CACHE = ChildChartCache()
+
+
+def child_chart_cache_stats() -> Dict[str, int]:
+    """Return statistics for the shared child chart cache."""
+    return CHILD_CHART_CACHE.stats()
+
+
 class SCXMLChildHandler(InvokeHandler):
     """Runs a nested SCXML/SCJSON machine using the Python engine.
 
@@ -179,49 +570,13 @@ class SCXMLChildHandler(InvokeHandler):
     def start(self) -> None:  # noqa: D401
         # Prefer explicit src path
         path = self.src
+        # Set by the parent context; trusted parents load children the same way
+        trusted = bool(getattr(self, 'trusted', False))
         try:
             if isinstance(path, (str, Path)):
-                p = Path(str(path))
-                from .context import DocumentContext, ExecutionMode  # local to avoid import cycle
-                if p.suffix.lower() == ".scxml":
-                    # Build child context with deferred initial entry to allow
-                    # the invoker to pump and bubble child's initial outputs.
-                    from .SCXMLDocumentHandler import SCXMLDocumentHandler
-                    from .pydantic import Scxml
-                    import json as _json
-                    xml_text = p.read_text(encoding="utf-8")
-                    handler = SCXMLDocumentHandler(fail_on_unknown_properties=False)
-                    json_str = handler.xml_to_json(xml_text)
-                    data = DocumentContext._prepare_raw_data(_json.loads(json_str))
-                    doc = Scxml.model_validate(data)
-                    self.child = DocumentContext._from_model(
-                        doc,
-                        data,
-                        allow_unsafe_eval=False,
-                        evaluator=None,
-                        execution_mode=ExecutionMode.LAX,
-                        source_xml=xml_text,
-                        base_dir=p.resolve().parent,
-                        defer_initial=True,
-                    )
-                else:
-                    # JSON input path
-                    from .pydantic import Scxml
-                    import json as _json
-                    from .context import DocumentContext, ExecutionMode
-                    text = p.read_text(encoding="utf-8")
-                    data = DocumentContext._prepare_raw_data(_json.loads(text))
-                    doc = Scxml.model_validate(data)
-                    self.child = DocumentContext._from_model(
-                        doc,
-                        data,
-                        allow_unsafe_eval=False,
-                        evaluator=None,
-                        execution_mode=ExecutionMode.LAX,
-                        source_xml=None,
-                        base_dir=p.resolve().parent,
-                        defer_initial=True,
-                    )
+                # Child context uses deferred initial entry so the invoker can
+                # pump and bubble the child's initial outputs.
+                self.child = CHILD_CHART_CACHE.load_file(path).instantiate(trusted=trusted)
             else:
                 # Attempt inline content if provided in payload
                 ctx = self._context_from_payload_content(self.payload)
@@ -230,24 +585,7 @@ class SCXMLChildHandler(InvokeHandler):
                 else:
                     xml_str = self._xml_from_payload_content(self.payload)
                     if xml_str:
-                        from .context import DocumentContext, ExecutionMode  # local to avoid import cycle
-                        from .SCXMLDocumentHandler import SCXMLDocumentHandler
-                        from .pydantic import Scxml
-                        import json as _json
-                        handler = SCXMLDocumentHandler(fail_on_unknown_properties=False)
-                        json_str = handler.xml_to_json(xml_str)
-                        data = DocumentContext._prepare_raw_data(_json.loads(json_str))
-                        doc = Scxml.model_validate(data)
-                        self.child = DocumentContext._from_model(
-                            doc,
-                            data,
-                            allow_unsafe_eval=False,
-                            evaluator=None,
-                            execution_mode=ExecutionMode.LAX,
-                            source_xml=xml_str,
-                            base_dir=None,
-                            defer_initial=True,
-                        )
+                        self.child = CHILD_CHART_CACHE.load_xml(xml_str).instantiate(trusted=trusted)
         except Exception:
             self.child = None
             return
@@ -384,6 +722,31 @@ class SCXMLChildHandler(InvokeHandler):
         except Exception:
             pass
 
+    def poll(self) -> int:
+        """Release the child's due wall-clock timers and bubble them.
+
+        On the mock clock timers move with :meth:`advance_time` instead.
+        """
+        child = self.child
+        if not child or not child.delayed_events or not child._use_wall_clock:
+            return 0
+        try:
+            child._release_delayed_events()
+        except Exception:
+            return 0
+        released = len(child.events)
+        if released:
+            self._pump()
+        return released
+
+    def next_timer(self) -> Optional[float]:  # noqa: D401
+        if not self.child:
+            return None
+        try:
+            return self.child.next_timer()
+        except Exception:
+            return None
+
     def _run_child_final_onexit(self) -> bool:
         if not self.child:
             return
@@ -509,6 +872,7 @@ class SCXMLChildHandler(InvokeHandler):
         return None
 
     def _context_from_payload_content(self, payload: Any):
+        trusted = bool(getattr(self, 'trusted', False))
         try:
             content = None
             if isinstance(payload, dict):
@@ -540,20 +904,7 @@ class SCXMLChildHandler(InvokeHandler):
                             return [normalize(i) for i in n]
                         return n
                     norm = normalize(node)
-                    from .pydantic import Scxml  # local import to avoid cycles
-                    from .context import DocumentContext, ExecutionMode  # local import
-                    doc = Scxml.model_validate(norm)
-                    raw = doc.model_dump(mode="python")
-                    return DocumentContext._from_model(
-                        doc,
-                        raw,
-                        allow_unsafe_eval=False,
-                        evaluator=None,
-                        execution_mode=ExecutionMode.LAX,
-                        source_xml=None,
-                        base_dir=None,
-                        defer_initial=True,
-                    )
+                    return CHILD_CHART_CACHE.load_node(norm).instantiate(trusted=trusted)
         except Exception:
             return None
         return None
@@ -0,0 +1,945 @@
+"""
+Agent Name: python-lockstep
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Experimental lockstep interpreter for many instances of one chart.
+
+:class:`LockstepBatch` runs ``N`` independent sessions of a chart side by
+side using NumPy arrays instead of ``N`` :class:`DocumentContext` objects:
+
+- the configuration and the sticky ``<final>`` markers are ``N x S`` boolean
+  matrices (one column per state, in ``activation_order``);
+- every top-level datamodel variable is a column, typed ``bool``, ``int64``
+  or ``float64`` while all instances hold that Python type, and ``object``
+  otherwise;
+- each instance's event queue is a row of a ring buffer of interned event
+  ids.
+
+Each microstep pops the head event of every instance with queued work,
+selects transitions for all of them at once (event matching per distinct
+event, guards evaluated column-wise) and groups the instances by
+configuration and chosen transition. The structural effect of a transition
+(exit/entry order, executable content, ``done.state`` events) is recorded
+once per group key by running the engine's own ``_fire_transition`` on a
+template context with actions captured instead of executed, so ordering
+always matches :class:`DocumentContext`. The captured actions then run over
+the whole group: ``<assign>``, ``<if>`` conditions and guards built from
+numbers, datamodel names, arithmetic, comparisons, ``and``/``or``/``not``,
+``In('id')`` and ``_event.name`` are vectorised. Anything else, including
+any expression that might raise (such as division by zero), is evaluated
+per instance with the engine's evaluator and error handling.
+
+Supported charts have no ``<invoke>``, ``<script>``, ``<send>``,
+``<cancel>``, ``<foreach>``, ``<history>``, ``<donedata>`` or state-level
+``<datamodel>``; other charts are rejected with :class:`ValueError`.
+Integer columns are ``int64``; integer arithmetic that could leave that
+range, or int/float mixes that float64 cannot represent exactly, runs per
+instance so results keep Python's unbounded integers (the column becomes
+``object``).
+"""
+
+from __future__ import annotations
+
+import ast
+import copy
+import operator
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover - depends on the environment
+    raise ImportError("scjson.lockstep requires NumPy (pip install 'scjson[sim]')") from exc
+
+from pydantic import PrivateAttr
+
+from .activation import ActivationStatus
+from .context import DocumentContext, _transition_matches
+from .events import Event, EventQueue
+from .pydantic import History, ScxmlFinalType
+
+__all__ = ["LockstepBatch", "SUPPORTED_ACTIONS"]
+
+#: Executable content the lockstep engine can run.
+SUPPORTED_ACTIONS = ("assign", "raise", "log", "if")
+
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+# Integer results at or beyond this magnitude go to the per-instance path,
+# which keeps Python's unbounded integers.
+_INT64_SAFE = 2**62
+# Integers above this magnitude do not convert to float64 exactly.
+_FLOAT_EXACT = 2**53
+
+_BINOPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+_CHECKED_BINOPS = (ast.Div, ast.FloorDiv, ast.Mod)
+_CMPOPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+
+# --------------------------------------------------------------------------- #
+# Column-wise expression compiler
+# --------------------------------------------------------------------------- #
+
+
+class _Fallback(Exception):
+    """The expression cannot be evaluated column-wise for these rows."""
+
+
+class _Frame:
+    """Evaluation scope for one group of rows."""
+
+    __slots__ = ("batch", "rows", "event", "conf_ids", "_vars")
+
+    def __init__(
+        self,
+        batch: "LockstepBatch",
+        rows: np.ndarray,
+        event: Optional[str],
+        conf_ids: Optional[FrozenSet[str]] = None,
+    ) -> None:
+        self.batch = batch
+        self.rows = rows
+        self.event = event
+        # Configuration shared by all rows (while running a transition's
+        # actions); ``None`` reads each row's configuration instead.
+        self.conf_ids = conf_ids
+        self._vars: Dict[str, np.ndarray] = {}
+
+    def var(self, name: str) -> np.ndarray:
+        values = self._vars.get(name)
+        if values is None:
+            column = self.batch._columns.get(name)
+            if column is None or column.dtype.kind == "O":
+                raise _Fallback(name)
+            values = self._vars[name] = column[self.rows]
+        return values
+
+    def in_state(self, state_id: str) -> Any:
+        if self.conf_ids is not None:
+            return state_id in self.conf_ids
+        bit = self.batch._bits.get(state_id)
+        if bit is None:
+            return False
+        return self.batch._conf[self.rows, bit]
+
+    def event_name(self) -> str:
+        if self.event is None:
+            raise _Fallback("_event")
+        return self.event
+
+
+def _numeric(value: Any) -> Any:
+    """Return ``value`` ready for Python-compatible arithmetic."""
+
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "b":
+            return value.astype(np.int64)
+        if value.dtype.kind in "if":
+            return value
+        raise _Fallback("non-numeric column")
+    if isinstance(value, (bool, int, float)):
+        return value
+    raise _Fallback("non-numeric value")
+
+
+def _comparable(value: Any) -> Any:
+    if isinstance(value, np.ndarray) and value.dtype.kind not in "bif":
+        raise _Fallback("non-numeric column")
+    return value
+
+
+def _is_int(value: Any) -> bool:
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind == "i"
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_float_mix(a: Any, b: Any) -> None:
+    """Reject int/float mixes that NumPy would round differently from Python."""
+
+    for value in (a, b):
+        if _is_int(value) and np.any(np.abs(value) > _FLOAT_EXACT):
+            raise _Fallback("inexact int to float")
+
+
+def _check_int_result(op: Callable[[Any, Any], Any], a: Any, b: Any, result: Any) -> None:
+    """Reject int64 results that may have wrapped around."""
+
+    if not (isinstance(result, np.ndarray) and result.dtype.kind == "i"):
+        return
+    wide = op(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+    if np.any(np.abs(wide) >= _INT64_SAFE):
+        raise _Fallback("int64 overflow")
+
+
+def _is_bool(value: Any) -> bool:
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind == "b"
+    return isinstance(value, bool)
+
+
+def _compile_node(node: ast.AST) -> Callable[[_Frame], Any]:
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, (bool, int, float, str)):
+            return lambda frame: value
+        raise _Fallback("constant")
+    if isinstance(node, ast.Name):
+        name = node.id
+        return lambda frame: frame.var(name)
+    if (
+        isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and node.value.id == "_event"
+        and node.attr == "name"
+    ):
+        return lambda frame: frame.event_name()
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_node(node.operand)
+        if isinstance(node.op, ast.Not):
+
+            def negate(frame: _Frame) -> Any:
+                value = _comparable(operand(frame))
+                return np.logical_not(value) if isinstance(value, np.ndarray) else not value
+
+            return negate
+        if isinstance(node.op, ast.USub):
+
+            def negative(frame: _Frame) -> Any:
+                value = _numeric(operand(frame))
+                if _is_int(value) and np.any(value == _INT64_MIN):
+                    raise _Fallback("int64 overflow")
+                return -value
+
+            return negative
+        if isinstance(node.op, ast.UAdd):
+            return lambda frame: +_numeric(operand(frame))
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+        op = _BINOPS[type(node.op)]
+        left, right = _compile_node(node.left), _compile_node(node.right)
+        checked = isinstance(node.op, _CHECKED_BINOPS)
+        true_div = isinstance(node.op, ast.Div)
+
+        def binop(frame: _Frame) -> Any:
+            a, b = _numeric(left(frame)), _numeric(right(frame))
+            if checked and np.any(b == 0):
+                # Python raises here; let the engine produce error.execution.
+                raise _Fallback("division by zero")
+            if true_div or not (_is_int(a) and _is_int(b)):
+                _check_float_mix(a, b)
+            result = op(a, b)
+            _check_int_result(op, a, b, result)
+            return result
+
+        return binop
+    if isinstance(node, ast.Compare):
+        operands = [_compile_node(node.left)] + [_compile_node(c) for c in node.comparators]
+        ops = []
+        for cmp in node.ops:
+            if type(cmp) not in _CMPOPS:
+                raise _Fallback("comparison")
+            ops.append(_CMPOPS[type(cmp)])
+
+        def compare(frame: _Frame) -> Any:
+            values = [_comparable(fn(frame)) for fn in operands]
+            result: Any = True
+            for op, a, b in zip(ops, values, values[1:]):
+                if isinstance(a, str) != isinstance(b, str) and (
+                    isinstance(a, np.ndarray) or isinstance(b, np.ndarray)
+                ):
+                    raise _Fallback("string comparison")
+                if _is_int(a) != _is_int(b):
+                    _check_float_mix(a, b)
+                result = result & op(a, b)
+            return result
+
+        return compare
+    if isinstance(node, ast.BoolOp):
+        operands = [_compile_node(v) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+        def boolop(frame: _Frame) -> Any:
+            values = [fn(frame) for fn in operands]
+            # ``and``/``or`` return operands, so only all-bool inputs are safe.
+            if not all(_is_bool(v) for v in values):
+                raise _Fallback("non-bool operand")
+            result = values[0]
+            for value in values[1:]:
+                result = combine(result, value)
+            return result
+
+        return boolop
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id == "In"
+        and len(node.args) == 1
+        and not node.keywords
+        and isinstance(node.args[0], ast.Constant)
+        and isinstance(node.args[0].value, str)
+    ):
+        state_id = node.args[0].value
+        return lambda frame: frame.in_state(state_id)
+    raise _Fallback(type(node).__name__)
+
+
+def _compile(expr: str) -> Optional[Callable[[_Frame], Any]]:
+    """Return a column-wise evaluator for ``expr`` or ``None``."""
+
+    try:
+        return _compile_node(ast.parse(expr.strip(), mode="eval").body)
+    except (SyntaxError, _Fallback):
+        return None
+
+
+def _kind(value: Any) -> str:
+    """Return the column kind that holds ``value`` without changing its type."""
+
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind if value.dtype.kind in "bif" else "O"
+    if isinstance(value, bool):
+        return "b"
+    if isinstance(value, int):
+        return "i" if _INT64_MIN <= value <= _INT64_MAX else "O"
+    if isinstance(value, float):
+        return "f"
+    return "O"
+
+
+_DTYPES = {"b": np.bool_, "i": np.int64, "f": np.float64}
+
+
+def _pack(values: Sequence[Any]) -> np.ndarray:
+    """Return per-row ``values`` as a typed array when they share one kind."""
+
+    kinds = {_kind(value) for value in values}
+    if len(kinds) == 1 and "O" not in kinds:
+        return np.array(values, dtype=_DTYPES[kinds.pop()])
+    packed = np.empty(len(values), dtype=object)
+    for n, value in enumerate(values):
+        packed[n] = value
+    return packed
+
+
+# --------------------------------------------------------------------------- #
+# Template context used to record transition plans
+# --------------------------------------------------------------------------- #
+
+
+class _RecordingQueue(EventQueue):
+    """Queue that records pushes as plan operations."""
+
+    def __init__(self, ops: List[Tuple[Any, ...]]) -> None:
+        super().__init__()
+        self._ops = ops
+
+    def push(self, evt: Event) -> None:
+        self._ops.append(("push", evt.name, False))
+
+    def push_front(self, evt: Event) -> None:
+        self._ops.append(("push", evt.name, True))
+
+
+class _Template(DocumentContext):
+    """Document context that can record actions instead of running them."""
+
+    _ops: Optional[List[Tuple[Any, ...]]] = PrivateAttr(default=None)
+
+    def _dispatch_action(self, kind: str, payload: Any, act: Any) -> None:
+        ops = self._ops
+        if ops is None:
+            super()._dispatch_action(kind, payload, act)
+            return
+        ops.append(("act", kind, payload, frozenset(self.configuration)))
+
+
+class _Plan:
+    """Recorded effect of one transition from one configuration."""
+
+    __slots__ = ("conf", "status", "ops")
+
+    def __init__(self, conf: np.ndarray, status: np.ndarray, ops: List[Tuple[Any, ...]]) -> None:
+        self.conf = conf
+        self.status = status
+        self.ops = ops
+
+
+# --------------------------------------------------------------------------- #
+# Batch interpreter
+# --------------------------------------------------------------------------- #
+
+
+class LockstepBatch:
+    """Run ``size`` instances of one chart in lockstep (experimental).
+
+    Build one with :meth:`from_xml_string`, :meth:`from_xml_file` or
+    :meth:`from_json_file`. After every :meth:`run`, each instance's
+    configuration, datamodel and (with ``record_logs``) action log equal
+    those of a :class:`DocumentContext` that received the same events.
+
+    Parameters
+    ----------
+    template: DocumentContext
+        Freshly loaded context built with the internal template class; its
+        state after initial entry is copied to every instance.
+    size: int
+        Number of instances.
+    record_logs: bool
+        Keep per-instance ``<log>`` output (costs a per-instance evaluation
+        for every log action).
+    """
+
+    def __init__(self, template: _Template, size: int, *, record_logs: bool = False) -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        _check_subset(template)
+        self._template = template
+        self.size = int(size)
+        self._table = template.transition_table()
+        self._ids: List[str] = sorted(template.activation_order, key=template.activation_order.__getitem__)
+        self._bits: Dict[str, int] = {sid: n for n, sid in enumerate(self._ids)}
+        self._src_bit = [self._bits[source] for source, _ in self._table]
+        self._top_finals = [
+            self._bits[child.id]
+            for child in template.root_activation.children
+            if isinstance(child.node, ScxmlFinalType)
+        ]
+        self._candidates: Dict[Optional[str], List[int]] = {}
+        self._compiled: Dict[str, Optional[Callable[[_Frame], Any]]] = {}
+        self._branches: Dict[int, List[Dict[str, Any]]] = {}
+        self._plans: Dict[bytes, _Plan] = {}
+        self.vectorized = 0
+        self.fallbacks = 0
+
+        n, width = self.size, len(self._ids)
+        self._conf = np.zeros((n, width), dtype=bool)
+        self._conf[:, [self._bits[s] for s in template.configuration]] = True
+        self._status = np.zeros((n, width), dtype=bool)
+        finals = [self._bits[a.id] for a in template.activations.values() if a.status is ActivationStatus.FINAL]
+        self._status[:, finals] = True
+
+        self._columns: Dict[str, np.ndarray] = {}
+        for name, value in template.data_model.items():
+            kind = _kind(value)
+            if kind == "O":
+                column = np.empty(n, dtype=object)
+                for row in range(n):
+                    column[row] = copy.deepcopy(value)
+            else:
+                column = np.full(n, value, dtype=_DTYPES[kind])
+            self._columns[name] = column
+
+        self._event_ids: Dict[str, int] = {}
+        self._event_names: List[str] = []
+        capacity = 8
+        self._qbuf = np.zeros((n, capacity), dtype=np.int32)
+        self._qdata = np.full((n, capacity), None, dtype=object)
+        self._qhead = np.zeros(n, dtype=np.int64)
+        self._qlen = np.zeros(n, dtype=np.int64)
+        everyone = np.arange(n)
+        for evt in template.events._q:
+            self._push(everyone, self._intern(evt.name), data=self._broadcast(evt.data))
+
+        self._logs: Optional[List[List[str]]] = None
+        if record_logs:
+            self._logs = [list(template.action_log) for _ in range(n)]
+
+    # ------------------------------------------------------------------ #
+    # Construction
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def from_xml_string(cls, xml: str, size: int, *, record_logs: bool = False, **kwargs: Any) -> "LockstepBatch":
+        """Load SCXML text; ``kwargs`` go to :meth:`DocumentContext.from_xml_string`."""
+
+        return cls(_Template.from_xml_string(xml, **kwargs), size, record_logs=record_logs)
+
+    @classmethod
+    def from_xml_file(cls, path: str | Path, size: int, *, record_logs: bool = False, **kwargs: Any) -> "LockstepBatch":
+        """Load an SCXML file; ``kwargs`` go to :meth:`DocumentContext.from_xml_file`."""
+
+        return cls(_Template.from_xml_file(path, **kwargs), size, record_logs=record_logs)
+
+    @classmethod
+    def from_json_file(cls, path: str | Path, size: int, *, record_logs: bool = False, **kwargs: Any) -> "LockstepBatch":
+        """Load an SCJSON file; ``kwargs`` go to :meth:`DocumentContext.from_json_file`."""
+
+        return cls(_Template.from_json_file(path, **kwargs), size, record_logs=record_logs)
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def enqueue(self, evt_name: str, data: Any | None = None) -> None:
+        """Queue the same external event for every instance."""
+
+        self._push(np.arange(self.size), self._intern(evt_name), data=self._broadcast(data))
+
+    def enqueue_each(self, evt_name: str, payloads: Sequence[Any]) -> None:
+        """Queue ``evt_name`` with one payload per instance."""
+
+        if len(payloads) != self.size:
+            raise ValueError(f"expected {self.size} payloads, got {len(payloads)}")
+        data = np.empty(self.size, dtype=object)
+        for row, payload in enumerate(payloads):
+            data[row] = payload
+        self._push(np.arange(self.size), self._intern(evt_name), data=data)
+
+    def run(self, max_rounds: int | None = None) -> int:
+        """Run microsteps until every queue is empty.
+
+        :param max_rounds: Optional limit on lockstep microsteps.
+        :returns: Number of microstep rounds executed.
+        """
+
+        rounds = 0
+        while max_rounds is None or rounds < max_rounds:
+            rows = np.flatnonzero(self._qlen)
+            if not len(rows):
+                break
+            self._microstep(rows)
+            rounds += 1
+        return rounds
+
+    def configuration(self, index: int) -> Set[str]:
+        """Return the active state ids of instance ``index``."""
+
+        return {self._ids[bit] for bit in np.flatnonzero(self._conf[index])}
+
+    def data(self, index: int) -> Dict[str, Any]:
+        """Return the datamodel of instance ``index``."""
+
+        return {name: self._value(name, index) for name in self._columns}
+
+    def column(self, name: str) -> np.ndarray:
+        """Return the values of datamodel variable ``name`` for all instances."""
+
+        return self._columns[name]
+
+    def action_log(self, index: int) -> List[str]:
+        """Return the ``<log>`` entries of instance ``index`` (``record_logs`` only)."""
+
+        if self._logs is None:
+            raise RuntimeError("logs are only kept with record_logs=True")
+        return list(self._logs[index])
+
+    @property
+    def done(self) -> np.ndarray:
+        """Boolean array: instances that reached a top-level ``<final>``."""
+
+        if not self._top_finals:
+            return np.zeros(self.size, dtype=bool)
+        return self._conf[:, self._top_finals].any(axis=1)
+
+    def occupancy(self) -> Dict[str, int]:
+        """Return how many instances have each state active."""
+
+        counts = self._conf.sum(axis=0)
+        return {sid: int(counts[bit]) for bit, sid in enumerate(self._ids)}
+
+    def stats(self) -> Dict[str, int]:
+        """Return ``plans`` recorded, ``vectorized`` evaluations and per-row ``fallbacks``."""
+
+        return {"plans": len(self._plans), "vectorized": self.vectorized, "fallbacks": self.fallbacks}
+
+    # ------------------------------------------------------------------ #
+    # Event queues
+    # ------------------------------------------------------------------ #
+
+    def _intern(self, name: str) -> int:
+        eid = self._event_ids.get(name)
+        if eid is None:
+            eid = self._event_ids[name] = len(self._event_names)
+            self._event_names.append(name)
+        return eid
+
+    def _broadcast(self, data: Any) -> Optional[np.ndarray]:
+        if data is None:
+            return None
+        # Fill element-wise so NumPy does not unpack list payloads.
+        payloads = np.empty(self.size, dtype=object)
+        for row in range(self.size):
+            payloads[row] = data
+        return payloads
+
+    def _reserve(self, rows: np.ndarray) -> None:
+        capacity = self._qbuf.shape[1]
+        if not len(rows) or self._qlen[rows].max() < capacity:
+            return
+        order = (self._qhead[:, None] + np.arange(capacity)) % capacity
+        everyone = np.arange(self.size)[:, None]
+        qbuf = np.zeros((self.size, capacity * 2), dtype=np.int32)
+        qdata = np.full((self.size, capacity * 2), None, dtype=object)
+        qbuf[:, :capacity] = self._qbuf[everyone, order]
+        qdata[:, :capacity] = self._qdata[everyone, order]
+        self._qbuf, self._qdata = qbuf, qdata
+        self._qhead[:] = 0
+
+    def _push(self, rows: np.ndarray, eid: int, *, front: bool = False, data: Optional[np.ndarray] = None) -> None:
+        self._reserve(rows)
+        capacity = self._qbuf.shape[1]
+        if front:
+            pos = (self._qhead[rows] - 1) % capacity
+            self._qhead[rows] = pos
+        else:
+            pos = (self._qhead[rows] + self._qlen[rows]) % capacity
+        self._qbuf[rows, pos] = eid
+        if data is not None:
+            self._qdata[rows, pos] = data
+        self._qlen[rows] += 1
+
+    def _pop(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        head = self._qhead[rows]
+        eids = self._qbuf[rows, head]
+        data = self._qdata[rows, head]
+        self._qdata[rows, head] = None
+        self._qhead[rows] = (head + 1) % self._qbuf.shape[1]
+        self._qlen[rows] -= 1
+        return eids, data
+
+    def _emit_error(self, rows: np.ndarray, front: bool = True, alias_front: bool = False) -> None:
+        """Mirror :meth:`DocumentContext._emit_error` for ``error.execution``."""
+
+        self._push(rows, self._intern("error.execution"), front=front)
+        self._push(rows, self._intern("error"), front=alias_front)
+
+    # ------------------------------------------------------------------ #
+    # Microsteps
+    # ------------------------------------------------------------------ #
+
+    def _microstep(self, rows: np.ndarray) -> None:
+        eids, data = self._pop(rows)
+        for eid in np.unique(eids):
+            mask = eids == eid
+            name = self._event_names[eid]
+            self._take(rows[mask], name, data[mask])
+        active = rows
+        while len(active):
+            active = self._take(active, None, None)
+
+    def _take(self, rows: np.ndarray, event: Optional[str], data: Optional[np.ndarray]) -> np.ndarray:
+        """Select and fire one transition per row; return the rows that fired."""
+
+        chosen = self._select(rows, event, data)
+        fired = chosen >= 0
+        if not fired.any():
+            return rows[:0]
+        rows, chosen = rows[fired], chosen[fired]
+        if data is not None:
+            data = data[fired]
+        keys = np.concatenate(
+            [
+                np.packbits(self._conf[rows], axis=1),
+                np.packbits(self._status[rows], axis=1),
+                chosen.astype(">i4").view(np.uint8).reshape(-1, 4),
+            ],
+            axis=1,
+        )
+        uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse))[:-1]
+        for key, group in zip(uniq, np.split(order, bounds)):
+            plan = self._plan(key.tobytes(), rows[group[0]], int(chosen[group[0]]))
+            members = rows[group]
+            self._apply(plan, members, event, None if data is None else data[group])
+        return rows
+
+    def _select(self, rows: np.ndarray, event: Optional[str], data: Optional[np.ndarray]) -> np.ndarray:
+        """Mirror :meth:`DocumentContext._select_transition` for many rows."""
+
+        chosen = np.full(len(rows), -1, dtype=np.int64)
+        undecided = np.ones(len(rows), dtype=bool)
+        for tid in self._candidates_for(event):
+            active = undecided & self._conf[rows, self._src_bit[tid]]
+            if not active.any():
+                continue
+            cond = self._table[tid][1].cond
+            if cond is None:
+                hit = active
+            else:
+                idx = np.flatnonzero(active)
+                ok = self._condition(cond, rows[idx], event, None if data is None else data[idx])
+                hit = np.zeros(len(rows), dtype=bool)
+                hit[idx[ok]] = True
+            chosen[hit] = tid
+            undecided &= ~hit
+            if not undecided.any():
+                break
+        return chosen
+
+    def _candidates_for(self, event: Optional[str]) -> List[int]:
+        cached = self._candidates.get(event)
+        if cached is not None:
+            return cached
+        matches = [tid for tid, (_, trans) in enumerate(self._table) if _transition_matches(trans, event)]
+        self._candidates[event] = matches
+        return matches
+
+    def _plan(self, key: bytes, row: int, tid: int) -> _Plan:
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        tpl = self._template
+        tpl.configuration = self.configuration(row)
+        finals = {self._ids[bit] for bit in np.flatnonzero(self._status[row])}
+        for sid, act in tpl.activations.items():
+            act.status = ActivationStatus.FINAL if sid in finals else ActivationStatus.ACTIVE
+        ops: List[Tuple[Any, ...]] = []
+        queue = tpl.events
+        tpl._ops, tpl.events = ops, _RecordingQueue(ops)
+        try:
+            source, trans = self._table[tid]
+            tpl._fire_transition(tpl.activations[source], trans)
+        finally:
+            tpl._ops, tpl.events = None, queue
+        conf = np.zeros(len(self._ids), dtype=bool)
+        conf[[self._bits[s] for s in tpl.configuration]] = True
+        status = np.zeros(len(self._ids), dtype=bool)
+        status[[self._bits[s] for s, a in tpl.activations.items() if a.status is ActivationStatus.FINAL]] = True
+        plan = self._plans[key] = _Plan(conf, status, ops)
+        return plan
+
+    def _apply(self, plan: _Plan, rows: np.ndarray, event: Optional[str], data: Optional[np.ndarray]) -> None:
+        for op in plan.ops:
+            if op[0] == "push":
+                self._push(rows, self._intern(op[1]), front=op[2])
+            else:
+                self._run_actions([(op[1], op[2])], rows, event, data, op[3])
+        self._conf[rows] = plan.conf
+        self._status[rows] = plan.status
+
+    # ------------------------------------------------------------------ #
+    # Executable content
+    # ------------------------------------------------------------------ #
+
+    def _run_actions(
+        self,
+        actions: Sequence[Tuple[str, Any]],
+        rows: np.ndarray,
+        event: Optional[str],
+        data: Optional[np.ndarray],
+        conf_ids: FrozenSet[str],
+    ) -> None:
+        for kind, payload in actions:
+            if kind == "raise":
+                self._push(rows, self._intern(payload.event))
+            elif kind == "assign":
+                self._assign(payload, rows, event, data, conf_ids)
+            elif kind == "if":
+                self._if(payload, rows, event, data, conf_ids)
+            elif kind == "log" and self._logs is not None:
+                for n, row in enumerate(rows):
+                    env = self._row_env(row, event, None if data is None else data[n], conf_ids)
+                    value = None
+                    if payload.expr is not None:
+                        try:
+                            value = self._template._evaluate_expr(payload.expr, env)
+                        except Exception:
+                            value = payload.expr
+                    self._logs[row].append(f"{payload.label or ''}:{value}")
+
+    def _assign(self, assign: Any, rows: np.ndarray, event: Optional[str], data: Optional[np.ndarray], conf_ids: FrozenSet[str]) -> None:
+        target = assign.location
+        if assign.expr is not None and target in self._columns:
+            values = self._vectorized(assign.expr, _Frame(self, rows, event, conf_ids))
+            if values is not None:
+                self._store(target, rows, values)
+                return
+        # Per-row path, mirroring DocumentContext._do_assign
+        self.fallbacks += len(rows)
+        if target not in self._columns:
+            for n in range(len(rows)):
+                self._emit_error(rows[n : n + 1], front=True, alias_front=True)
+            return
+        values: List[Any] = []
+        for n, row in enumerate(rows):
+            value: Any = None
+            if assign.expr is not None:
+                env = self._row_env(row, event, None if data is None else data[n], conf_ids)
+                try:
+                    value = self._template._evaluate_expr(assign.expr, env)
+                except Exception:
+                    value = assign.expr
+                    self._emit_error(rows[n : n + 1], front=True)
+            elif assign.content:
+                value = "".join(str(x) for x in assign.content)
+            values.append(value)
+        self._store(target, rows, _pack(values))
+
+    def _if(self, block: Any, rows: np.ndarray, event: Optional[str], data: Optional[np.ndarray], conf_ids: FrozenSet[str]) -> None:
+        # Mirrors DocumentContext._do_if, including evaluating every
+        # ``elseif`` after a branch has run.
+        branches = self._branches.get(id(block))
+        if branches is None:
+            branches = self._branches[id(block)] = self._template._split_if_branches(block)
+        executed = np.zeros(len(rows), dtype=bool)
+        for branch in branches:
+            if branch["kind"] in {"if", "elseif"}:
+                active = self._truth(branch.get("cond") or "False", rows, event, data, conf_ids)
+            else:
+                active = ~executed
+            if not active.any():
+                continue
+            executed |= active
+            self._run_actions(
+                branch["actions"],
+                rows[active],
+                event,
+                None if data is None else data[active],
+                conf_ids,
+            )
+
+    def _truth(self, expr: str, rows: np.ndarray, event: Optional[str], data: Optional[np.ndarray], conf_ids: FrozenSet[str]) -> np.ndarray:
+        values = self._vectorized(expr, _Frame(self, rows, event, conf_ids))
+        if values is not None:
+            if isinstance(values, np.ndarray):
+                return values != 0
+            return np.full(len(rows), bool(values))
+        self.fallbacks += len(rows)
+        result = np.zeros(len(rows), dtype=bool)
+        for n, row in enumerate(rows):
+            env = self._row_env(row, event, None if data is None else data[n], conf_ids)
+            try:
+                result[n] = bool(self._template._evaluate_expr(expr, env))
+            except Exception:
+                result[n] = False
+        return result
+
+    def _condition(self, expr: str, rows: np.ndarray, event: Optional[str], data: Optional[np.ndarray]) -> np.ndarray:
+        """Mirror :meth:`DocumentContext._eval_condition` for many rows."""
+
+        values = self._vectorized(expr, _Frame(self, rows, event))
+        if values is not None and _is_bool(values):
+            if isinstance(values, np.ndarray):
+                return values
+            return np.full(len(rows), values)
+        self.fallbacks += len(rows)
+        result = np.zeros(len(rows), dtype=bool)
+        for n, row in enumerate(rows):
+            env = self._row_env(row, event, None if data is None else data[n], None)
+            try:
+                value = self._template._evaluate_expr(expr, env)
+            except Exception:
+                value = None
+            if isinstance(value, bool):
+                result[n] = value
+            else:
+                self._emit_error(rows[n : n + 1], front=True)
+        return result
+
+    def _vectorized(self, expr: str, frame: _Frame) -> Any:
+        """Evaluate ``expr`` for all rows of ``frame`` or return ``None``."""
+
+        try:
+            fn = self._compiled[expr]
+        except KeyError:
+            fn = self._compiled[expr] = _compile(expr)
+        if fn is None:
+            return None
+        try:
+            with np.errstate(all="ignore"):
+                values = fn(frame)
+        except Exception:
+            return None
+        if isinstance(values, np.ndarray) and values.dtype.kind not in "bif":
+            return None
+        self.vectorized += 1
+        return values
+
+    # ------------------------------------------------------------------ #
+    # Datamodel columns
+    # ------------------------------------------------------------------ #
+
+    def _value(self, name: str, row: int) -> Any:
+        value = self._columns[name][row]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def _store(self, name: str, rows: np.ndarray, values: Any) -> None:
+        column = self._columns[name]
+        kind = _kind(values)
+        if kind != "O" and column.dtype.kind == kind:
+            column[rows] = values
+            return
+        if len(rows) == self.size:
+            # Every instance gets a new value; retype the whole column.
+            if kind == "O":
+                column = np.empty(self.size, dtype=object)
+            else:
+                column = np.empty(self.size, dtype=_DTYPES[kind])
+            self._columns[name] = column
+        elif column.dtype.kind != "O":
+            # Mixed Python types: keep exact values in an object column.
+            column = self._columns[name] = column.astype(object)
+        if kind != "O":
+            column[rows] = values
+        elif isinstance(values, np.ndarray):
+            for n, row in enumerate(rows):
+                column[row] = values[n]
+        else:
+            for row in rows:
+                column[row] = values
+
+    def _row_env(self, row: int, event: Optional[str], data: Any, conf_ids: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+        """Build the expression scope :meth:`DocumentContext._scope_env` would."""
+
+        tpl = self._template
+        tpl._current_event = None if event is None else Event(name=event, data=data)
+        try:
+            env = tpl._scope_env(tpl.root_activation)
+        finally:
+            tpl._current_event = None
+        for name in self._columns:
+            env[name] = self._value(name, row)
+        active = conf_ids if conf_ids is not None else self.configuration(row)
+        env["In"] = active.__contains__
+        return env
+
+
+def _check_subset(template: DocumentContext) -> None:
+    """Raise :class:`ValueError` when the chart uses unsupported features."""
+
+    problems: Set[str] = set()
+    if getattr(template.doc, "script", None):
+        problems.add("<script>")
+
+    def walk(actions: Sequence[Tuple[str, Any]], where: str) -> None:
+        for kind, payload in actions:
+            if kind == "if":
+                for branch in template._split_if_branches(payload):
+                    walk(branch["actions"], where)
+            elif kind not in SUPPORTED_ACTIONS:
+                problems.add(f"<{kind}> in {where}")
+
+    for act in template.activations.values():
+        node = act.node
+        if act.invokes:
+            problems.add(f"<invoke> in {act.id}")
+        if isinstance(node, History):
+            problems.add(f"<history> {act.id}")
+        if act is not template.root_activation and act.local_data:
+            problems.add(f"<datamodel> in {act.id}")
+        if isinstance(node, ScxmlFinalType) and getattr(node, "donedata", None):
+            problems.add(f"<donedata> in {act.id}")
+        containers = list(getattr(node, "onentry", None) or []) + list(getattr(node, "onexit", None) or [])
+        containers += [t.container for t in act.transitions if t.container is not None]
+        for container in containers:
+            walk(template._iter_actions(container), act.id)
+    if problems:
+        raise ValueError("chart is outside the lockstep subset: " + ", ".join(sorted(problems)))
@@ -0,0 +1,496 @@
+"""
+Agent Name: python-montecarlo
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Monte-Carlo simulation of charts under stochastic workloads for the
+``simulate`` command.
+
+A workload spec describes event generators (Poisson rates, fixed periods or
+explicit times) and payload distributions. Every session runs on the mock
+clock: the clock jumps between arrivals and timer deadlines, so hours of
+simulated time cost milliseconds. Sessions are independent and seeded from
+``(seed, index)``, so results do not depend on how they are split across the
+process pool. Per-session results are aggregated into occupancy histograms,
+time-to-final statistics and error rates. NumPy is used for the aggregation
+when it is installed; otherwise an equivalent pure-Python path is used.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+try:  # NumPy is optional; it only speeds up aggregation.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None  # type: ignore[assignment]
+
+__all__ = [
+    "DISTRIBUTIONS",
+    "Workload",
+    "sample_value",
+    "simulate_session",
+    "iter_sessions",
+    "summarize",
+    "run_montecarlo",
+]
+
+DISTRIBUTIONS = ("uniform", "normal", "exponential", "poisson", "randint", "choice", "bernoulli")
+
+#: Percentiles reported for distributions.
+PERCENTILES = (50, 90, 99)
+
+_Arrival = Tuple[float, str, Any]
+
+
+def sample_value(spec: Any, rng: random.Random) -> Any:
+    """Draw a payload value from ``spec``.
+
+    Mappings with a ``dist`` key are distributions; other mappings and
+    lists are sampled element-wise and anything else is returned as is.
+
+    Supported distributions: ``uniform`` (``low``, ``high``), ``normal``
+    (``mean``, ``stddev``), ``exponential`` (``mean``), ``poisson``
+    (``lam``), ``randint`` (``low``, ``high``, inclusive), ``choice``
+    (``values``, optional ``weights``) and ``bernoulli`` (``p``).
+    """
+
+    if isinstance(spec, Mapping):
+        if "dist" not in spec:
+            return {key: sample_value(value, rng) for key, value in spec.items()}
+        kind = spec["dist"]
+        if kind == "uniform":
+            return rng.uniform(float(spec.get("low", 0.0)), float(spec.get("high", 1.0)))
+        if kind == "normal":
+            return rng.gauss(float(spec.get("mean", 0.0)), float(spec.get("stddev", 1.0)))
+        if kind == "exponential":
+            return rng.expovariate(1.0 / float(spec.get("mean", 1.0)))
+        if kind == "poisson":
+            return _poisson(float(spec.get("lam", 1.0)), rng)
+        if kind == "randint":
+            return rng.randint(int(spec.get("low", 0)), int(spec.get("high", 1)))
+        if kind == "choice":
+            values = list(spec["values"])
+            weights = spec.get("weights")
+            return rng.choices(values, weights=weights)[0]
+        if kind == "bernoulli":
+            return rng.random() < float(spec.get("p", 0.5))
+        raise ValueError(f"unknown distribution {kind!r}; expected one of {', '.join(DISTRIBUTIONS)}")
+    if isinstance(spec, list):
+        return [sample_value(item, rng) for item in spec]
+    return spec
+
+
+def _poisson(lam: float, rng: random.Random) -> int:
+    """Draw from a Poisson distribution (Knuth; normal approximation above 30)."""
+
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        return max(0, int(round(rng.gauss(lam, math.sqrt(lam)))))
+    limit = math.exp(-lam)
+    count = 0
+    product = rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+class Workload:
+    """Event generators for one simulated session.
+
+    Parameters
+    ----------
+    events: Sequence[Mapping[str, Any]]
+        One generator per entry, each with a ``name`` and exactly one of
+        ``rate`` (Poisson arrivals per second), ``every`` (fixed period in
+        seconds, first arrival at ``start``, default one period) or ``at``
+        (list of arrival times). ``data`` is an optional payload spec for
+        :func:`sample_value`.
+    horizon: float | None
+        Default simulated seconds per session.
+    """
+
+    def __init__(self, events: Sequence[Mapping[str, Any]], horizon: float | None = None) -> None:
+        self.events = [dict(item) for item in events]
+        self.horizon = None if horizon is None else float(horizon)
+        for item in self.events:
+            if not item.get("name"):
+                raise ValueError("every workload event needs a 'name'")
+            modes = [key for key in ("rate", "every", "at") if key in item]
+            if len(modes) != 1:
+                raise ValueError(f"event {item['name']!r} needs exactly one of 'rate', 'every' or 'at'")
+            if "rate" in item and float(item["rate"]) < 0:
+                raise ValueError(f"event {item['name']!r} has a negative rate")
+            if "every" in item and float(item["every"]) <= 0:
+                raise ValueError(f"event {item['name']!r} needs a positive period")
+
+    @classmethod
+    def from_dict(cls, spec: Mapping[str, Any]) -> "Workload":
+        """Build a workload from its JSON form (``events`` and ``horizon``)."""
+
+        return cls(spec.get("events") or [], spec.get("horizon"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the JSON form accepted by :meth:`from_dict`."""
+
+        return {"events": self.events, "horizon": self.horizon}
+
+    def arrivals(self, rng: random.Random, horizon: float) -> List[_Arrival]:
+        """Return ``(time, name, data)`` arrivals before ``horizon``, sorted by time.
+
+        Ties keep the order of the generators in the spec.
+        """
+
+        arrivals: List[Tuple[float, int, str, Any]] = []
+        for order, item in enumerate(self.events):
+            name = str(item["name"])
+            if "at" in item:
+                times: Iterable[float] = (float(t) for t in item["at"])
+            elif "every" in item:
+                period = float(item["every"])
+                start = float(item.get("start", period))
+                count = int(math.floor((horizon - start) / period)) + 1 if start <= horizon else 0
+                times = (start + n * period for n in range(max(0, count)))
+            else:
+                times = self._poisson_times(float(item["rate"]), rng, horizon)
+            data = item.get("data")
+            for t in times:
+                if 0.0 <= t <= horizon:
+                    arrivals.append((t, order, name, sample_value(data, rng)))
+        arrivals.sort(key=lambda a: (a[0], a[1]))
+        return [(t, name, data) for t, _, name, data in arrivals]
+
+    @staticmethod
+    def _poisson_times(rate: float, rng: random.Random, horizon: float) -> Iterator[float]:
+        if rate <= 0:
+            return
+        t = rng.expovariate(rate)
+        while t <= horizon:
+            yield t
+            t += rng.expovariate(rate)
+
+
+def _load(chart: str | Path) -> Any:
+    """Return a fresh context for ``chart`` using the prepared-chart cache."""
+
+    from .invoke import CHILD_CHART_CACHE
+
+    return CHILD_CHART_CACHE.load_file(chart).instantiate(defer_initial=False)
+
+
+def simulate_session(
+    chart: str | Path,
+    workload: Workload,
+    *,
+    horizon: float,
+    seed: Any = 0,
+) -> Dict[str, Any]:
+    """Run one session on the mock clock and return its measurements.
+
+    Parameters
+    ----------
+    chart: str | Path
+        SCXML or SCJSON document.
+    workload: Workload
+        Event generators and payload distributions.
+    horizon: float
+        Simulated seconds to run unless the chart finishes first.
+    seed: Any
+        Seed for the session's random generator.
+
+    Returns
+    -------
+    dict
+        ``seed``, ``events`` (arrivals delivered), ``final`` (simulated time
+        a top-level final was reached, or ``None``), ``errors`` (``error.*``
+        events processed), ``elapsed`` (simulated seconds), ``occupancy``
+        (seconds per user state) and ``failure`` (exception text when the
+        session raised, else ``None``).
+    """
+
+    rng = random.Random(seed)
+    result: Dict[str, Any] = {
+        "seed": seed,
+        "events": 0,
+        "final": None,
+        "errors": 0,
+        "elapsed": 0.0,
+        "occupancy": {},
+        "failure": None,
+    }
+    by_mask: Dict[int, float] = {}
+    now = 0.0
+    errors = 0
+    ctx = None
+    try:
+        ctx = _load(chart)
+        ctx.advance_time(0.0)  # switch to the mock clock
+        arrivals = workload.arrivals(rng, horizon)
+        queue = ctx.events
+
+        def settle() -> None:
+            nonlocal errors
+            while queue:
+                head = queue._q[0]
+                if head.name.startswith("error."):
+                    errors += 1
+                ctx.microstep()
+
+        def advance_to(until: float) -> None:
+            nonlocal now
+            while not ctx.done:
+                delay = ctx.next_timer()
+                step = until - now if delay is None or now + delay > until else delay
+                mask = ctx.configuration_mask()
+                by_mask[mask] = by_mask.get(mask, 0.0) + step
+                ctx.advance_time(step)
+                now += step
+                settle()
+                if delay is None or now >= until:
+                    return
+
+        settle()
+        for at, name, data in arrivals:
+            advance_to(at)
+            if ctx.done:
+                break
+            ctx.enqueue(name, data)
+            result["events"] += 1
+            settle()
+        if not ctx.done:
+            advance_to(horizon)
+        if ctx.done:
+            result["final"] = now
+    except Exception as exc:
+        result["failure"] = f"{type(exc).__name__}: {exc}"
+    result["errors"] = errors
+    result["elapsed"] = now
+    if ctx is not None:
+        occupancy: Dict[str, float] = {}
+        for mask, seconds in by_mask.items():
+            for state_id in ctx.states_from_mask(mask):
+                if ctx._is_user_state(state_id):
+                    occupancy[state_id] = occupancy.get(state_id, 0.0) + seconds
+        result["occupancy"] = occupancy
+    return result
+
+
+def _session_job(job: Dict[str, Any]) -> List[Dict[str, Any]]:
+    workload = Workload.from_dict(job["workload"])
+    return [
+        simulate_session(job["chart"], workload, horizon=job["horizon"], seed=seed)
+        for seed in job["seeds"]
+    ]
+
+
+def iter_sessions(
+    chart: str | Path,
+    workload: Workload,
+    *,
+    sessions: int,
+    horizon: float,
+    seed: int = 0,
+    jobs: int = 1,
+) -> Iterator[Dict[str, Any]]:
+    """Simulate ``sessions`` independent sessions and yield results in order.
+
+    Session ``i`` is seeded with ``"<seed>:<i>"``, so the results are the
+    same for any ``jobs``.
+
+    Parameters
+    ----------
+    jobs: int
+        Worker processes; ``1`` runs in the calling process.
+    """
+
+    seeds = [f"{seed}:{index}" for index in range(sessions)]
+    base = {"chart": str(chart), "workload": workload.to_dict(), "horizon": float(horizon)}
+    if jobs <= 1 or sessions <= 1:
+        yield from _session_job(dict(base, seeds=seeds))
+        return
+    workers = min(jobs, sessions)
+    # A few chunks per worker balances load while amortising chart loading.
+    size = max(1, math.ceil(sessions / (workers * 4)))
+    chunks = [dict(base, seeds=seeds[i : i + size]) for i in range(0, sessions, size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in pool.map(_session_job, chunks):
+            yield from batch
+
+
+def _percentile(ordered: Sequence[float], q: float) -> float:
+    """Linear-interpolation percentile of sorted values (NumPy's default)."""
+
+    pos = (len(ordered) - 1) * q / 100.0
+    low = int(math.floor(pos))
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def _describe(values: Sequence[float]) -> Dict[str, Any]:
+    """Return count, mean, population stddev, min, max and percentiles."""
+
+    if not len(values):
+        return {"count": 0}
+    if np is not None:
+        arr = np.asarray(values, dtype=float)
+        stats = {
+            "count": int(arr.size),
+            "mean": float(arr.mean()),
+            "std": float(arr.std()),
+            "min": float(arr.min()),
+            "max": float(arr.max()),
+        }
+        for q, value in zip(PERCENTILES, np.percentile(arr, PERCENTILES)):
+            stats[f"p{q}"] = float(value)
+        return stats
+    ordered = sorted(float(v) for v in values)
+    mean = math.fsum(ordered) / len(ordered)
+    stats = {
+        "count": len(ordered),
+        "mean": mean,
+        "std": math.sqrt(math.fsum((v - mean) ** 2 for v in ordered) / len(ordered)),
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+    for q in PERCENTILES:
+        stats[f"p{q}"] = _percentile(ordered, q)
+    return stats
+
+
+def _histogram(values: Sequence[float], bins: int, low: float, high: float) -> List[int]:
+    """Equal-width bin counts over ``[low, high]`` (last bin closed)."""
+
+    if np is not None:
+        counts, _ = np.histogram(np.asarray(values, dtype=float), bins=bins, range=(low, high))
+        return [int(c) for c in counts]
+    counts = [0] * bins
+    width = (high - low) / bins if high > low else 1.0
+    for value in values:
+        if value < low or value > high:
+            continue
+        index = min(int((value - low) / width), bins - 1)
+        counts[index] += 1
+    return counts
+
+
+def _rounded(stats: Dict[str, Any], digits: int = 6) -> Dict[str, Any]:
+    return {k: round(v, digits) if isinstance(v, float) else v for k, v in stats.items()}
+
+
+def summarize(
+    results: Iterable[Dict[str, Any]],
+    *,
+    horizon: float,
+    bins: int = 10,
+) -> Dict[str, Any]:
+    """Aggregate per-session results into a compact JSON-ready summary.
+
+    Parameters
+    ----------
+    results: Iterable[dict]
+        Results from :func:`simulate_session` / :func:`iter_sessions`.
+    horizon: float
+        Simulated seconds per session; bounds the time-to-final histogram.
+    bins: int
+        Histogram bins for occupancy fractions and time-to-final.
+
+    Returns
+    -------
+    dict
+        ``sessions``, ``completion`` (rate, time-to-final statistics and
+        histogram), ``errors`` (session error rate and per-session counts),
+        ``failures`` (sessions that raised, with a few messages) and
+        ``occupancy`` (per state: fraction of simulated time spent in the
+        state across sessions, as statistics and a histogram over ``[0, 1]``).
+    """
+
+    runs = list(results)
+    total = len(runs)
+    finals = [r["final"] for r in runs if r["final"] is not None]
+    error_counts = [r["errors"] for r in runs]
+    failures = [r["failure"] for r in runs if r["failure"]]
+
+    states: Dict[str, None] = {}
+    for run in runs:
+        for state_id in run["occupancy"]:
+            states.setdefault(state_id, None)
+    if np is not None:
+        matrix = np.zeros((total, len(states)), dtype=float)
+        columns = {state_id: n for n, state_id in enumerate(states)}
+        spans = np.array([r["elapsed"] for r in runs], dtype=float)
+        for row, run in enumerate(runs):
+            for state_id, seconds in run["occupancy"].items():
+                matrix[row, columns[state_id]] = seconds
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fractions = np.where(spans[:, None] > 0, matrix / spans[:, None], 0.0)
+        per_state = {state_id: fractions[:, columns[state_id]].tolist() for state_id in states}
+    else:
+        per_state = {
+            state_id: [
+                (r["occupancy"].get(state_id, 0.0) / r["elapsed"]) if r["elapsed"] > 0 else 0.0
+                for r in runs
+            ]
+            for state_id in states
+        }
+
+    completion = {"rate": round(len(finals) / total, 6) if total else 0.0}
+    completion["time"] = _rounded(_describe(finals))
+    completion["histogram"] = {
+        "range": [0.0, float(horizon)],
+        "counts": _histogram(finals, bins, 0.0, float(horizon)),
+    }
+    return {
+        "sessions": total,
+        "horizon": float(horizon),
+        "numpy": np is not None,
+        "completion": completion,
+        "errors": {
+            "rate": round(sum(1 for c in error_counts if c) / total, 6) if total else 0.0,
+            "perSession": _rounded(_describe(error_counts)),
+        },
+        "failures": {"count": len(failures), "examples": failures[:5]},
+        "occupancy": {
+            state_id: dict(
+                _rounded(_describe(values)),
+                histogram=_histogram(values, bins, 0.0, 1.0),
+            )
+            for state_id, values in per_state.items()
+        },
+    }
+
+
+def run_montecarlo(
+    chart: str | Path,
+    workload: Workload,
+    *,
+    sessions: int = 100,
+    horizon: float | None = None,
+    seed: int = 0,
+    jobs: int = 1,
+    bins: int = 10,
+) -> Dict[str, Any]:
+    """Simulate ``sessions`` sessions of ``chart`` and return the summary.
+
+    ``horizon`` defaults to the workload's own. The summary from
+    :func:`summarize` is extended with ``chart``, ``seed``, ``jobs`` and
+    wall-clock ``elapsed`` seconds.
+    """
+
+    span = horizon if horizon is not None else workload.horizon
+    if span is None or span <= 0:
+        raise ValueError("a positive horizon is required (workload 'horizon' or --horizon)")
+    started = time.perf_counter()
+    results = iter_sessions(chart, workload, sessions=sessions, horizon=span, seed=seed, jobs=jobs)
+    summary = summarize(results, horizon=span, bins=bins)
+    summary = dict({"chart": str(chart), "seed": seed, "jobs": jobs}, **summary)
+    summary["elapsed"] = round(time.perf_counter() - started, 6)
+    return summary
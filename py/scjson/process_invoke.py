@@ -0,0 +1,450 @@
+"""
+Agent Name: python-process-invoke
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Out-of-process child machines for the ``scxml-process`` invoke type.
+
+:class:`SCXMLChildHandler` runs a child machine inside the parent's
+microstep, so a CPU-heavy child stalls the parent and every sibling
+invocation. :class:`SCXMLProcessHandler` hosts the same handler in a worker
+process instead. A :class:`ProcessChildPool` owns the workers and talks to
+them over duplex pipes. Commands (start, event, time advance, cancel) are
+posted without waiting. Each reply carries the child's emitted events in
+emission order, plus completion data or an error. The parent collects
+replies when it polls (:meth:`DocumentContext.poll_invocations`, called at
+the start of every microstep) and replays them through the normal emitter
+and done callback. ``#_parent`` sends, ``done.invoke`` ordering hints,
+autoforwarded events and cancellation therefore behave as they do for
+in-process children; only their timing becomes asynchronous.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import multiprocessing
+import os
+import threading
+from collections import deque
+from multiprocessing.connection import Connection, wait as wait_connections
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .events import Event
+from .invoke import InvokeHandler, OnDone
+
+__all__ = ["ProcessChildPool", "SCXMLProcessHandler", "default_process_pool"]
+
+# Reply tuple: (session id, emitted event dicts, prefer-front flag,
+# done flag, done data, error text)
+_Reply = Tuple[str, List[Dict[str, Any]], bool, bool, Any, Optional[str]]
+
+
+def _worker_main(conn: Connection) -> None:
+    """Serve child sessions for one worker process until shut down."""
+
+    from .invoke import SCXMLChildHandler
+
+    sessions: Dict[str, SCXMLChildHandler] = {}
+    outboxes: Dict[str, List[Event]] = {}
+    finished: Dict[str, List[Any]] = {}
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            break
+        op = msg[0]
+        if op == "shutdown":
+            break
+        sid = msg[1]
+        if op == "cancel":
+            handler = sessions.pop(sid, None)
+            outboxes.pop(sid, None)
+            finished.pop(sid, None)
+            if handler is not None:
+                try:
+                    handler.cancel()
+                except Exception:
+                    pass
+            continue
+        error: str | None = None
+        try:
+            if op == "start":
+                spec = msg[2]
+                outbox: List[Event] = []
+                done: List[Any] = []
+                handler = SCXMLChildHandler(
+                    "scxml", spec["src"], spec["payload"], on_done=done.append
+                )
+                handler.set_emitter(outbox.append)
+                handler.invoke_id = spec["invoke_id"]  # type: ignore[attr-defined]
+                handler.trusted = spec["trusted"]  # type: ignore[attr-defined]
+                sessions[sid], outboxes[sid], finished[sid] = handler, outbox, done
+                handler.start()
+                if handler.child is None:
+                    error = "child machine failed to load"
+            elif sid in sessions:
+                handler = sessions[sid]
+                if op == "send":
+                    handler.send(msg[2], msg[3])
+                elif op == "advance":
+                    handler.advance_time(msg[2])
+        except Exception as exc:  # pragma: no cover - defensive
+            error = f"{type(exc).__name__}: {exc}"
+        if sid not in sessions:
+            if error is not None:
+                conn.send((sid, [], False, False, None, error))
+            continue
+        outbox, done = outboxes[sid], finished[sid]
+        if not (outbox or done or error):
+            continue
+        handler = sessions[sid]
+        emitted = [evt.model_dump() for evt in outbox]
+        outbox.clear()
+        complete = bool(done) or error is not None
+        reply: _Reply = (
+            sid,
+            emitted,
+            bool(getattr(handler, "_prefer_front_done", False)),
+            bool(done),
+            done[0] if done else None,
+            error,
+        )
+        if complete:
+            sessions.pop(sid, None)
+            outboxes.pop(sid, None)
+            finished.pop(sid, None)
+        try:
+            conn.send(reply)
+        except Exception as exc:
+            # Unpicklable event or done data: report instead of dropping
+            conn.send((sid, [], False, False, None, f"{type(exc).__name__}: {exc}"))
+
+
+class ProcessChildPool:
+    """Worker processes hosting ``scxml-process`` child sessions.
+
+    Workers start on first use. Each session stays on one worker, the one
+    with the fewest open sessions when it starts. A worker that exits is
+    replaced; each of its sessions receives one ``"worker process
+    exited"`` error reply. The pool is safe to share between contexts and
+    threads.
+
+    Parameters
+    ----------
+    workers : int | None
+        Worker processes; defaults to the CPU count.
+    mp_context : multiprocessing context | None
+        Start-method context; defaults to the platform default.
+    """
+
+    def __init__(self, workers: int | None = None, *, mp_context: Any | None = None) -> None:
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._mp = mp_context or multiprocessing.get_context()
+        self._procs: List[Any] = []
+        self._conns: List[Connection] = []
+        self._load: List[int] = []
+        self._placement: Dict[str, int] = {}
+        self._inbox: Dict[str, Deque[_Reply]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._closed = False
+        self.restarts = 0
+
+    # ------------------------------------------------------------------ #
+    # Session API used by SCXMLProcessHandler
+    # ------------------------------------------------------------------ #
+
+    def open(self, spec: Dict[str, Any]) -> str:
+        """Start a child session from ``spec`` and return its id."""
+        with self._lock:
+            self._ensure_started()
+            sid = f"p{next(self._ids)}"
+            self._inbox[sid] = deque()
+            # A worker found dead here is replaced, so retry once
+            for _ in range(2):
+                idx = min(range(len(self._conns)), key=self._load.__getitem__)
+                if self._send(idx, ("start", sid, spec)):
+                    self._placement[sid] = idx
+                    self._load[idx] += 1
+                    return sid
+            self._inbox[sid].append(_worker_exited(sid))
+            return sid
+
+    def post(self, sid: str, *message: Any) -> None:
+        """Send ``(op, sid, *args)`` to the session's worker without waiting."""
+        with self._lock:
+            idx = self._placement.get(sid)
+            if idx is None:
+                return
+            self._send(idx, (message[0], sid, *message[1:]))
+
+    def close(self, sid: str, *, cancel: bool = True) -> None:
+        """Forget ``sid``; with ``cancel`` the worker drops the session too."""
+        with self._lock:
+            idx = self._placement.pop(sid, None)
+            self._inbox.pop(sid, None)
+            if idx is None:
+                return
+            self._load[idx] -= 1
+            if cancel:
+                self._send(idx, ("cancel", sid))
+
+    def take(self, sid: str) -> List[_Reply]:
+        """Collect available replies and return (and clear) those for ``sid``."""
+        self.collect()
+        with self._lock:
+            box = self._inbox.get(sid)
+            if not box:
+                return []
+            replies = list(box)
+            box.clear()
+            return replies
+
+    def collect(self, timeout: float = 0.0) -> int:
+        """Route worker replies to session inboxes.
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait for the first reply; ``0`` only drains what is
+            already available.
+
+        Returns
+        -------
+        int
+            Number of replies received, including the error replies of
+            sessions lost with a worker.
+        """
+        with self._lock:
+            conns = list(self._conns)
+        if not conns:
+            return 0
+        ready = wait_connections(conns, timeout)
+        received = 0
+        with self._lock:
+            for conn in ready:
+                try:
+                    idx = self._conns.index(conn)
+                except ValueError:
+                    continue  # replaced after its worker died
+                while True:
+                    try:
+                        if not conn.poll():
+                            break
+                        reply: _Reply = conn.recv()
+                    except (EOFError, OSError):
+                        received += self._worker_died(idx)
+                        break
+                    box = self._inbox.get(reply[0])
+                    if box is not None:
+                        box.append(reply)
+                        received += 1
+        return received
+
+    def stats(self) -> Dict[str, Any]:
+        """Return ``workers``, ``started``, open ``sessions`` per worker and ``restarts``."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "started": bool(self._procs),
+                "sessions": list(self._load),
+                "restarts": self.restarts,
+            }
+
+    def shutdown(self) -> None:
+        """Stop all workers; open sessions are abandoned."""
+        with self._lock:
+            self._closed = True
+            for conn in self._conns:
+                try:
+                    conn.send(("shutdown",))
+                except (OSError, ValueError):
+                    pass
+            for proc in self._procs:
+                proc.join(timeout=2)
+                if proc.is_alive():
+                    proc.terminate()
+            for conn in self._conns:
+                conn.close()
+            self._procs, self._conns, self._load = [], [], []
+            self._placement.clear()
+            self._inbox.clear()
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+
+    def _ensure_started(self) -> None:
+        if self._closed:
+            raise RuntimeError("process pool is shut down")
+        if self._procs:
+            return
+        for _ in range(self.workers):
+            proc, conn = self._spawn()
+            self._procs.append(proc)
+            self._conns.append(conn)
+            self._load.append(0)
+
+    def _spawn(self) -> Tuple[Any, Connection]:
+        parent_end, child_end = self._mp.Pipe(duplex=True)
+        proc = self._mp.Process(target=_worker_main, args=(child_end,), daemon=True)
+        proc.start()
+        child_end.close()
+        return proc, parent_end
+
+    def _send(self, idx: int, message: Tuple[Any, ...]) -> bool:
+        """Send to worker ``idx``; a broken pipe replaces the worker."""
+        try:
+            self._conns[idx].send(message)
+        except (OSError, ValueError):
+            self._worker_died(idx)
+            return False
+        return True
+
+    def _worker_died(self, idx: int) -> int:
+        """Replace worker ``idx`` and fail its sessions once.
+
+        Returns
+        -------
+        int
+            Number of sessions failed.
+        """
+        lost = [sid for sid, placed in self._placement.items() if placed == idx]
+        for sid in lost:
+            del self._placement[sid]
+            self._inbox[sid].append(_worker_exited(sid))
+        self._conns[idx].close()
+        self._procs[idx].join(timeout=1)
+        if self._procs[idx].is_alive():
+            self._procs[idx].terminate()
+        self._load[idx] = 0
+        if not self._closed:
+            self._procs[idx], self._conns[idx] = self._spawn()
+            self.restarts += 1
+        return len(lost)
+
+
+def _worker_exited(sid: str) -> _Reply:
+    return (sid, [], False, False, None, "worker process exited")
+
+
+_DEFAULT_POOL: ProcessChildPool | None = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_process_pool() -> ProcessChildPool:
+    """Return the process-wide pool used by ``scxml-process`` invocations."""
+
+    global _DEFAULT_POOL
+    with _DEFAULT_LOCK:
+        if _DEFAULT_POOL is None:
+            _DEFAULT_POOL = ProcessChildPool()
+            atexit.register(_DEFAULT_POOL.shutdown)
+        return _DEFAULT_POOL
+
+
+class SCXMLProcessHandler(InvokeHandler):
+    """Runs an SCXML/SCJSON child machine in a :class:`ProcessChildPool`.
+
+    Parameters
+    ----------
+    type_name : str
+        Invocation type (``scxml-process``).
+    src : Any
+        Child chart path; inline ``<content>`` travels in ``payload``.
+    payload : Any
+        Invoke payload (params, namelist, content).
+    on_done : Callable[[Any], None]
+        Completion callback.
+    pool : ProcessChildPool | None
+        Pool to run in; defaults to :func:`default_process_pool`.
+    """
+
+    def __init__(
+        self,
+        type_name: str,
+        src: Any,
+        payload: Any,
+        on_done: Optional[OnDone] = None,
+        pool: ProcessChildPool | None = None,
+    ) -> None:
+        super().__init__(type_name, src, payload, on_done)
+        self.pool = pool
+        self.session_id: str | None = None
+        self.finished = False
+
+    def start(self) -> None:  # noqa: D401
+        if self.pool is None:
+            self.pool = default_process_pool()
+        spec = {
+            "src": self.src,
+            "payload": self.payload,
+            "invoke_id": getattr(self, "invoke_id", None),
+            "trusted": bool(getattr(self, "trusted", False)),
+        }
+        self.session_id = self.pool.open(spec)
+
+    def send(self, name: str, data: Any | None = None) -> None:  # noqa: D401
+        if self._active():
+            self.pool.post(self.session_id, "send", str(name), data)  # type: ignore[union-attr]
+
+    def advance_time(self, seconds: float) -> None:  # noqa: D401
+        if self._active() and seconds > 0:
+            self.pool.post(self.session_id, "advance", seconds)  # type: ignore[union-attr]
+
+    def cancel(self) -> None:  # noqa: D401
+        super().cancel()
+        self._close()
+
+    def stop(self) -> None:  # noqa: D401
+        self._close()
+
+    def poll(self) -> int:
+        """Replay replies that arrived from the worker; return their count."""
+        if self.session_id is None or self.pool is None or self.finished:
+            return 0
+        replies = self.pool.take(self.session_id)
+        for _sid, emitted, prefer_front, done, data, error in replies:
+            if getattr(self, "is_canceled", False):
+                break
+            for item in emitted:
+                try:
+                    self._emit(Event(**item))
+                except Exception:
+                    pass
+            if error is not None:
+                self.finished = True
+                self._close(cancel=False)
+                self._emit(
+                    Event(name="error.communication", data=error, invokeid=getattr(self, "invoke_id", None))
+                )
+                break
+            if done:
+                self.finished = True
+                self._prefer_front_done = prefer_front
+                self._close(cancel=False)
+                self._on_done(data)
+                break
+        return len(replies)
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to ``timeout`` seconds for any reply from the pool."""
+        if self.pool is None or self.finished:
+            return False
+        return self.pool.collect(timeout) > 0
+
+    def _active(self) -> bool:
+        return (
+            self.session_id is not None
+            and self.pool is not None
+            and not self.finished
+            and not getattr(self, "is_canceled", False)
+        )
+
+    def _close(self, *, cancel: bool = True) -> None:
+        if self.session_id is not None and self.pool is not None:
+            self.pool.close(self.session_id, cancel=cancel)
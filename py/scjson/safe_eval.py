@@ -11,8 +11,11 @@ runtime engine.
 
 from __future__ import annotations
 
+import ast
 import builtins
 import math
+from functools import lru_cache
+from types import CodeType
 from typing import Any, Dict, Iterable, Mapping, Sequence
 
 try:  # pragma: no cover - exercised in environments with sandbox extras
@@ -24,7 +27,6 @@ try:  # pragma: no cover - exercised in environments with sandbox extras
         guard_code,
     )
 except Exception:  # pragma: no cover - simplified sandbox fallback
-    import ast
     import fnmatch
 
     class SandboxViolation(RuntimeError):
@@ -118,7 +120,7 @@ except Exception:  # pragma: no cover - simplified sandbox fallback
 
         _Visitor().visit(tree)
 
-__all__ = ["SafeEvaluationError", "SafeExpressionEvaluator"]
+__all__ = ["SafeEvaluationError", "SafeExpressionEvaluator", "parse_expression"]
 
 
 _DEFAULT_ALLOW_PATTERNS: Sequence[str] = (
@@ -161,6 +163,33 @@ class SafeEvaluationError(RuntimeError):
     """Raised when an expression attempts an unsafe operation."""
 
 
+@lru_cache(maxsize=4096)
+def parse_expression(expr: str) -> ast.Expression:
+    """Return the parsed ``eval``-mode tree for ``expr``.
+
+    Trees are cached process-wide and shared between the evaluator's compiled
+    code cache and static analysis helpers (for example the vector payload
+    analyzer). Callers must treat the returned tree as read-only.
+
+    Parameters
+    ----------
+    expr:
+        Expression source text.
+
+    Returns
+    -------
+    ast.Expression
+        Parsed expression tree.
+
+    Raises
+    ------
+    SyntaxError
+        If ``expr`` is not a valid Python expression.
+    """
+
+    return ast.parse(expr, mode="eval")
+
+
 class SafeExpressionEvaluator:
     """Evaluate SCXML datamodel expressions within a sandboxed environment.
 
@@ -190,6 +219,42 @@ class SafeExpressionEvaluator:
             default_deny.update(deny_patterns)
         self._deny_patterns = tuple(sorted(default_deny))
 
+        self._rules: Dict[str, Any] = {
+            "allow": list(self._allow_patterns),
+            "deny": list(self._deny_patterns),
+            "block_import": True,
+            "block_dunder": True,
+        }
+        self._safe_globals: Dict[str, Any] | None = None
+        # Expressions that passed the sandbox guard, compiled once per evaluator
+        self._code_cache: Dict[str, CodeType] = {}
+
+    def _compile(self, expr: str) -> CodeType:
+        """Guard and compile ``expr``, reusing previously compiled code."""
+
+        code = self._code_cache.get(expr)
+        if code is not None:
+            return code
+        try:
+            guard_code(expr, self._rules)
+        except SandboxViolation as exc:  # pragma: no cover - guard failures
+            raise SafeEvaluationError(str(exc)) from exc
+        try:
+            code = compile(parse_expression(expr), "<string>", "eval")
+        except SyntaxError as exc:
+            raise SafeEvaluationError(str(exc)) from exc
+        self._code_cache[expr] = code
+        return code
+
+    def _globals(self) -> Dict[str, Any]:
+        """Return the filtered builtins and modules exposed to expressions."""
+
+        if self._safe_globals is None:
+            safe_globals: Dict[str, Any] = filter_globals(vars(builtins), self._rules)
+            safe_globals.update(_prepare_modules(self._rules))
+            self._safe_globals = safe_globals
+        return self._safe_globals
+
     def evaluate(
         self,
         expr: str,
@@ -224,31 +289,21 @@ class SafeExpressionEvaluator:
         if not expr:
             raise SafeEvaluationError("Expression is empty")
 
-        rules = {
-            "allow": list(self._allow_patterns),
-            "deny": list(self._deny_patterns),
-            "block_import": True,
-            "block_dunder": True,
-        }
-        try:
-            guard_code(expr, rules)
-        except SandboxViolation as exc:  # pragma: no cover - guard failures
-            raise SafeEvaluationError(str(exc)) from exc
-
-        safe_globals: Dict[str, Any] = filter_globals(vars(builtins), rules)
-        safe_globals.update(_prepare_modules(rules))
+        code = self._compile(expr)
 
+        safe_globals = self._globals()
         if extra_globals:
             for name in extra_globals:
                 if name.startswith("__"):
                     raise SafeEvaluationError(
                         "Global helpers must not begin with double underscore"
                     )
+            safe_globals = dict(safe_globals)
             safe_globals.update(extra_globals)
 
         locals_ns = dict(env)
         try:
-            return eval(expr, {"__builtins__": safe_globals}, locals_ns)
+            return eval(code, {"__builtins__": safe_globals}, locals_ns)
         except SandboxViolation as exc:  # pragma: no cover - wrapped immediately
             raise SafeEvaluationError(str(exc)) from exc
         except Exception as exc:  # noqa: BLE001
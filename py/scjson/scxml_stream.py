@@ -0,0 +1,257 @@
+"""
+Agent Name: python-scxml-stream
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Bounded-memory SCXML → SCJSON conversion.
+
+:meth:`SCXMLDocumentHandler.xml_to_json` materializes the whole element tree,
+the xsdata object graph, two recursive copies of the dumped dictionary and
+the final JSON string. :func:`stream_xml_to_json` instead walks the document
+with ``lxml.etree.iterparse`` and binds one top-level child of ``<scxml>`` at
+a time, so peak memory follows the largest top-level element rather than the
+document. Each child is decimal-fixed, pruned and serialized immediately
+into a per-field spool file. The spools are then concatenated in ``Scxml``
+field order, which keeps indented output byte-identical to ``xml_to_json``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, TextIO
+
+from lxml import etree
+from xsdata.formats.dataclass.parsers import XmlParser
+from xsdata.formats.dataclass.parsers.config import ParserConfig
+
+from .SCXMLDocumentHandler import SCXMLDocumentHandler
+from .dataclasses import Scxml
+
+__all__ = ["stream_xml_to_json", "stream_xml_file"]
+
+SCXML_NS = "http://www.w3.org/2005/07/scxml"
+_PLACEHOLDER = "@@scjson-stream-child@@"
+_ELEMENT_FIELDS = [
+    f.name for f in fields(Scxml) if f.metadata.get("type") in ("Element", "Wildcard")
+]
+
+
+def _shape(value: Any, omit_empty: bool) -> Any:
+    """Apply the same decimal fixing and pruning as ``xml_to_json``."""
+
+    value = SCXMLDocumentHandler._fix_decimal(value)
+    if omit_empty:
+        value = SCXMLDocumentHandler._remove_empty(value)
+    return value
+
+
+def _dumps(value: Any, indent: int | None, depth: int) -> str:
+    """Serialize ``value`` as it would appear ``depth`` levels deep."""
+
+    if indent is None:
+        return json.dumps(value, separators=(",", ":"))
+    text = json.dumps(value, indent=indent)
+    return text.replace("\n", "\n" + " " * (indent * depth))
+
+
+class _FieldSpool:
+    """Serialized list items for one ``Scxml`` element field."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.handle: TextIO = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def add(self, item: str, indent: int | None) -> None:
+        if self.count:
+            self.handle.write(",")
+        if indent is not None:
+            self.handle.write("\n" + " " * (indent * 2))
+        self.handle.write(item)
+        self.count += 1
+
+    def close(self) -> None:
+        self.handle.close()
+
+
+def _wrapper(root: etree._Element) -> bytes:
+    """Return an ``<scxml>`` start/end pair carrying the root attributes."""
+
+    wrapper = etree.Element(f"{{{SCXML_NS}}}scxml", nsmap={None: SCXML_NS})
+    for key, value in root.attrib.items():
+        wrapper.set(key, value)
+    wrapper.text = _PLACEHOLDER
+    return etree.tostring(wrapper, encoding="utf-8")
+
+
+def stream_xml_to_json(
+    source: str | Path | BinaryIO,
+    sink: TextIO,
+    *,
+    omit_empty: bool = True,
+    indent: int | None = 2,
+    fail_on_unknown_properties: bool = True,
+) -> int:
+    """Convert an SCXML document to SCJSON, writing incrementally to ``sink``.
+
+    Parameters
+    ----------
+    source: str | Path | BinaryIO
+        SCXML file path or binary file object.
+    sink: TextIO
+        Destination for the JSON text.
+    omit_empty: bool
+        Drop ``None`` and empty containers, as ``SCXMLDocumentHandler`` does.
+    indent: int | None
+        Indentation width; ``None`` writes compact JSON without whitespace.
+    fail_on_unknown_properties: bool
+        Raise on unknown SCXML elements instead of skipping them.
+
+    Returns
+    -------
+    int
+        Number of top-level child elements converted.
+
+    Notes
+    -----
+    Like ``xml_to_json``, documents whose root ``<scxml>`` omits the SCXML
+    namespace are accepted and bound as if it were declared.
+    """
+
+    parser = XmlParser(
+        config=ParserConfig(fail_on_unknown_properties=fail_on_unknown_properties)
+    )
+    spools: Dict[str, _FieldSpool] = {name: _FieldSpool() for name in _ELEMENT_FIELDS}
+    root: etree._Element | None = None
+    head = tail = b""
+    converted = 0
+    depth = 0
+    try:
+        for event, elem in etree.iterparse(
+            source, events=("start", "end"), remove_comments=True, huge_tree=True, recover=True
+        ):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    if etree.QName(elem).localname != "scxml" or (
+                        etree.QName(elem).namespace not in (None, SCXML_NS)
+                    ):
+                        raise ValueError(f"Expected <scxml> root element, found {elem.tag}")
+                    root = elem
+                    head, tail = _wrapper(root).split(_PLACEHOLDER.encode("utf-8"), 1)
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            child = etree.tostring(elem, encoding="utf-8", with_tail=False)
+            model = parser.from_bytes(head + child + tail, Scxml)
+            for name in _ELEMENT_FIELDS:
+                for item in getattr(model, name):
+                    value = asdict(item) if hasattr(item, "__dataclass_fields__") else item
+                    if omit_empty and (
+                        value is None or (isinstance(value, (list, dict)) and not value)
+                    ):
+                        continue
+                    spools[name].add(_dumps(_shape(value, omit_empty), indent, 2), indent)
+            converted += 1
+            # Release the converted subtree and any siblings already handled.
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        if root is None:
+            raise ValueError("Empty SCXML document")
+
+        attributes = _shape(asdict(parser.from_bytes(head + tail, Scxml)), omit_empty)
+        _write_document(sink, spools, attributes, omit_empty=omit_empty, indent=indent)
+    finally:
+        for spool in spools.values():
+            spool.close()
+    return converted
+
+
+def _write_document(
+    sink: TextIO,
+    spools: Dict[str, _FieldSpool],
+    attributes: Dict[str, Any],
+    *,
+    omit_empty: bool,
+    indent: int | None,
+) -> None:
+    """Assemble the root object in ``Scxml`` field order."""
+
+    sep = ": " if indent is not None else ":"
+    pad = "\n" + " " * indent if indent is not None else ""
+    members: List[Any] = []
+    for f in fields(Scxml):
+        spool = spools.get(f.name)
+        if spool is not None:
+            if spool.count or not omit_empty:
+                members.append((f.name, spool))
+        elif f.name in attributes:
+            members.append((f.name, attributes[f.name]))
+    if not members:
+        sink.write("{}")
+        return
+    sink.write("{")
+    for idx, (name, value) in enumerate(members):
+        if idx:
+            sink.write(",")
+        sink.write(pad + json.dumps(name) + sep)
+        if isinstance(value, _FieldSpool):
+            if not value.count:
+                sink.write("[]")
+                continue
+            sink.write("[")
+            value.handle.seek(0)
+            shutil.copyfileobj(value.handle, sink)
+            sink.write(pad + "]" if indent is not None else "]")
+        else:
+            sink.write(_dumps(value, indent, 1))
+    sink.write("\n}" if indent is not None else "}")
+
+
+def stream_xml_file(
+    src: str | Path,
+    dest: str | Path,
+    **options: Any,
+) -> int:
+    """Stream ``src`` into the SCJSON file ``dest``.
+
+    Parameters
+    ----------
+    src: str | Path
+        SCXML input file.
+    dest: str | Path
+        SCJSON output file; parent directories are created. Output goes to
+        a temporary file in the same directory that replaces ``dest`` only
+        on success, so a failed conversion leaves any existing ``dest``
+        untouched.
+    **options:
+        Keyword options accepted by :func:`stream_xml_to_json`.
+
+    Returns
+    -------
+    int
+        Number of top-level child elements converted.
+    """
+
+    out = Path(dest)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=out.parent, prefix=f".{out.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            count = stream_xml_to_json(str(src), handle, **options)
+        os.replace(tmp, out)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return count
@@ -0,0 +1,330 @@
+"""
+Agent Name: python-session-host
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Multi-session runtime host with a cooperative, budgeted scheduler.
+
+A :class:`SessionHost` owns many :class:`~scjson.context.DocumentContext`
+instances keyed by session id. Events are routed with a dictionary lookup
+and the session is put on a round-robin ready queue. Each scheduling round
+gives every ready session one turn of at most ``step_budget`` microsteps.
+A session that still has queued events after its turn goes to the back of
+the queue, so a chatty or looping chart cannot starve its neighbours.
+Sessions with pending timers or invocations are checked at the start of
+each round and become ready when something is due.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Iterator, Optional
+
+from .context import DocumentContext
+from .events import Event
+
+__all__ = ["SessionHost"]
+
+logger = logging.getLogger(__name__)
+
+ContextFactory = Callable[[Hashable], DocumentContext]
+
+
+class _Session:
+    """Scheduler bookkeeping for one hosted context."""
+
+    __slots__ = (
+        "session_id",
+        "ctx",
+        "queued",
+        "closed",
+        "pending_since",
+        "steps",
+        "turns",
+        "preempted",
+        "errors",
+        "max_lag",
+    )
+
+    def __init__(self, session_id: Hashable, ctx: DocumentContext) -> None:
+        self.session_id = session_id
+        self.ctx = ctx
+        self.queued = False
+        self.closed = False
+        self.pending_since: Optional[float] = None
+        self.steps = 0
+        self.turns = 0
+        self.preempted = 0
+        self.errors = 0
+        self.max_lag = 0.0
+
+
+class SessionHost:
+    """Host many document contexts and share the interpreter between them.
+
+    Parameters
+    ----------
+    factory : Callable[[Hashable], DocumentContext] | None
+        Builds the context for a session id in :meth:`open` when none is
+        given.
+    step_budget : int
+        Maximum microsteps per session per turn (at least ``1``).
+    clock : Callable[[], float]
+        Time source for lag reporting; defaults to :func:`time.monotonic`.
+    on_turn : Callable[[Hashable, DocumentContext], None] | None
+        Called after every turn with the session id and its context, for
+        example to publish the new configuration.
+    """
+
+    def __init__(
+        self,
+        factory: Optional[ContextFactory] = None,
+        *,
+        step_budget: int = 64,
+        clock: Callable[[], float] = time.monotonic,
+        on_turn: Optional[Callable[[Hashable, DocumentContext], None]] = None,
+    ) -> None:
+        self.factory = factory
+        self.on_turn = on_turn
+        self.step_budget = max(1, int(step_budget))
+        self._clock = clock
+        self._sessions: Dict[Hashable, _Session] = {}
+        self._ready: Deque[_Session] = deque()
+        # Sessions with delayed events or invocations that may wake them up
+        self._waiting: Dict[Hashable, _Session] = {}
+
+    # ------------------------------------------------------------------ #
+    # Session management
+    # ------------------------------------------------------------------ #
+
+    def open(self, session_id: Hashable, ctx: Optional[DocumentContext] = None) -> DocumentContext:
+        """Add a session and return its context.
+
+        :param session_id: Key used to route events to the session.
+        :param ctx: Context to host; built with ``factory`` when omitted.
+        :returns: The hosted context.
+        """
+
+        if session_id in self._sessions:
+            raise KeyError(f"session already open: {session_id!r}")
+        if ctx is None:
+            if self.factory is None:
+                raise ValueError("no context given and the host has no factory")
+            ctx = self.factory(session_id)
+        rec = _Session(session_id, ctx)
+        self._sessions[session_id] = rec
+        # The initial macrostep may have raised events or scheduled timers.
+        if ctx.events:
+            self._make_ready(rec)
+        self._track(rec)
+        return ctx
+
+    def close(self, session_id: Hashable) -> DocumentContext:
+        """Remove a session, dropping any work still queued for it.
+
+        :param session_id: Session to remove.
+        :returns: The context that was hosted.
+        """
+
+        rec = self._sessions.pop(session_id)
+        rec.closed = True
+        self._waiting.pop(session_id, None)
+        return rec.ctx
+
+    def get(self, session_id: Hashable) -> DocumentContext:
+        """Return the context hosted for ``session_id``."""
+
+        return self._sessions[session_id].ctx
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._sessions))
+
+    # ------------------------------------------------------------------ #
+    # Routing and scheduling
+    # ------------------------------------------------------------------ #
+
+    def send(self, session_id: Hashable, name: str, data: Any | None = None) -> bool:
+        """Queue an external event for a session.
+
+        The event goes through the context's ingress queue, so its ingress
+        policies apply; events sent between two turns of the session can
+        be coalesced or dropped. A full ``block`` policy drops the event,
+        since the host drains the queue on the same thread.
+
+        :param session_id: Target session; :class:`KeyError` when unknown.
+        :param name: Event name.
+        :param data: Optional payload.
+        :returns: ``False`` when an ingress policy dropped the event.
+        """
+
+        rec = self._sessions[session_id]
+        admitted = rec.ctx._ingress.put(Event(name=name, data=data), 0)
+        self._make_ready(rec)
+        return admitted
+
+    @property
+    def ready(self) -> int:
+        """Number of sessions waiting for a turn."""
+
+        return sum(1 for rec in self._ready if not rec.closed)
+
+    def run_once(self) -> int:
+        """Run one scheduling round.
+
+        Every session that is ready when the round starts gets one turn.
+        Sessions made ready during the round wait for the next one.
+
+        :returns: Number of microsteps executed.
+        """
+
+        self._wake_waiting()
+        executed = 0
+        for _ in range(len(self._ready)):
+            rec = self._ready.popleft()
+            if rec.closed:
+                continue
+            executed += self._turn(rec)
+        return executed
+
+    def run(self, max_rounds: int | None = None) -> int:
+        """Run rounds until no session is ready or ``max_rounds`` is reached.
+
+        Sessions that are only waiting on future timers or running
+        invocations do not keep this loop alive.
+
+        :param max_rounds: Optional limit on scheduling rounds.
+        :returns: Total number of microsteps executed.
+        """
+
+        executed = 0
+        rounds = 0
+        while max_rounds is None or rounds < max_rounds:
+            self._wake_waiting()
+            if not self._ready:
+                break
+            executed += self.run_once()
+            rounds += 1
+        return executed
+
+    def next_deadline(self, poll_interval: float = 0.05) -> Optional[float]:
+        """Return when :meth:`run` next has work that is not yet queued.
+
+        :param poll_interval: Delay reported for sessions waiting on
+            invocations, which can only be polled.
+        :returns: A :func:`time.monotonic` timestamp (the earliest pending
+            wall-clock timer, or now plus ``poll_interval``), or ``None``
+            when no session is waiting on anything.
+        """
+
+        deadline: Optional[float] = None
+        for rec in self._waiting.values():
+            ctx = rec.ctx
+            if ctx._live_invocations():
+                due = time.monotonic() + poll_interval
+            elif ctx.delayed_events and ctx._use_wall_clock:
+                due = ctx.delayed_events[0][0]
+            else:
+                continue
+            if deadline is None or due < deadline:
+                deadline = due
+        return deadline
+
+    def _make_ready(self, rec: _Session) -> None:
+        if rec.queued:
+            return
+        rec.queued = True
+        rec.pending_since = self._clock()
+        self._ready.append(rec)
+
+    def _turn(self, rec: _Session) -> int:
+        ctx = rec.ctx
+        now = self._clock()
+        if rec.pending_since is not None:
+            rec.max_lag = max(rec.max_lag, now - rec.pending_since)
+        budget = self.step_budget
+        count = 0
+        try:
+            ctx._drain_ingress()
+            while ctx.events and count < budget:
+                ctx.microstep()
+                count += 1
+        except Exception:
+            rec.errors += 1
+            logger.exception("session %r failed during a microstep", rec.session_id)
+        rec.steps += count
+        rec.turns += 1
+        if ctx.events:
+            rec.preempted += 1
+            rec.pending_since = self._clock()
+            self._ready.append(rec)
+        else:
+            rec.queued = False
+            rec.pending_since = None
+        self._track(rec)
+        if self.on_turn is not None:
+            self.on_turn(rec.session_id, ctx)
+        return count
+
+    def _track(self, rec: _Session) -> None:
+        if rec.ctx.delayed_events or rec.ctx._live_invocations():
+            self._waiting[rec.session_id] = rec
+        else:
+            self._waiting.pop(rec.session_id, None)
+
+    def _wake_waiting(self) -> None:
+        for rec in list(self._waiting.values()):
+            if rec.queued:
+                continue
+            ctx = rec.ctx
+            try:
+                ctx._release_delayed_events()
+                ctx.poll_invocations()
+            except Exception:
+                rec.errors += 1
+                logger.exception("session %r failed while polling", rec.session_id)
+            if ctx.events:
+                self._make_ready(rec)
+            else:
+                self._track(rec)
+
+    # ------------------------------------------------------------------ #
+    # Reporting
+    # ------------------------------------------------------------------ #
+
+    def stats(self, session_id: Hashable) -> Dict[str, Any]:
+        """Return scheduling counters for one session.
+
+        Keys: ``queue_depth`` (events queued in the context or its ingress queue), ``lag``
+        (seconds the session has been waiting for a turn, ``0.0`` when
+        idle), ``max_lag``, ``steps``, ``turns``, ``preempted`` (turns that
+        ended on the budget) and ``errors``.
+        """
+
+        rec = self._sessions[session_id]
+        lag = 0.0
+        if rec.pending_since is not None:
+            lag = max(0.0, self._clock() - rec.pending_since)
+        return {
+            "queue_depth": len(rec.ctx.events) + len(rec.ctx._ingress),
+            "lag": lag,
+            "max_lag": rec.max_lag,
+            "steps": rec.steps,
+            "turns": rec.turns,
+            "preempted": rec.preempted,
+            "errors": rec.errors,
+        }
+
+    def report(self) -> Dict[Hashable, Dict[str, Any]]:
+        """Return :meth:`stats` for every hosted session."""
+
+        return {sid: self.stats(sid) for sid in self._sessions}
@@ -0,0 +1,504 @@
+"""
+Agent Name: python-sharding
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Sharded multi-process session hosting.
+
+:class:`ShardedHost` is a router that spreads sessions over worker
+processes. Each worker runs a :class:`~scjson.session_host.SessionHost`.
+Sessions are assigned with a consistent-hash ring (:class:`HashRing`), so
+adding or removing a worker only moves the sessions whose ring segment
+changed owner. Those sessions are migrated as
+:meth:`DocumentContext.snapshot` data and rebuilt on the new owner.
+
+The router queues commands per worker and sends them as one pipe message
+per batch. Workers reply with one status entry per session touched by the
+batch (configuration and whether the chart finished), plus unsolicited
+entries when a wall-clock timer fires. Everything runs on ``multiprocessing``
+pipes, so a full deployment can be exercised on one machine.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import time
+from multiprocessing.connection import Connection, wait as wait_connections
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+__all__ = ["HashRing", "ShardedHost"]
+
+logger = logging.getLogger(__name__)
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes.
+
+    Parameters
+    ----------
+    nodes : Iterable[Hashable]
+        Initial node names.
+    replicas : int
+        Virtual points per node; more points give a more even spread.
+    """
+
+    def __init__(self, nodes: Iterable[Hashable] = (), *, replicas: int = 64) -> None:
+        self.replicas = max(1, int(replicas))
+        self._points: List[int] = []
+        self._owners: List[Hashable] = []
+        self._nodes: List[Hashable] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[Hashable]:
+        """Nodes currently on the ring, in insertion order."""
+
+        return list(self._nodes)
+
+    def add(self, node: Hashable) -> None:
+        """Place ``node`` on the ring."""
+
+        if node in self._nodes:
+            return
+        self._nodes.append(node)
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            idx = bisect.bisect(self._points, point)
+            self._points.insert(idx, point)
+            self._owners.insert(idx, node)
+
+    def remove(self, node: Hashable) -> None:
+        """Take ``node`` off the ring."""
+
+        if node not in self._nodes:
+            return
+        self._nodes.remove(node)
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def node_for(self, key: Hashable) -> Hashable:
+        """Return the node owning ``key``."""
+
+        if not self._points:
+            raise LookupError("hash ring is empty")
+        idx = bisect.bisect(self._points, _hash(str(key))) % len(self._points)
+        return self._owners[idx]
+
+
+def _status(session_id: Hashable, ctx: Any) -> Dict[str, Any]:
+    configuration = sorted(ctx._filter_states(ctx.configuration), key=ctx._activation_order_key)
+    return {"session": session_id, "configuration": configuration, "done": ctx.done}
+
+
+def _shard_main(conn: Connection) -> None:
+    """Serve one shard: apply command batches to a local session host."""
+
+    from .invoke import CHILD_CHART_CACHE
+    from .session_host import SessionHost
+
+    touched: Dict[Hashable, None] = {}
+    host = SessionHost(on_turn=lambda sid, _ctx: touched.setdefault(sid, None))
+
+    def load(chart: str, *, defer_initial: bool) -> Any:
+        return CHILD_CHART_CACHE.load_file(chart).instantiate(defer_initial=defer_initial)
+
+    while True:
+        deadline = host.next_deadline()
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            if not conn.poll(timeout):
+                # A timer or invocation is due; report the sessions it moved.
+                host.run()
+                if touched:
+                    conn.send((None, [_status(sid, host.get(sid)) for sid in touched if sid in host]))
+                    touched.clear()
+                continue
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        seq, batch = message
+        entries: List[Dict[str, Any]] = []
+        for cmd in batch:
+            op, sid = cmd[0], cmd[1]
+            try:
+                if op == "send":
+                    host.send(sid, cmd[2], cmd[3])
+                elif op == "open":
+                    host.open(sid, load(cmd[2], defer_initial=False))
+                    touched[sid] = None
+                elif op == "import":
+                    ctx = load(cmd[2], defer_initial=True)
+                    ctx.restore(cmd[3])
+                    host.open(sid, ctx)
+                elif op == "export":
+                    host.run()
+                    snapshot = host.get(sid).snapshot()
+                    host.close(sid)
+                    entries.append({"session": sid, "snapshot": snapshot})
+                elif op == "close":
+                    host.close(sid)
+                    entries.append({"session": sid, "closed": True})
+                elif op == "query":
+                    host.run()
+                    ctx = host.get(sid)
+                    entries.append(dict(_status(sid, ctx), data=dict(ctx.data_model)))
+            except Exception as exc:
+                entries.append({"session": sid, "error": f"{type(exc).__name__}: {exc}"})
+        host.run()
+        entries.extend(_status(sid, host.get(sid)) for sid in touched if sid in host)
+        touched.clear()
+        try:
+            conn.send((seq, entries))
+        except (OSError, ValueError):
+            break
+    conn.close()
+
+
+class ShardedHost:
+    """Router for sessions spread over worker processes.
+
+    Sessions are opened from a chart file (``.scxml`` or ``.scjson``) and
+    placed on the worker that owns their id on the hash ring. Commands are
+    buffered per worker and shipped as a batch when ``batch_size`` is
+    reached or on :meth:`flush`. Status entries come back through
+    :meth:`collect` and :meth:`pump`; call one of them regularly so the
+    workers never block on a full pipe.
+
+    Each status entry is a dict with ``session``, ``configuration`` (user
+    states) and ``done``. Failed commands produce ``{"session", "error"}``
+    entries instead.
+
+    Sessions with running invocations cannot be snapshotted; during a
+    rebalance they stay pinned to their current worker.
+
+    A worker whose process exits is taken off the ring. Each of its
+    sessions is reported once with ``{"session", "error": "worker process
+    exited"}`` and then forgotten.
+
+    Parameters
+    ----------
+    workers : int
+        Worker processes started immediately.
+    replicas : int
+        Virtual nodes per worker on the hash ring.
+    batch_size : int
+        Commands per worker that trigger an automatic flush.
+    mp_context : multiprocessing context | None
+        Start-method context; defaults to the platform default.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        *,
+        replicas: int = 64,
+        batch_size: int = 256,
+        mp_context: Any | None = None,
+    ) -> None:
+        self.batch_size = max(1, int(batch_size))
+        self.ring = HashRing(replicas=replicas)
+        self._mp = mp_context or multiprocessing.get_context()
+        self._procs: Dict[str, Any] = {}
+        self._conns: Dict[str, Connection] = {}
+        self._pending: Dict[str, List[Tuple[Any, ...]]] = {}
+        self._inflight: Dict[str, int] = {}
+        self._charts: Dict[Hashable, str] = {}
+        self._owner: Dict[Hashable, str] = {}
+        self._pinned: Dict[Hashable, str] = {}
+        self._backlog: List[Dict[str, Any]] = []
+        self._names = itertools.count()
+        self._seq = itertools.count(1)
+        self.migrated = 0
+        for _ in range(max(1, int(workers))):
+            self.add_worker()
+
+    # ------------------------------------------------------------------ #
+    # Sessions
+    # ------------------------------------------------------------------ #
+
+    def open(self, session_id: Hashable, chart: str | Path) -> str:
+        """Start a session from ``chart`` and return the owning worker."""
+
+        if session_id in self._owner:
+            raise KeyError(f"session already open: {session_id!r}")
+        path = str(Path(chart).resolve())
+        worker = self.ring.node_for(session_id)
+        self._charts[session_id] = path
+        self._owner[session_id] = worker
+        self._queue(worker, ("open", session_id, path))
+        return worker
+
+    def send(self, session_id: Hashable, name: str, data: Any | None = None) -> None:
+        """Queue an external event for a session (:class:`KeyError` if unknown)."""
+
+        self._queue(self._owner[session_id], ("send", session_id, name, data))
+
+    def close(self, session_id: Hashable) -> None:
+        """Drop a session on its worker."""
+
+        worker = self._owner.pop(session_id)
+        self._charts.pop(session_id, None)
+        self._pinned.pop(session_id, None)
+        self._queue(worker, ("close", session_id))
+
+    def query(self, session_id: Hashable) -> Dict[str, Any]:
+        """Return the session's status entry including its datamodel.
+
+        Flushes and waits for every outstanding batch.
+        """
+
+        self._queue(self._owner[session_id], ("query", session_id))
+        found: Dict[str, Any] = {}
+        kept = []
+        for entry in self.pump():
+            if entry.get("session") == session_id and ("data" in entry or "error" in entry) and not found:
+                found = entry
+            else:
+                kept.append(entry)
+        self._backlog = kept + self._backlog
+        if "error" in found:
+            raise KeyError(found["error"])
+        return found
+
+    def owner(self, session_id: Hashable) -> str:
+        """Return the worker currently hosting ``session_id``."""
+
+        return self._owner[session_id]
+
+    # ------------------------------------------------------------------ #
+    # Batching
+    # ------------------------------------------------------------------ #
+
+    def flush(self) -> None:
+        """Ship every buffered command batch to its worker."""
+
+        for worker in list(self._pending):
+            self._flush_worker(worker)
+
+    def collect(self, timeout: float = 0.0) -> List[Dict[str, Any]]:
+        """Return status entries received so far.
+
+        :param timeout: Seconds to wait for the first reply when nothing is
+            available yet.
+        """
+
+        entries, self._backlog = self._backlog, []
+        if not entries:
+            entries = self._receive(timeout)
+        else:
+            entries.extend(self._receive(0.0))
+        return entries
+
+    def pump(self, timeout: float | None = None) -> List[Dict[str, Any]]:
+        """Flush and wait until every batch sent so far has been answered.
+
+        :param timeout: Optional overall limit in seconds.
+        :returns: All status entries received, including earlier backlog.
+        """
+
+        self.flush()
+        entries, self._backlog = self._backlog, []
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while any(self._inflight.values()):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            entries.extend(self._receive(remaining))
+        return entries
+
+    def _queue(self, worker: str, command: Tuple[Any, ...]) -> None:
+        batch = self._pending.setdefault(worker, [])
+        batch.append(command)
+        if len(batch) >= self.batch_size:
+            self._flush_worker(worker)
+
+    def _flush_worker(self, worker: str) -> None:
+        batch = self._pending.pop(worker, None)
+        if not batch:
+            return
+        # Drain replies first so a worker blocked on a full pipe can proceed.
+        self._backlog.extend(self._receive(0.0))
+        conn = self._conns.get(worker)
+        if conn is None:
+            return  # died meanwhile; its sessions were already failed
+        try:
+            conn.send((next(self._seq), batch))
+        except (OSError, ValueError):
+            self._backlog.extend(self._worker_died(worker))
+            return
+        self._inflight[worker] += 1
+
+    def _receive(self, timeout: float | None) -> List[Dict[str, Any]]:
+        by_conn = {conn: name for name, conn in self._conns.items()}
+        entries: List[Dict[str, Any]] = []
+        for conn in wait_connections(list(by_conn), timeout):
+            worker = by_conn[conn]
+            while True:
+                try:
+                    if not conn.poll():
+                        break
+                    seq, items = conn.recv()
+                except (EOFError, OSError):
+                    entries.extend(self._worker_died(worker))
+                    break
+                if seq is not None:
+                    self._inflight[worker] -= 1
+                entries.extend(items)
+        return entries
+
+    # ------------------------------------------------------------------ #
+    # Workers and rebalancing
+    # ------------------------------------------------------------------ #
+
+    def add_worker(self) -> str:
+        """Start a worker, put it on the ring and migrate sessions to it."""
+
+        name = f"shard-{next(self._names)}"
+        parent_end, child_end = self._mp.Pipe(duplex=True)
+        proc = self._mp.Process(target=_shard_main, args=(child_end,), daemon=True)
+        proc.start()
+        child_end.close()
+        self._procs[name] = proc
+        self._conns[name] = parent_end
+        self._inflight[name] = 0
+        self.ring.add(name)
+        self._rebalance()
+        return name
+
+    def remove_worker(self, name: str) -> None:
+        """Migrate every session off ``name`` and stop it.
+
+        :raises RuntimeError: When a session cannot be moved; the worker
+            then stays on the ring.
+        """
+
+        if name not in self._conns:
+            raise KeyError(name)
+        if len(self._conns) == 1:
+            raise RuntimeError("cannot remove the last worker")
+        self.ring.remove(name)
+        stuck = self._rebalance()
+        if stuck:
+            self.ring.add(name)
+            raise RuntimeError(f"sessions could not be migrated: {stuck}")
+        self._stop_worker(name)
+
+    def _rebalance(self) -> List[Hashable]:
+        """Move sessions whose ring owner changed; return those left behind.
+
+        Pinned sessions are retried, since their invocations may have
+        finished in the meantime.
+        """
+
+        moves = []
+        for sid, current in self._owner.items():
+            target = self.ring.node_for(sid)
+            if target != current:
+                moves.append((sid, current, target))
+        if not moves:
+            return []
+        for sid, current, _ in moves:
+            self._queue(current, ("export", sid))
+        snapshots: Dict[Hashable, Any] = {}
+        failed: Dict[Hashable, str] = {}
+        for entry in self.pump():
+            sid = entry.get("session")
+            if "snapshot" in entry:
+                snapshots[sid] = entry["snapshot"]
+            elif "error" in entry and any(sid == m[0] for m in moves):
+                failed[sid] = entry["error"]
+            else:
+                self._backlog.append(entry)
+        stuck = []
+        for sid, current, target in moves:
+            if sid not in self._owner:
+                continue  # lost with a worker that exited
+            if sid in snapshots:
+                target = self.ring.node_for(sid)
+                self._pinned.pop(sid, None)
+                self._owner[sid] = target
+                self._queue(target, ("import", sid, self._charts[sid], snapshots[sid]))
+                self.migrated += 1
+            else:
+                logger.warning("session %r stays on %s: %s", sid, current, failed.get(sid, "no snapshot"))
+                self._pinned[sid] = current
+                stuck.append(sid)
+        self._backlog.extend(self.pump())
+        return stuck
+
+    def _worker_died(self, worker: str) -> List[Dict[str, Any]]:
+        """Drop a worker whose process exited and fail its sessions once.
+
+        Their state died with the process, so each gets one error entry and
+        is forgotten; later commands for it raise :class:`KeyError`.
+        """
+
+        conn = self._conns.pop(worker, None)
+        if conn is None:
+            return []
+        proc = self._procs.pop(worker)
+        self._inflight.pop(worker, None)
+        self._pending.pop(worker, None)
+        self.ring.remove(worker)
+        conn.close()
+        proc.join(timeout=2)
+        lost = [sid for sid, owner in self._owner.items() if owner == worker]
+        for sid in lost:
+            del self._owner[sid]
+            self._charts.pop(sid, None)
+            self._pinned.pop(sid, None)
+        logger.warning("worker %s exited; %d sessions lost", worker, len(lost))
+        return [{"session": sid, "error": "worker process exited"} for sid in lost]
+
+    def _stop_worker(self, name: str) -> None:
+        conn = self._conns.pop(name)
+        proc = self._procs.pop(name)
+        self._inflight.pop(name, None)
+        self._pending.pop(name, None)
+        try:
+            conn.send(None)
+        except (OSError, ValueError):
+            pass
+        proc.join(timeout=2)
+        if proc.is_alive():
+            proc.terminate()
+        conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return ``workers``, ``sessions`` per worker, ``pinned`` and ``migrated``."""
+
+        sessions = {name: 0 for name in self._conns}
+        for owner in self._owner.values():
+            sessions[owner] = sessions.get(owner, 0) + 1
+        return {
+            "workers": list(self._conns),
+            "sessions": sessions,
+            "pinned": len(self._pinned),
+            "migrated": self.migrated,
+        }
+
+    def shutdown(self) -> None:
+        """Stop all workers; their sessions are discarded."""
+
+        for name in list(self._conns):
+            self._stop_worker(name)
+
+    def __enter__(self) -> "ShardedHost":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.shutdown()
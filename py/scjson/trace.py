@@ -0,0 +1,301 @@
+"""
+Agent Name: python-trace
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Library form of the ``engine-trace`` command.
+
+The helpers here produce the standardized JSONL execution trace consumed by
+the comparison harnesses (``exec_compare``/``exec_sweep``) without spawning a
+new interpreter per chart.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, TextIO
+
+from .context import DocumentContext, ExecutionMode
+from .events import Event
+from .json_stream import JsonStreamDecoder
+from .safe_eval import SafeExpressionEvaluator
+
+__all__ = ["load_trace_context", "iter_trace", "write_trace", "trace_chart"]
+
+
+def load_trace_context(
+    input_path: str | Path,
+    *,
+    is_xml: bool,
+    unsafe_eval: bool = False,
+    expr_preset: str = "standard",
+    expr_allow: Iterable[str] = (),
+    expr_deny: Iterable[str] = (),
+    lax_mode: bool = False,
+    ordering: str = "tolerant",
+) -> DocumentContext:
+    """Build a context configured the same way ``engine-trace`` does.
+
+    Parameters
+    ----------
+    input_path: str | Path
+        SCJSON or SCXML chart.
+    is_xml: bool
+        Treat ``input_path`` as SCXML when ``True``.
+    unsafe_eval: bool
+        Allow direct Python ``eval`` for expressions when ``True``.
+    expr_preset: str
+        Sandbox preset (``standard`` or ``minimal``); ignored when unsafe.
+    expr_allow, expr_deny: Iterable[str]
+        Additional sandbox allow/deny patterns.
+    lax_mode: bool
+        Selects lax execution mode when ``True``; strict mode remains default.
+    ordering: str
+        Ordering policy for child→parent emissions.
+
+    Returns
+    -------
+    DocumentContext
+        Initialized runtime context.
+    """
+
+    execution_mode = ExecutionMode.LAX if lax_mode else ExecutionMode.STRICT
+    kwargs: Dict[str, Any] = {
+        "allow_unsafe_eval": unsafe_eval,
+        "execution_mode": execution_mode,
+    }
+    if not unsafe_eval:
+        # Minimal preset denies math.* and trims to a smaller surface
+        deny = list(expr_deny or ())
+        allow = list(expr_allow or ())
+        if (expr_preset or "standard").lower() == "minimal":
+            deny.append("math.*")
+        kwargs["evaluator"] = SafeExpressionEvaluator(
+            allow_patterns=allow or None, deny_patterns=deny or None
+        )
+    ctx = (
+        DocumentContext.from_xml_file(input_path, **kwargs)
+        if is_xml
+        else DocumentContext.from_json_file(input_path, **kwargs)
+    )
+    try:
+        ctx.ordering_mode = (ordering or "tolerant").lower()
+    except Exception:
+        pass
+    return ctx
+
+
+def _shape_step(
+    ctx: DocumentContext,
+    trace: Dict[str, Any],
+    *,
+    leaf_only: bool,
+    omit_actions: bool,
+    omit_delta: bool,
+    omit_transitions: bool,
+) -> Dict[str, Any]:
+    """Apply post-processing filters and ordering for determinism/size."""
+
+    if leaf_only:
+        leaf_ids = ctx.leaf_state_ids()
+        for key in ("configuration", "enteredStates", "exitedStates"):
+            vals = trace.get(key)
+            if isinstance(vals, list):
+                trace[key] = [v for v in vals if v in leaf_ids]
+    if omit_actions and "actionLog" in trace:
+        trace["actionLog"] = []
+    if omit_delta and "datamodelDelta" in trace:
+        trace["datamodelDelta"] = {}
+    # Ensure reproducible ordering for datamodelDelta keys
+    if not omit_delta and isinstance(trace.get("datamodelDelta"), dict):
+        dm = trace["datamodelDelta"]
+        trace["datamodelDelta"] = {k: dm[k] for k in sorted(dm)}
+    if omit_transitions and "firedTransitions" in trace:
+        trace["firedTransitions"] = []
+    return trace
+
+
+def iter_trace(
+    ctx: DocumentContext,
+    events: Iterable[Mapping[str, Any]],
+    *,
+    leaf_only: bool = False,
+    omit_actions: bool = False,
+    omit_delta: bool = False,
+    omit_transitions: bool = False,
+    emit_time_steps: bool = False,
+    max_steps: int | None = None,
+    on_limit: Callable[[], None] | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield trace steps for ``ctx`` driven by ``events``.
+
+    Step 0 is the initial configuration after eventless transitions only.
+    Event objects use ``event``/``name`` and optional ``data``; objects with
+    a positive ``advance_time`` are control tokens that advance the mock
+    clock without emitting a step unless ``emit_time_steps`` is set.
+
+    Parameters
+    ----------
+    ctx: DocumentContext
+        Initialized runtime context.
+    events: Iterable[Mapping[str, Any]]
+        Decoded event stream.
+    leaf_only: bool
+        Restrict configuration/entered/exited sets to leaf states.
+    omit_actions, omit_delta, omit_transitions: bool
+        Blank the respective trace fields.
+    emit_time_steps: bool
+        Emit a synthetic step after each ``advance_time`` token.
+    max_steps: int | None
+        Optional limit on processed event steps after the initial snapshot.
+    on_limit: Callable[[], None] | None
+        Called once when ``max_steps`` truncates the stream.
+
+    Returns
+    -------
+    Iterator[dict]
+        Trace steps in order, each carrying its ``step`` number.
+    """
+
+    shape = {
+        "leaf_only": leaf_only,
+        "omit_actions": omit_actions,
+        "omit_delta": omit_delta,
+        "omit_transitions": omit_transitions,
+    }
+    filtered_start = ctx._filter_states(ctx.configuration)
+    if leaf_only:
+        leaf_ids = ctx.leaf_state_ids()
+        filtered_start = [s for s in filtered_start if s in leaf_ids]
+    yield {
+        "step": 0,
+        "event": None,
+        "firedTransitions": [],
+        "enteredStates": sorted(filtered_start, key=ctx._activation_order_key),
+        "exitedStates": [],
+        "configuration": sorted(filtered_start, key=ctx._activation_order_key),
+        "actionLog": [],
+        "datamodelDelta": (
+            {} if omit_delta else {k: ctx.data_model[k] for k in sorted(ctx.data_model)}
+        ),
+    }
+
+    step_no = 1
+    for msg in events:
+        # Support control tokens in the event stream to advance time
+        # without emitting a trace step. This enables vectors to flush
+        # delayed <send> events between external stimuli.
+        try:
+            adv = msg.get("advance_time") if isinstance(msg, Mapping) else None
+            if isinstance(adv, (int, float)) and adv > 0:
+                ctx.advance_time(float(adv))
+                if emit_time_steps:
+                    trace = _shape_step(ctx, ctx.trace_step(Event(name="__time__", data=None)), **shape)
+                    trace["event"] = None
+                    trace["step"] = step_no
+                    yield trace
+                    step_no += 1
+                continue
+        except Exception:
+            # Fall through to normal event handling
+            pass
+        if max_steps is not None and step_no > max_steps:
+            if on_limit is not None:
+                on_limit()
+            break
+        evt_name = msg.get("event") or msg.get("name")
+        if not evt_name:
+            continue
+        trace = ctx.trace_step(Event(name=evt_name, data=msg.get("data")))
+        trace = _shape_step(ctx, trace, **shape)
+        trace["step"] = step_no
+        yield trace
+        step_no += 1
+
+
+def write_trace(
+    ctx: DocumentContext,
+    events: Iterable[Mapping[str, Any]],
+    sink: TextIO,
+    **options: Any,
+) -> int:
+    """Write the trace for ``ctx`` to ``sink`` as JSON lines.
+
+    Parameters
+    ----------
+    ctx: DocumentContext
+        Initialized runtime context.
+    events: Iterable[Mapping[str, Any]]
+        Decoded event stream.
+    sink: TextIO
+        Destination for one JSON object per line.
+    **options:
+        Keyword options accepted by :func:`iter_trace`.
+
+    Returns
+    -------
+    int
+        Number of steps written, including step 0.
+    """
+
+    count = 0
+    for step in iter_trace(ctx, events, **options):
+        sink.write(json.dumps(step) + "\n")
+        count += 1
+    return count
+
+
+def trace_chart(
+    input_path: str | Path,
+    events_path: str | Path | None,
+    out_path: str | Path,
+    *,
+    is_xml: bool,
+    advance_time: float = 0.0,
+    ordering: str = "tolerant",
+    lax_mode: bool = False,
+    **options: Any,
+) -> int:
+    """Trace a chart file against a JSONL events file, in process.
+
+    This mirrors ``scjson engine-trace -I <input> -e <events> -o <out>``
+    using the default sandbox configuration.
+
+    Parameters
+    ----------
+    input_path: str | Path
+        SCJSON or SCXML chart.
+    events_path: str | Path | None
+        Optional JSONL event stream; no events are processed when omitted.
+    out_path: str | Path
+        Destination trace file.
+    is_xml: bool
+        Treat ``input_path`` as SCXML when ``True``.
+    advance_time: float
+        Advance mock time by N seconds before processing events.
+    ordering: str
+        Ordering policy for child→parent emissions.
+    lax_mode: bool
+        Selects lax execution mode when ``True``.
+    **options:
+        Keyword options accepted by :func:`iter_trace`.
+
+    Returns
+    -------
+    int
+        Number of steps written, including step 0.
+    """
+
+    ctx = load_trace_context(input_path, is_xml=is_xml, lax_mode=lax_mode, ordering=ordering)
+    if advance_time and advance_time > 0:
+        ctx.advance_time(advance_time)
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("w", encoding="utf-8") as sink:
+        if events_path is None:
+            return write_trace(ctx, (), sink, **options)
+        with open(events_path, "r", encoding="utf-8") as stream:
+            return write_trace(ctx, JsonStreamDecoder(stream), sink, **options)
@@ -0,0 +1,454 @@
+"""
+Agent Name: python-trace-worker
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Persistent trace worker protocol.
+
+Reference engines started with ``--worker`` stay alive and serve trace jobs
+over stdin/stdout so interpreter startup is paid once per worker instead of
+once per chart. Every message is a frame: a 4-byte big-endian length followed
+by that many bytes of UTF-8 JSON.
+
+On startup a worker writes the sync marker ``\\x00SCJSON-TRACE-WORKER/1\\x00``
+before its first frame; clients discard anything that precedes it (banners,
+runtime warnings) so startup noise never desynchronizes the stream.
+
+Requests::
+
+    {"id": 1, "op": "trace", "chart": "/abs/chart.scxml",
+     "events": "/abs/chart.events.jsonl" | null, "xml": true}
+    {"id": 2, "op": "shutdown"}
+
+Responses::
+
+    {"id": 1, "ok": true, "steps": [{...}, ...]}
+    {"id": 1, "ok": false, "error": "message"}
+
+:func:`serve` implements the Python side (``scjson engine-trace --worker``);
+:class:`TraceWorkerPool` is the harness side and restarts crashed or hung
+workers, retrying the job on a fresh process.
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import struct
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Mapping, Sequence
+
+__all__ = [
+    "WorkerError",
+    "SYNC_MARKER",
+    "read_frame",
+    "skip_to_marker",
+    "write_frame",
+    "serve",
+    "TraceWorker",
+    "TraceWorkerPool",
+]
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 1 << 30
+SYNC_MARKER = b"\x00SCJSON-TRACE-WORKER/1\x00"
+
+
+class WorkerError(RuntimeError):
+    """Raised when a worker crashes, hangs, or violates the framing."""
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes | None:
+    chunks: List[bytes] = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(stream: BinaryIO) -> Dict[str, Any] | None:
+    """Read one length-prefixed JSON frame.
+
+    Parameters
+    ----------
+    stream: BinaryIO
+        Binary stream positioned at a frame boundary.
+
+    Returns
+    -------
+    dict | None
+        Decoded message, or ``None`` on a clean end of stream.
+    """
+
+    header = _read_exact(stream, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_FRAME_BYTES:
+        raise WorkerError(f"Frame of {size} bytes exceeds limit")
+    body = _read_exact(stream, size)
+    if body is None:
+        raise WorkerError("Stream ended inside a frame")
+    message = json.loads(body.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise WorkerError("Frame payload must be a JSON object")
+    return message
+
+
+def skip_to_marker(stream: BinaryIO, marker: bytes = SYNC_MARKER) -> bool:
+    """Consume ``stream`` up to and including ``marker``.
+
+    Returns
+    -------
+    bool
+        ``True`` when the marker was found, ``False`` on end of stream.
+    """
+
+    window = b""
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            return False
+        window = (window + byte)[-len(marker):]
+        if window == marker:
+            return True
+
+
+def write_frame(stream: BinaryIO, message: Mapping[str, Any]) -> None:
+    """Write ``message`` as one length-prefixed JSON frame and flush."""
+
+    body = json.dumps(message).encode("utf-8")
+    stream.write(_HEADER.pack(len(body)) + body)
+    stream.flush()
+
+
+def _trace_job(
+    request: Mapping[str, Any],
+    context_options: Mapping[str, Any],
+    trace_options: Mapping[str, Any],
+    advance_time: float,
+) -> List[Dict[str, Any]]:
+    from .json_stream import JsonStreamDecoder
+    from .trace import iter_trace, load_trace_context
+
+    ctx = load_trace_context(
+        request["chart"], is_xml=bool(request.get("xml")), **context_options
+    )
+    if advance_time and advance_time > 0:
+        ctx.advance_time(advance_time)
+    events_path = request.get("events")
+    if not events_path:
+        return list(iter_trace(ctx, (), **trace_options))
+    with open(events_path, "r", encoding="utf-8") as stream:
+        return list(iter_trace(ctx, JsonStreamDecoder(stream), **trace_options))
+
+
+def serve(
+    stdin: BinaryIO | None = None,
+    stdout: BinaryIO | None = None,
+    *,
+    context_options: Mapping[str, Any] | None = None,
+    trace_options: Mapping[str, Any] | None = None,
+    advance_time: float = 0.0,
+) -> None:
+    """Serve trace jobs until shutdown or end of input.
+
+    ``sys.stdout`` is redirected to ``sys.stderr`` while serving so stray
+    prints from user code cannot corrupt the frame stream.
+
+    Parameters
+    ----------
+    stdin, stdout: BinaryIO | None
+        Frame streams; default to the process standard streams.
+    context_options: Mapping[str, Any] | None
+        Keyword options for :func:`scjson.trace.load_trace_context`.
+    trace_options: Mapping[str, Any] | None
+        Keyword options for :func:`scjson.trace.iter_trace`.
+    advance_time: float
+        Advance mock time by N seconds before processing each job's events.
+
+    Returns
+    -------
+    None
+        Returns when a ``shutdown`` request arrives or input closes.
+    """
+
+    reader = stdin if stdin is not None else sys.stdin.buffer
+    writer = stdout if stdout is not None else sys.stdout.buffer
+    ctx_opts = dict(context_options or {})
+    tr_opts = dict(trace_options or {})
+    saved_stdout = sys.stdout
+    # Flush any pending text (e.g. the CLI banner) ahead of the marker
+    saved_stdout.flush()
+    sys.stdout = sys.stderr
+    try:
+        writer.write(SYNC_MARKER)
+        writer.flush()
+        while True:
+            request = read_frame(reader)
+            if request is None:
+                return
+            req_id = request.get("id")
+            op = request.get("op", "trace")
+            if op == "shutdown":
+                write_frame(writer, {"id": req_id, "ok": True})
+                return
+            if op == "ping":
+                write_frame(writer, {"id": req_id, "ok": True})
+                continue
+            try:
+                steps = _trace_job(request, ctx_opts, tr_opts, advance_time)
+            except Exception as exc:  # report and keep serving
+                write_frame(
+                    writer,
+                    {"id": req_id, "ok": False, "error": f"{type(exc).__name__}: {exc}"},
+                )
+                continue
+            write_frame(writer, {"id": req_id, "ok": True, "steps": steps})
+    finally:
+        sys.stdout = saved_stdout
+
+
+class TraceWorker:
+    """One long-lived worker process speaking the frame protocol.
+
+    A reader thread drains the worker's stdout into a queue so requests can
+    wait with a timeout; a worker that does not answer in time is killed.
+    """
+
+    def __init__(
+        self,
+        cmd: Sequence[str],
+        *,
+        env: Mapping[str, str] | None = None,
+        timeout: float = 60.0,
+    ) -> None:
+        self.cmd = list(cmd)
+        self.env = dict(env) if env is not None else None
+        self.timeout = timeout
+        self._proc: subprocess.Popen[bytes] | None = None
+        self._replies: queue.Queue[Dict[str, Any] | None] = queue.Queue()
+        self._next_id = 0
+        self.restarts = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self) -> None:
+        """Launch the worker process if it is not already running."""
+
+        if self.alive:
+            return
+        if self._proc is not None:
+            # Exited between requests; replace it
+            self.kill()
+            self.restarts += 1
+        self._replies = queue.Queue()
+        proc = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=self.env,
+        )
+        self._proc = proc
+        replies = self._replies
+
+        def _drain() -> None:
+            try:
+                if not skip_to_marker(proc.stdout):  # type: ignore[arg-type]
+                    replies.put(None)
+                    return
+                while True:
+                    message = read_frame(proc.stdout)  # type: ignore[arg-type]
+                    replies.put(message)
+                    if message is None:
+                        return
+            except Exception:
+                replies.put(None)
+
+        threading.Thread(target=_drain, name="scjson-trace-worker", daemon=True).start()
+
+    def kill(self) -> None:
+        """Terminate the worker process without waiting for pending work."""
+
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=5)
+        except Exception:
+            pass
+        for pipe in (proc.stdin, proc.stdout):
+            try:
+                if pipe is not None:
+                    pipe.close()
+            except Exception:
+                pass
+
+    def restart(self) -> None:
+        """Replace the worker process with a fresh one."""
+
+        self.kill()
+        self.restarts += 1
+        self.start()
+
+    def request(self, message: Mapping[str, Any]) -> Dict[str, Any]:
+        """Send ``message`` and wait for the reply carrying the same id.
+
+        Raises
+        ------
+        WorkerError
+            If the worker exits, closes its output, or exceeds ``timeout``.
+        """
+
+        self.start()
+        assert self._proc is not None and self._proc.stdin is not None
+        self._next_id += 1
+        req_id = self._next_id
+        try:
+            write_frame(self._proc.stdin, dict(message, id=req_id))
+        except (BrokenPipeError, OSError, ValueError) as exc:
+            self.kill()
+            raise WorkerError(f"Worker input closed: {exc}") from exc
+        while True:
+            try:
+                reply = self._replies.get(timeout=self.timeout)
+            except queue.Empty:
+                self.kill()
+                raise WorkerError(f"Worker did not answer within {self.timeout}s")
+            if reply is None:
+                self.kill()
+                raise WorkerError("Worker exited before answering")
+            if reply.get("id") == req_id:
+                return reply
+            # Late answer to a request we already gave up on; discard it
+
+    def close(self) -> None:
+        """Ask the worker to shut down, killing it if it does not comply."""
+
+        if self.alive:
+            try:
+                self.request({"op": "shutdown"})
+            except WorkerError:
+                pass
+        self.kill()
+
+
+class TraceWorkerPool:
+    """Fixed-size pool of :class:`TraceWorker` processes.
+
+    Workers are started lazily. A job whose worker crashes or hangs is
+    retried on a restarted worker up to ``retries`` times; engine-reported
+    errors (``ok: false``) are not retried.
+
+    Parameters
+    ----------
+    cmd: Sequence[str]
+        Worker command, typically the reference command plus ``--worker``.
+    size: int
+        Number of worker processes.
+    env: Mapping[str, str] | None
+        Environment for the worker processes.
+    timeout: float
+        Seconds to wait for each job before declaring the worker hung.
+    retries: int
+        Restarts allowed per job after a crash or hang.
+    """
+
+    def __init__(
+        self,
+        cmd: Sequence[str],
+        size: int = 1,
+        *,
+        env: Mapping[str, str] | None = None,
+        timeout: float = 60.0,
+        retries: int = 1,
+    ) -> None:
+        self.cmd = list(cmd)
+        self.retries = max(0, retries)
+        self._workers = [
+            TraceWorker(cmd, env=env, timeout=timeout) for _ in range(max(1, size))
+        ]
+        self._idle: queue.Queue[TraceWorker] = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    @property
+    def restarts(self) -> int:
+        return sum(worker.restarts for worker in self._workers)
+
+    def trace(
+        self, chart: Path | str, events: Path | str | None, *, is_xml: bool
+    ) -> List[Dict[str, Any]]:
+        """Run one trace job and return its steps.
+
+        Raises
+        ------
+        WorkerError
+            When the engine reports an error or retries are exhausted.
+        """
+
+        request = {
+            "op": "trace",
+            "chart": str(Path(chart).resolve()),
+            "events": str(Path(events).resolve()) if events is not None else None,
+            "xml": is_xml,
+        }
+        worker = self._idle.get()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    reply = worker.request(request)
+                    break
+                except WorkerError:
+                    if attempt >= self.retries:
+                        raise
+                    attempt += 1
+                    worker.restart()
+            if not reply.get("ok"):
+                raise WorkerError(str(reply.get("error") or "worker reported failure"))
+            steps = reply.get("steps")
+            return steps if isinstance(steps, list) else []
+        finally:
+            self._idle.put(worker)
+
+    def write_trace(
+        self,
+        chart: Path | str,
+        events: Path | str | None,
+        out: Path,
+        *,
+        is_xml: bool,
+    ) -> None:
+        """Run one trace job and write its steps to ``out`` as JSONL."""
+
+        steps = self.trace(chart, events, is_xml=is_xml)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with out.open("w", encoding="utf-8") as sink:
+            for step in steps:
+                sink.write(json.dumps(step) + "\n")
+
+    def close(self) -> None:
+        """Shut down every worker."""
+
+        for worker in self._workers:
+            worker.close()
+
+    def __enter__(self) -> "TraceWorkerPool":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,239 @@
+"""
+Agent Name: python-verify
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Batch chart verification for ``engine-verify`` and ``verify_sweep``.
+
+Charts run to quiescence in process (optionally across a process pool, so
+each worker imports scjson once) and report ``pass``/``fail``/``other``
+based on the final configuration, plus ``timeout`` or ``error`` when the run
+does not complete.
+"""
+
+from __future__ import annotations
+
+import glob
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+from .context import DocumentContext, ExecutionMode
+
+__all__ = [
+    "OUTCOMES",
+    "VerifyTimeout",
+    "collect_charts",
+    "verify_chart",
+    "iter_verify",
+    "verify_summary",
+]
+
+OUTCOMES = ("pass", "fail", "other", "timeout", "error")
+
+
+class VerifyTimeout(BaseException):
+    """Raised inside a chart run when its deadline expires.
+
+    Derives from ``BaseException`` so the engine's defensive
+    ``except Exception`` handlers cannot swallow it.
+    """
+
+
+@contextmanager
+def _deadline(seconds: float | None) -> Iterator[None]:
+    """Raise :class:`VerifyTimeout` in the current thread after ``seconds``.
+
+    Uses ``SIGALRM`` and therefore only applies on POSIX in the main thread;
+    elsewhere the block runs without a deadline.
+    """
+
+    if (
+        not seconds
+        or seconds <= 0
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def _expire(signum: int, frame: Any) -> None:
+        raise VerifyTimeout(f"exceeded {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, _expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def collect_charts(target: str | Path, pattern: str = "**/*.scxml") -> List[Path]:
+    """Resolve a file, directory, or glob into a sorted list of charts.
+
+    Parameters
+    ----------
+    target: str | Path
+        Chart file, directory searched with ``pattern``, or a glob.
+    pattern: str
+        Glob applied beneath a directory ``target``.
+
+    Returns
+    -------
+    List[Path]
+        Matching SCXML/SCJSON files.
+    """
+
+    path = Path(target)
+    if path.is_file():
+        return [path]
+    if path.is_dir():
+        candidates: Iterable[Path] = path.glob(pattern)
+    else:
+        candidates = (Path(p) for p in glob.glob(str(target), recursive=True))
+    return sorted(
+        p for p in candidates if p.is_file() and p.suffix.lower() in {".scxml", ".scjson"}
+    )
+
+
+def verify_chart(
+    chart: str | Path,
+    *,
+    is_xml: bool | None = None,
+    advance_time: float = 0.0,
+    max_steps: int = 2000,
+    lax_mode: bool = True,
+    timeout: float | None = None,
+) -> Dict[str, Any]:
+    """Run one chart to quiescence and classify the outcome.
+
+    Parameters
+    ----------
+    chart: str | Path
+        SCXML or SCJSON document.
+    is_xml: bool | None
+        Treat the chart as SCXML; inferred from the suffix when ``None``.
+    advance_time: float
+        Advance mock time by N seconds before running.
+    max_steps: int
+        Maximum microsteps before declaring ``other``.
+    lax_mode: bool
+        Use lax execution mode when ``True``.
+    timeout: float | None
+        Wall-clock seconds for load and run; ``None`` disables the deadline.
+
+    Returns
+    -------
+    dict
+        ``chart``, ``outcome``, ``elapsed`` seconds, and ``error`` for
+        ``timeout``/``error`` outcomes.
+    """
+
+    path = Path(chart)
+    xml = path.suffix.lower() == ".scxml" if is_xml is None else is_xml
+    mode = ExecutionMode.LAX if lax_mode else ExecutionMode.STRICT
+    result: Dict[str, Any] = {"chart": str(path), "outcome": "other"}
+    started = time.perf_counter()
+    try:
+        with _deadline(timeout):
+            ctx = (
+                DocumentContext.from_xml_file(path, execution_mode=mode)
+                if xml
+                else DocumentContext.from_json_file(path, execution_mode=mode)
+            )
+            if advance_time > 0:
+                ctx.advance_time(advance_time)
+            ctx.run(steps=max_steps)
+        config = set(ctx.configuration)
+        if "pass" in config:
+            result["outcome"] = "pass"
+        elif "fail" in config:
+            result["outcome"] = "fail"
+    except VerifyTimeout as exc:
+        result["outcome"] = "timeout"
+        result["error"] = str(exc)
+    except Exception as exc:
+        result["outcome"] = "error"
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["elapsed"] = round(time.perf_counter() - started, 6)
+    return result
+
+
+def _verify_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    chart = job.pop("chart")
+    return verify_chart(chart, **job)
+
+
+def iter_verify(
+    charts: Iterable[str | Path],
+    *,
+    jobs: int = 1,
+    **options: Any,
+) -> Iterator[Dict[str, Any]]:
+    """Verify ``charts`` and yield results in input order.
+
+    Parameters
+    ----------
+    charts: Iterable[str | Path]
+        Charts to verify.
+    jobs: int
+        Worker processes; ``1`` runs in the calling process.
+    **options:
+        Keyword options accepted by :func:`verify_chart`.
+
+    Returns
+    -------
+    Iterator[dict]
+        One result per chart.
+    """
+
+    payloads = [dict(options, chart=str(chart)) for chart in charts]
+    if jobs <= 1 or len(payloads) <= 1:
+        for payload in payloads:
+            yield _verify_job(payload)
+        return
+    workers = min(jobs, len(payloads))
+    chunksize = max(1, len(payloads) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_verify_job, payloads, chunksize=chunksize)
+
+
+def verify_summary(
+    results: Iterable[Dict[str, Any]], *, elapsed: float | None = None
+) -> Dict[str, Any]:
+    """Aggregate per-chart results into a JSON-ready summary.
+
+    Parameters
+    ----------
+    results: Iterable[dict]
+        Results from :func:`verify_chart`/:func:`iter_verify`.
+    elapsed: float | None
+        Optional wall-clock seconds for the whole batch.
+
+    Returns
+    -------
+    dict
+        ``total``, ``counts`` per outcome, summed ``chartSeconds``, optional
+        ``elapsed``, and the per-chart ``charts`` list.
+    """
+
+    charts = list(results)
+    counts = {outcome: 0 for outcome in OUTCOMES}
+    for item in charts:
+        counts[item["outcome"]] = counts.get(item["outcome"], 0) + 1
+    summary: Dict[str, Any] = {
+        "total": len(charts),
+        "counts": counts,
+        "chartSeconds": round(sum(float(item.get("elapsed", 0.0)) for item in charts), 6),
+    }
+    if elapsed is not None:
+        summary["elapsed"] = round(elapsed, 6)
+    summary["charts"] = charts
+    return summary
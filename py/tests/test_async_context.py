@@ -0,0 +1,162 @@
+"""
+Agent Name: python-async-context-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for the asyncio front end.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from scjson.async_context import AsyncDocumentContext, AsyncInvokeHandler
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+
+
+def _chart(body: str) -> str:
+    return (
+        f'<scxml {NS} initial="idle">'
+        '<datamodel><data id="result" expr="None"/></datamodel>'
+        '<state id="idle"><transition event="go" target="busy"/></state>'
+        f"{body}"
+        '<state id="left"/><final id="failed"/><final id="done"/></scxml>'
+    )
+
+
+def test_delayed_send_uses_loop_timer() -> None:
+    """A delayed ``<send>`` fires from a loop timer while the loop idles."""
+    ctx = AsyncDocumentContext.from_xml_string(
+        _chart(
+            '<state id="busy"><onentry><send event="tick" delay="0.15s"/>'
+            '<send id="never" event="late" delay="0.05s"/><cancel sendid="never"/></onentry>'
+            '<transition event="late" target="failed"/>'
+            '<transition event="tick" target="done"/></state>'
+        )
+    )
+
+    async def main():
+        await ctx.send("go")
+        started = time.monotonic()
+        steps = await ctx.run_until_done()
+        return steps, time.monotonic() - started
+
+    steps, elapsed = asyncio.run(main())
+    assert [s["event"]["name"] for s in steps] == ["go", "tick"]
+    assert steps[-1]["configuration"] == ["done"]
+    assert elapsed >= 0.14
+    assert ctx.done and ctx._timer is None
+
+
+def test_child_invocation_timers_arm_the_loop_timer() -> None:
+    """A wall-clock timer inside an in-process child completes the run."""
+    ctx = AsyncDocumentContext.from_xml_string(
+        f'<scxml {NS} initial="a">'
+        '<state id="a"><invoke id="kid" type="scxml"><content>'
+        '<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="nap">'
+        '<state id="nap"><onentry><send event="ring" target="#_parent" delay="0.1s"/></onentry></state>'
+        '</scxml></content></invoke><transition event="ring" target="b"/></state>'
+        '<final id="b"/></scxml>'
+    )
+
+    async def main():
+        return await asyncio.wait_for(ctx.run_until_done(), 5)
+
+    steps = asyncio.run(main())
+    assert steps[-1]["event"]["name"] == "ring"
+    assert ctx.done and ctx._timer is None
+
+
+def test_async_callables_and_handlers() -> None:
+    """``async def`` callables complete, fail and cancel as invocations."""
+
+    class Sleeper(AsyncInvokeHandler):
+        async def run(self):
+            await asyncio.sleep(10)
+
+    async def double(x):
+        await asyncio.sleep(0.01)
+        return x * 2
+
+    async def boom():
+        raise ValueError("nope")
+
+    def _ctx(invoke: str, extra: str = "") -> AsyncDocumentContext:
+        ctx = AsyncDocumentContext.from_xml_string(
+            _chart(
+                f'<state id="busy">{invoke}'
+                '<transition event="done.invoke.q" target="done">'
+                '<assign location="result" expr="_event.data"/></transition>'
+                f'<transition event="error.execution" target="failed"/>{extra}</state>'
+            )
+        )
+        ctx.invoke_registry.register_callable("double", double)
+        ctx.invoke_registry.register_callable("boom", boom)
+        ctx.invoke_registry.register("sleep", Sleeper)
+        return ctx
+
+    async def main():
+        ok = _ctx('<invoke id="q" type="python:double"><param name="x" expr="21"/></invoke>')
+        bad = _ctx('<invoke id="q" type="python:boom"/>')
+        slow = _ctx('<invoke id="q" type="sleep"/>', '<transition event="leave" target="left"/>')
+        for ctx in (ok, bad, slow):
+            await ctx.send("go")
+        await slow.send("leave")
+        slow.close()
+        await asyncio.gather(*(c.run_until_done() for c in (ok, bad, slow)))
+        await asyncio.sleep(0)
+        return ok, bad, slow, slow.invocations["q"].task
+
+    ok, bad, slow, task = asyncio.run(main())
+    assert ok.data_model["result"] == 42 and ok.done
+    assert "failed" in bad.configuration
+    assert "left" in slow.configuration and task.cancelled()
+
+
+def test_idle_sessions_cost_no_cpu() -> None:
+    """Many parked sessions sleep on the loop and all wake when fed."""
+    chart = _chart('<state id="busy"><transition event="finish" target="done"/></state>')
+    contexts = [AsyncDocumentContext.from_xml_string(chart) for _ in range(200)]
+
+    async def main():
+        runners = [asyncio.ensure_future(c.run_until_done()) for c in contexts]
+        for ctx in contexts:
+            await ctx.send("go")
+        await asyncio.sleep(0.05)
+        cpu = time.process_time()
+        await asyncio.sleep(0.3)
+        idle_cpu = time.process_time() - cpu
+        for ctx in contexts:
+            await ctx.send("finish")
+        results = await asyncio.gather(*runners)
+        return idle_cpu, results
+
+    idle_cpu, results = asyncio.run(main())
+    assert idle_cpu < 0.05
+    assert all(len(steps) == 2 for steps in results)
+    assert all(ctx.done for ctx in contexts)
+
+
+def test_send_waits_while_inbox_is_full() -> None:
+    """``max_pending`` suspends producers until the interpreter catches up."""
+    ctx = AsyncDocumentContext.from_xml_string(
+        _chart('<state id="busy"><transition event="finish" target="done"/></state>')
+    )
+    ctx.max_pending = 1
+
+    async def main():
+        await ctx.send("go")
+        producer = asyncio.ensure_future(ctx.send("finish"))
+        await asyncio.sleep(0.01)
+        blocked = not producer.done()
+        steps = await ctx.run_until_done()
+        await producer
+        return blocked, steps
+
+    blocked, steps = asyncio.run(main())
+    assert blocked
+    assert [s["event"]["name"] for s in steps] == ["go", "finish"]
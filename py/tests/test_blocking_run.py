@@ -0,0 +1,121 @@
+"""
+Agent Name: python-blocking-run-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for thread-safe ingestion and the blocking run loops.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from scjson.context import DocumentContext
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+COUNTER = (
+    f'<scxml {NS} initial="counting">'
+    '<datamodel><data id="n" expr="0"/></datamodel>'
+    '<state id="counting"><transition event="tick">'
+    '<assign location="n" expr="n + 1"/></transition>'
+    '<transition event="finish" target="done"/></state>'
+    '<final id="done"/></scxml>'
+)
+
+
+def test_posts_from_many_threads_are_all_processed() -> None:
+    """Concurrent producers never lose events; ``stop`` ends the loop."""
+    ctx = DocumentContext.from_xml_string(COUNTER)
+
+    def produce() -> None:
+        for _ in range(500):
+            ctx.post("tick")
+
+    producers = [threading.Thread(target=produce) for _ in range(4)]
+
+    def feed() -> None:
+        for thread in producers:
+            thread.start()
+        for thread in producers:
+            thread.join()
+        ctx.stop()
+
+    feeder = threading.Thread(target=feed)
+    feeder.start()
+    ctx.run_forever()
+    feeder.join()
+    assert ctx.data_model["n"] == 2000
+    assert "counting" in ctx.configuration
+
+
+def test_run_until_idle_sleeps_until_the_next_timer() -> None:
+    """Pending timers keep the loop waiting; ``timeout`` bounds the wait."""
+    chart = (
+        f'<scxml {NS} initial="a">'
+        '<state id="a"><onentry><send event="t" delay="0.2s"/></onentry>'
+        '<transition event="t" target="b"/></state><state id="b"/></scxml>'
+    )
+    ctx = DocumentContext.from_xml_string(chart)
+    assert ctx.run_until_idle(timeout=0.02) is False
+    assert "a" in ctx.configuration
+    started, cpu = time.monotonic(), time.process_time()
+    assert ctx.run_until_idle() is True
+    assert time.monotonic() - started >= 0.15
+    assert time.process_time() - cpu < 0.05
+    assert "b" in ctx.configuration
+
+
+def test_idle_run_forever_uses_no_cpu_and_ends_at_final() -> None:
+    """A parked loop wakes for a posted event and returns at a final state."""
+    ctx = DocumentContext.from_xml_string(COUNTER)
+    runner = threading.Thread(target=ctx.run_forever)
+    runner.start()
+    time.sleep(0.05)
+    cpu = time.process_time()
+    time.sleep(0.3)
+    assert time.process_time() - cpu < 0.05
+    ctx.post("tick")
+    ctx.post("finish")
+    runner.join(5)
+    assert not runner.is_alive()
+    assert ctx.done and ctx.data_model["n"] == 1
+
+
+def test_invocation_results_wake_the_loop() -> None:
+    """A ``python:`` call completes ``run_until_idle`` without polling."""
+    chart = (
+        f'<scxml {NS} initial="idle">'
+        '<state id="idle"><transition event="go" target="busy"/></state>'
+        '<state id="busy"><invoke id="q" type="python:nap"/>'
+        '<transition event="done.invoke.q" target="done"/></state>'
+        '<final id="done"/></scxml>'
+    )
+    ctx = DocumentContext.from_xml_string(chart)
+    ctx.invoke_registry.register_callable("nap", lambda: time.sleep(0.1))
+    ctx.post("go")
+    assert ctx.run_until_idle(timeout=5) is True
+    assert ctx.done
+
+
+def test_child_timers_wake_the_loop() -> None:
+    """Wall-clock timers of an in-process child fire under both loops."""
+    chart = (
+        f'<scxml {NS} initial="a">'
+        '<state id="a"><invoke id="kid" type="scxml"><content>'
+        '<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="nap">'
+        '<state id="nap"><onentry><send event="ring" target="#_parent" delay="0.1s"/></onentry></state>'
+        '</scxml></content></invoke><transition event="ring" target="b"/></state>'
+        '<final id="b"/></scxml>'
+    )
+    ctx = DocumentContext.from_xml_string(chart)
+    assert ctx.run_until_idle(timeout=5) is True
+    assert ctx.done
+    ctx = DocumentContext.from_xml_string(chart)
+    runner = threading.Thread(target=ctx.run_forever)
+    runner.start()
+    runner.join(5)
+    assert not runner.is_alive()
+    assert ctx.done
@@ -0,0 +1,116 @@
+"""
+Agent Name: python-child-chart-cache-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for the shared ``<invoke>`` child chart cache.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from scjson.context import DocumentContext
+from scjson.invoke import CHILD_CHART_CACHE, ChildChartCache, child_chart_cache_stats
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml"'
+PARENT = (
+    f'<scxml {NS} datamodel="python" initial="idle">'
+    '<state id="idle"><transition event="req" target="busy"/></state>'
+    '<state id="busy"><invoke id="w" type="scxml" src="worker.scxml"/>'
+    '<transition event="reset" target="idle"/></state></scxml>'
+)
+
+
+def _worker(initial: str) -> str:
+    return (
+        f'<scxml {NS} datamodel="python" initial="{initial}">'
+        '<datamodel><data id="count" expr="0"/></datamodel>'
+        '<state id="a"><transition event="bump" target="b">'
+        '<assign location="count" expr="count + 1"/></transition></state>'
+        '<state id="b"/></scxml>'
+    )
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    CHILD_CHART_CACHE.clear()
+    yield
+    CHILD_CHART_CACHE.clear()
+
+
+def test_file_children_share_prepared_chart(tmp_path: Path) -> None:
+    """Repeated invocations of one file load it once and stay independent."""
+    (tmp_path / "parent.scxml").write_text(PARENT, encoding="utf-8")
+    worker = tmp_path / "worker.scxml"
+    worker.write_text(_worker("a"), encoding="utf-8")
+    ctx = DocumentContext.from_xml_file(tmp_path / "parent.scxml")
+
+    ctx.enqueue("req")
+    ctx.run()
+    first = ctx.invocations["w"].child
+    first.enqueue("bump")
+    first.run()
+    ctx.enqueue("reset")
+    ctx.run()
+    ctx.enqueue("req")
+    ctx.run()
+    second = ctx.invocations["w"].child
+
+    assert second is not first and second.doc is first.doc
+    assert "b" in first.configuration and first.data_model["count"] == 1
+    assert "a" in second.configuration and second.data_model["count"] == 0
+    assert child_chart_cache_stats()["hits"] == 1
+    assert child_chart_cache_stats()["misses"] == 1
+
+    # Editing the file invalidates its entry.
+    worker.write_text(_worker("b"), encoding="utf-8")
+    os.utime(worker, ns=(0, 0))
+    ctx.enqueue("reset")
+    ctx.run()
+    ctx.enqueue("req")
+    ctx.run()
+    assert "b" in ctx.invocations["w"].child.configuration
+    assert child_chart_cache_stats()["misses"] == 2
+    assert child_chart_cache_stats()["entries"] == 1
+
+
+def test_inline_content_is_cached_by_content() -> None:
+    """Inline ``<content>`` children are prepared once per distinct body."""
+    chart = Path(__file__).resolve().parents[2] / "tests" / "exec" / "invoke_inline.scxml"
+    for _ in range(3):
+        ctx = DocumentContext.from_xml_file(chart)
+        ctx.enqueue("go")
+        ctx.run()
+        assert "done" in ctx.configuration
+    stats = child_chart_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_cache_is_bounded_and_can_be_disabled(tmp_path: Path) -> None:
+    """The LRU evicts beyond ``max_entries``; ``0`` disables storage."""
+    charts = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.scxml"
+        path.write_text(_worker("a"), encoding="utf-8")
+        charts.append(path)
+    cache = ChildChartCache(max_entries=2)
+    for path in charts + charts[-1:]:
+        cache.load_file(path)
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 3,
+        "evictions": 1,
+        "entries": 2,
+        "max_entries": 2,
+    }
+    off = ChildChartCache(max_entries=0)
+    off.load_file(charts[0])
+    off.load_file(charts[0])
+    assert off.stats()["misses"] == 2 and off.stats()["entries"] == 0
@@ -208,3 +208,169 @@ def test_document_context_invalid_datamodel():
     doc = Scxml(state=[{"id": "a"}], datamodel_attribute="ecmascript", version=1.0)
     with pytest.raises(ValueError):
         DocumentContext.from_doc(doc)
+
+
+def _failed_files(output):
+    """Return the paths named by "Failed to convert" lines, sorted."""
+    prefix = "Failed to convert "
+    return sorted(
+        line[len(prefix):].split(": ", 1)[0] for line in output.splitlines() if line.startswith(prefix)
+    )
+
+
+def test_parallel_conversion_matches_serial(tmp_path):
+    """``--jobs`` produces the same files and ordered output as a serial run."""
+    src_dir = tmp_path / "src"
+    src_dir.mkdir()
+    for name in ["c", "a", "b"]:
+        (src_dir / f"{name}.scxml").write_text(_create_scxml(Path(name)))
+    (src_dir / "broken.scxml").write_text("not xml")
+    runner = CliRunner()
+    results = {}
+    for jobs in ["1", "3"]:
+        out_dir = tmp_path / f"out{jobs}"
+        result = runner.invoke(main, ["json", str(src_dir), "-o", str(out_dir), "-j", jobs])
+        assert result.exit_code == 1
+        results[jobs] = result.output.replace(str(out_dir), "OUT")
+        assert sorted(p.name for p in out_dir.iterdir()) == ["a.scjson", "b.scjson", "c.scjson"]
+    assert results["1"] == results["3"]
+    assert results["1"].index("a.scjson") < results["1"].index("b.scjson") < results["1"].index("c.scjson")
+    assert _failed_files(results["1"]) == [str(src_dir / "broken.scxml")]
+
+
+def test_conversion_exit_status_names_failing_files(tmp_path):
+    """Clean trees exit 0; each failing file is named and the run exits 1."""
+    handler = SCXMLDocumentHandler()
+    xml_dir = tmp_path / "xml"
+    json_dir = tmp_path / "json"
+    (xml_dir / "sub").mkdir(parents=True)
+    (json_dir / "sub").mkdir(parents=True)
+    for name in ["a", "sub/b"]:
+        (xml_dir / f"{name}.scxml").write_text(_create_scxml(Path(name)))
+        (json_dir / f"{name}.scjson").write_text(_create_scjson(handler))
+    runner = CliRunner()
+    clean = runner.invoke(main, ["json", str(xml_dir), "-r", "-o", str(tmp_path / "out1")])
+    assert clean.exit_code == 0, clean.output
+    clean = runner.invoke(main, ["xml", str(json_dir), "-r", "-o", str(tmp_path / "out2")])
+    assert clean.exit_code == 0, clean.output
+
+    (xml_dir / "sub" / "bad.scxml").write_text("not xml at all <<")
+    (json_dir / "broken.scjson").write_text("{")
+    failed = runner.invoke(main, ["json", str(xml_dir), "-r", "-o", str(tmp_path / "out3")])
+    assert failed.exit_code == 1
+    assert _failed_files(failed.output) == [str(xml_dir / "sub" / "bad.scxml")]
+    assert (tmp_path / "out3" / "sub" / "b.scjson").exists()
+    failed = runner.invoke(main, ["xml", str(json_dir), "-r", "-o", str(tmp_path / "out4")])
+    assert failed.exit_code == 1
+    assert _failed_files(failed.output) == [str(json_dir / "broken.scjson")]
+    verify = runner.invoke(main, ["json", str(xml_dir), "-r", "-v"])
+    assert verify.exit_code == 1
+    assert _failed_files(verify.output) == [str(xml_dir / "sub" / "bad.scxml")]
+
+
+def test_parallel_validation_reports_every_failure(tmp_path):
+    """Validation across workers reports all failures and exits non-zero."""
+    src_dir = tmp_path / "src"
+    src_dir.mkdir()
+    (src_dir / "good.scxml").write_text(_create_scxml(Path("good")))
+    (src_dir / "bad1.scxml").write_text("not xml")
+    (src_dir / "bad2.scjson").write_text("{")
+    result = CliRunner().invoke(main, ["validate", str(src_dir), "-j", "2"])
+    assert result.exit_code == 1
+    assert "Validation failed for" in result.output
+    assert str(src_dir / "bad1.scxml") in result.output
+    assert str(src_dir / "bad2.scjson") in result.output
+    assert "good.scxml" not in result.output
+
+
+def test_incremental_conversion_skips_unchanged(tmp_path):
+    """Manifest-driven runs convert only changed sources and prune orphans."""
+    src_dir = tmp_path / "src"
+    (src_dir / "nested").mkdir(parents=True)
+    for name in ["a", "b", "nested/c"]:
+        (src_dir / f"{name}.scxml").write_text(_create_scxml(Path(name)))
+    out_dir = tmp_path / "out"
+    runner = CliRunner()
+    args = ["json", str(src_dir), "-r", "-o", str(out_dir), "--incremental"]
+
+    first = runner.invoke(main, args)
+    assert first.exit_code == 0
+    assert first.output.count("Wrote ") == 3
+    assert "Skipped 0 unchanged file(s)" in first.output
+    assert (out_dir / ".scjson-manifest.json").exists()
+
+    (src_dir / "a.scxml").write_text(
+        '<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="s"><state id="s"/></scxml>'
+    )
+    (src_dir / "nested" / "c.scxml").unlink()
+    (out_dir / "b.scjson").write_text("tampered")
+    second = runner.invoke(main, args)
+    assert second.exit_code == 0
+    assert f"Wrote {out_dir / 'a.scjson'}" in second.output
+    assert f"Wrote {out_dir / 'b.scjson'}" in second.output
+    assert f"Removed {out_dir / 'nested' / 'c.scjson'}" in second.output
+    assert not (out_dir / "nested" / "c.scjson").exists()
+
+    third = runner.invoke(main, args)
+    assert "Wrote " not in third.output
+    assert "Skipped 2 unchanged file(s)" in third.output
+
+    rebuilt = runner.invoke(main, args + ["--keep-empty"])
+    assert rebuilt.output.count("Wrote ") == 2
+
+
+def test_incremental_scope_change_and_failures_keep_outputs(tmp_path):
+    """Dropping ``-r`` or failing a conversion never deletes a good output."""
+    src_dir = tmp_path / "src"
+    (src_dir / "nested").mkdir(parents=True)
+    for name in ["a", "nested/c"]:
+        (src_dir / f"{name}.scxml").write_text(_create_scxml(Path(name)))
+    runner = CliRunner()
+    args = ["json", str(src_dir), "--incremental"]
+
+    assert runner.invoke(main, args + ["-r"]).exit_code == 0
+    flat = runner.invoke(main, args)
+    assert "Removed" not in flat.output
+    assert (src_dir / "nested" / "c.scjson").exists()
+
+    runner.invoke(main, args + ["-r"])
+    (src_dir / "a.scxml").write_text("not xml at all <<")
+    failed = runner.invoke(main, args + ["-r"])
+    assert failed.exit_code == 1 and "Failed to convert" in failed.output
+    assert (src_dir / "a.scjson").exists()
+    manifest = json.loads((src_dir / ".scjson-manifest.json").read_text())
+    assert manifest["entries"]["a.scxml"]["source"] is None
+
+    (src_dir / "a.scxml").unlink()
+    gone = runner.invoke(main, args + ["-r"])
+    assert gone.exit_code == 0
+    assert f"Removed {src_dir / 'a.scjson'}" in gone.output
+    assert (src_dir / "nested" / "c.scjson").exists()
+
+
+def test_validate_with_cached_schema(tmp_path):
+    """``validate --schema`` checks SCXML against one compiled XSD."""
+    from scjson.SCXMLDocumentHandler import compiled_schema
+
+    xsd = Path(__file__).resolve().parents[2] / "xsd" / "scxml.xsd"
+    src_dir = tmp_path / "src"
+    src_dir.mkdir()
+    (src_dir / "ok.scxml").write_text(
+        '<scxml xmlns="http://www.w3.org/2005/07/scxml" version="1.0" initial="a"><state id="a"/></scxml>'
+    )
+    (src_dir / "noversion.scxml").write_text(_create_scxml(Path("noversion")))
+    handler = SCXMLDocumentHandler()
+    (src_dir / "ok.scjson").write_text(handler.xml_to_json((src_dir / "ok.scxml").read_text()))
+
+    result = CliRunner().invoke(main, ["validate", str(src_dir), "--schema", str(xsd), "-j", "2"])
+    assert result.exit_code == 1
+    assert f"Validation failed for {src_dir / 'noversion.scxml'}: schema:" in result.output
+    assert "ok.scxml" not in result.output and "ok.scjson" not in result.output
+    assert CliRunner().invoke(main, ["validate", str(src_dir)]).exit_code == 0
+
+    assert compiled_schema(xsd) is compiled_schema(str(xsd))
+    cached = SCXMLDocumentHandler(schema_path=str(xsd))
+    assert cached.schema is compiled_schema(xsd)
+    assert cached.validate(str(src_dir / "ok.scxml"))
+    assert SCXMLDocumentHandler().serializer is handler.serializer
+    assert SCXMLDocumentHandler().parser.context is handler.parser.context
@@ -0,0 +1,51 @@
+"""
+Agent Name: python-cli-startup-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Import-regression guard for CLI startup (see ``benchmarks/bench_startup.py``).
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCH = Path(__file__).resolve().parents[1] / "benchmarks" / "bench_startup.py"
+_spec = importlib.util.spec_from_file_location("bench_startup", BENCH)
+bench_startup = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench_startup)
+
+
+def _heavy(modules: list[str], forbidden: tuple[str, ...]) -> list[str]:
+    return [m for m in forbidden if any(x == m or x.startswith(m + ".") for x in modules)]
+
+
+def test_help_does_not_import_engine_or_models() -> None:
+    """``scjson --help`` loads neither the engine, models nor codegen."""
+    _, modules = bench_startup.run_scenario(["--help"], 1)
+    assert _heavy(modules, bench_startup.HEAVY) == []
+
+
+def test_conversion_does_not_import_engine(tmp_path: Path) -> None:
+    """A plain ``json`` conversion skips the engine and jinja2 codegen."""
+    chart = tmp_path / "chart.scxml"
+    chart.write_text('<scxml xmlns="http://www.w3.org/2005/07/scxml"/>', encoding="utf-8")
+    _, modules = bench_startup.run_scenario(["json", str(chart)], 1)
+    assert "scjson.dataclasses" in modules
+    assert _heavy(modules, ("scjson.context", "scjson.pydantic", "jinja2")) == []
+
+
+def test_package_exports_resolve_lazily() -> None:
+    """Public names on ``scjson`` still import on first access."""
+    import scjson
+
+    assert scjson.DocumentContext.__name__ == "DocumentContext"
+    assert scjson.Event is sys.modules["scjson.events"].Event
+    with pytest.raises(AttributeError):
+        scjson.does_not_exist  # noqa: B018
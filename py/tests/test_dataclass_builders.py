@@ -0,0 +1,98 @@
+"""
+Agent Name: python-dataclass-builder-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for the compiled JSON → dataclass builders.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from decimal import Decimal
+from pathlib import Path
+
+from xsdata.formats.dataclass.models.generics import AnyElement
+
+from scjson import SCXMLDocumentHandler as handler_module
+from scjson.SCXMLDocumentHandler import SCXMLDocumentHandler, _builder
+from scjson.dataclasses import BooleanDatatype, Scxml, State, Transition
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_round_trip_is_stable_for_exec_charts() -> None:
+    """json_to_xml over compiled builders preserves every example chart."""
+    handler = SCXMLDocumentHandler()
+    checked = 0
+    for chart in sorted((ROOT / "tests" / "exec").glob("*.scxml")):
+        try:
+            json_str = handler.xml_to_json(chart.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        assert handler.xml_to_json(handler.json_to_xml(json_str)) == json_str, chart.name
+        checked += 1
+    assert checked > 5
+
+
+def test_builders_handle_recursion_coercion_and_fallbacks() -> None:
+    """Nested types, Decimal/Enum coercion and Optional fallbacks convert."""
+    handler = SCXMLDocumentHandler()
+    data = {
+        "version": 1.0,
+        "state": [
+            {
+                "id": "outer",
+                "state": [{"id": "inner", "transition": [{"target": ["outer"], "event": "go"}]}],
+            }
+        ],
+        "other_element": [{"qname": "{urn:x}note", "text": "hi", "attributes": {"a": "1"}}],
+    }
+    model = handler._to_dataclass(Scxml, data)
+    assert model.version == Decimal("1.0")
+    inner = model.state[0].state[0]
+    assert isinstance(inner, State) and isinstance(inner.transition[0], Transition)
+    assert inner.transition[0].target == ["outer"]
+    assert isinstance(model.other_element[0], AnyElement)
+    assert model.other_element[0].attributes == {"a": "1"}
+
+    data_el = handler._to_dataclass(
+        Transition, {"type_value": "internal", "cond": None}
+    )
+    assert data_el.cond is None
+    assert handler._to_dataclass(BooleanDatatype, "true") is BooleanDatatype.TRUE
+    assert handler._to_dataclass(BooleanDatatype, "maybe") == "maybe"
+    assert _builder(State) is _builder("State")
+    assert json.loads(handler.xml_to_json(handler.to_string(model)))["state"][0]["id"] == "outer"
+
+
+def test_builders_compile_safely_on_first_concurrent_use(monkeypatch) -> None:
+    """Threads racing on an empty cache never see a half-built builder."""
+    monkeypatch.setattr(handler_module, "_BUILDERS", {})
+    handler = SCXMLDocumentHandler()
+    chart = next(iter(sorted((ROOT / "tests" / "exec").glob("*.scxml"))))
+    data = json.loads(handler.xml_to_json(chart.read_text(encoding="utf-8")))
+    expected = handler.to_string(handler._to_dataclass(Scxml, data))
+    monkeypatch.setattr(handler_module, "_BUILDERS", {})
+    start = threading.Barrier(8)
+    results: list = []
+    errors: list = []
+
+    def convert() -> None:
+        start.wait()
+        try:
+            results.append(handler.to_string(handler._to_dataclass(Scxml, data)))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=convert) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert results == [expected] * 8
+    assert not handler_module._PENDING_BUILDERS
@@ -0,0 +1,86 @@
+"""
+Agent Name: python-engine-verify-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for single-chart and batch ``engine-verify``.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from scjson.cli import main
+from scjson.verify import iter_verify, verify_chart
+
+HEADER = '<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="a">'
+CHARTS = {
+    "ok": HEADER + '<state id="a"><transition target="pass"/></state><final id="pass"/></scxml>',
+    "bad": HEADER + '<state id="a"><transition target="fail"/></state><final id="fail"/></scxml>',
+    "loop": HEADER
+    + '<state id="a"><transition target="b"/></state>'
+    + '<state id="b"><transition target="a"/></state></scxml>',
+}
+
+
+def _write_charts(root: Path, names=("ok", "bad", "loop")) -> Path:
+    root.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        (root / f"{name}.scxml").write_text(CHARTS[name], encoding="utf-8")
+    return root
+
+
+def test_single_chart_keeps_outcome_and_exit_code(tmp_path: Path) -> None:
+    """One chart without ``--summary`` prints ``outcome:`` as before."""
+    root = _write_charts(tmp_path / "charts", ("ok", "bad"))
+    runner = CliRunner()
+    passed = runner.invoke(main, ["engine-verify", "-I", str(root / "ok.scxml"), "--xml"])
+    assert passed.exit_code == 0
+    assert "outcome: pass" in passed.output
+    failed = runner.invoke(main, ["engine-verify", "-I", str(root / "bad.scxml"), "--xml"])
+    assert failed.exit_code == 1
+    assert "outcome: fail" in failed.output
+
+
+def test_eventless_loop_times_out(tmp_path: Path) -> None:
+    """A runaway eventless loop is reported as ``timeout``, not hung."""
+    root = _write_charts(tmp_path / "charts", ("loop",))
+    result = verify_chart(root / "loop.scxml", timeout=0.5)
+    assert result["outcome"] == "timeout"
+    assert result["error"] == "exceeded 0.5s"
+    assert result["elapsed"] < 5
+
+
+def test_batch_verify_writes_summary(tmp_path: Path) -> None:
+    """A directory runs across workers and summarizes every outcome."""
+    root = _write_charts(tmp_path / "charts")
+    summary = tmp_path / "summary.json"
+    result = CliRunner().invoke(
+        main,
+        [
+            "engine-verify",
+            "-I",
+            str(root),
+            "--xml",
+            "-j",
+            "2",
+            "--timeout",
+            "1",
+            "--summary",
+            str(summary),
+        ],
+    )
+    assert result.exit_code == 1
+    assert "Verify summary: total=3 pass=1 fail=1 other=0 timeout=1 error=0" in result.output
+    data = json.loads(summary.read_text(encoding="utf-8"))
+    assert data["jobs"] == 2
+    outcomes = {Path(item["chart"]).stem: item["outcome"] for item in data["charts"]}
+    assert outcomes == {"bad": "fail", "loop": "timeout", "ok": "pass"}
+
+    serial = [item["outcome"] for item in iter_verify(sorted(root.glob("*.scxml")), timeout=1)]
+    assert serial == [item["outcome"] for item in data["charts"]]
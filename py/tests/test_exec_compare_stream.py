@@ -0,0 +1,106 @@
+"""
+Agent Name: python-exec-compare-stream-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for the streaming trace diff and rolling-hash bisection.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "py"))
+
+from exec_compare import (  # noqa: E402
+    _bisect_trace_files,
+    _diff_steps,
+    _diff_trace_files,
+    _normalize_step,
+)
+
+NORMALIZE = partial(
+    _normalize_step,
+    leaf_ids=None,
+    keep_step0_states=True,
+    omit_actions=False,
+    omit_delta=False,
+    omit_transitions=False,
+)
+
+
+def _step(idx: int, state: str = "s0") -> dict:
+    return {
+        "step": idx,
+        "event": {"name": "tick", "data": None} if idx else None,
+        "firedTransitions": [],
+        "enteredStates": [],
+        "exitedStates": [],
+        "configuration": [state],
+        "actionLog": [],
+        "datamodelDelta": {"n": idx},
+    }
+
+
+def _write(path: Path, count: int, diverge: dict[int, str] | None = None) -> Path:
+    diverge = diverge or {}
+    with path.open("w", encoding="utf-8") as sink:
+        for idx in range(count):
+            sink.write(json.dumps(_step(idx, diverge.get(idx, "s0"))) + "\n")
+    return path
+
+
+def test_streaming_diff_matches_in_memory_diff(tmp_path: Path) -> None:
+    """The first reported divergence agrees with the list-based diff."""
+    left = _write(tmp_path / "left.jsonl", 50, {17: "s1"})
+    right = _write(tmp_path / "right.jsonl", 52)
+    streamed = _diff_trace_files(left, right, NORMALIZE)
+    loaded = [
+        [NORMALIZE(json.loads(line)) for line in path.read_text().splitlines()]
+        for path in (left, right)
+    ]
+    in_memory = _diff_steps(*loaded)
+    assert streamed[0] is True
+    assert streamed[1][0].startswith("Length mismatch")
+    assert streamed[1][1:3] == in_memory[1][1:3]
+    # Totals stay exact even though comparison stopped at step 17
+    assert streamed[2] == (50, 52, 18, 1)
+
+
+def test_streaming_diff_limits_reported_mismatches(tmp_path: Path) -> None:
+    """Comparison stops after N mismatching steps."""
+    left = _write(tmp_path / "left.jsonl", 100, {3: "x", 5: "x", 9: "x"})
+    right = _write(tmp_path / "right.jsonl", 100)
+    mismatch, notes, stats = _diff_trace_files(left, right, NORMALIZE, max_mismatches=2)
+    assert mismatch
+    assert [n for n in notes if n.startswith("Step ")] == ["Step 3:", "Step 5:"]
+    assert notes[-1].startswith("Stopped after 2 mismatching step(s)")
+    assert stats == (100, 100, 6, 2)
+    assert not _diff_trace_files(right, right, NORMALIZE)[0]
+
+
+def test_bisect_locates_first_divergence(tmp_path: Path) -> None:
+    """Checkpoint bisection finds the exact first divergent step."""
+    left = _write(tmp_path / "left.jsonl", 5000, {3210: "s1", 4000: "s1"})
+    right = _write(tmp_path / "right.jsonl", 5000)
+    mismatch, notes, stats = _bisect_trace_files(left, right, NORMALIZE, stride=128)
+    assert mismatch
+    assert notes[0] == "Step 3210:"
+    assert stats == (5000, 5000, 3210, 1)
+
+    shorter = _write(tmp_path / "short.jsonl", 4097)
+    mismatch, notes, stats = _bisect_trace_files(right, shorter, NORMALIZE, stride=128)
+    assert mismatch
+    assert notes == ["Length mismatch: python trace has 5000 steps, reference has 4097."]
+    assert stats[2] == 4097
+
+    assert _bisect_trace_files(right, right, NORMALIZE, stride=128) == (
+        False,
+        [],
+        (5000, 5000, 5000, 0),
+    )
@@ -62,3 +62,101 @@ def test_exec_sweep_generates_coverage_summary(tmp_path: Path) -> None:
     assert "totals" in data and "charts" in data
     # Expect the chart path to be present in the charts map (stringified path)
     assert any(str(chart) in k or k == str(chart) for k in data["charts"].keys())
+
+
+def test_exec_sweep_parallel_reuses_result_cache(tmp_path: Path) -> None:
+    root = Path(__file__).resolve().parents[2]
+    charts_dir = tmp_path / "charts"
+    charts_dir.mkdir(parents=True, exist_ok=True)
+    for name, target in (("a", "s1"), ("b", "s0")):
+        (charts_dir / f"{name}.scxml").write_text(
+            (
+                f"""
+                <scxml initial="s0" xmlns="http://www.w3.org/2005/07/scxml">
+                  <state id="s0"><transition event="go" target="{target}"/></state>
+                  <state id="s1"/>
+                </scxml>
+                """
+            ).strip(),
+            encoding="utf-8",
+        )
+        (charts_dir / f"{name}.events.jsonl").write_text('{"event": "go"}\n', encoding="utf-8")
+
+    workdir = tmp_path / "artifacts"
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(root / "py")
+    cmd = [
+        sys.executable,
+        str(root / "py" / "exec_sweep.py"),
+        str(charts_dir),
+        "--workdir",
+        str(workdir),
+        "--reference",
+        f"{sys.executable} -m scjson.cli engine-trace",
+        "--jobs",
+        "2",
+    ]
+    first = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env)
+    assert first.returncode == 0, f"stdout:\n{first.stdout}\n\nstderr:\n{first.stderr}"
+    assert "Reused cached results" not in first.stdout
+    assert (workdir / "a" / "python.trace.jsonl").exists()
+    assert list((workdir / ".sweep-cache").rglob("*.json"))
+
+    second = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env)
+    assert second.returncode == 0, second.stdout
+    assert "Reused cached results for 2 of 2 charts" in second.stdout
+
+    # Editing a chart invalidates only its own entry
+    chart_a = charts_dir / "a.scxml"
+    chart_a.write_text(chart_a.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    third = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env)
+    assert third.returncode == 0, third.stdout
+    assert "Reused cached results for 1 of 2 charts" in third.stdout
+
+
+def test_exec_sweep_records_engine_crashes_as_errors(tmp_path: Path, monkeypatch) -> None:
+    """An exception in the Python engine is reported, not replaced by a fallback trace."""
+    root = Path(__file__).resolve().parents[2]
+    monkeypatch.syspath_prepend(str(root / "py"))
+    import exec_sweep
+
+    chart = tmp_path / "boom.scxml"
+    chart.write_text(
+        '<scxml initial="s0" xmlns="http://www.w3.org/2005/07/scxml"><state id="s0"/></scxml>',
+        encoding="utf-8",
+    )
+    (tmp_path / "boom.events.jsonl").write_text('{"event": "go"}\n', encoding="utf-8")
+
+    def crash(*_args, **_kwargs):
+        raise KeyError("engine bug")
+
+    monkeypatch.setattr(exec_sweep, "trace_chart", crash)
+    job = {
+        "chart": str(chart),
+        "scratch": str(tmp_path / "work"),
+        "reference": "python -m scjson.cli engine-trace",
+        "explicit_reference": True,
+        "python_reference": "python -m scjson.cli engine-trace",
+        "scion_reference": None,
+        "scion_ready": False,
+        "env": dict(os.environ),
+        "reference_worker": False,
+        "reference_timeout": None,
+        "engine": "test",
+        "cache_dir": None,
+        "generate_vectors": False,
+        "gen_depth": 1,
+        "gen_limit": 1,
+        "gen_variants_per_event": 1,
+        "leaf_only": True,
+        "keep_step0_states": False,
+        "omit_actions": True,
+        "omit_delta": True,
+        "omit_transitions": True,
+        "advance_time": 0.0,
+        "ordering": "tolerant",
+    }
+    result = exec_sweep._sweep_chart(job)
+    assert result["status"] == "error"
+    assert "KeyError" in result["output"] and "engine bug" in result["output"]
+    assert not (tmp_path / "work" / "python.trace.jsonl").exists()
@@ -0,0 +1,73 @@
+"""
+Agent Name: python-flat-transitions-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for the flat-region transition table.
+"""
+
+from __future__ import annotations
+
+from scjson.context import DocumentContext
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+CHART = (
+    f'<scxml {NS} initial="ops">'
+    '<datamodel><data id="n" expr="0"/></datamodel>'
+    '<state id="ops" initial="idle">'
+    '<transition event="reset" target="idle"/>'
+    '<state id="idle"><transition event="start" target="running"/>'
+    '<transition event="noop"/></state>'
+    '<state id="running"><transition event="pause pause.*" target="paused"/>'
+    '<transition event="stop" cond="n &gt; 0" target="idle"/>'
+    '<transition event="stop" target="idle"/>'
+    '<transition event="tick"><assign location="n" expr="n + 1"/></transition></state>'
+    '<state id="paused"><onexit><log label="resume" expr="n"/></onexit>'
+    '<transition event="start" target="running"/></state>'
+    "</state>"
+    '<parallel id="both"><state id="left"/><state id="right"/></parallel>'
+    "</scxml>"
+)
+EVENTS = ["start", "tick", "pause.soft", "noop", "start", "stop", "start", "stop", "reset", "other", "start"]
+
+
+def _run(flat: bool) -> DocumentContext:
+    ctx = DocumentContext.from_xml_string(CHART)
+    ctx.flat_transitions = flat
+    return ctx
+
+
+def test_flat_table_matches_general_path() -> None:
+    """Configurations, data and traces agree with the table on and off."""
+    fast, slow = _run(True), _run(False)
+    for name in EVENTS:
+        fast.enqueue(name)
+        slow.enqueue(name)
+        assert fast.trace_step() == slow.trace_step()
+        fast.run()
+        slow.run()
+        assert fast.configuration == slow.configuration
+        assert fast.data_model == slow.data_model
+        assert fast.action_log == slow.action_log
+    assert fast.data_model["n"] == 1 and fast.action_log == ["resume:1"]
+
+
+def test_only_guard_and_action_free_moves_are_compiled() -> None:
+    """Guards, executable content, ancestor transitions and onexit use the general path."""
+    ctx = _run(True)
+    assert set(ctx._flat_states) == {"idle", "running"}
+    for name in ["start", "pause.soft", "start", "tick", "stop", "noop", "reset", "other"]:
+        ctx.enqueue(name)
+        ctx.run()
+    table = ctx._flat_table
+    step = table[("idle", "start")]
+    assert (step.source.id, step.exited, step.entered) == ("idle", ("idle",), ("running",))
+    assert table[("idle", "noop")].entered == ()
+    assert table[("idle", "other")].source is None
+    assert table[("idle", None)].source is None
+    # Guarded candidate, executable content, ancestor transition, non-flat target
+    for key in [("running", "stop"), ("running", "tick"), ("idle", "reset"), ("running", "pause.soft")]:
+        assert table[key] is None
+    assert not any(state == "paused" for state, _ in table)
@@ -0,0 +1,124 @@
+"""
+Agent Name: python-ingress-policy-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for per-event ingress coalescing, dropping and backpressure.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from scjson.async_context import AsyncDocumentContext
+from scjson.context import DocumentContext
+from scjson.session_host import SessionHost
+from scjson.events import IngressPolicy, SCJSON_NS, parse_ingress_policies
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+
+
+def _recorder(attrs: str = "", cls: type = DocumentContext) -> DocumentContext:
+    return cls.from_xml_string(
+        f'<scxml {NS} {attrs} initial="on">'
+        '<datamodel><data id="seen" expr="[]"/></datamodel>'
+        '<state id="on"><transition event="*">'
+        '<assign location="seen" expr="seen + [(_event.name, _event.data)]"/>'
+        "</transition></state></scxml>"
+    )
+
+
+def test_latest_value_wins_keeps_one_pending_event() -> None:
+    """A burst of readings collapses into one event with the newest payload."""
+    ctx = _recorder()
+    ctx.set_ingress_policy("reading", "latest")
+    ctx.post("alarm", "a")
+    for i in range(1000):
+        ctx.post("reading", i)
+    ctx.post("alarm", "b")
+    stats = ctx.ingress_stats()
+    assert stats["pending"] == 3 and stats["coalesced"] == {"reading": 999}
+    ctx.run()
+    assert ctx.data_model["seen"] == [("alarm", "a"), ("reading", 999), ("alarm", "b")]
+    ctx.post("reading", 1000)
+    ctx.run()
+    assert ctx.data_model["seen"][-1] == ("reading", 1000)
+
+
+@pytest.mark.parametrize(
+    "kind, kept",
+    [("drop-oldest", [7, 8, 9]), ("drop-newest", [0, 1, 2])],
+)
+def test_bounded_drop_policies(kind: str, kept: list) -> None:
+    """Drop policies keep ``limit`` pending events and count the rest."""
+    ctx = _recorder()
+    ctx.set_ingress_policy("reading", kind, 3)
+    accepted = [ctx.post("reading", i) for i in range(10)]
+    ctx.run()
+    assert [data for _, data in ctx.data_model["seen"]] == kept
+    assert ctx.ingress_stats()["dropped"] == {"reading": 7}
+    assert accepted.count(False) == (7 if kind == "drop-newest" else 0)
+
+
+def test_block_policy_applies_backpressure() -> None:
+    """Producers wait for room; a timed-out post is dropped."""
+    ctx = _recorder()
+    ctx.set_ingress_policy("cmd", "block", 2)
+    assert ctx.post("cmd", 0) and ctx.post("cmd", 1)
+    assert ctx.post("cmd", "late", timeout=0.01) is False
+
+    producer = threading.Thread(target=lambda: [ctx.post("cmd", i) for i in range(2, 20)])
+    producer.start()
+    while producer.is_alive() or ctx.ingress_stats()["pending"]:
+        ctx.run_until_idle(timeout=0.01)
+    producer.join()
+    assert [data for _, data in ctx.data_model["seen"]] == list(range(20))
+    stats = ctx.ingress_stats()
+    assert stats["blocked"]["cmd"] >= 2 and stats["dropped"] == {"cmd": 1}
+
+
+def test_policies_from_chart_metadata() -> None:
+    """``scjson:ingress`` on ``<scxml>`` declares policies in the chart."""
+    ctx = _recorder(f'xmlns:scjson="{SCJSON_NS}" scjson:ingress="reading=latest; alarm=drop-oldest:4"')
+    assert ctx._ingress.policies == {
+        "reading": IngressPolicy("latest"),
+        "alarm": IngressPolicy("drop-oldest", 4),
+    }
+    with pytest.raises(ValueError):
+        parse_ingress_policies("reading=sometimes")
+
+
+def test_send_front_ends_apply_policies() -> None:
+    """``SessionHost.send`` and the async ``send``/``send_nowait`` go through ingress."""
+    host = SessionHost()
+    ctx = _recorder()
+    ctx.set_ingress_policy("reading", "latest")
+    ctx.set_ingress_policy("command", "block", 1)
+    host.open("s", ctx)
+    for i in range(50):
+        host.send("s", "reading", i)
+    assert host.send("s", "command", 1) is True
+    assert host.send("s", "command", 2) is False
+    assert host.stats("s")["queue_depth"] == 2
+    host.run()
+    assert ctx.data_model["seen"] == [("reading", 49), ("command", 1)]
+
+    actx = _recorder(cls=AsyncDocumentContext)
+    actx.set_ingress_policy("reading", "latest")
+
+    async def main():
+        for i in range(50):
+            assert actx.send_nowait("reading", i)
+        await actx.send("alarm", "a")
+        actx.close()
+        return await actx.run_until_done()
+
+    steps = asyncio.run(main())
+    assert [s["event"]["name"] for s in steps] == ["reading", "alarm"]
+    assert actx.data_model["seen"] == [("reading", 49), ("alarm", "a")]
+    assert actx.ingress_stats()["coalesced"] == {"reading": 49}
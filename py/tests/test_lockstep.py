@@ -0,0 +1,180 @@
+"""
+Agent Name: python-lockstep-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for the lockstep batch interpreter.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from scjson.context import DocumentContext  # noqa: E402
+from scjson.lockstep import LockstepBatch  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[2]
+CORPUS = sorted((ROOT / "tests" / "exec").glob("*.scxml")) + sorted((ROOT / "tests" / "sweep_corpus").glob("*.scxml"))
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+CHART = (
+    f'<scxml {NS} initial="wrap">'
+    '<datamodel><data id="n" expr="0"/><data id="total" expr="0"/><data id="ratio" expr="1.0"/>'
+    "<data id=\"flag\" expr=\"False\"/><data id=\"tag\" expr=\"'x'\"/></datamodel>"
+    '<state id="wrap"><parallel id="main">'
+    '<state id="left" initial="l1">'
+    '<state id="l1">'
+    "<transition event=\"go\" cond=\"_event.data['v'] &gt; 5\" target=\"l2\">"
+    "<assign location=\"total\" expr=\"total + _event.data['v']\"/></transition>"
+    '<transition event="go"><assign location="n" expr="n + 1"/><log label="n" expr="n"/></transition></state>'
+    '<state id="l2"><onentry><raise event="inner"/>'
+    '<if cond="n &gt; 2"><assign location="flag" expr="True"/>'
+    "<elseif cond=\"n &gt; 1\"/><assign location=\"tag\" expr=\"'mid'\"/>"
+    "<else/><assign location=\"tag\" expr=\"'low'\"/></if></onentry>"
+    "<transition event=\"div\" cond=\"In('r2')\"><assign location=\"ratio\" expr=\"ratio / n\"/></transition>"
+    '<transition event="back" target="l1"/>'
+    '<transition target="lf" cond="total &gt;= 20"/></state>'
+    '<final id="lf"/></state>'
+    '<state id="right" initial="r1">'
+    '<state id="r1"><transition event="inner" target="r2"/></state>'
+    '<state id="r2"><transition event="go" cond="n" target="r1"/>'
+    '<transition event="error.execution" target="rerr"/></state>'
+    '<state id="rerr"><transition event="oops"><assign location="missing" expr="1"/></transition>'
+    '<transition event="fin" target="rf"/></state>'
+    '<final id="rf"/></state>'
+    "</parallel>"
+    '<transition event="done.state.main" target="end"><log label="done" expr="total"/></transition>'
+    '</state><final id="end"/></scxml>'
+)
+
+
+def _assert_same(batch: LockstepBatch, singles: list[DocumentContext]) -> None:
+    for i, ctx in enumerate(singles):
+        assert batch.configuration(i) == ctx.configuration
+        data = batch.data(i)
+        assert data == ctx.data_model
+        assert [type(v) for v in data.values()] == [type(v) for v in ctx.data_model.values()]
+        assert batch.action_log(i) == ctx.action_log
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_instances_match_document_context(seed: int) -> None:
+    """Every instance ends each macrostep exactly where a single session would."""
+    rng = random.Random(seed)
+    size = 8
+    batch = LockstepBatch.from_xml_string(CHART, size, record_logs=True)
+    singles = [DocumentContext.from_xml_string(CHART) for _ in range(size)]
+    _assert_same(batch, singles)
+    for _ in range(25):
+        name = rng.choice(["go", "go", "div", "back", "oops", "fin", "inner", "noise"])
+        if name == "go":
+            payloads = [{"v": rng.randint(0, 10)} for _ in range(size)]
+            batch.enqueue_each(name, payloads)
+            for ctx, payload in zip(singles, payloads):
+                ctx.enqueue(name, payload)
+        else:
+            batch.enqueue(name)
+            for ctx in singles:
+                ctx.enqueue(name)
+        batch.run()
+        for ctx in singles:
+            ctx.run()
+        _assert_same(batch, singles)
+    stats = batch.stats()
+    assert stats["plans"] > 0 and stats["vectorized"] > 0
+
+
+def test_columns_keep_python_types_and_queues_grow() -> None:
+    """Mixed-type assignments promote a column; long raise chains fit the queue."""
+    chart = (
+        f'<scxml {NS} initial="a">'
+        '<datamodel><data id="x" expr="1"/><data id="hits" expr="0"/></datamodel>'
+        '<state id="a"><transition event="set"><assign location="x" expr="_event.data"/></transition>'
+        '<transition event="burst">' + '<raise event="hit"/>' * 20 + "</transition>"
+        '<transition event="hit"><assign location="hits" expr="hits + 1"/></transition></state></scxml>'
+    )
+    batch = LockstepBatch.from_xml_string(chart, 3)
+    assert batch.column("x").dtype == np.int64
+    batch.enqueue("set", 2.5)
+    batch.run()
+    assert batch.column("x").dtype == np.float64
+    batch.enqueue_each("set", [7, "seven", None])
+    batch.run()
+    assert [batch.data(i)["x"] for i in range(3)] == [7, "seven", None]
+    assert type(batch.data(0)["x"]) is int
+
+    batch.enqueue("burst")
+    batch.enqueue("burst")
+    batch.run()
+    assert batch.column("hits").tolist() == [40, 40, 40]
+    assert batch.occupancy()["a"] == 3 and not batch.done.any()
+
+
+def test_unsupported_charts_are_rejected() -> None:
+    chart = (
+        f'<scxml {NS} initial="a">'
+        '<state id="a"><onentry><send event="t" delay="1s"/></onentry>'
+        '<history id="h"><transition target="a"/></history><transition event="t" target="a"/></state></scxml>'
+    )
+    with pytest.raises(ValueError, match="<history> h.*<send> in a"):
+        LockstepBatch.from_xml_string(chart, 2)
+    with pytest.raises(ValueError):
+        LockstepBatch.from_xml_string(CHART, 0)
+
+
+def test_integer_overflow_matches_python_integers() -> None:
+    """Results outside int64 fall back per instance instead of wrapping."""
+    chart = (
+        f'<scxml {NS} initial="a">'
+        '<datamodel><data id="x" expr="2"/><data id="y" expr="0"/></datamodel>'
+        '<state id="a"><transition event="square"><assign location="x" expr="x * x"/></transition>'
+        '<transition event="third" cond="x &gt; 1.5"><assign location="y" expr="x / 3"/></transition>'
+        "</state></scxml>"
+    )
+    batch = LockstepBatch.from_xml_string(chart, 2)
+    single = DocumentContext.from_xml_string(chart)
+    for name in ["square"] * 6 + ["third"]:
+        batch.enqueue(name)
+        batch.run()
+        single.enqueue(name)
+        single.run()
+        assert batch.data(1) == single.data_model
+    assert batch.data(0)["x"] == 2**64
+    assert batch.column("x").dtype == object
+
+
+@pytest.mark.parametrize("chart", CORPUS, ids=lambda path: f"{path.parent.name}/{path.stem}")
+def test_corpus_charts_match_document_context(chart: Path) -> None:
+    """In-scope charts from the execution corpus replay identically."""
+    try:
+        batch = LockstepBatch.from_xml_file(chart, 4, record_logs=True)
+    except ValueError:
+        pytest.skip("chart uses features outside the lockstep subset")
+    singles = [DocumentContext.from_xml_file(chart) for _ in range(4)]
+    events = []
+    stream = chart.with_suffix(".events.jsonl")
+    if stream.exists():
+        for line in stream.read_text(encoding="utf-8").splitlines():
+            item = json.loads(line) if line.strip() else {}
+            if "event" in item:
+                events.append((item["event"], item.get("data")))
+    names = sorted({n for attr in re.findall(r'event="([^"*]+)"', chart.read_text()) for n in attr.split()})
+    rng = random.Random(chart.name)
+    events += [(rng.choice(names), None) for _ in range(20)] if names else []
+    _assert_same(batch, singles)
+    for name, data in events:
+        batch.enqueue(name, data)
+        for ctx in singles:
+            ctx.enqueue(name, data)
+        batch.run()
+        for ctx in singles:
+            ctx.run()
+        _assert_same(batch, singles)
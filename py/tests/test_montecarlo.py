@@ -0,0 +1,116 @@
+"""
+Agent Name: python-montecarlo-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for Monte-Carlo workload simulation and the ``simulate`` command.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from scjson.cli import main
+from scjson.montecarlo import Workload, sample_value, simulate_session, summarize
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+CHART = (
+    f'<scxml {NS} initial="idle">'
+    '<state id="idle"><transition event="order" target="busy"/></state>'
+    '<state id="busy"><onentry><send event="finished" delay="10s"/></onentry>'
+    '<transition event="finished" target="done"/>'
+    '<transition event="order"><raise event="error.overload"/></transition></state>'
+    '<final id="done"/></scxml>'
+)
+
+
+@pytest.fixture()
+def chart(tmp_path: Path) -> Path:
+    path = tmp_path / "orders.scxml"
+    path.write_text(CHART, encoding="utf-8")
+    return path
+
+
+def test_session_measures_occupancy_completion_and_errors(chart: Path) -> None:
+    """A scripted session reports exact simulated times."""
+    workload = Workload([{"name": "order", "at": [5, 8, 30]}])
+    result = simulate_session(chart, workload, horizon=100, seed=1)
+    assert result["final"] == pytest.approx(15)
+    assert result["occupancy"] == pytest.approx({"idle": 5, "busy": 10})
+    assert result["errors"] == 1
+    assert result["events"] == 2  # the chart finished before the third order
+    assert result["failure"] is None
+
+    idle = simulate_session(chart, Workload([]), horizon=3600)
+    assert idle["final"] is None and idle["occupancy"] == {"idle": 3600}
+
+
+def test_workload_generators_and_payloads() -> None:
+    """Arrivals are seeded, sorted and bounded by the horizon."""
+    workload = Workload(
+        [
+            {"name": "tick", "every": 10, "data": {"n": {"dist": "randint", "low": 1, "high": 3}}},
+            {"name": "hit", "rate": 0.5},
+        ]
+    )
+    first = workload.arrivals(random.Random(7), 60)
+    assert first == workload.arrivals(random.Random(7), 60)
+    assert [t for t, _, _ in first] == sorted(t for t, _, _ in first)
+    ticks = [(t, data) for t, name, data in first if name == "tick"]
+    assert [t for t, _ in ticks] == [10, 20, 30, 40, 50, 60]
+    assert all(data["n"] in (1, 2, 3) for _, data in ticks)
+    assert 10 < sum(1 for _, name, _ in first if name == "hit") < 60
+
+    rng = random.Random(0)
+    assert sample_value({"dist": "choice", "values": ["a"]}, rng) == "a"
+    assert sample_value([{"dist": "bernoulli", "p": 1}, 4], rng) == [True, 4]
+    with pytest.raises(ValueError):
+        sample_value({"dist": "zipf"}, rng)
+    with pytest.raises(ValueError):
+        Workload([{"name": "x", "rate": 1, "every": 2}])
+
+
+def test_summary_statistics() -> None:
+    """Percentiles interpolate linearly and histograms close the last bin."""
+    runs = [
+        {"final": f, "errors": e, "failure": None, "elapsed": 10.0, "occupancy": {"a": 10.0 - f, "b": f}}
+        for f, e in [(1.0, 0), (2.0, 0), (3.0, 1), (10.0, 2)]
+    ]
+    summary = summarize(runs, horizon=10.0, bins=5)
+    time_stats = summary["completion"]["time"]
+    assert time_stats["p50"] == 2.5 and time_stats["max"] == 10.0
+    assert summary["completion"]["histogram"]["counts"] == [1, 2, 0, 0, 1]
+    assert summary["errors"]["rate"] == 0.5
+    assert summary["occupancy"]["b"]["mean"] == pytest.approx(0.4)
+
+
+def test_simulate_command_is_independent_of_jobs(chart: Path, tmp_path: Path) -> None:
+    """The summary for a seed is the same serially and across the pool."""
+    spec = tmp_path / "workload.json"
+    spec.write_text(json.dumps({"horizon": 30, "events": [{"name": "order", "rate": 0.05}]}))
+    runner = CliRunner()
+    summaries = []
+    for jobs in ("1", "2"):
+        out = tmp_path / f"summary-{jobs}.json"
+        result = runner.invoke(
+            main,
+            ["simulate", "-I", str(chart), "-w", str(spec), "-n", "40", "--seed", "3", "-j", jobs, "-o", str(out)],
+        )
+        assert result.exit_code == 0, result.output
+        data = json.loads(out.read_text())
+        for key in ("elapsed", "jobs"):
+            data.pop(key)
+        summaries.append(data)
+    assert summaries[0] == summaries[1]
+    summary = summaries[0]
+    assert summary["sessions"] == 40
+    assert 0 < summary["completion"]["rate"] < 1
+    # Occupancy stops at the final state.
+    assert set(summary["occupancy"]) == {"idle", "busy"}
@@ -0,0 +1,74 @@
+"""
+Agent Name: python-process-batch-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for batch event processing without trace construction.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from scjson.context import DocumentContext
+from scjson.events import Event
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+CHART = (
+    f'<scxml {NS} initial="off">'
+    '<datamodel><data id="n" expr="0"/></datamodel>'
+    '<state id="off"><transition event="toggle" target="on"/></state>'
+    '<state id="on">'
+    '<onentry><assign location="n" expr="n + 1"/>'
+    '<send target="#_parent" event="lit"><param name="n" expr="n"/></send></onentry>'
+    '<transition event="toggle" target="off"/>'
+    '<transition event="report"><send target="http://example.com/hook" event="status"/></transition>'
+    "</state></scxml>"
+)
+
+
+def test_batch_matches_enqueue_and_run() -> None:
+    """A batch leaves the same configuration and data as one-by-one runs."""
+    events = ["toggle", ("toggle", {"why": "test"}), Event(name="toggle"), "noise"]
+    batch = DocumentContext.from_xml_string(CHART)
+    result = batch.process_batch(events)
+    assert result == {"events": 4}
+
+    single = DocumentContext.from_xml_string(CHART)
+    for name in ["toggle", "toggle", "toggle", "noise"]:
+        single.enqueue(name)
+        single.run()
+    assert batch.configuration == single.configuration
+    assert batch.data_model["n"] == single.data_model["n"] == 2
+
+
+def test_batch_collects_mask_transitions_and_outbound() -> None:
+    """Requested outputs are compact and decode back to chart elements."""
+    ctx = DocumentContext.from_xml_string(CHART)
+    result = ctx.process_batch(
+        ["toggle", "report", "toggle", "toggle"],
+        collect=("configuration", "transitions", "outbound"),
+    )
+    assert ctx.states_from_mask(result["configuration"]) == [ctx.root_activation.id, "on"]
+    assert result["configuration"] == ctx.configuration_mask()
+
+    table = ctx.transition_table()
+    taken = [(table[t][0], table[t][1].event) for t in result["transitions"]]
+    assert taken == [("off", "toggle"), ("on", "report"), ("on", "toggle"), ("off", "toggle")]
+
+    outbound = [(target, evt.name, evt.data) for target, evt in result["outbound"]]
+    assert outbound == [
+        ("#_parent", "lit", {"n": 1}),
+        ("http://example.com/hook", "status", None),
+        ("#_parent", "lit", {"n": 2}),
+    ]
+    # Captured sends were not queued back into the session.
+    assert not ctx.events
+
+
+def test_batch_rejects_unknown_outputs() -> None:
+    ctx = DocumentContext.from_xml_string(CHART)
+    with pytest.raises(ValueError):
+        ctx.process_batch(["toggle"], collect=["trace"])
@@ -0,0 +1,185 @@
+"""
+Agent Name: python-process-invoke-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for the out-of-process ``scxml-process`` invoke type.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+
+from scjson.context import DocumentContext
+from scjson.process_invoke import ProcessChildPool, SCXMLProcessHandler
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+CHILD = f"""<scxml {NS} initial="wait">
+  <datamodel><data id="n" expr="0"/></datamodel>
+  <state id="wait">
+    <onentry><send target="#_parent" event="child.ready"/></onentry>
+    <transition event="work" target="worked"><assign location="n" expr="n + 1"/></transition>
+  </state>
+  <state id="worked">
+    <onentry><send target="#_parent" event="child.worked"/></onentry>
+    <transition event="finish" target="end"/>
+  </state>
+  <final id="end"><donedata><param name="n" expr="n"/></donedata></final>
+</scxml>"""
+
+
+def _parent(body: str) -> str:
+    return (
+        f'<scxml {NS} initial="idle">'
+        '<datamodel><data id="result" expr="None"/></datamodel>'
+        '<state id="idle"><transition event="begin" target="run"/></state>'
+        f"{body}<final id='done'/></scxml>"
+    )
+
+
+@pytest.fixture()
+def pool():
+    pool = ProcessChildPool(workers=2)
+    yield pool
+    pool.shutdown()
+
+
+def _context(tmp_path: Path, body: str, pool: ProcessChildPool) -> DocumentContext:
+    (tmp_path / "child.scxml").write_text(CHILD, encoding="utf-8")
+    (tmp_path / "parent.scxml").write_text(_parent(body), encoding="utf-8")
+    ctx = DocumentContext.from_xml_file(tmp_path / "parent.scxml")
+    ctx.invoke_registry.register(
+        "scxml-process",
+        lambda t, s, p, on_done=None: SCXMLProcessHandler(t, s, p, on_done, pool=pool),
+    )
+    ctx.enqueue("begin")
+    ctx.run()
+    return ctx
+
+
+def _settle(ctx: DocumentContext, state: str) -> None:
+    for _ in range(100):
+        if state in ctx.configuration:
+            return
+        ctx.poll_invocations(0.1)
+        ctx.run()
+    raise AssertionError(f"never reached {state}: {sorted(ctx.configuration)}")
+
+
+def test_child_events_autoforward_and_done(tmp_path: Path, pool: ProcessChildPool) -> None:
+    """``#_parent`` sends, autoforward and ``done.invoke`` data round-trip."""
+    body = (
+        '<state id="run" initial="waiting">'
+        '<invoke id="kid" type="scxml-process" src="child.scxml" autoforward="true"/>'
+        '<state id="waiting"><transition event="child.ready" target="ready"/></state>'
+        '<state id="ready"><transition event="child.worked" target="worked"/></state>'
+        '<state id="worked"/>'
+        '<transition event="done.invoke.kid" target="done">'
+        '<assign location="result" expr="_event.data"/></transition></state>'
+    )
+    ctx = _context(tmp_path, body, pool)
+    assert "waiting" in ctx.configuration  # the child has not reported yet
+    _settle(ctx, "ready")
+    ctx.enqueue("work")
+    ctx.run()
+    _settle(ctx, "worked")
+    ctx.enqueue("finish")
+    ctx.run()
+    _settle(ctx, "done")
+    assert ctx.data_model["result"] == {"n": 1}
+    assert pool.stats()["sessions"] == [0, 0]
+
+
+def test_cancel_drops_the_remote_session(tmp_path: Path, pool: ProcessChildPool) -> None:
+    """Leaving the invoking state cancels the child; no late done arrives."""
+    body = (
+        '<state id="run"><invoke id="kid" type="scxml-process" src="child.scxml"/>'
+        '<transition event="leave" target="after"/>'
+        '<transition event="done.invoke" target="done"/></state>'
+        '<state id="after"><transition event="done.invoke" target="done"/></state>'
+    )
+    ctx = _context(tmp_path, body, pool)
+    assert sum(pool.stats()["sessions"]) == 1
+    ctx.enqueue("leave")
+    ctx.run()
+    assert "after" in ctx.configuration
+    assert pool.stats()["sessions"] == [0, 0]
+    ctx.poll_invocations(0.3)
+    ctx.run()
+    assert "after" in ctx.configuration
+
+
+def test_failed_child_raises_communication_error(tmp_path: Path, pool: ProcessChildPool) -> None:
+    """A child that cannot load surfaces ``error.communication``."""
+    body = (
+        '<state id="run"><invoke id="kid" type="scxml-process" src="missing.scxml"/>'
+        '<transition event="error.communication" target="done"/></state>'
+    )
+    ctx = _context(tmp_path, body, pool)
+    _settle(ctx, "done")
+
+
+def test_parallel_invocations_spread_across_workers(tmp_path: Path, pool: ProcessChildPool) -> None:
+    """Sibling invocations are placed on different worker processes."""
+    body = (
+        '<state id="run">'
+        '<invoke id="a" type="scxml-process" src="child.scxml"/>'
+        '<invoke id="b" type="scxml-process" src="child.scxml"/>'
+        "</state>"
+    )
+    ctx = _context(tmp_path, body, pool)
+    assert pool.stats()["sessions"] == [1, 1]
+    assert {h.type_name for h in ctx.invocations.values()} == {"scxml-process"}
+
+
+def test_dead_worker_is_replaced_and_fails_its_sessions_once(tmp_path: Path) -> None:
+    """Killing the only worker errors its sessions once and keeps the pool usable."""
+    (tmp_path / "child.scxml").write_text(CHILD, encoding="utf-8")
+    spec = {"src": str(tmp_path / "child.scxml"), "payload": None, "invoke_id": "kid", "trusted": False}
+    pool = ProcessChildPool(workers=1)
+    try:
+        lost = pool.open(spec)
+        assert pool.collect(5) == 1
+        assert [r[1][0]["name"] for r in pool.take(lost)] == ["child.ready"]
+        pool._procs[0].kill()
+        pool._procs[0].join(5)
+
+        # Sends to the dead pipe neither raise nor reach a worker
+        # The broken pipe surfaces on this send or on the next collect
+        pool.post(lost, "send", "work", None)
+        pool.collect(0.2)
+        assert [r[5] for r in pool.take(lost)] == ["worker process exited"]
+        assert pool.take(lost) == []
+        assert pool.stats()["restarts"] == 1 and pool.stats()["sessions"] == [0]
+        pool.post(lost, "send", "work", None)
+        pool.close(lost)
+
+        started = time.monotonic()
+        assert pool.collect(0.3) == 0
+        assert time.monotonic() - started >= 0.25
+
+        fresh = pool.open(spec)
+        assert pool.collect(5) == 1
+        assert [r[1][0]["name"] for r in pool.take(fresh)] == ["child.ready"]
+        pool.post(fresh, "send", "work", None)
+        assert pool.collect(5) == 1
+        assert [r[1][0]["name"] for r in pool.take(fresh)] == ["child.worked"]
+
+        # Opening straight after a crash lands on the replacement worker
+        pool._procs[0].kill()
+        pool._procs[0].join(5)
+        third = pool.open(spec)
+        deadline = time.monotonic() + 5
+        replies = []
+        while not replies and time.monotonic() < deadline:
+            pool.collect(0.5)
+            replies = pool.take(third)
+        assert replies and replies[0][5] is None
+        assert [r[5] for r in pool.take(fresh)] == ["worker process exited"]
+    finally:
+        pool.shutdown()
@@ -0,0 +1,101 @@
+"""
+Agent Name: python-python-invoke-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for ``python:`` invocations run on a thread pool.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+
+from scjson.context import DocumentContext
+from scjson.invoke import PYTHON_CALLABLES, register_callable
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+
+
+def _chart(invoke: str, extra: str = "") -> str:
+    return (
+        f'<scxml {NS} initial="idle">'
+        '<datamodel><data id="result" expr="None"/></datamodel>'
+        '<state id="idle"><transition event="begin" target="busy"/></state>'
+        f'<state id="busy">{invoke}'
+        '<transition event="done.invoke.q" target="done">'
+        '<assign location="result" expr="_event.data"/></transition>'
+        '<transition event="error.execution" target="failed"/>'
+        f"{extra}</state>"
+        '<state id="left"/><final id="failed"/><final id="done"/></scxml>'
+    )
+
+
+def _settle(ctx: DocumentContext) -> None:
+    for _ in range(50):
+        if not ctx.poll_invocations(0.1):
+            continue
+        ctx.run()
+        return
+
+
+def test_registered_callable_runs_off_thread(tmp_path: Path) -> None:
+    """A blocking sqlite query completes as ``done.invoke.<id>``."""
+    db = tmp_path / "rows.db"
+    with sqlite3.connect(db) as conn:
+        conn.execute("create table t (v integer)")
+        conn.executemany("insert into t values (?)", [(1,), (2,), (3,)])
+    seen = []
+
+    def total(path: str) -> int:
+        seen.append(threading.current_thread().name)
+        with sqlite3.connect(path) as conn:
+            return conn.execute("select sum(v) from t").fetchone()[0]
+
+    ctx = DocumentContext.from_xml_string(
+        _chart(f'<invoke id="q" type="python:total"><param name="path" expr="{str(db)!r}"/></invoke>')
+    )
+    ctx.invoke_registry.register_callable("total", total)
+    ctx.enqueue("begin")
+    ctx.run()
+    _settle(ctx)
+    assert "done" in ctx.configuration
+    assert ctx.data_model["result"] == 6
+    assert seen and seen[0].startswith("scjson-invoke")
+
+
+def test_failures_and_unknown_names_raise_error_execution() -> None:
+    """Exceptions and unregistered names surface as ``error.execution``."""
+    register_callable("boom", lambda: 1 / 0)
+    try:
+        for name in ("boom", "nope"):
+            ctx = DocumentContext.from_xml_string(_chart(f'<invoke id="q" type="python:{name}"/>'))
+            ctx.enqueue("begin")
+            ctx.run()
+            _settle(ctx)
+            assert "failed" in ctx.configuration, name
+    finally:
+        PYTHON_CALLABLES.pop("boom", None)
+
+
+def test_state_exit_cancels_and_interpreter_never_blocks() -> None:
+    """The interpreter keeps running while the call blocks; exit discards it."""
+    release = threading.Event()
+    ctx = DocumentContext.from_xml_string(
+        _chart('<invoke id="q" type="python:wait"/>', '<transition event="leave" target="left"/>')
+    )
+    ctx.invoke_registry.register_callable("wait", lambda: release.wait(5) and "late")
+    ctx.enqueue("begin")
+    ctx.run()
+    assert "busy" in ctx.configuration
+    assert ctx.poll_invocations(0.05) == 0
+    ctx.enqueue("leave")
+    ctx.run()
+    release.set()
+    ctx.poll_invocations(0.2)
+    ctx.run()
+    assert "left" in ctx.configuration
+    assert ctx.data_model["result"] is None
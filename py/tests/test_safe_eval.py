@@ -10,7 +10,7 @@ from decimal import Decimal
 
 from scjson.context import DocumentContext
 from scjson.pydantic import Data, Datamodel, Scxml, State
-from scjson.safe_eval import SafeEvaluationError, SafeExpressionEvaluator
+from scjson.safe_eval import SafeEvaluationError, SafeExpressionEvaluator, parse_expression
 
 
 def test_safe_evaluator_basic_math() -> None:
@@ -36,6 +36,16 @@ def test_safe_evaluator_blocks_imports() -> None:
         raise AssertionError("unsafe import was permitted")
 
 
+def test_safe_evaluator_reuses_compiled_code() -> None:
+    """Repeated expressions compile once and share the parsed tree cache."""
+    evaluator = SafeExpressionEvaluator()
+    assert evaluator.evaluate("value * 2", {"value": 2}) == 4
+    code = evaluator._code_cache["value * 2"]
+    assert evaluator.evaluate("value * 2", {"value": 5}) == 10
+    assert evaluator._code_cache["value * 2"] is code
+    assert parse_expression("value * 2") is parse_expression("value * 2")
+
+
 def test_assign_falls_back_when_sandbox_blocks() -> None:
     """Assignments with disallowed expressions fall back to the raw string."""
     doc = Scxml(
@@ -0,0 +1,99 @@
+"""
+Agent Name: python-scxml-stream-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for bounded-memory SCXML → SCJSON streaming.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from scjson.SCXMLDocumentHandler import SCXMLDocumentHandler
+from scjson.cli import main
+from scjson.scxml_stream import stream_xml_to_json
+
+ROOT = Path(__file__).resolve().parents[2]
+CHARTS = sorted((ROOT / "tests" / "exec").glob("*.scxml")) + [ROOT / "examples" / "example.scxml"]
+
+
+def _convertible(chart: Path, handler: SCXMLDocumentHandler) -> str | None:
+    try:
+        return handler.xml_to_json(chart.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+@pytest.mark.parametrize("omit_empty", [True, False])
+def test_stream_matches_xml_to_json(omit_empty: bool) -> None:
+    """Indented streaming output is byte-identical to ``xml_to_json``."""
+    handler = SCXMLDocumentHandler(omit_empty=omit_empty)
+    checked = 0
+    for chart in CHARTS:
+        expected = _convertible(chart, handler)
+        if expected is None:
+            with pytest.raises(Exception):
+                stream_xml_to_json(chart, io.StringIO(), omit_empty=omit_empty)
+            continue
+        buf = io.StringIO()
+        stream_xml_to_json(chart, buf, omit_empty=omit_empty)
+        assert buf.getvalue() == expected, chart.name
+        compact = io.StringIO()
+        stream_xml_to_json(chart, compact, omit_empty=omit_empty, indent=None)
+        assert "\n" not in compact.getvalue()
+        assert json.loads(compact.getvalue()) == json.loads(expected)
+        checked += 1
+    assert checked > 5
+
+
+def test_stream_accepts_missing_namespace_and_mixed_children() -> None:
+    """Unnamespaced roots bind like ``xml_to_json`` and keep field order."""
+    xml = (
+        '<scxml initial="b" version="1.0">'
+        '<final id="f"/><state id="a"/><datamodel><data id="x" expr="1"/></datamodel>'
+        '<state id="b"><transition event="go" target="f"/></state>'
+        "</scxml>"
+    )
+    buf = io.StringIO()
+    assert stream_xml_to_json(io.BytesIO(xml.encode()), buf) == 4
+    assert buf.getvalue() == SCXMLDocumentHandler().xml_to_json(xml)
+    assert list(json.loads(buf.getvalue()))[:3] == ["state", "final", "datamodel"]
+
+
+def test_cli_stream_and_compact(tmp_path: Path) -> None:
+    """``scjson json --stream`` writes the same document as the default path."""
+    chart = ROOT / "examples" / "example.scxml"
+    runner = CliRunner()
+    plain = tmp_path / "plain.scjson"
+    streamed = tmp_path / "streamed.scjson"
+    compact = tmp_path / "compact.scjson"
+    assert runner.invoke(main, ["json", str(chart), "-o", str(plain)]).exit_code == 0
+    assert runner.invoke(main, ["json", str(chart), "-o", str(streamed), "--stream"]).exit_code == 0
+    result = runner.invoke(main, ["json", str(chart), "-o", str(compact), "--stream", "--compact"])
+    assert result.exit_code == 0
+    assert streamed.read_text() == plain.read_text()
+    assert json.loads(compact.read_text()) == json.loads(plain.read_text())
+    assert len(compact.read_text()) < len(plain.read_text())
+
+
+def test_stream_failure_keeps_previous_output(tmp_path: Path) -> None:
+    """A malformed source neither truncates nor creates the destination."""
+    bad = tmp_path / "bad.scxml"
+    bad.write_text("not xml at all <<")
+    dest = tmp_path / "bad.scjson"
+    runner = CliRunner()
+    assert runner.invoke(main, ["json", str(bad), "-o", str(dest), "--stream"]).exit_code == 1
+    assert not dest.exists()
+
+    dest.write_text("previous")
+    runner.invoke(main, ["json", str(bad), "-o", str(dest), "--stream"])
+    assert dest.read_text() == "previous"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["bad.scjson", "bad.scxml"]
@@ -0,0 +1,99 @@
+"""
+Agent Name: python-session-host-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for the multi-session host and its budgeted scheduler.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from scjson.context import DocumentContext
+from scjson.session_host import SessionHost
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+SIMPLE = (
+    f'<scxml {NS} initial="idle">'
+    '<datamodel><data id="n" expr="0"/></datamodel>'
+    '<state id="idle"><transition event="go" target="idle">'
+    '<assign location="n" expr="n + 1"/></transition>'
+    '<transition event="stop" target="done"/></state>'
+    '<final id="done"/></scxml>'
+)
+# Re-raises its own event forever once started.
+SPIN = (
+    f'<scxml {NS} initial="idle">'
+    '<state id="idle"><transition event="go" target="spin"/></state>'
+    '<state id="spin"><onentry><raise event="again"/></onentry>'
+    '<transition event="again" target="spun"/></state>'
+    '<state id="spun"><onentry><raise event="again"/></onentry>'
+    '<transition event="again" target="spin"/></state></scxml>'
+)
+TIMER = (
+    f'<scxml {NS} initial="wait">'
+    '<state id="wait"><onentry><send event="tick" delay="10s"/></onentry>'
+    '<transition event="tick" target="done"/></state><final id="done"/></scxml>'
+)
+
+
+def test_routes_events_to_sessions() -> None:
+    """Events reach only their session; unknown ids raise ``KeyError``."""
+    host = SessionHost(lambda sid: DocumentContext.from_xml_string(SIMPLE))
+    for sid in ("a", "b"):
+        host.open(sid)
+    for _ in range(3):
+        host.send("a", "go")
+    host.send("b", "stop")
+    host.run()
+    assert host.get("a").data_model["n"] == 3
+    assert "done" in host.get("b").configuration
+    assert host.stats("a")["queue_depth"] == 0 and host.stats("a")["lag"] == 0.0
+    with pytest.raises(KeyError):
+        host.send("missing", "go")
+    host.close("a")
+    assert "a" not in host and len(host) == 1
+
+
+def test_looping_session_cannot_starve_others() -> None:
+    """A runaway chart is preempted each round while others make progress."""
+    host = SessionHost(step_budget=8)
+    host.open("spin", DocumentContext.from_xml_string(SPIN))
+    for sid in range(5):
+        host.open(sid, DocumentContext.from_xml_string(SIMPLE))
+    host.send("spin", "go")
+    for sid in range(5):
+        host.send(sid, "go")
+        host.send(sid, "stop")
+
+    host.run_once()
+    assert all("done" in host.get(sid).configuration for sid in range(5))
+    assert host.ready == 1
+
+    assert host.run(max_rounds=10) == 10 * 8
+    stats = host.stats("spin")
+    assert stats["preempted"] == stats["turns"] == 11
+    assert stats["steps"] == 11 * 8
+    assert stats["queue_depth"] == 1
+    assert host.report()[0]["turns"] == 1
+
+
+def test_lag_and_timers_with_injected_clock() -> None:
+    """Lag is measured from routing to the next turn; due timers wake sessions."""
+    now = [0.0]
+    host = SessionHost(clock=lambda: now[0])
+    host.open("s", DocumentContext.from_xml_string(SIMPLE))
+    host.send("s", "go")
+    now[0] = 2.5
+    assert host.stats("s")["lag"] == 2.5
+    host.run()
+    assert host.stats("s")["max_lag"] == 2.5
+
+    ctx = host.open("t", DocumentContext.from_xml_string(TIMER))
+    assert host.run() == 0
+    ctx.advance_time(10)
+    host.run()
+    assert "done" in ctx.configuration
@@ -0,0 +1,134 @@
+"""
+Agent Name: python-sharding-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for snapshots, the hash ring and the sharded session host.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+
+from scjson.context import DocumentContext
+from scjson.sharding import HashRing, ShardedHost
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+CHART = (
+    f'<scxml {NS} initial="idle">'
+    '<datamodel><data id="n" expr="0"/></datamodel>'
+    '<state id="idle"><transition event="go" target="idle">'
+    '<assign location="n" expr="n + 1"/></transition>'
+    '<transition event="later" target="waiting"/></state>'
+    '<state id="waiting"><onentry><send event="tick" delay="0.3s"/></onentry>'
+    '<transition event="tick" target="done"/></state>'
+    '<final id="done"/></scxml>'
+)
+
+
+@pytest.fixture()
+def chart(tmp_path: Path) -> Path:
+    path = tmp_path / "session.scxml"
+    path.write_text(CHART, encoding="utf-8")
+    return path
+
+
+def test_snapshot_restores_state_and_timers() -> None:
+    """A restored context continues with the same data, queue and timers."""
+    ctx = DocumentContext.from_xml_string(CHART)
+    ctx.enqueue("go")
+    ctx.run()
+    ctx.enqueue("later")
+    ctx.run()
+    ctx.enqueue("go")
+    ctx.advance_time(0.1)
+    snap = ctx.snapshot()
+
+    copy = DocumentContext.from_xml_string(CHART)
+    copy.restore(snap)
+    assert copy.configuration == ctx.configuration
+    assert copy.data_model == {"n": 1}
+    assert [e.name for e in copy.events._q] == ["go"]
+    copy.run()
+    copy.advance_time(0.15)
+    copy.run()
+    assert "waiting" in copy.configuration
+    copy.advance_time(0.05)
+    copy.run()
+    assert copy.done
+
+
+def test_ring_moves_only_keys_for_the_new_node() -> None:
+    """Adding a node reassigns roughly its share of keys and nothing else."""
+    ring = HashRing(["a", "b", "c"])
+    keys = [f"session-{i}" for i in range(2000)]
+    before = {k: ring.node_for(k) for k in keys}
+    ring.add("d")
+    moved = [k for k in keys if ring.node_for(k) != before[k]]
+    assert all(ring.node_for(k) == "d" for k in moved)
+    assert 300 < len(moved) < 700
+    ring.remove("d")
+    assert {k: ring.node_for(k) for k in keys} == before
+
+
+def test_router_batches_and_migrates_sessions(chart: Path) -> None:
+    """Sessions keep their state across worker addition and removal."""
+    with ShardedHost(workers=2, batch_size=16) as host:
+        for i in range(40):
+            host.open(i, chart)
+            for _ in range(i % 4):
+                host.send(i, "go")
+        entries = host.pump()
+        assert {e["session"] for e in entries} == set(range(40))
+        assert sum(host.stats()["sessions"].values()) == 40
+
+        for i in range(40):
+            host.send(i, "later")
+        host.pump()
+        added = host.add_worker()
+        stats = host.stats()
+        assert 0 < stats["migrated"] == stats["sessions"][added]
+
+        host.remove_worker("shard-0")
+        assert "shard-0" not in host.stats()["workers"]
+        assert [host.query(i)["data"]["n"] for i in range(8)] == [0, 1, 2, 3, 0, 1, 2, 3]
+
+        # Timers carried over in the snapshots still fire on the new owners.
+        done = set()
+        deadline = time.monotonic() + 10
+        while len(done) < 40 and time.monotonic() < deadline:
+            done.update(e["session"] for e in host.collect(0.5) if e.get("done"))
+        assert done == set(range(40))
+
+
+def test_dead_worker_fails_its_sessions_once(chart: Path) -> None:
+    """A killed worker leaves the ring and its sessions are reported once."""
+    with ShardedHost(workers=2, batch_size=4) as host:
+        for i in range(20):
+            host.open(i, chart)
+        host.pump()
+        lost = {i for i in range(20) if host.owner(i) == "shard-0"}
+        assert lost and len(lost) < 20
+        host._procs["shard-0"].kill()
+        host._procs["shard-0"].join(5)
+
+        for i in range(20):
+            if i not in lost:
+                host.send(i, "go")
+        errors = [e for e in host.pump(timeout=10) if "error" in e]
+        errors += [e for e in host.collect(0.2) if "error" in e]
+        assert sorted(e["session"] for e in errors) == sorted(lost)
+        assert host.stats()["workers"] == ["shard-1"]
+        with pytest.raises(KeyError):
+            host.send(min(lost), "go")
+
+        for i in range(20, 30):
+            assert host.open(i, chart) == "shard-1"
+        host.pump(timeout=10)
+        assert not [e for e in host.collect(0.2) if "error" in e]
+        assert host.query(25)["configuration"] == ["idle"]
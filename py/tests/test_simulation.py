@@ -0,0 +1,73 @@
+"""
+Agent Name: python-simulation-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for discrete-event simulation on the mock clock.
+"""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from scjson.context import DocumentContext
+
+NS = 'xmlns="http://www.w3.org/2005/07/scxml" datamodel="python"'
+
+
+def test_hour_long_timeout_takes_no_real_time() -> None:
+    """The clock jumps straight to the deadline and the chart finishes."""
+    chart = (
+        f'<scxml {NS} initial="waiting">'
+        '<state id="waiting"><onentry><send event="timeout" delay="1h"/></onentry>'
+        '<transition event="timeout" target="expired"/></state>'
+        '<final id="expired"/></scxml>'
+    )
+    ctx = DocumentContext.from_xml_string(chart)
+    assert ctx.next_timer() == pytest.approx(3600, abs=1)
+    started = time.monotonic()
+    assert ctx.simulate() == pytest.approx(3600, abs=1)
+    assert time.monotonic() - started < 1
+    assert ctx.done and ctx.next_timer() is None
+
+
+def test_horizon_and_jump_limit_bound_periodic_timers() -> None:
+    """A timer that re-arms forever stops at the horizon or the jump limit."""
+    chart = (
+        f'<scxml {NS} initial="a">'
+        '<datamodel><data id="n" expr="0"/></datamodel>'
+        '<state id="a"><onentry><send event="tick" delay="600s"/></onentry>'
+        '<transition event="tick" target="b"><assign location="n" expr="n + 1"/></transition></state>'
+        '<state id="b"><onentry><send event="tick" delay="600s"/></onentry>'
+        '<transition event="tick" target="a"><assign location="n" expr="n + 1"/></transition></state>'
+        "</scxml>"
+    )
+    ctx = DocumentContext.from_xml_string(chart)
+    assert ctx.simulate(horizon=3900) == 3900
+    assert ctx.data_model["n"] == 6
+    assert ctx.next_timer() == pytest.approx(300)
+
+    ctx.simulate(max_jumps=4)
+    assert ctx.data_model["n"] == 10
+
+
+def test_child_invocation_timers_drive_the_clock() -> None:
+    """Deadlines inside an invoked child chart are part of the schedule."""
+    chart = (
+        f'<scxml {NS} initial="busy">'
+        '<state id="busy"><invoke id="kid" type="scxml"><content>'
+        '<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="nap">'
+        '<state id="nap"><onentry><send event="ring" target="#_parent" delay="30m"/></onentry></state>'
+        "</scxml></content></invoke>"
+        '<transition event="ring" target="woke"/></state>'
+        '<final id="woke"/></scxml>'
+    )
+    ctx = DocumentContext.from_xml_string(chart)
+    assert not ctx.delayed_events
+    assert ctx.next_timer() == pytest.approx(1800, abs=1)
+    assert ctx.simulate(horizon=7200) == pytest.approx(1800, abs=1)
+    assert ctx.done
@@ -0,0 +1,121 @@
+"""
+Agent Name: python-trace-worker-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for the persistent trace worker protocol.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from scjson.trace_worker import (
+    SYNC_MARKER,
+    TraceWorkerPool,
+    WorkerError,
+    read_frame,
+    serve,
+    skip_to_marker,
+    write_frame,
+)
+
+ROOT = Path(__file__).resolve().parents[2]
+CHART = """
+<scxml initial="s0" xmlns="http://www.w3.org/2005/07/scxml">
+  <state id="s0"><transition event="go" target="s1"/></state>
+  <state id="s1"/>
+</scxml>
+""".strip()
+
+
+def _write_chart(tmp_path: Path) -> tuple[Path, Path]:
+    chart = tmp_path / "toggle.scxml"
+    chart.write_text(CHART, encoding="utf-8")
+    events = tmp_path / "toggle.events.jsonl"
+    events.write_text('{"event": "go"}\n', encoding="utf-8")
+    return chart, events
+
+
+def _worker_env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(ROOT / "py")
+    return env
+
+
+def test_frames_round_trip_after_marker() -> None:
+    """Noise before the marker is skipped and frames decode in order."""
+    buf = io.BytesIO()
+    buf.write(b"banner line\n" + SYNC_MARKER)
+    write_frame(buf, {"id": 1, "ok": True})
+    write_frame(buf, {"id": 2, "steps": [{"step": 0}]})
+    buf.seek(0)
+    assert skip_to_marker(buf)
+    assert read_frame(buf) == {"id": 1, "ok": True}
+    assert read_frame(buf) == {"id": 2, "steps": [{"step": 0}]}
+    assert read_frame(buf) is None
+
+
+def test_serve_reports_errors_and_keeps_serving(tmp_path: Path) -> None:
+    """An engine error answers ``ok: false`` without ending the session."""
+    chart, events = _write_chart(tmp_path)
+    requests = io.BytesIO()
+    write_frame(requests, {"id": 1, "op": "trace", "chart": str(tmp_path / "missing.scxml"), "xml": True})
+    write_frame(requests, {"id": 2, "op": "trace", "chart": str(chart), "events": str(events), "xml": True})
+    write_frame(requests, {"id": 3, "op": "shutdown"})
+    requests.seek(0)
+    replies = io.BytesIO()
+    serve(requests, replies)
+    replies.seek(0)
+    assert skip_to_marker(replies)
+    first, second, third = read_frame(replies), read_frame(replies), read_frame(replies)
+    assert first["id"] == 1 and first["ok"] is False
+    assert second["ok"] is True
+    assert [step["configuration"] for step in second["steps"]] == [["s0"], ["s1"]]
+    assert third == {"id": 3, "ok": True}
+
+
+def test_pool_matches_cli_and_restarts_crashed_worker(tmp_path: Path) -> None:
+    """Pool traces equal one-shot output and survive a killed worker."""
+    chart, events = _write_chart(tmp_path)
+    from click.testing import CliRunner
+
+    from scjson.cli import main
+
+    out = tmp_path / "cli.trace.jsonl"
+    result = CliRunner().invoke(
+        main, ["engine-trace", "-I", str(chart), "-e", str(events), "--xml", "-o", str(out)]
+    )
+    assert result.exit_code == 0, result.output
+    expected = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+
+    cmd = [sys.executable, "-m", "scjson.cli", "engine-trace", "--worker"]
+    with TraceWorkerPool(cmd, 1, env=_worker_env(), timeout=60) as pool:
+        assert pool.trace(chart, events, is_xml=True) == expected
+        worker = pool._workers[0]
+        assert worker._proc is not None
+        worker._proc.kill()
+        worker._proc.wait()
+        assert pool.trace(chart, events, is_xml=True) == expected
+        assert pool.restarts == 1
+
+
+def test_pool_gives_up_on_hung_worker(tmp_path: Path) -> None:
+    """A worker that never answers is killed and retried, then reported."""
+    chart, events = _write_chart(tmp_path)
+    cmd = [sys.executable, "-c", "import time; time.sleep(60)"]
+    pool = TraceWorkerPool(cmd, 1, timeout=0.5, retries=1)
+    try:
+        with pytest.raises(WorkerError):
+            pool.trace(chart, events, is_xml=True)
+        assert pool.restarts == 1
+    finally:
+        pool.close()
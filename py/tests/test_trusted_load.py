@@ -0,0 +1,123 @@
+"""
+Agent Name: python-trusted-load-tests
+
+Part of the scjson project.
+Developed by Softoboros Technology Inc.
+Licensed under the BSD 1-Clause License.
+
+Tests for trusted (pre-validated) context loading.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+from scjson.SCXMLDocumentHandler import SCXMLDocumentHandler
+from scjson.context import DocumentContext
+from scjson.events import Event
+
+ROOT = Path(__file__).resolve().parents[2]
+CHARTS = sorted((ROOT / "tests" / "exec").glob("*.scxml"))
+
+
+def _scjson(chart: Path, tmp_path: Path) -> Path | None:
+    try:
+        text = SCXMLDocumentHandler().xml_to_json(chart.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    out = tmp_path / f"{chart.stem}.scjson"
+    out.write_text(text, encoding="utf-8")
+    return out
+
+
+def _order_by_path(ctx: DocumentContext) -> dict:
+    """Return ``json_order`` keyed by each container's field path in ``ctx.doc``."""
+    paths: dict = {}
+
+    def walk(node, path: tuple) -> None:
+        if isinstance(node, list):
+            for idx, item in enumerate(node):
+                walk(item, path + (idx,))
+        elif isinstance(node, BaseModel):
+            paths[id(node)] = path
+            for name in type(node).model_fields:
+                walk(getattr(node, name), path + (name,))
+
+    walk(ctx.doc, ())
+    assert set(ctx.json_order) <= set(paths)
+    return {paths[key]: order for key, order in ctx.json_order.items()}
+
+
+def _run(ctx: DocumentContext, chart: Path) -> list:
+    """Return the configuration after the initial step and each event."""
+    steps = [sorted(ctx.configuration)]
+    events = chart.with_suffix(".events.jsonl")
+    if events.exists():
+        for line in events.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if "event" not in item:
+                continue
+            ctx.trace_step(Event(name=item["event"], data=item.get("data")))
+            steps.append(sorted(ctx.configuration))
+    return steps
+
+
+@pytest.mark.parametrize("chart", CHARTS, ids=[c.stem for c in CHARTS])
+def test_trusted_load_matches_validated(chart: Path, tmp_path: Path) -> None:
+    """Trusted loads index and execute charts exactly like strict loads."""
+    source = _scjson(chart, tmp_path)
+    if source is None:
+        pytest.skip("chart does not convert")
+    strict = DocumentContext.from_json_file(source)
+    trusted = DocumentContext.from_json_file(source, trusted=True)
+    assert trusted.doc == strict.doc
+    assert _order_by_path(trusted) == _order_by_path(strict)
+    assert _run(trusted, chart) == _run(strict, chart)
+
+
+def test_trusted_xml_loads_read_order_from_the_source(monkeypatch) -> None:
+    """XML loads keep the source's interleaved action order, trusted or not."""
+    xml = (
+        '<scxml xmlns="http://www.w3.org/2005/07/scxml" datamodel="python" initial="a">'
+        '<datamodel><data id="n" expr="0"/></datamodel>'
+        '<state id="a"><onentry><log label="first" expr="n"/><assign location="n" expr="1"/>'
+        '<log label="second" expr="n"/><raise event="go"/><log label="third" expr="n"/></onentry>'
+        '<transition event="go" target="b"/></state><state id="b"/></scxml>'
+    )
+    strict = DocumentContext.from_xml_string(xml)
+
+    def layout_order(_raw):
+        raise AssertionError("XML loads must not derive order from the dataclass layout")
+
+    monkeypatch.setattr(DocumentContext, "_order_from_data", staticmethod(layout_order))
+    trusted = DocumentContext.from_xml_string(xml, trusted=True)
+    assert _order_by_path(trusted) == _order_by_path(strict)
+    onentry = _order_by_path(trusted)[("state", 0, "onentry", 0)]
+    assert onentry == ["log", "assign", "log", "raise", "log"]
+    assert trusted.action_log == strict.action_log == ["first:0", "second:1", "third:1"]
+    trusted.run()
+    assert trusted._trusted and "b" in trusted.configuration
+
+
+def test_trusted_flag_reaches_invoked_children() -> None:
+    """Inline ``<invoke>`` children inherit the parent's trusted mode."""
+    xml = (
+        '<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="a">'
+        '<state id="a"><invoke id="kid" type="scxml"><content>'
+        '<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="wait">'
+        '<state id="wait"><onentry><log expr="1"/><raise event="x"/></onentry>'
+        '<transition event="stop" target="end"/></state><final id="end"/>'
+        "</scxml></content></invoke></state></scxml>"
+    )
+    for trusted in (False, True):
+        ctx = DocumentContext.from_xml_string(xml, trusted=trusted)
+        child = ctx.invocations["kid"].child
+        assert child is not None
+        assert child._trusted is trusted
+        assert "wait" in child.configuration
@@ -18,7 +18,12 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from scjson.context import DocumentContext, ExecutionMode
-from vector_lib.analyzer import extract_event_alphabet, extract_invoke_hints
+from vector_lib.analyzer import (
+    chart_fingerprint,
+    extract_event_alphabet,
+    extract_invoke_hints,
+    extract_payload_heuristics,
+)
 
 
 def _chart_alphabet() -> str:
@@ -48,6 +53,19 @@ def _chart_invoke_deferred() -> str:
     ).strip()
 
 
+def _chart_compound_guard() -> str:
+    return (
+        """
+        <scxml initial="s0" xmlns="http://www.w3.org/2005/07/scxml">
+          <state id="s0">
+            <transition event="go" cond="_event.data.n &gt;= 3 and (_event.data.kind == 'A' or _event.data.kind == 'B')" target="s1"/>
+          </state>
+          <state id="s1"/>
+        </scxml>
+        """
+    ).strip()
+
+
 def test_alphabet_extraction_ignores_wildcards() -> None:
     ctx = DocumentContext.from_xml_string(_chart_alphabet(), execution_mode=ExecutionMode.LAX)
     alpha = extract_event_alphabet(ctx)
@@ -58,3 +76,23 @@ def test_invoke_hints_deferred_true() -> None:
     ctx = DocumentContext.from_xml_string(_chart_invoke_deferred(), execution_mode=ExecutionMode.LAX)
     hints = extract_invoke_hints(ctx)
     assert hints.get("has_deferred") is True
+
+
+def test_payload_heuristics_compound_guard_boundaries() -> None:
+    ctx = DocumentContext.from_xml_string(_chart_compound_guard(), execution_mode=ExecutionMode.LAX)
+    payloads = extract_payload_heuristics(ctx, max_variants=6).get("go") or []
+    # Each disjunct of the "or" yields a satisfying payload at the threshold
+    assert {"n": 3, "kind": "A"} in payloads
+    assert {"n": 3, "kind": "B"} in payloads
+    # The negated guard pushes n just below the threshold
+    assert any(p.get("n") == 2 for p in payloads)
+
+
+def test_payload_heuristics_memoized_per_chart() -> None:
+    ctx = DocumentContext.from_xml_string(_chart_compound_guard(), execution_mode=ExecutionMode.LAX)
+    first = extract_payload_heuristics(ctx)
+    first["go"].clear()
+    # Cached results are returned as independent copies
+    assert extract_payload_heuristics(ctx)["go"]
+    other = DocumentContext.from_xml_string(_chart_alphabet(), execution_mode=ExecutionMode.LAX)
+    assert chart_fingerprint(ctx) != chart_fingerprint(other)
@@ -22,6 +22,7 @@ import json
 from scjson.context import DocumentContext, ExecutionMode
 from vector_lib.analyzer import extract_payload_heuristics
 from vector_lib.search import generate_sequences
+import vector_gen
 from vector_gen import generate_vectors, _minimize_sequence
 
 
@@ -298,3 +299,22 @@ def test_vector_meta_recommends_advance_time(tmp_path: Path) -> None:
     assert float(meta.get("advanceTime", 0.0)) >= 0.0
     # For this chart specifically, we should detect the 1s delay and recommend > 0
     assert float(meta.get("advanceTime", 0.0)) > 0.0
+
+
+def test_payload_hint_cache_is_keyed_on_analyzer_source(tmp_path: Path, monkeypatch) -> None:
+    """A sidecar written by another analyzer version is recomputed."""
+    chart = tmp_path / "flag.scxml"
+    chart.write_text(_chart_cond_flag(), encoding="utf-8")
+    ctx = DocumentContext.from_xml_file(chart, execution_mode=ExecutionMode.LAX)
+    hints = vector_gen._cached_payload_hints(ctx, tmp_path, "flag", 4)
+    sidecar = tmp_path / "flag.payload-hints.json"
+    record = json.loads(sidecar.read_text(encoding="utf-8"))
+    assert record["analyzerHash"] == vector_gen._analyzer_fingerprint()
+
+    record["hints"] = {"go": [{"stale": True}]}
+    sidecar.write_text(json.dumps(record), encoding="utf-8")
+    assert vector_gen._cached_payload_hints(ctx, tmp_path, "flag", 4) == {"go": [{"stale": True}]}
+
+    monkeypatch.setattr(vector_gen, "_analyzer_fingerprint", lambda: "newer-analyzer")
+    assert vector_gen._cached_payload_hints(ctx, tmp_path, "flag", 4) == hints
+    assert json.loads(sidecar.read_text(encoding="utf-8"))["analyzerHash"] == "newer-analyzer"
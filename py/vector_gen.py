@@ -15,12 +15,16 @@ delayed sends during initialization to choose a recommended ``advance_time``.
 from __future__ import annotations
 
 import argparse
+import hashlib
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Iterable, List, Set
 
 from scjson.context import DocumentContext, ExecutionMode
 from scjson.events import Event
+from vector_lib import analyzer
 from vector_lib.analyzer import (
+    chart_fingerprint,
     extract_event_alphabet,
     extract_invoke_hints,
     extract_payload_heuristics,
@@ -47,6 +51,66 @@ def _ctx_factory(chart: Path, treat_as_xml: bool, advance_time: float) -> callab
     return make
 
 
+@lru_cache(maxsize=1)
+def _analyzer_fingerprint() -> str:
+    """Hash the analyzer source so payload-hint sidecars expire when it changes."""
+
+    try:
+        return hashlib.sha256(Path(analyzer.__file__).read_bytes()).hexdigest()
+    except OSError:
+        return "unknown"
+
+
+def _cached_payload_hints(ctx: DocumentContext, out_dir: Path, stem: str, variants: int) -> dict[str, list]:
+    """Return payload heuristics, reusing a sidecar from a previous run.
+
+    The sidecar ``<stem>.payload-hints.json`` records the analyzer's chart
+    fingerprint and a hash of the analyzer source; when both match the
+    analysis is skipped.
+
+    Parameters
+    ----------
+    ctx: DocumentContext
+        Initialized runtime context for the chart.
+    out_dir: Path
+        Vector output directory holding the sidecar.
+    stem: str
+        Chart file stem used to name the sidecar.
+    variants: int
+        Maximum payload variants per event.
+
+    Returns
+    -------
+    dict[str, list]
+        Mapping from event name to payload variants.
+    """
+    cache_path = out_dir / f"{stem}.payload-hints.json"
+    fingerprint = chart_fingerprint(ctx)
+    analyzer_hash = _analyzer_fingerprint()
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if (
+            cached.get("chartHash") == fingerprint
+            and cached.get("analyzerHash") == analyzer_hash
+            and cached.get("maxVariants") == variants
+        ):
+            return cached["hints"]
+    except Exception:
+        pass
+    hints = extract_payload_heuristics(ctx, max_variants=variants)
+    try:
+        record = {
+            "chartHash": fingerprint,
+            "analyzerHash": analyzer_hash,
+            "maxVariants": variants,
+            "hints": hints,
+        }
+        cache_path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+    except Exception:
+        pass
+    return hints
+
+
 def _simulate_sequence(ctx: DocumentContext, seq: list[Any]) -> CoverageTracker:
     """Simulate a sequence of stimuli against the given context.
 
@@ -176,7 +240,7 @@ def generate_vectors(
 
     alphabet = extract_event_alphabet(ctx)
     hints = extract_invoke_hints(ctx)
-    payload_hints = extract_payload_heuristics(ctx, max_variants=max(1, int(variants_per_event)))
+    payload_hints = _cached_payload_hints(ctx, out_dir, chart.stem, max(1, int(variants_per_event)))
     # Include a generic "complete" stimulus when a deferred invocation is present.
     if hints.get("has_deferred") and "complete" not in alphabet:
         alphabet = list(alphabet) + ["complete"]
@@ -232,14 +296,13 @@ def generate_vectors(
                 name = item.get("event") if isinstance(item, dict) else str(item)
                 data = item.get("data") if isinstance(item, dict) and ("data" in item) else None
                 trace = ctx.trace_step(Event(name=str(name), data=data))
-                # If any delayed events are scheduled, advance time just past
-                # the earliest due so they will be released before the next
-                # external stimulus.
+                # If any timers are pending (here or in child invocations),
+                # advance time just past the earliest due so they will be
+                # released before the next external stimulus.
                 try:
-                    now = float(getattr(ctx, "_timer_now", 0.0))
-                    deltas = [float(due) - now for (due, _evt) in getattr(ctx, "delayed_events", [])]
-                    if deltas:
-                        delta = max(0.0, min(deltas)) + epsilon
+                    pending = ctx.next_timer()
+                    if pending is not None:
+                        delta = pending + epsilon
                         # Apply to runtime so subsequent simulation matches
                         ctx.advance_time(delta)
                         # Record control token for the CLI runner; reference
@@ -11,17 +11,22 @@ This module extracts:
 - A simple event alphabet from transition ``event`` attributes
 - Lightweight invoke hints
 - Phase 2 payload heuristics: suggested ``_event.data`` shapes per event
-  name, derived from scanning transition ``cond`` expressions for common
-  patterns (truthiness, equality, numeric thresholds).
+  name, derived from the parsed ``ast`` of transition ``cond`` expressions
+  (truthiness, equality, numeric thresholds, membership and boolean
+  combinations of those).
 """
 
 from __future__ import annotations
 
-import re
+import ast
+import copy
+import hashlib
 import json
-from typing import Any, Dict, List, Set, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from scjson.context import DocumentContext
+from scjson.safe_eval import parse_expression
 
 
 def extract_event_alphabet(ctx: DocumentContext) -> List[str]:
@@ -84,35 +89,45 @@ def extract_invoke_hints(ctx: DocumentContext) -> Dict[str, bool]:
     return {"has_deferred": has_deferred}
 
 
-def _parse_literal(token: str) -> Any:
-    """Parse a simple Python-like literal from a token.
-
-    Supports single/double quoted strings, integers, floats, and
-    ``True``/``False``/``None``. Returns the original token on failure.
-
-    Parameters
-    ----------
-    token: str
-        Raw token text to parse.
-
-    Returns
-    -------
-    Any
-        Parsed value or the original string if parsing fails.
-    """
-    t = token.strip()
-    if len(t) >= 2 and ((t[0] == t[-1] == '"') or (t[0] == t[-1] == "'")):
-        return t[1:-1]
-    if t in {"True", "False"}:
-        return t == "True"
-    if t == "None":
-        return None
-    try:
-        if "." in t:
-            return float(t)
-        return int(t)
-    except Exception:
-        return token
+_EVENT_ROOTS = {"_event", "event"}
+# Fallback values tried when a path only has exclusion constraints
+_FLIP_CANDIDATES: Tuple[Any, ...] = (False, True, None, 0, 1, "__none__")
+# Upper bound on disjuncts kept per condition to limit combinatorics
+_MAX_DISJUNCTS = 8
+_MISSING = object()
+
+# Negated forms of the atomic constraint kinds produced by ``_compare_atoms``
+_NEGATED = {
+    "eq": "ne",
+    "ne": "eq",
+    "lt": "ge",
+    "ge": "lt",
+    "le": "gt",
+    "gt": "le",
+    "in": "notin",
+    "notin": "in",
+    "contains": "excludes",
+    "excludes": "contains",
+    "truthy": "falsy",
+    "falsy": "truthy",
+    "present": "present",
+}
+# Orientation swap used when the event path is the right-hand operand
+_MIRRORED = {"lt": "gt", "gt": "lt", "le": "ge", "ge": "le", "eq": "eq", "ne": "ne"}
+_COMPARE_OPS = {
+    ast.Eq: "eq",
+    ast.NotEq: "ne",
+    ast.Lt: "lt",
+    ast.LtE: "le",
+    ast.Gt: "gt",
+    ast.GtE: "ge",
+}
+
+_HINT_CACHE: "OrderedDict[Tuple[str, int], Dict[str, List[Dict[str, Any]]]]" = OrderedDict()
+_HINT_CACHE_SIZE = 128
+
+Atom = Tuple[str, str, Any]
+Conjunction = Dict[str, "_Constraint"]
 
 
 def _set_deep(mapping: Dict[str, Any], dotted: str, value: Any) -> None:
@@ -140,24 +155,476 @@ def _set_deep(mapping: Dict[str, Any], dotted: str, value: Any) -> None:
         cur = nxt
 
 
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _flip(value: Any) -> Any:
+    """Return a value of the same flavour as ``value`` that differs from it."""
+    if isinstance(value, bool):
+        return not value
+    if _is_number(value):
+        return value + 1
+    if isinstance(value, str):
+        return value + "_x"
+    if value is None:
+        return 1
+    if isinstance(value, (list, tuple)):
+        return [] if value else [None]
+    return None
+
+
+class _Constraint:
+    """Accumulated requirements on a single ``_event.data`` path.
+
+    Constraints are merged conjunctively; :meth:`solve` picks the first
+    boundary value that satisfies all of them.
+    """
+
+    __slots__ = (
+        "eq",
+        "ne",
+        "lo",
+        "lo_incl",
+        "hi",
+        "hi_incl",
+        "members",
+        "non_members",
+        "contains",
+        "excludes",
+        "truthy",
+    )
+
+    def __init__(self) -> None:
+        self.eq: Any = _MISSING
+        self.ne: List[Any] = []
+        self.lo: Any = None
+        self.lo_incl = True
+        self.hi: Any = None
+        self.hi_incl = True
+        self.members: Optional[List[Any]] = None
+        self.non_members: List[Any] = []
+        self.contains: List[Any] = []
+        self.excludes: List[Any] = []
+        self.truthy: Optional[bool] = None
+
+    @classmethod
+    def from_atom(cls, kind: str, value: Any) -> "_Constraint":
+        con = cls()
+        if kind == "eq":
+            con.eq = value
+        elif kind == "ne":
+            con.ne.append(value)
+        elif kind in {"gt", "ge"} and _is_number(value):
+            con.lo, con.lo_incl = value, kind == "ge"
+        elif kind in {"lt", "le"} and _is_number(value):
+            con.hi, con.hi_incl = value, kind == "le"
+        elif kind == "in":
+            con.members = list(value)
+        elif kind == "notin":
+            con.non_members.extend(value)
+        elif kind == "contains":
+            con.contains.append(value)
+        elif kind == "excludes":
+            con.excludes.append(value)
+        elif kind == "truthy":
+            con.truthy = True
+        elif kind == "falsy":
+            con.truthy = False
+        return con
+
+    def merge(self, other: "_Constraint") -> Optional["_Constraint"]:
+        """Return the conjunction of ``self`` and ``other`` or ``None`` on conflict."""
+        out = _Constraint()
+        if self.eq is not _MISSING and other.eq is not _MISSING and self.eq != other.eq:
+            return None
+        out.eq = self.eq if self.eq is not _MISSING else other.eq
+        if self.truthy is not None and other.truthy is not None and self.truthy != other.truthy:
+            return None
+        out.truthy = self.truthy if self.truthy is not None else other.truthy
+        out.ne = self.ne + other.ne
+        out.non_members = self.non_members + other.non_members
+        out.contains = self.contains + other.contains
+        out.excludes = self.excludes + other.excludes
+        if self.members is None or other.members is None:
+            out.members = self.members if other.members is None else other.members
+        else:
+            out.members = [m for m in self.members if m in other.members]
+        out.lo, out.lo_incl = self.lo, self.lo_incl
+        if other.lo is not None and (
+            out.lo is None or other.lo > out.lo or (other.lo == out.lo and not other.lo_incl)
+        ):
+            out.lo, out.lo_incl = other.lo, other.lo_incl
+        out.hi, out.hi_incl = self.hi, self.hi_incl
+        if other.hi is not None and (
+            out.hi is None or other.hi < out.hi or (other.hi == out.hi and not other.hi_incl)
+        ):
+            out.hi, out.hi_incl = other.hi, other.hi_incl
+        return out
+
+    def accepts(self, value: Any) -> bool:
+        try:
+            if self.eq is not _MISSING and value != self.eq:
+                return False
+            if any(value == v for v in self.ne):
+                return False
+            if self.lo is not None or self.hi is not None:
+                if not _is_number(value):
+                    return False
+                if self.lo is not None and (value < self.lo or (value == self.lo and not self.lo_incl)):
+                    return False
+                if self.hi is not None and (value > self.hi or (value == self.hi and not self.hi_incl)):
+                    return False
+            if self.members is not None and value not in self.members:
+                return False
+            if any(value == v for v in self.non_members):
+                return False
+            if self.contains or self.excludes:
+                if not isinstance(value, list):
+                    return False
+                if any(v not in value for v in self.contains) or any(v in value for v in self.excludes):
+                    return False
+            if self.truthy is not None and bool(value) != self.truthy:
+                return False
+        except TypeError:
+            return False
+        return True
+
+    def _candidates(self) -> Iterable[Any]:
+        if self.eq is not _MISSING:
+            yield self.eq
+            return
+        if self.contains or self.excludes:
+            yield list(self.contains)
+            return
+        if self.members is not None:
+            yield from self.members
+            return
+        if self.lo is not None or self.hi is not None:
+            # Boundary values just inside the admissible interval first
+            if self.lo is not None:
+                yield self.lo if self.lo_incl else self.lo + 1
+            if self.hi is not None:
+                yield self.hi if self.hi_incl else self.hi - 1
+            if self.lo is not None and self.hi is not None:
+                mid = (self.lo + self.hi) / 2.0
+                yield int(mid) if float(mid).is_integer() else mid
+            return
+        if self.truthy is not None:
+            yield self.truthy
+            return
+        for excluded in self.ne + self.non_members:
+            yield _flip(excluded)
+        if self.ne or self.non_members:
+            yield from _FLIP_CANDIDATES
+            return
+        yield True
+
+    def solve(self) -> Any:
+        """Return a value satisfying every constraint or ``_MISSING``."""
+        for candidate in self._candidates():
+            if self.accepts(candidate):
+                return candidate
+        return _MISSING
+
+
+def _event_data_path(node: ast.AST) -> Optional[str]:
+    """Return the dotted path below ``_event.data`` referenced by ``node``.
+
+    Both attribute access (``_event.data.user.id``) and string subscripts
+    (``_event.data['user']``) are recognised.
+    """
+    parts: List[str] = []
+    cur = node
+    while True:
+        if isinstance(cur, ast.Attribute):
+            parts.append(cur.attr)
+            cur = cur.value
+        elif (
+            isinstance(cur, ast.Subscript)
+            and isinstance(cur.slice, ast.Constant)
+            and isinstance(cur.slice.value, str)
+        ):
+            parts.append(cur.slice.value)
+            cur = cur.value
+        else:
+            break
+    if not isinstance(cur, ast.Name) or cur.id not in _EVENT_ROOTS:
+        return None
+    parts.reverse()
+    if len(parts) < 2 or parts[0] != "data":
+        return None
+    return ".".join(parts[1:])
+
+
+def _operand_value(node: ast.AST, ctx: DocumentContext) -> Any:
+    """Resolve a comparison operand to a literal or datamodel value."""
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        pass
+    names: List[str] = []
+    cur = node
+    while isinstance(cur, ast.Attribute):
+        names.append(cur.attr)
+        cur = cur.value
+    if not isinstance(cur, ast.Name) or cur.id in _EVENT_ROOTS:
+        return _MISSING
+    names.append(cur.id)
+    # Resolve dotted variable from global datamodel only (best-effort)
+    value: Any = ctx.data_model
+    for part in reversed(names):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+
+def _compare_atoms(left: ast.AST, op: ast.cmpop, right: ast.AST, ctx: DocumentContext) -> List[Atom]:
+    """Translate one ``left <op> right`` link of a comparison into atoms."""
+    lpath = _event_data_path(left)
+    rpath = _event_data_path(right)
+    if lpath is None and rpath is None:
+        return []
+    if lpath is not None and rpath is not None:
+        return [(lpath, "present", None), (rpath, "present", None)]
+    path = lpath if lpath is not None else rpath
+    other = right if lpath is not None else left
+    value = _operand_value(other, ctx)
+    if value is _MISSING:
+        return [(path, "present", None)]
+
+    if isinstance(op, (ast.Is, ast.IsNot)):
+        kind = "eq" if isinstance(op, ast.Is) else "ne"
+        return [(path, kind, value)]
+    if isinstance(op, (ast.In, ast.NotIn)):
+        positive = isinstance(op, ast.In)
+        if lpath is not None:
+            if isinstance(value, (list, tuple, set, frozenset)) and value:
+                return [(path, "in" if positive else "notin", list(value))]
+            return [(path, "present", None)]
+        return [(path, "contains" if positive else "excludes", value)]
+    kind = _COMPARE_OPS.get(type(op))
+    if kind is None:
+        return [(path, "present", None)]
+    if lpath is None:
+        kind = _MIRRORED[kind]
+    return [(path, kind, value)]
+
+
+def _merge_conjunctions(left: Conjunction, right: Conjunction) -> Optional[Conjunction]:
+    merged = dict(left)
+    for path, con in right.items():
+        if path in merged:
+            combined = merged[path].merge(con)
+            if combined is None:
+                return None
+            merged[path] = combined
+        else:
+            merged[path] = con
+    return merged
+
+
+def _conjoin(parts: List[List[Conjunction]]) -> List[Conjunction]:
+    """Distribute a conjunction of disjunctions into (bounded) DNF."""
+    result: List[Conjunction] = [{}]
+    for alternatives in parts:
+        nxt: List[Conjunction] = []
+        for left in result:
+            for right in alternatives:
+                merged = _merge_conjunctions(left, right)
+                if merged is not None:
+                    nxt.append(merged)
+                if len(nxt) >= _MAX_DISJUNCTS:
+                    break
+            if len(nxt) >= _MAX_DISJUNCTS:
+                break
+        result = nxt
+        if not result:
+            break
+    return result
+
+
+def _atoms_to_dnf(atoms: List[Atom], negate: bool) -> List[Conjunction]:
+    if not negate:
+        return _conjoin([[{path: _Constraint.from_atom(kind, value)}] for path, kind, value in atoms])
+    # not (a and b) == (not a) or (not b)
+    return [
+        {path: _Constraint.from_atom(_NEGATED[kind], value)} for path, kind, value in atoms
+    ][:_MAX_DISJUNCTS]
+
+
+def _condition_dnf(node: ast.AST, ctx: DocumentContext, negate: bool = False) -> List[Conjunction]:
+    """Return constraint sets (disjunctive normal form) satisfying ``node``.
+
+    When ``negate`` is true the constraints describe ``not node`` instead;
+    negation is pushed down to the atoms following De Morgan's laws.
+    """
+    if isinstance(node, ast.BoolOp):
+        conjunctive = isinstance(node.op, ast.And) != negate
+        parts = [_condition_dnf(value, ctx, negate) for value in node.values]
+        if conjunctive:
+            return _conjoin(parts)
+        out: List[Conjunction] = []
+        for alternatives in parts:
+            out.extend(alternatives)
+        return out[:_MAX_DISJUNCTS]
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return _condition_dnf(node.operand, ctx, not negate)
+    if isinstance(node, ast.Compare):
+        atoms: List[Atom] = []
+        left = node.left
+        # Chained comparisons are an implicit conjunction of their links
+        for op, right in zip(node.ops, node.comparators):
+            atoms.extend(_compare_atoms(left, op, right, ctx))
+            left = right
+        if atoms:
+            return _atoms_to_dnf(atoms, negate)
+    else:
+        path = _event_data_path(node)
+        if path is not None:
+            return _atoms_to_dnf([(path, "truthy", None)], negate)
+    # Opaque sub-expression (calls, arithmetic, datamodel checks): keep any
+    # referenced event paths present without constraining their values.
+    present = {
+        p: _Constraint()
+        for p in (_event_data_path(sub) for sub in ast.walk(node))
+        if p is not None
+    }
+    return [present]
+
+
+def _solve_conjunction(conj: Conjunction) -> Optional[Dict[str, Any]]:
+    """Materialize a payload satisfying ``conj`` or ``None`` when infeasible."""
+    payload: Dict[str, Any] = {}
+    for path in sorted(conj, key=lambda p: (p.count("."), p)):
+        if any(other.startswith(path + ".") for other in conj):
+            # Nested paths imply a (truthy) mapping at this level
+            continue
+        value = conj[path].solve()
+        if value is _MISSING:
+            return None
+        _set_deep(payload, path, value)
+    return payload
+
+
+def _condition_payloads(cond: str, ctx: DocumentContext) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return satisfying and violating payloads for ``cond``."""
+    try:
+        tree = parse_expression(cond)
+    except (SyntaxError, ValueError):
+        return [], []
+    positives = [p for p in (_solve_conjunction(c) for c in _condition_dnf(tree.body, ctx)) if p]
+    negatives = [p for p in (_solve_conjunction(c) for c in _condition_dnf(tree.body, ctx, True)) if p]
+    return positives, negatives
+
+
+def _iter_conditions(ctx: DocumentContext) -> Iterable[Tuple[List[str], str]]:
+    for sid in sorted(ctx.activations.keys(), key=ctx._activation_order_key):
+        act = ctx.activations.get(sid)
+        if not act:
+            continue
+        for trans in getattr(act, "transitions", []) or []:
+            raw_events = (trans.event or "").split()
+            # Skip wildcard/prefix rules; generation targets concrete names
+            ev_names = [t for t in raw_events if t and t != "*" and not t.endswith(".*")]
+            if ev_names and trans.cond:
+                yield ev_names, str(trans.cond)
+
+
+def chart_fingerprint(ctx: DocumentContext) -> str:
+    """Return a stable hash of the inputs consumed by payload analysis.
+
+    The fingerprint covers every transition (source, event, cond) and the
+    current global datamodel, which membership tests may reference.
+
+    Parameters
+    ----------
+    ctx : DocumentContext
+        Initialized runtime context.
+
+    Returns
+    -------
+    str
+        Hex-encoded SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    for sid in sorted(ctx.activations.keys(), key=ctx._activation_order_key):
+        act = ctx.activations.get(sid)
+        for trans in getattr(act, "transitions", []) or []:
+            digest.update(json.dumps([sid, trans.event, trans.cond]).encode("utf-8"))
+    try:
+        dm_text = json.dumps(ctx.data_model, sort_keys=True, default=repr)
+    except Exception:
+        dm_text = repr(sorted(ctx.data_model.items(), key=lambda item: str(item[0])))
+    digest.update(dm_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _deep_merge(a: Dict[str, Any], b: Dict[str, Any]) -> tuple[bool, Dict[str, Any]]:
+    out: Dict[str, Any] = {}
+    keys = set(a.keys()) | set(b.keys())
+    for k in keys:
+        if k in a and k in b:
+            va, vb = a[k], b[k]
+            if isinstance(va, dict) and isinstance(vb, dict):
+                ok, merged = _deep_merge(va, vb)
+                if not ok:
+                    return False, {}
+                out[k] = merged
+            else:
+                if va != vb:
+                    return False, {}
+                out[k] = va
+        elif k in a:
+            out[k] = a[k]
+        else:
+            out[k] = b[k]
+    return True, out
+
+
+def _dedup(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    seen: set[str] = set()
+    out: List[Dict[str, Any]] = []
+    for p in payloads:
+        try:
+            key = json.dumps(p, sort_keys=True)
+        except Exception:
+            key = str(p)
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(p)
+    return out
+
+
 def extract_payload_heuristics(ctx: DocumentContext, max_variants: int = 3) -> Dict[str, List[Dict[str, Any]]]:
     """Infer simple event payload variants from transition conditions.
 
-    This scans each transition ``cond`` expression for references to
-    ``_event.data.<path>`` (or ``event.data.<path>``) and common comparator
-    patterns, then proposes a small set of payload dictionaries for the
-    associated concrete event names.
+    Each transition ``cond`` is parsed with :func:`scjson.safe_eval.parse_expression`
+    (sharing the evaluator's tree cache) and reduced to constraint sets over
+    ``_event.data.<path>`` (or ``event.data.<path>``) references. Boolean
+    ``and``/``or``/``not`` combinations are normalized into disjunctive form
+    so compound guards yield one candidate per satisfiable branch.
 
-    Heuristics covered:
+    Constraints covered:
     - Truthiness: ``_event.data.x`` or ``not _event.data.x`` → x=True/False
-    - Equality: ``_event.data.x == <literal>`` → x=<literal>
-    - Inequality: ``_event.data.n >= 3`` → n=3 and n=4
-    - ``is None`` and ``is not None`` → x=None and x=1
+    - Equality: ``_event.data.x == <literal>`` → x=<literal>, flipped otherwise
+    - Thresholds and ranges: ``_event.data.n >= 3`` → n=3 and n=2;
+      ``0 < _event.data.n < 5`` → n=1 with boundary violations n=0 and n=5
+    - ``is None`` / ``is not None`` → x=None and x=1
+    - Membership: ``x in [..]``, ``x in <datamodel var>`` and ``'A' in x``
+
+    Results are memoized per :func:`chart_fingerprint`, so repeated calls for
+    the same chart skip analysis.
 
     Parameters
     ----------
     ctx : DocumentContext
         Initialized runtime context used to iterate transitions and events.
+    max_variants : int
+        Maximum number of payload variants kept per event.
 
     Returns
     -------
@@ -167,261 +634,37 @@ def extract_payload_heuristics(ctx: DocumentContext, max_variants: int = 3) -> D
         where reasonable. Payload dictionaries can be merged by the caller to
         compose per-event candidates.
     """
+    key = (chart_fingerprint(ctx), max(1, int(max_variants)))
+    cached = _HINT_CACHE.get(key)
+    if cached is None:
+        cached = _analyze_payloads(ctx, key[1])
+        _HINT_CACHE[key] = cached
+        while len(_HINT_CACHE) > _HINT_CACHE_SIZE:
+            _HINT_CACHE.popitem(last=False)
+    else:
+        _HINT_CACHE.move_to_end(key)
+    return copy.deepcopy(cached)
+
+
+def _analyze_payloads(ctx: DocumentContext, max_variants: int) -> Dict[str, List[Dict[str, Any]]]:
     hints: Dict[str, List[Dict[str, Any]]] = {}
     # Track per-event positive/negative pairs to enable one-hot fusion later
     per_event_pairs: Dict[str, List[tuple[Dict[str, Any], Dict[str, Any]]]] = {}
 
-    # Regex to capture event.data paths and nearby comparators
-    path_re = re.compile(r"(?:(?:_event|event)\.data\.)((?:[A-Za-z_][A-Za-z0-9_]*)(?:\.[A-Za-z_][A-Za-z0-9_]*)*)")
-
-    def _record(evt: str, positive: Dict[str, Any], negative: Dict[str, Any]) -> None:
-        cur = hints.setdefault(evt, [])
-        # Keep variants short; append positive/negative if non-empty and not duplicates
-        for variant in (positive, negative):
-            if not variant:
-                continue
-            if variant not in cur:
-                cur.append(variant)
-            if len(cur) >= 3:
-                break
-
-    for sid in sorted(ctx.activations.keys(), key=ctx._activation_order_key):
-        act = ctx.activations.get(sid)
-        if not act:
+    for ev_names, cond in _iter_conditions(ctx):
+        positives, negatives = _condition_payloads(cond, ctx)
+        if not positives and not negatives:
             continue
-        for trans in getattr(act, "transitions", []) or []:
-            raw_events = (trans.event or "").split()
-            # Skip wildcard/prefix rules; generation targets concrete names
-            ev_names = [t for t in raw_events if t and t != "*" and not t.endswith(".*")]
-            if not ev_names or not trans.cond:
-                continue
-            cond = str(trans.cond)
-            # Find all event.data paths referenced in the condition
-            paths = list(path_re.finditer(cond))
-            if not paths:
-                continue
-
-            positive: Dict[str, Any] = {}
-            negative: Dict[str, Any] = {}
-
-            def _resolve_var(path_expr: str) -> Any:
-                # Resolve dotted variable from global datamodel only (best-effort)
-                cur: Any = ctx.data_model
-                for part in [p for p in path_expr.split(".") if p]:
-                    if isinstance(cur, dict) and part in cur:
-                        cur = cur[part]
-                    else:
-                        return None
-                return cur
-
-            for m in paths:
-                path = m.group(1)
-                # Look around the match to find a comparator/value
-                start, end = m.span(0)
-                window = cond[max(0, start - 48) : min(len(cond), end + 48)]
-                # Equality/inequality
-                eq = re.search(r"==\s*([^\s\)\]\}]+|'.*?'|\".*?\")", window)
-                ne = re.search(r"!=\s*([^\s\)\]\}]+|'.*?'|\".*?\")", window)
-                ge = re.search(r">=\s*([0-9]+(?:\.[0-9]+)?)", window)
-                le = re.search(r"<=\s*([0-9]+(?:\.[0-9]+)?)", window)
-                gt = re.search(r">\s*([0-9]+(?:\.[0-9]+)?)", window)
-                lt = re.search(r"<\s*([0-9]+(?:\.[0-9]+)?)", window)
-                is_none = re.search(r"\bis\s+None\b", window)
-                not_none = re.search(r"\bis\s+not\s+None\b", window)
-                not_prefix = re.search(r"\bnot\s+(?:(?:_event|event)\.data\.)", window)
-                # Membership tests
-                # Forms handled:
-                #   <path> [not] in [list literal]
-                #   [literal] in <path> (treat path as container)
-                path_expr = re.escape(m.group(0))  # full matched prefix and path
-                mem_in = re.search(rf"{path_expr}\s+in\s*(\[[^\]]+\]|\([^\)]+\))", cond)
-                mem_not_in = re.search(rf"{path_expr}\s+not\s+in\s*(\[[^\]]+\]|\([^\)]+\))", cond)
-                rev_in = re.search(rf"('.*?'|\".*?\"|\S+)\s+in\s*{path_expr}", cond)
-                rev_not_in = re.search(rf"('.*?'|\".*?\"|\S+)\s+not\s+in\s*{path_expr}", cond)
-                var_in = re.search(rf"{path_expr}\s+in\s+([A-Za-z_][A-Za-z0-9_\.]+)", cond)
-                var_not_in = re.search(rf"{path_expr}\s+not\s+in\s+([A-Za-z_][A-Za-z0-9_\.]+)", cond)
-                mem_values: List[Any] = []
-                if mem_in or mem_not_in:
-                    seq_text = (mem_in or mem_not_in).group(1)
-                    try:
-                        # Simple safe literal eval for lists/tuples
-                        if seq_text.startswith("(") and seq_text.endswith(")"):
-                            raw_list = seq_text[1:-1]
-                        elif seq_text.startswith("[") and seq_text.endswith("]"):
-                            raw_list = seq_text[1:-1]
-                        else:
-                            raw_list = seq_text
-                        parts = [p.strip() for p in raw_list.split(",") if p.strip()]
-                        for tok in parts:
-                            mem_values.append(_parse_literal(tok))
-                    except Exception:
-                        mem_values = []
-
-                if eq:
-                    val = _parse_literal(eq.group(1))
-                    _set_deep(positive, path, val)
-                    # Pick a flipped value for negative branch
-                    flipped = None if val is not None else 1
-                    if isinstance(val, bool):
-                        flipped = not val
-                    elif isinstance(val, (int, float)):
-                        flipped = val + 1
-                    elif isinstance(val, str):
-                        flipped = val + "_x"
-                    _set_deep(negative, path, flipped)
-                elif ge or le or gt or lt:
-                    num_s = (ge or le or gt or lt).group(1)
-                    try:
-                        num = float(num_s) if "." in num_s else int(num_s)
-                    except Exception:
-                        num = 0
-                    # Satisfy threshold and flip over/under
-                    _set_deep(positive, path, num)
-                    _set_deep(negative, path, (num + 1) if isinstance(num, (int, float)) else 1)
-                elif is_none:
-                    _set_deep(positive, path, None)
-                    _set_deep(negative, path, 1)
-                elif not_none:
-                    _set_deep(positive, path, 1)
-                    _set_deep(negative, path, None)
-                elif mem_in and mem_values:
-                    # Choose first member as positive, a distinct value as negative
-                    _set_deep(positive, path, mem_values[0])
-                    flipped = None
-                    for candidate in (False, True, None, 0, 1, "__none__"):
-                        if candidate not in mem_values:
-                            flipped = candidate
-                            break
-                    _set_deep(negative, path, flipped)
-                elif mem_not_in and mem_values:
-                    # Choose a non-member for positive, and member for negative
-                    positive_val = None
-                    for candidate in (False, True, None, 0, 1, "__none__"):
-                        if candidate not in mem_values:
-                            positive_val = candidate
-                            break
-                    _set_deep(positive, path, positive_val)
-                    _set_deep(negative, path, mem_values[0])
-                elif rev_in:
-                    # Reverse orientation: literal in <path> (container)
-                    lit = _parse_literal(rev_in.group(1))
-                    _set_deep(positive, path, [lit])
-                    _set_deep(negative, path, [])
-                elif rev_not_in:
-                    lit = _parse_literal(rev_not_in.group(1))
-                    _set_deep(positive, path, [])
-                    _set_deep(negative, path, [lit])
-                elif var_in:
-                    varname = var_in.group(1)
-                    # Skip _event.data var; handled earlier
-                    if not varname.startswith("_event.") and not varname.startswith("event."):
-                        container = _resolve_var(varname)
-                        if isinstance(container, (list, tuple)) and container:
-                            _set_deep(positive, path, container[0])
-                            flipped = None
-                            for candidate in (False, True, None, 0, 1, "__none__"):
-                                if candidate not in container:
-                                    flipped = candidate
-                                    break
-                            _set_deep(negative, path, flipped)
-                elif var_not_in:
-                    varname = var_not_in.group(1)
-                    if not varname.startswith("_event.") and not varname.startswith("event."):
-                        container = _resolve_var(varname)
-                        if isinstance(container, (list, tuple)) and container:
-                            _set_deep(positive, path, None)
-                            _set_deep(negative, path, container[0])
-                else:
-                    # Truthiness or negation
-                    if not_prefix:
-                        _set_deep(positive, path, False)
-                        _set_deep(negative, path, True)
-                    else:
-                        _set_deep(positive, path, True)
-                        _set_deep(negative, path, False)
-
-            # Chained comparisons around the same path
-            path_full = re.escape(m.group(0))
-            chain = re.search(rf"([0-9]+(?:\.[0-9]+)?)\s*([<>]=?)\s*{path_full}\s*([<>]=?)\s*([0-9]+(?:\.[0-9]+)?)", cond)
-            if chain:
-                try:
-                    left_num = float(chain.group(1))
-                    right_num = float(chain.group(4))
-                    mid = (left_num + right_num) / 2.0
-                    pos = int(mid) if mid.is_integer() else mid
-                    neg = int(right_num + 1) if right_num.is_integer() else right_num + 1.0
-                    _set_deep(positive, path, pos)
-                    _set_deep(negative, path, neg)
-                except Exception:
-                    pass
-            else:
-                # Try split comparisons: path > a and path < b
-                try:
-                    lowers = [
-                        float(m2.group(2))
-                        for m2 in re.finditer(rf"{path_full}\s*>\s*([0-9]+(?:\.[0-9]+)?)", cond)
-                    ] + [
-                        float(m2.group(1))
-                        for m2 in re.finditer(rf"([0-9]+(?:\.[0-9]+)?)\s*<\s*{path_full}", cond)
-                    ]
-                    uppers = [
-                        float(m2.group(2))
-                        for m2 in re.finditer(rf"{path_full}\s*<\s*([0-9]+(?:\.[0-9]+)?)", cond)
-                    ] + [
-                        float(m2.group(1))
-                        for m2 in re.finditer(rf"([0-9]+(?:\.[0-9]+)?)\s*>\s*{path_full}", cond)
-                    ]
-                    if lowers and uppers:
-                        lo = max(lowers)
-                        hi = min(uppers)
-                        if lo < hi:
-                            mid = (lo + hi) / 2.0
-                            pos = int(mid) if mid.is_integer() else mid
-                            neg = int(hi + 1) if hi.is_integer() else hi + 1.0
-                            _set_deep(positive, path, pos)
-                            _set_deep(negative, path, neg)
-                except Exception:
-                    pass
-
-            for ev in ev_names:
-                _record(ev, positive, negative)
-                per_event_pairs.setdefault(ev, []).append((dict(positive), dict(negative)))
-
-    # Fuse payloads across transitions for the same event to form richer shapes
-    def _deep_merge(a: Dict[str, Any], b: Dict[str, Any]) -> tuple[bool, Dict[str, Any]]:
-        out: Dict[str, Any] = {}
-        keys = set(a.keys()) | set(b.keys())
-        for k in keys:
-            if k in a and k in b:
-                va, vb = a[k], b[k]
-                if isinstance(va, dict) and isinstance(vb, dict):
-                    ok, merged = _deep_merge(va, vb)
-                    if not ok:
-                        return False, {}
-                    out[k] = merged
-                else:
-                    if va != vb:
-                        return False, {}
-                    out[k] = va
-            elif k in a:
-                out[k] = a[k]
-            else:
-                out[k] = b[k]
-        return True, out
-
-    def _dedup(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        seen: set[str] = set()
-        out: List[Dict[str, Any]] = []
-        for p in payloads:
-            try:
-                key = json.dumps(p, sort_keys=True)
-            except Exception:
-                key = str(p)
-            if key in seen:
-                continue
-            seen.add(key)
-            out.append(p)
-        return out
+        positive = positives[0] if positives else {}
+        negative = negatives[0] if negatives else {}
+        # Primary pair first, then alternative boundary values per branch
+        variants = [positive, negative] + positives[1:] + negatives[1:]
+        for ev in ev_names:
+            cur = hints.setdefault(ev, [])
+            for variant in variants:
+                if variant and variant not in cur:
+                    cur.append(variant)
+            per_event_pairs.setdefault(ev, []).append((dict(positive), dict(negative)))
 
     fused: Dict[str, List[Dict[str, Any]]] = {}
     for ev, variants in hints.items():
@@ -429,7 +672,7 @@ def extract_payload_heuristics(ctx: DocumentContext, max_variants: int = 3) -> D
         # Greedy pairwise fusion to limit combinatorics; keep up to 3
         results: List[Dict[str, Any]] = []
         # Prefer richer seeds first
-        seeds = sorted(base, key=lambda d: (-len(d), json.dumps(d, sort_keys=True)))
+        seeds = sorted(base, key=lambda d: (-len(d), json.dumps(d, sort_keys=True, default=repr)))
         for i, a in enumerate(seeds):
             # Add the seed itself first
             if len(results) < 3:
@@ -458,6 +701,6 @@ def extract_payload_heuristics(ctx: DocumentContext, max_variants: int = 3) -> D
 
         # Prepend one-hot variants to prioritize branch-flipping sequences
         prioritized = one_hot + results
-        fused[ev] = _dedup(prioritized)[:max(1, int(max_variants))] if prioritized else base[:max(1, int(max_variants))]
+        fused[ev] = _dedup(prioritized)[:max_variants] if prioritized else base[:max_variants]
 
     return fused
@@ -7,18 +7,23 @@ Licensed under the BSD 1-Clause License.
 
 Sweep a corpus with the Python engine verifier and summarize outcomes.
 
-Runs `python -m scjson.cli engine-verify` on each chart and reports counts of
-pass/fail/other. Useful for quickly triaging coverage without requiring an
-events stream.
+Verifies each chart in process via ``scjson.verify`` (the same code path as
+``scjson engine-verify``), optionally across a process pool so every worker
+imports scjson once, and reports counts of pass/fail/other/timeout/error.
+Useful for quickly triaging coverage without requiring an events stream.
 """
 
 from __future__ import annotations
 
 import argparse
-import subprocess
+import json
+import os
 import sys
+import time
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Iterable
+
+from scjson.verify import iter_verify, verify_summary
 
 ROOT = Path(__file__).resolve().parent.parent
 
@@ -29,30 +34,6 @@ def _iter_charts(root: Path, pattern: str) -> Iterable[Path]:
             yield p
 
 
-def _verify(chart: Path, advance_time: float) -> Tuple[str, str]:
-    cmd = [
-        sys.executable,
-        "-m",
-        "scjson.cli",
-        "engine-verify",
-        "-I",
-        str(chart),
-        "--xml",
-    ]
-    if advance_time and advance_time > 0:
-        cmd.extend(["--advance-time", str(advance_time)])
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    out = (proc.stdout or "") + (proc.stderr or "")
-    # Output contains lines like "outcome: pass"
-    outcome = "other"
-    for line in out.splitlines():
-        line = line.strip().lower()
-        if line.startswith("outcome:"):
-            outcome = line.split(":", 1)[1].strip()
-            break
-    return outcome, out
-
-
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
@@ -73,31 +54,60 @@ def main() -> None:
         default=3.0,
         help="Advance time by N seconds for each chart (for delayed sends)",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=0,
+        help="Worker processes (default 0 = one per CPU; 1 runs serially)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Per-chart wall-clock limit in seconds (0 disables)",
+    )
+    parser.add_argument(
+        "--summary",
+        type=Path,
+        help="Write a JSON summary with per-chart outcome and timing",
+    )
     args = parser.parse_args()
 
-    total = 0
-    counts = {"pass": 0, "fail": 0, "other": 0}
-    failures: list[tuple[Path, str]] = []
-
-    for chart in _iter_charts(args.root, args.glob):
-        total += 1
-        outcome, raw = _verify(chart, args.advance_time)
-        counts[outcome] = counts.get(outcome, 0) + 1
-        if outcome != "pass":
-            failures.append((chart, raw))
+    charts = list(_iter_charts(args.root, args.glob))
+    workers = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    started = time.perf_counter()
+    results = list(
+        iter_verify(
+            charts,
+            jobs=workers,
+            is_xml=True,
+            advance_time=args.advance_time,
+            timeout=args.timeout or None,
+        )
+    )
+    summary = verify_summary(results, elapsed=time.perf_counter() - started)
+    counts = summary["counts"]
+    failures = [item for item in results if item["outcome"] != "pass"]
 
     print(
-        f"Verify summary: total={total} pass={counts['pass']} fail={counts['fail']} other={counts['other']}"
+        f"Verify summary: total={summary['total']} pass={counts['pass']} fail={counts['fail']} "
+        f"other={counts['other']} timeout={counts['timeout']} error={counts['error']} "
+        f"elapsed={summary['elapsed']:.2f}s"
     )
+    if args.summary:
+        args.summary.parent.mkdir(parents=True, exist_ok=True)
+        args.summary.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
     if failures:
         print("Sample failures (first 10):")
-        for path, text in failures[:10]:
-            print(f"- {path}")
-            print(text.strip())
+        for item in failures[:10]:
+            print(f"- {item['chart']}")
+            print(f"outcome: {item['outcome']}")
+            if item.get("error"):
+                print(item["error"])
         sys.exit(1)
     sys.exit(0)
 
 
 if __name__ == "__main__":
     main()
-
@@ -220,7 +220,8 @@ const COMBINED_INVOKERS = Object.assign({}, DEFAULT_INVOKERS, MOCK_INVOKERS);
 
 function usage() {
   console.error(
-    "Usage: scjson-scion-trace -I <chart.scxml> [-e events.jsonl] [-o trace.jsonl]"
+    "Usage: scjson-scion-trace -I <chart.scxml> [-e events.jsonl] [-o trace.jsonl]\n" +
+      "       scjson-scion-trace --worker"
   );
   process.exit(1);
 }
@@ -400,106 +401,230 @@ function emitTrace(ctx, step, sink) {
   sink.write(`${JSON.stringify(trace)}\n`);
 }
 
-(function main() {
-  const opts = parseArgs(process.argv.slice(2));
-  const chartPath = path.resolve(opts.input);
-  if (!fs.existsSync(chartPath)) {
-    console.error(`Chart not found: ${chartPath}`);
-    process.exit(1);
-  }
-  const events = opts.events ? readEvents(path.resolve(opts.events)) : [];
-
-  const sink = opts.out
-    ? fs.createWriteStream(path.resolve(opts.out), { encoding: "utf8" })
-    : process.stdout;
+function traceChart(chartPath, events, sink, done) {
+  let finished = false;
+  const finish = (err, label) => {
+    if (finished) return;
+    finished = true;
+    done(err, label);
+  };
 
+  let xml;
+  try {
+    xml = fs.readFileSync(chartPath, "utf8");
+  } catch (err) {
+    finish(err, "Chart not readable");
+    return;
+  }
   const dom = makeDom("file:///" + path.dirname(chartPath) + "/");
-
-  const xml = fs.readFileSync(chartPath, "utf8");
   const url = pathToFileURL(chartPath).toString();
 
+  try {
+    compileChart(url, xml, dom, events, sink, finish);
+  } catch (err) {
+    dom.window.close();
+    finish(err, `SCION (${SCION_NPM_URL}) compile error`);
+  }
+}
+
+function compileChart(url, xml, dom, events, sink, finish) {
   documentStringToModel(url, xml, (err, modelFactory) => {
     if (err) {
-      console.error(`SCION (${SCION_NPM_URL}) compile error`, err);
-      process.exit(1);
+      finish(err, `SCION (${SCION_NPM_URL}) compile error`);
+      return;
     }
 
     modelFactory.prepare(
       (prepErr, prepared) => {
         if (prepErr) {
-          console.error(`SCION (${SCION_NPM_URL}) prepare error`, prepErr);
-          process.exit(1);
+          finish(prepErr, `SCION (${SCION_NPM_URL}) prepare error`);
+          return;
         }
 
-        const interpreter = new core.Statechart(prepared, { invokers: COMBINED_INVOKERS });
-        const listenerState = { current: null };
-        const originalLog = console.log;
-
-        const listener = {
-          onEntry(stateId) {
-            if (listenerState.current) listenerState.current.entered.add(stateId);
-          },
-          onExit(stateId) {
-            if (listenerState.current) listenerState.current.exited.add(stateId);
-          },
-          onTransition(source, targets) {
-            if (listenerState.current) {
-              const arr = Array.isArray(targets) ? targets.slice() : [targets];
-              listenerState.current.transitions.push({ source, targets: arr });
-            }
-          },
-        };
-        interpreter.registerListener(listener);
-
-        function runWithContext(ctx, fn) {
-          listenerState.current = ctx;
-          const actionLogger = (...args) => {
-            const formatted = args.map(formatLogArg);
-            let payload;
-            if (formatted.length === 2 && typeof args[0] === "string") {
-              payload = `${formatted[0]}:${formatted[1]}`;
-            } else {
-              payload = formatted.join(" ");
-            }
-            listenerState.current.actionLog.push(payload);
+        try {
+          const interpreter = new core.Statechart(prepared, { invokers: COMBINED_INVOKERS });
+          const listenerState = { current: null };
+          const originalLog = console.log;
+
+          const listener = {
+            onEntry(stateId) {
+              if (listenerState.current) listenerState.current.entered.add(stateId);
+            },
+            onExit(stateId) {
+              if (listenerState.current) listenerState.current.exited.add(stateId);
+            },
+            onTransition(source, targets) {
+              if (listenerState.current) {
+                const arr = Array.isArray(targets) ? targets.slice() : [targets];
+                listenerState.current.transitions.push({ source, targets: arr });
+              }
+            },
           };
-          console.log = actionLogger;
-          try {
-            fn();
-          } finally {
-            console.log = originalLog;
-            listenerState.current = null;
+          interpreter.registerListener(listener);
+
+          function runWithContext(ctx, fn) {
+            listenerState.current = ctx;
+            const actionLogger = (...args) => {
+              const formatted = args.map(formatLogArg);
+              let payload;
+              if (formatted.length === 2 && typeof args[0] === "string") {
+                payload = `${formatted[0]}:${formatted[1]}`;
+              } else {
+                payload = formatted.join(" ");
+              }
+              listenerState.current.actionLog.push(payload);
+            };
+            console.log = actionLogger;
+            try {
+              fn();
+            } finally {
+              console.log = originalLog;
+              listenerState.current = null;
+            }
           }
-        }
 
-        // Initial step
-        const startCtx = createContext(null);
-        startCtx.beforeSnapshot = [[], {}, false, {}, []];
-        runWithContext(startCtx, () => interpreter.start());
-        startCtx.afterSnapshot = interpreter.getSnapshot();
-        emitTrace(startCtx, 0, sink);
-
-        // Event steps
-        let stepNo = 1;
-        for (const evt of events) {
-          const eventObj = { name: evt.name, data: evt.data };
-          const ctx = createContext(eventObj);
-          ctx.beforeSnapshot = interpreter.getSnapshot();
-          runWithContext(ctx, () => {
-            interpreter.gen({ name: evt.name, data: evt.data });
-          });
-          ctx.afterSnapshot = interpreter.getSnapshot();
-          emitTrace(ctx, stepNo, sink);
-          stepNo += 1;
-        }
-
-        if (sink !== process.stdout) {
-          sink.end();
+          // Initial step
+          const startCtx = createContext(null);
+          startCtx.beforeSnapshot = [[], {}, false, {}, []];
+          runWithContext(startCtx, () => interpreter.start());
+          startCtx.afterSnapshot = interpreter.getSnapshot();
+          emitTrace(startCtx, 0, sink);
+
+          // Event steps
+          let stepNo = 1;
+          for (const evt of events) {
+            const eventObj = { name: evt.name, data: evt.data };
+            const ctx = createContext(eventObj);
+            ctx.beforeSnapshot = interpreter.getSnapshot();
+            runWithContext(ctx, () => {
+              interpreter.gen({ name: evt.name, data: evt.data });
+            });
+            ctx.afterSnapshot = interpreter.getSnapshot();
+            emitTrace(ctx, stepNo, sink);
+            stepNo += 1;
+          }
+        } catch (runErr) {
+          finish(runErr, `SCION (${SCION_NPM_URL}) runtime error`);
+          return;
+        } finally {
+          dom.window.close();
         }
-        dom.window.close();
+        finish(null);
       },
       undefined,
       { document: global.document }
     );
   });
+}
+
+// Persistent worker mode: length-prefixed JSON frames over stdin/stdout.
+// Mirrors py/scjson/trace_worker.py; see that module for the message shapes.
+const SYNC_MARKER = Buffer.from("\u0000SCJSON-TRACE-WORKER/1\u0000", "latin1");
+
+function runWorker() {
+  const out = process.stdout;
+  // Keep stray logging off the frame stream; action logs are captured per run.
+  console.log = (...args) => console.error(...args);
+
+  function writeFrame(message, cb) {
+    const body = Buffer.from(JSON.stringify(message), "utf8");
+    const header = Buffer.alloc(4);
+    header.writeUInt32BE(body.length, 0);
+    out.write(Buffer.concat([header, body]), cb);
+  }
+
+  let buffer = Buffer.alloc(0);
+  let busy = false;
+  let ended = false;
+  const pending = [];
+
+  function pump() {
+    if (busy) return;
+    const req = pending.shift();
+    if (!req) {
+      if (ended) process.exit(0);
+      return;
+    }
+    const id = Object.prototype.hasOwnProperty.call(req, "id") ? req.id : null;
+    const op = req.op || "trace";
+    if (op === "shutdown") {
+      writeFrame({ id, ok: true }, () => process.exit(0));
+      return;
+    }
+    busy = true;
+    const reply = (message) => {
+      writeFrame(message);
+      busy = false;
+      setImmediate(pump);
+    };
+    if (op === "ping") {
+      reply({ id, ok: true });
+      return;
+    }
+    let events;
+    try {
+      events = req.events ? readEvents(path.resolve(req.events)) : [];
+    } catch (err) {
+      reply({ id, ok: false, error: `Events not readable: ${(err && err.message) || err}` });
+      return;
+    }
+    const lines = [];
+    const sink = { write(text) { lines.push(text); } };
+    traceChart(path.resolve(String(req.chart || "")), events, sink, (err, label) => {
+      if (err) {
+        reply({ id, ok: false, error: `${label}: ${(err && err.message) || err}` });
+        return;
+      }
+      reply({ id, ok: true, steps: lines.map((line) => JSON.parse(line)) });
+    });
+  }
+
+  process.stdin.on("data", (chunk) => {
+    buffer = Buffer.concat([buffer, chunk]);
+    while (buffer.length >= 4) {
+      const size = buffer.readUInt32BE(0);
+      if (buffer.length < 4 + size) break;
+      const body = buffer.subarray(4, 4 + size);
+      buffer = buffer.subarray(4 + size);
+      try {
+        pending.push(JSON.parse(body.toString("utf8")));
+      } catch (err) {
+        console.error("Discarding malformed frame", err);
+      }
+    }
+    pump();
+  });
+  process.stdin.on("end", () => {
+    ended = true;
+    pump();
+  });
+  out.write(SYNC_MARKER);
+}
+
+(function main() {
+  if (process.argv.slice(2).includes("--worker")) {
+    runWorker();
+    return;
+  }
+  const opts = parseArgs(process.argv.slice(2));
+  const chartPath = path.resolve(opts.input);
+  if (!fs.existsSync(chartPath)) {
+    console.error(`Chart not found: ${chartPath}`);
+    process.exit(1);
+  }
+  const events = opts.events ? readEvents(path.resolve(opts.events)) : [];
+
+  const sink = opts.out
+    ? fs.createWriteStream(path.resolve(opts.out), { encoding: "utf8" })
+    : process.stdout;
+
+  traceChart(chartPath, events, sink, (err, label) => {
+    if (err) {
+      console.error(label, err);
+      process.exit(1);
+    }
+    if (sink !== process.stdout) {
+      sink.end();
+    }
+  });
 })();